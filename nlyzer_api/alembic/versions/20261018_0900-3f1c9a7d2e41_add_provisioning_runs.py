@@ -0,0 +1,73 @@
+"""Add provisioning runs and checkpoints
+
+Revision ID: 3f1c9a7d2e41
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2e41'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+    op.create_table(
+        'provisioning_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('failed_step', sa.String(length=64), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_provisioning_runs_tenant_id'),
+        'provisioning_runs',
+        ['tenant_id'],
+        unique=True
+    )
+    op.create_table(
+        'provisioning_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('step_name', sa.String(length=64), nullable=False),
+        sa.Column('output', sa.JSON(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['run_id'], ['provisioning_runs.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_id', 'step_name')
+    )
+    op.create_index(
+        op.f('ix_provisioning_checkpoints_run_id'),
+        'provisioning_checkpoints',
+        ['run_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Revert migration."""
+    op.drop_index(
+        op.f('ix_provisioning_checkpoints_run_id'),
+        table_name='provisioning_checkpoints'
+    )
+    op.drop_table('provisioning_checkpoints')
+    op.drop_index(
+        op.f('ix_provisioning_runs_tenant_id'), table_name='provisioning_runs'
+    )
+    op.drop_table('provisioning_runs')
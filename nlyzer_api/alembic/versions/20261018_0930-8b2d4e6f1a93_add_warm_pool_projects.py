@@ -0,0 +1,54 @@
+"""Add warm pool projects
+
+Revision ID: 8b2d4e6f1a93
+Revises: 3f1c9a7d2e41
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4e6f1a93'
+down_revision: Union[str, None] = '3f1c9a7d2e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+    op.create_table(
+        'warm_pool_projects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('ready_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_warm_pool_projects_project_id'),
+        'warm_pool_projects',
+        ['project_id'],
+        unique=True
+    )
+    op.create_index(
+        op.f('ix_warm_pool_projects_status'),
+        'warm_pool_projects',
+        ['status'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Revert migration."""
+    op.drop_index(
+        op.f('ix_warm_pool_projects_status'), table_name='warm_pool_projects'
+    )
+    op.drop_index(
+        op.f('ix_warm_pool_projects_project_id'), table_name='warm_pool_projects'
+    )
+    op.drop_table('warm_pool_projects')
@@ -1,8 +1,20 @@
 """SQLAlchemy database models for NLyzer API."""
 
-from sqlalchemy import create_engine
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    create_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import relationship, sessionmaker
 
 # Base class for all our models
 Base = declarative_base()
@@ -13,4 +25,77 @@ Base = declarative_base()
 #     __tablename__ = "users"
 #     id = Column(Integer, primary_key=True)
 #     email = Column(String, unique=True, index=True)
-#     ...
\ No newline at end of file
+#     ...
+
+
+class ProvisioningRun(Base):
+    """
+    Provisioning state of one tenant, across all attempts.
+    
+    A failed run keeps its checkpoints so that the next attempt resumes
+    where it stopped instead of recreating resources.
+    """
+    
+    __tablename__ = "provisioning_runs"
+    
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(String(64), unique=True, index=True, nullable=False)
+    status = Column(String(16), nullable=False, default="running")
+    attempts = Column(Integer, nullable=False, default=0)
+    failed_step = Column(String(64))
+    last_error = Column(Text)
+    # Claim of the running attempt (UTC); NULL once it finishes
+    lease_expires_at = Column(DateTime)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+    
+    checkpoints = relationship(
+        "ProvisioningCheckpoint",
+        back_populates="run",
+        cascade="all, delete-orphan"
+    )
+
+
+class ProvisioningCheckpoint(Base):
+    """
+    Output of one completed provisioning step.
+    
+    Outputs are what later steps and retries need, e.g. the project ID,
+    the service account email or the Weaviate IP.
+    """
+    
+    __tablename__ = "provisioning_checkpoints"
+    __table_args__ = (UniqueConstraint("run_id", "step_name"),)
+    
+    id = Column(Integer, primary_key=True)
+    run_id = Column(
+        Integer,
+        ForeignKey("provisioning_runs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    step_name = Column(String(64), nullable=False)
+    output = Column(JSON)
+    completed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    run = relationship("ProvisioningRun", back_populates="checkpoints")
+
+
+class WarmPoolProject(Base):
+    """
+    A pre-provisioned project in the warm pool.
+    
+    Pool projects are created, billed and networked ahead of time and
+    handed to a new tenant when it signs up. The row is deleted when a
+    tenant claims the project.
+    """
+    
+    __tablename__ = "warm_pool_projects"
+    
+    id = Column(Integer, primary_key=True)
+    project_id = Column(String(64), unique=True, index=True, nullable=False)
+    status = Column(String(16), nullable=False, index=True, default="warming")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ready_at = Column(DateTime)
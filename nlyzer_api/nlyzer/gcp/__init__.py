@@ -7,6 +7,11 @@ orchestration.
 
 Key Components:
 - provisioning: Automated tenant infrastructure deployment
+- batch_provisioning: Quota-aware provisioning of many tenants at once
+- warm_pool: Pre-provisioned projects claimed by new tenants
+- teardown: Dependency-ordered, concurrent deletion of provisioned resources
+- resilience: Retry budgets and circuit breakers around every GCP call
+- tracing: Spans for provisioning runs, steps and GCP calls, exported as OTLP/JSON
 - clients: Centralized GCP client management and authentication
 - exceptions: Custom exception classes for GCP operations
 
@@ -20,24 +25,76 @@ Usage:
     from nlyzer.gcp.provisioning import provision_new_tenant
     
     result = await provision_new_tenant(tenant_id, config)
+
+Import Cost:
+    provision_new_tenant and GCPClientManager are resolved lazily on first
+    attribute access, and the google.cloud client libraries are only imported
+    when a client for that service is first requested. Importing this package
+    (e.g. for the exception classes) stays cheap for CLI invocations and
+    Cloud Function cold starts.
 """
 
-from nlyzer.gcp.provisioning import provision_new_tenant
-from nlyzer.gcp.clients import GCPClientManager
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from nlyzer.gcp.exceptions import (
+    AuthenticationError,
     ProvisioningError,
-    TenantAlreadyExistsError,
+    ProvisioningInProgressError,
     ResourceCreationError,
-    AuthenticationError
+    RunLeaseLostError,
+    TenantAlreadyExistsError,
 )
 
 __all__ = [
     'provision_new_tenant',
+    'abandon_provisioning',
+    'deprovision_tenant',
+    'provision_tenant_batch',
+    'deprovision_tenant_batch',
+    'get_warm_pool',
     'GCPClientManager', 
     'ProvisioningError',
     'TenantAlreadyExistsError',
+    'ProvisioningInProgressError',
+    'RunLeaseLostError',
     'ResourceCreationError',
     'AuthenticationError'
 ]
 
-__version__ = '1.0.0'
\ No newline at end of file
+__version__ = '1.0.0'
+
+# Public names loaded from their submodule on first access
+_LAZY_EXPORTS = {
+    'provision_new_tenant': 'nlyzer.gcp.provisioning',
+    'abandon_provisioning': 'nlyzer.gcp.provisioning',
+    'deprovision_tenant': 'nlyzer.gcp.provisioning',
+    'provision_tenant_batch': 'nlyzer.gcp.batch_provisioning',
+    'deprovision_tenant_batch': 'nlyzer.gcp.batch_provisioning',
+    'get_warm_pool': 'nlyzer.gcp.warm_pool',
+    'GCPClientManager': 'nlyzer.gcp.clients',
+}
+
+if TYPE_CHECKING:
+    from nlyzer.gcp.batch_provisioning import (
+        deprovision_tenant_batch,
+        provision_tenant_batch,
+    )
+    from nlyzer.gcp.clients import GCPClientManager
+    from nlyzer.gcp.provisioning import (
+        abandon_provisioning,
+        deprovision_tenant,
+        provision_new_tenant,
+    )
+    from nlyzer.gcp.warm_pool import get_warm_pool
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve lazily exported names on first access."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
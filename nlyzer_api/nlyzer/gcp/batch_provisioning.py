@@ -0,0 +1,337 @@
+"""
+Batch Tenant Provisioning
+
+Onboards many tenants at once without tripping GCP quotas. Tenants are
+provisioned by a bounded pool of workers, and every GCP call they make is
+paced by the shared quota budgets of nlyzer.gcp.quotas, which slow down
+when GCP answers with 429 / RESOURCE_EXHAUSTED and retry the throttled
+call instead of failing the run.
+
+If a call stays throttled for so long that its provisioning run fails
+anyway, the tenant is put back in the queue after a backoff. Because runs
+are checkpointed, the retry resumes where the failed run stopped.
+
+deprovision_tenant_batch is the bulk counterpart for offboarding: many
+tenants are torn down concurrently under the same quota budgets, and
+their DNS record removals share one DNS manager so they are batched into
+few zone writes.
+
+Usage:
+    from nlyzer.gcp.batch_provisioning import TenantRequest, provision_tenant_batch
+    
+    result = await provision_tenant_batch([
+        TenantRequest("tenant-a", config_a),
+        TenantRequest("tenant-b", config_b),
+    ])
+    
+    result = await deprovision_tenant_batch(["tenant-c", "tenant-d"])
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from nlyzer.gcp.checkpoints import CheckpointStore
+from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.dns_resolver import backoff_delay
+from nlyzer.gcp.exceptions import CleanupError, TenantAlreadyExistsError
+from nlyzer.gcp.provisioning import deprovision_tenant, provision_new_tenant
+from nlyzer.gcp.quotas import QuotaLimitedClientManager, QuotaManager, get_quota_manager
+
+logger = logging.getLogger(__name__)
+
+# Tenants provisioned at the same time. Each run mostly waits on long-running
+# operations, so concurrency is bounded by quotas rather than local resources.
+DEFAULT_BATCH_CONCURRENCY = 10
+
+# Tenants torn down at the same time when offboarding
+DEFAULT_DEPROVISION_CONCURRENCY = 20
+
+# Times a run that failed on an exhausted quota is resumed, and the backoff
+# before each resume
+DEFAULT_MAX_QUOTA_RESUMES = 3
+QUOTA_RESUME_DELAY = 30.0
+MAX_QUOTA_RESUME_DELAY = 300.0
+
+
+@dataclass
+class TenantRequest:
+    """
+    One tenant to provision in a batch.
+    
+    Attributes:
+        tenant_id: Unique tenant identifier
+        config: Tenant configuration, as for provision_new_tenant
+    """
+    
+    tenant_id: str
+    config: Dict = field(default_factory=dict)
+
+
+async def provision_tenant_batch(
+    requests: Iterable[TenantRequest],
+    client_manager: Optional[GCPClientManager] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    quotas: Optional[QuotaManager] = None,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    max_quota_resumes: int = DEFAULT_MAX_QUOTA_RESUMES
+) -> Dict[str, Any]:
+    """
+    Provision a batch of tenants within GCP quotas.
+    
+    Tenants are started in the given order, at most max_concurrency at a
+    time. A tenant whose provisioning raises, e.g. because it already
+    exists or another attempt holds its run, is reported as failed with
+    the error; the rest of the batch carries on.
+    
+    Args:
+        requests: Tenants to provision; tenant IDs must be unique
+        client_manager: Optional GCP client manager for the control-plane
+                       project
+        checkpoint_store: Optional checkpoint store. Defaults to the
+                         process-wide store.
+        quotas: Optional quota manager. Defaults to the process-wide
+               manager, so concurrent batches share budgets.
+        max_concurrency: Maximum tenants provisioned at the same time
+        max_quota_resumes: Times a run that failed on an exhausted quota
+                          is resumed
+    
+    Returns:
+        Dict containing:
+            - status: "success", "partial" or "failed"
+            - succeeded: Tenant IDs provisioned successfully
+            - failed: Tenant IDs whose provisioning failed
+            - results: provision_new_tenant result by tenant ID, with the
+              number of quota resumes under "quota_resumes"
+            - elapsed_seconds: Wall-clock time of the batch
+            - quota: Budget statistics after the batch
+    
+    Raises:
+        ValueError: If a tenant ID appears more than once
+    """
+    requests = list(requests)
+    tenant_ids = [request.tenant_id for request in requests]
+    duplicates = sorted(
+        tenant_id for tenant_id, count in Counter(tenant_ids).items() if count > 1
+    )
+    if duplicates:
+        raise ValueError(f"Duplicate tenant IDs in batch: {', '.join(duplicates)}")
+    
+    client_manager = client_manager or GCPClientManager()
+    quotas = quotas or get_quota_manager()
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait((request, 0))
+    results: Dict[str, Dict[str, Any]] = {}
+    
+    async def provision(request: TenantRequest) -> Tuple[Dict[str, Any], List[str]]:
+        exhausted: List[str] = []
+        tenant_client_manager = QuotaLimitedClientManager(
+            client_manager, quotas,
+            on_exhausted=lambda service, method: exhausted.append(f"{service}/{method}")
+        )
+        try:
+            result = await provision_new_tenant(
+                request.tenant_id, request.config,
+                client_manager=tenant_client_manager,
+                checkpoint_store=checkpoint_store
+            )
+        except Exception as error:
+            # Recorded as the tenant's failure, so that the other workers
+            # and the batch result are unaffected
+            if not isinstance(error, TenantAlreadyExistsError):
+                logger.error(
+                    f"Provisioning of tenant {request.tenant_id} raised "
+                    f"{type(error).__name__}: {str(error)}"
+                )
+            result = {
+                "status": "failed",
+                "error_message": str(error),
+                "tenant_id": request.tenant_id
+            }
+        return result, exhausted
+    
+    async def worker() -> None:
+        while True:
+            try:
+                request, resumes = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            result, exhausted = await provision(request)
+            if (
+                result["status"] != "success"
+                and exhausted
+                and resumes < max_quota_resumes
+            ):
+                # Hold the worker slot while backing off, so the batch
+                # also sheds load while quotas recover
+                delay = backoff_delay(
+                    resumes, QUOTA_RESUME_DELAY, MAX_QUOTA_RESUME_DELAY
+                )
+                logger.warning(
+                    f"Provisioning of tenant {request.tenant_id} ran out of quota "
+                    f"({', '.join(exhausted)}); resuming in {delay:.0f}s"
+                )
+                await asyncio.sleep(delay)
+                queue.put_nowait((request, resumes + 1))
+                continue
+            
+            result["quota_resumes"] = resumes
+            results[request.tenant_id] = result
+    
+    start = time.monotonic()
+    logger.info(
+        f"Provisioning batch of {len(requests)} tenants "
+        f"with concurrency {max_concurrency}"
+    )
+    workers = min(max_concurrency, len(requests))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.monotonic() - start
+    
+    succeeded = [
+        tenant_id for tenant_id in tenant_ids
+        if results[tenant_id]["status"] == "success"
+    ]
+    failed = [
+        tenant_id for tenant_id in tenant_ids
+        if results[tenant_id]["status"] != "success"
+    ]
+    if not failed:
+        status = "success"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "failed"
+    
+    logger.info(
+        f"Provisioned {len(succeeded)}/{len(requests)} tenants in {elapsed:.1f}s"
+    )
+    return {
+        "status": status,
+        "succeeded": succeeded,
+        "failed": failed,
+        "results": {tenant_id: results[tenant_id] for tenant_id in tenant_ids},
+        "elapsed_seconds": elapsed,
+        "quota": quotas.get_stats()
+    }
+
+
+async def deprovision_tenant_batch(
+    tenant_ids: Iterable[str],
+    client_manager: Optional[GCPClientManager] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    quotas: Optional[QuotaManager] = None,
+    max_concurrency: int = DEFAULT_DEPROVISION_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Offboard a batch of tenants within GCP quotas.
+    
+    Each tenant is torn down with deprovision_tenant. A tenant whose
+    teardown fails keeps its checkpoints, so the batch can be rerun for
+    the failed tenants.
+    
+    Args:
+        tenant_ids: Tenants to offboard; must be unique
+        client_manager: Optional GCP client manager for the control-plane
+                       project
+        checkpoint_store: Optional checkpoint store. Defaults to the
+                         process-wide store.
+        quotas: Optional quota manager. Defaults to the process-wide
+               manager.
+        max_concurrency: Maximum tenants torn down at the same time
+    
+    Returns:
+        Dict containing:
+            - status: "success", "partial" or "failed"
+            - succeeded: Tenant IDs offboarded, including those with
+              nothing to delete
+            - failed: Tenant IDs with resources left over
+            - results: deprovision_tenant result, or the error, by tenant ID
+            - elapsed_seconds: Wall-clock time of the batch
+            - quota: Budget statistics after the batch
+    
+    Raises:
+        ValueError: If a tenant ID appears more than once
+    """
+    from nlyzer.gcp.dns import DNSManager
+    
+    tenant_ids = list(tenant_ids)
+    duplicates = sorted(
+        tenant_id for tenant_id, count in Counter(tenant_ids).items() if count > 1
+    )
+    if duplicates:
+        raise ValueError(f"Duplicate tenant IDs in batch: {', '.join(duplicates)}")
+    
+    client_manager = client_manager or GCPClientManager()
+    quotas = quotas or get_quota_manager()
+    limited_client_manager = QuotaLimitedClientManager(client_manager, quotas)
+    dns_manager = DNSManager(client_manager=client_manager)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def deprovision(tenant_id: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await deprovision_tenant(
+                    tenant_id,
+                    client_manager=limited_client_manager,
+                    checkpoint_store=checkpoint_store,
+                    dns_manager=dns_manager
+                )
+            except CleanupError as error:
+                return {
+                    "status": "failed",
+                    "error_message": str(error),
+                    "tenant_id": tenant_id,
+                    "project_id": error.project_id,
+                    "failed_resources": error.details["failed_resources"]
+                }
+            except Exception as error:
+                logger.error(
+                    f"Deprovisioning of tenant {tenant_id} raised "
+                    f"{type(error).__name__}: {str(error)}"
+                )
+                return {
+                    "status": "failed",
+                    "error_message": str(error),
+                    "tenant_id": tenant_id
+                }
+    
+    start = time.monotonic()
+    logger.info(
+        f"Deprovisioning batch of {len(tenant_ids)} tenants "
+        f"with concurrency {max_concurrency}"
+    )
+    results = dict(zip(
+        tenant_ids,
+        await asyncio.gather(*(deprovision(tenant_id) for tenant_id in tenant_ids))
+    ))
+    elapsed = time.monotonic() - start
+    
+    failed = [
+        tenant_id for tenant_id in tenant_ids
+        if results[tenant_id]["status"] == "failed"
+    ]
+    succeeded = [tenant_id for tenant_id in tenant_ids if tenant_id not in failed]
+    if not failed:
+        status = "success"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "failed"
+    
+    logger.info(
+        f"Deprovisioned {len(succeeded)}/{len(tenant_ids)} tenants in {elapsed:.1f}s"
+    )
+    return {
+        "status": status,
+        "succeeded": succeeded,
+        "failed": failed,
+        "results": results,
+        "elapsed_seconds": elapsed,
+        "quota": quotas.get_stats()
+    }
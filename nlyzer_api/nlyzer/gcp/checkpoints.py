@@ -0,0 +1,533 @@
+"""
+Provisioning Checkpoints
+
+Creating a project or booting a GCE instance takes minutes, so a failed
+provisioning run must not throw its progress away. Every provisioning step
+that succeeds is recorded as a checkpoint holding its output (project ID,
+service account email, Weaviate IP, ...). When provisioning is retried,
+the checkpoints are restored and only the remaining steps run.
+
+Each attempt claims the tenant's run for a lease of RUN_LEASE_SECONDS,
+renewed with every checkpoint. A second attempt for the tenant is
+rejected with ProvisioningInProgressError while the lease holds; once a
+crashed worker's lease expires, the next attempt takes the run over.
+Writes carry the attempt number returned by start_run as a fencing
+token, so a worker that lost its run to a newer attempt gets
+RunLeaseLostError instead of overwriting the newer attempt's progress.
+
+Stores:
+- SQLAlchemyCheckpointStore: ProvisioningRun and ProvisioningCheckpoint
+  rows in the platform database (nlyzer.db.models)
+- InMemoryCheckpointStore: process-local, for tests and local development
+
+Outputs are stored as JSON, so tuples come back as lists.
+
+Usage:
+    store = get_checkpoint_store()
+    state = await store.start_run(tenant_id)
+    await store.save_checkpoint(
+        tenant_id, "create_project", project_id, state.attempts
+    )
+    await store.finish_run(tenant_id, state.attempts, RUN_SUCCEEDED)
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from nlyzer.core.config import settings
+from nlyzer.gcp.exceptions import (
+    ProvisioningInProgressError,
+    RunLeaseLostError,
+    TenantAlreadyExistsError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Run states stored in ProvisioningRun.status
+RUN_RUNNING = "running"
+RUN_FAILED = "failed"
+RUN_SUCCEEDED = "succeeded"
+
+# How long an attempt holds its run without checkpointing. Must exceed the
+# longest step (VM boot and validation take minutes), or a slow but live
+# attempt can be taken over.
+RUN_LEASE_SECONDS = 1800.0
+
+
+@dataclass
+class ProvisioningState:
+    """
+    Persisted provisioning progress of one tenant.
+    
+    Attributes:
+        tenant_id: Tenant being provisioned
+        status: RUN_RUNNING, RUN_FAILED or RUN_SUCCEEDED
+        attempts: Number of provisioning attempts started
+        outputs: Checkpointed step outputs, by step name
+        failed_step: Step that failed in the last attempt, if any
+        last_error: Error of the last failed attempt, if any
+        lease_expires_at: When the running attempt's claim on the run
+                         expires (UTC), if an attempt is running
+    """
+    
+    tenant_id: str
+    status: str = RUN_RUNNING
+    attempts: int = 0
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    failed_step: Optional[str] = None
+    last_error: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    
+    @property
+    def in_progress(self) -> bool:
+        """Whether an attempt is running and still holds its lease."""
+        return (
+            self.status == RUN_RUNNING
+            and self.lease_expires_at is not None
+            and self.lease_expires_at > datetime.utcnow()
+        )
+
+
+class CheckpointStore(ABC):
+    """
+    Persistence for provisioning runs and their step checkpoints.
+    """
+    
+    @abstractmethod
+    async def load(self, tenant_id: str) -> Optional[ProvisioningState]:
+        """
+        Load a tenant's provisioning state.
+        
+        Returns:
+            The stored state, or None if the tenant was never provisioned
+        """
+    
+    @abstractmethod
+    async def start_run(self, tenant_id: str) -> ProvisioningState:
+        """
+        Claim the tenant's run for a new attempt, creating it on first use.
+        
+        The claim is atomic, so of two concurrent attempts only one starts.
+        Existing checkpoints are kept, so the attempt resumes from them.
+        
+        Returns:
+            State at the start of the attempt. Its ``attempts`` number is
+            the attempt's fencing token for all later writes.
+        
+        Raises:
+            TenantAlreadyExistsError: If the tenant was already provisioned
+            ProvisioningInProgressError: If another attempt holds the run
+        """
+    
+    @abstractmethod
+    async def save_checkpoint(
+        self,
+        tenant_id: str,
+        step_name: str,
+        output: Any,
+        attempt: int
+    ) -> None:
+        """
+        Record, or replace, the output of a completed step and renew the lease.
+        
+        Raises:
+            RunLeaseLostError: If ``attempt`` no longer holds the run
+        """
+    
+    @abstractmethod
+    async def discard_checkpoints(
+        self,
+        tenant_id: str,
+        step_names: Iterable[str],
+        attempt: int
+    ) -> None:
+        """
+        Forget steps whose resources no longer exist.
+        
+        Raises:
+            RunLeaseLostError: If ``attempt`` no longer holds the run
+        """
+    
+    @abstractmethod
+    async def finish_run(
+        self,
+        tenant_id: str,
+        attempt: int,
+        status: str,
+        failed_step: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Record the outcome of the current attempt and release the run.
+        
+        Raises:
+            RunLeaseLostError: If ``attempt`` no longer holds the run
+        """
+    
+    @abstractmethod
+    async def delete_run(self, tenant_id: str) -> None:
+        """Delete a tenant's run and all of its checkpoints."""
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    """
+    Process-local checkpoint store.
+    
+    Outputs are round-tripped through JSON like the database store, so code
+    tested against this store sees the same types in production.
+    """
+    
+    def __init__(self, lease_seconds: float = RUN_LEASE_SECONDS):
+        """
+        Initialize the store.
+        
+        Args:
+            lease_seconds: How long an attempt holds its run without
+                          checkpointing
+        """
+        self._runs: Dict[str, ProvisioningState] = {}
+        self._lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+    
+    async def load(self, tenant_id: str) -> Optional[ProvisioningState]:
+        state = self._runs.get(tenant_id)
+        return copy.deepcopy(state) if state is not None else None
+    
+    async def start_run(self, tenant_id: str) -> ProvisioningState:
+        with self._lock:
+            state = self._runs.setdefault(tenant_id, ProvisioningState(tenant_id))
+            _check_claimable(state)
+            state.status = RUN_RUNNING
+            state.attempts += 1
+            state.lease_expires_at = _lease_expiry(self._lease_seconds)
+            return copy.deepcopy(state)
+    
+    async def save_checkpoint(
+        self,
+        tenant_id: str,
+        step_name: str,
+        output: Any,
+        attempt: int
+    ) -> None:
+        with self._lock:
+            state = self._held_run(tenant_id, attempt)
+            state.outputs[step_name] = json.loads(json.dumps(output))
+            state.lease_expires_at = _lease_expiry(self._lease_seconds)
+    
+    async def discard_checkpoints(
+        self,
+        tenant_id: str,
+        step_names: Iterable[str],
+        attempt: int
+    ) -> None:
+        with self._lock:
+            outputs = self._held_run(tenant_id, attempt).outputs
+            for step_name in step_names:
+                outputs.pop(step_name, None)
+    
+    async def finish_run(
+        self,
+        tenant_id: str,
+        attempt: int,
+        status: str,
+        failed_step: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            state = self._held_run(tenant_id, attempt)
+            state.status = status
+            state.failed_step = failed_step
+            state.last_error = error
+            state.lease_expires_at = None
+    
+    async def delete_run(self, tenant_id: str) -> None:
+        with self._lock:
+            self._runs.pop(tenant_id, None)
+    
+    def _held_run(self, tenant_id: str, attempt: int) -> ProvisioningState:
+        """Get a run held by the given attempt. Caller holds the lock."""
+        state = self._runs.get(tenant_id)
+        _check_held(tenant_id, attempt, state)
+        return state
+
+
+class SQLAlchemyCheckpointStore(CheckpointStore):
+    """
+    Checkpoint store backed by the platform database.
+    
+    Uses synchronous SQLAlchemy sessions on a worker thread, so database
+    round trips do not block the event loop. Each call is its own
+    transaction, so a checkpoint is durable as soon as the call returns.
+    Runs are claimed under a row lock (SELECT ... FOR UPDATE).
+    """
+    
+    def __init__(self, session_factory, lease_seconds: float = RUN_LEASE_SECONDS):
+        """
+        Initialize the store.
+        
+        Args:
+            session_factory: SQLAlchemy sessionmaker bound to the platform
+                            database
+            lease_seconds: How long an attempt holds its run without
+                          checkpointing
+        """
+        self._session_factory = session_factory
+        self._lease_seconds = lease_seconds
+    
+    async def load(self, tenant_id: str) -> Optional[ProvisioningState]:
+        return await asyncio.to_thread(self._load, tenant_id)
+    
+    async def start_run(self, tenant_id: str) -> ProvisioningState:
+        return await asyncio.to_thread(self._start_run, tenant_id)
+    
+    async def save_checkpoint(
+        self,
+        tenant_id: str,
+        step_name: str,
+        output: Any,
+        attempt: int
+    ) -> None:
+        await asyncio.to_thread(
+            self._save_checkpoint, tenant_id, step_name, output, attempt
+        )
+    
+    async def discard_checkpoints(
+        self,
+        tenant_id: str,
+        step_names: Iterable[str],
+        attempt: int
+    ) -> None:
+        await asyncio.to_thread(
+            self._discard_checkpoints, tenant_id, list(step_names), attempt
+        )
+    
+    async def finish_run(
+        self,
+        tenant_id: str,
+        attempt: int,
+        status: str,
+        failed_step: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        await asyncio.to_thread(
+            self._finish_run, tenant_id, attempt, status, failed_step, error
+        )
+    
+    async def delete_run(self, tenant_id: str) -> None:
+        await asyncio.to_thread(self._delete_run, tenant_id)
+    
+    # ========================================================================
+    # Private Helper Methods (run on a worker thread)
+    # ========================================================================
+    
+    def _get_run(self, session, tenant_id: str, for_update: bool = False):
+        """Get a tenant's ProvisioningRun row, or None, locking it if asked."""
+        from nlyzer.db.models import ProvisioningRun
+        
+        query = session.query(ProvisioningRun).filter_by(tenant_id=tenant_id)
+        if for_update:
+            query = query.with_for_update()
+        return query.one_or_none()
+    
+    def _to_state(self, run) -> ProvisioningState:
+        """Convert a ProvisioningRun row and its checkpoints to a state."""
+        return ProvisioningState(
+            tenant_id=run.tenant_id,
+            status=run.status,
+            attempts=run.attempts,
+            outputs={
+                checkpoint.step_name: checkpoint.output
+                for checkpoint in run.checkpoints
+            },
+            failed_step=run.failed_step,
+            last_error=run.last_error,
+            lease_expires_at=run.lease_expires_at
+        )
+    
+    def _load(self, tenant_id: str) -> Optional[ProvisioningState]:
+        with self._session_factory() as session:
+            run = self._get_run(session, tenant_id)
+            return self._to_state(run) if run is not None else None
+    
+    def _start_run(self, tenant_id: str) -> ProvisioningState:
+        from sqlalchemy.exc import IntegrityError
+        
+        from nlyzer.db.models import ProvisioningRun
+        
+        with self._session_factory() as session:
+            run = self._get_run(session, tenant_id, for_update=True)
+            if run is None:
+                run = ProvisioningRun(
+                    tenant_id=tenant_id, status=RUN_RUNNING, attempts=0
+                )
+                session.add(run)
+                try:
+                    session.flush()
+                except IntegrityError:
+                    # A concurrent first attempt inserted the run; claim it
+                    # like any existing run
+                    session.rollback()
+                    run = self._get_run(session, tenant_id, for_update=True)
+            _check_claimable(self._to_state(run))
+            run.status = RUN_RUNNING
+            run.attempts += 1
+            run.lease_expires_at = _lease_expiry(self._lease_seconds)
+            session.commit()
+            return self._to_state(run)
+    
+    def _get_held_run(self, session, tenant_id: str, attempt: int):
+        """Get and lock a tenant's ProvisioningRun row held by the given attempt."""
+        run = self._get_run(session, tenant_id, for_update=True)
+        _check_held(tenant_id, attempt, self._to_state(run) if run else None)
+        return run
+    
+    def _save_checkpoint(
+        self,
+        tenant_id: str,
+        step_name: str,
+        output: Any,
+        attempt: int
+    ) -> None:
+        from nlyzer.db.models import ProvisioningCheckpoint
+        
+        with self._session_factory() as session:
+            run = self._get_held_run(session, tenant_id, attempt)
+            checkpoint = next(
+                (item for item in run.checkpoints if item.step_name == step_name),
+                None
+            )
+            if checkpoint is None:
+                checkpoint = ProvisioningCheckpoint(step_name=step_name)
+                run.checkpoints.append(checkpoint)
+            checkpoint.output = json.loads(json.dumps(output))
+            run.lease_expires_at = _lease_expiry(self._lease_seconds)
+            session.commit()
+    
+    def _discard_checkpoints(
+        self,
+        tenant_id: str,
+        step_names: list,
+        attempt: int
+    ) -> None:
+        with self._session_factory() as session:
+            run = self._get_held_run(session, tenant_id, attempt)
+            run.checkpoints = [
+                checkpoint for checkpoint in run.checkpoints
+                if checkpoint.step_name not in step_names
+            ]
+            session.commit()
+    
+    def _finish_run(
+        self,
+        tenant_id: str,
+        attempt: int,
+        status: str,
+        failed_step: Optional[str],
+        error: Optional[str]
+    ) -> None:
+        with self._session_factory() as session:
+            run = self._get_held_run(session, tenant_id, attempt)
+            run.status = status
+            run.failed_step = failed_step
+            run.last_error = error
+            run.lease_expires_at = None
+            session.commit()
+    
+    def _delete_run(self, tenant_id: str) -> None:
+        with self._session_factory() as session:
+            run = self._get_run(session, tenant_id)
+            if run is not None:
+                session.delete(run)
+                session.commit()
+
+
+def _lease_expiry(lease_seconds: float) -> datetime:
+    """Expiry (UTC) of a lease taken or renewed now."""
+    return datetime.utcnow() + timedelta(seconds=lease_seconds)
+
+
+def _check_claimable(state: ProvisioningState) -> None:
+    """
+    Check that a new attempt may claim the run.
+    
+    Raises:
+        TenantAlreadyExistsError: If the tenant was already provisioned
+        ProvisioningInProgressError: If another attempt holds the run
+    """
+    if state.status == RUN_SUCCEEDED:
+        raise TenantAlreadyExistsError(
+            state.tenant_id, state.outputs.get("create_project")
+        )
+    if state.in_progress:
+        raise ProvisioningInProgressError(state.tenant_id, state.lease_expires_at)
+    if state.status == RUN_RUNNING and state.attempts:
+        logger.warning(
+            f"Lease of provisioning attempt {state.attempts} for tenant "
+            f"{state.tenant_id} expired; taking the run over"
+        )
+
+
+def _check_held(
+    tenant_id: str,
+    attempt: int,
+    state: Optional[ProvisioningState]
+) -> None:
+    """
+    Check that an attempt still holds the run it writes to.
+    
+    An attempt whose lease expired keeps the run until another attempt
+    takes it over, since nothing else could have written to it meanwhile.
+    
+    Raises:
+        RunLeaseLostError: If the run was deleted, taken over or finished
+    """
+    if state is None:
+        raise RunLeaseLostError(tenant_id, attempt)
+    if state.attempts != attempt or state.status != RUN_RUNNING:
+        raise RunLeaseLostError(tenant_id, attempt, state.attempts)
+
+
+# Process-wide store, created on first use
+_checkpoint_store: Optional[CheckpointStore] = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """
+    Get the process-wide checkpoint store, creating it on first use.
+    
+    Uses the platform database when settings.DATABASE_URL is set; its
+    tables are created by the Alembic migrations (``alembic upgrade head``).
+    Without a database, checkpoints are kept in memory and only survive for
+    the lifetime of the process.
+    
+    Returns:
+        The shared CheckpointStore instance
+    """
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                database_url = getattr(settings, "DATABASE_URL", None)
+                if database_url:
+                    from sqlalchemy import create_engine
+                    from sqlalchemy.orm import sessionmaker
+                    
+                    engine = create_engine(database_url, pool_pre_ping=True)
+                    _checkpoint_store = SQLAlchemyCheckpointStore(
+                        sessionmaker(bind=engine, expire_on_commit=False)
+                    )
+                else:
+                    logger.warning(
+                        "DATABASE_URL is not set; provisioning checkpoints "
+                        "are kept in memory only"
+                    )
+                    _checkpoint_store = InMemoryCheckpointStore()
+    return _checkpoint_store
@@ -10,6 +10,7 @@ services and provides a single point of configuration for client settings.
 Security Features:
 - Application Default Credentials (ADC) for secure authentication
 - Client instance caching to prevent authentication overhead
+- Credentials and transports shared process-wide via the ClientRegistry
 - Centralized credential management
 - Error handling for authentication failures
 
@@ -19,29 +20,171 @@ Usage:
     
     # Client is automatically authenticated and ready to use
     projects = projects_client.list_projects()
+    
+    # Inside a coroutine, use the async accessors instead so that slow
+    # API calls do not block the event loop
+    secrets_client = client_manager.get_secrets_async_client()
+    response = await secrets_client.access_secret_version(request={"name": name})
 """
 
+import asyncio
+import contextvars
+import functools
+import importlib
 import logging
-from typing import Optional, Dict, Any
-
-from google.auth import default
-from google.auth.credentials import Credentials
-from google.cloud import (
-    billing_v1,
-    compute_v1, 
-    iam_admin_v1,
-    resourcemanager_v3,
-    run_v2,
-    secretmanager,
-    storage
-)
-from google.api_core import exceptions as gcp_exceptions
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 
 from nlyzer.core.config import settings
 from nlyzer.gcp.exceptions import AuthenticationError
+from nlyzer.gcp.metrics import ClientMetrics, InstrumentedClient
+from nlyzer.gcp.registry import ClientRegistry, get_client_registry
+
+if TYPE_CHECKING:
+    from google.auth.credentials import Credentials
+    from google.cloud import (
+        billing_v1,
+        compute_v1,
+        iam_admin_v1,
+        resourcemanager_v3,
+        run_v2,
+        secretmanager,
+        storage,
+    )
+
+    from nlyzer.gcp.credentials import CredentialRefresher
 
 logger = logging.getLogger(__name__)
 
+# Clients bound to a single project at construction time. All other clients
+# take the project per request and are shared across projects.
+PROJECT_SCOPED_CLIENTS = frozenset({'storage', 'storage_async'})
+
+# Asyncio gRPC clients are bound to the event loop they were created on, so
+# the registry caches them together with their loop, and replaces (and
+# closes) them when requested from a different event loop.
+LOOP_BOUND_CLIENTS = frozenset({
+    'projects_async', 'billing_async', 'iam_async', 'secrets_async',
+    'run_services_async'
+})
+
+# Synchronous client cache keys and the accessor that builds each one
+CLIENT_ACCESSORS = {
+    'projects': 'get_projects_client',
+    'billing': 'get_billing_client',
+    'iam': 'get_iam_client',
+    'secrets': 'get_secrets_client',
+    'storage': 'get_storage_client',
+    'compute_instances': 'get_instances_client',
+    'compute_networks': 'get_networks_client',
+    'compute_firewalls': 'get_firewalls_client',
+    'compute_operations': 'get_operations_client',
+    'run_services': 'get_run_services_client',
+}
+
+# Seconds to wait for a gRPC channel to connect during warm-up
+WARM_UP_CONNECT_TIMEOUT = 10.0
+
+
+def _load_library(module_name: str) -> ModuleType:
+    """
+    Import a google.cloud client library on first use.
+    
+    Client libraries are loaded lazily so that importing nlyzer.gcp, or using
+    only a couple of services, does not pay the import cost of every GCP
+    library. Python caches the module after the first import.
+    
+    Args:
+        module_name: Module name under google.cloud (e.g. 'secretmanager')
+        
+    Returns:
+        The imported client library module
+    """
+    return importlib.import_module(f"google.cloud.{module_name}")
+
+
+def _get_running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Get the running event loop, or None when called outside a coroutine."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncClientAdapter:
+    """
+    Asyncio facade over a synchronous GCP client.
+    
+    Some client libraries (Cloud Storage, and Compute Engine which is REST
+    only) do not provide an asyncio transport. This adapter exposes the same
+    method names as the wrapped client, but each call is dispatched to a
+    worker thread and returned as an awaitable, so the event loop keeps
+    serving other coroutines while the request is in flight.
+    
+    Non-callable attributes are returned unchanged. Objects returned by a
+    call (e.g. a storage Bucket) are the library's synchronous objects, so
+    any further network calls made on them should also be awaited through
+    ``run_blocking``.
+    """
+    
+    def __init__(self, client: Any, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Wrap a synchronous client.
+        
+        Args:
+            client: The synchronous GCP client instance to wrap
+            executor: Thread pool used for blocking calls. Uses the event
+                     loop's default executor if not provided.
+        """
+        self._client = client
+        self._executor = executor
+    
+    @property
+    def sync_client(self) -> Any:
+        """The wrapped synchronous client."""
+        return self._client
+    
+    def close(self) -> None:
+        """
+        Release the adapter.
+        
+        The wrapped synchronous client is shared through the registry and
+        may still be in use, so it is left open.
+        """
+    
+    async def run_blocking(self, func, *args, **kwargs) -> Any:
+        """
+        Run an arbitrary blocking callable on the adapter's executor.
+        
+        Args:
+            func: Blocking callable to execute
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+            
+        Returns:
+            The callable's return value
+        """
+        loop = asyncio.get_running_loop()
+        # Carry context variables such as the current trace span over to
+        # the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        async def _call(*args, **kwargs):
+            return await self.run_blocking(attribute, *args, **kwargs)
+        
+        return _call
+
 
 class GCPClientManager:
     """
@@ -57,27 +200,68 @@ class GCPClientManager:
     - Client instance caching for performance optimization
     - Centralized error handling and logging
     - Support for all GCP services required for tenant provisioning
+    - Asyncio-native clients via the ``get_*_async_client()`` accessors
+    - Credentials and client transports shared across managers and tenant
+      projects through the process-wide ClientRegistry
+    - Cache and per-API call metrics via get_metrics()
     
     Thread Safety:
     This class is thread-safe and can be used across multiple concurrent
-    provisioning operations.
+    provisioning operations. Client creation is single-flight: each client
+    is built exactly once per registry key, using a per-key lock, while
+    reads of already cached clients only take the registry's short lookup
+    lock.
     """
     
-    def __init__(self, project_id: Optional[str] = None):
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        registry: Optional[ClientRegistry] = None,
+        instrument_clients: bool = False
+    ):
         """
         Initialize the GCP Client Manager.
         
+        Managers are cheap to create: credentials and clients come from the
+        process-wide registry, so one manager per tenant project is fine.
+        
         Args:
             project_id: GCP project ID to use as default. If not provided,
                        uses the project ID from settings.
+            registry: Client registry to share credentials and clients
+                     through. Defaults to the process-wide registry.
+            instrument_clients: Whether to wrap returned clients so that
+                               per-method call counts and latencies are
+                               recorded in the registry's ClientMetrics
         """
         self._project_id = project_id or settings.GCP_PROJECT_ID
-        self._credentials: Optional[Credentials] = None
-        self._client_cache: Dict[str, Any] = {}
+        self._registry = registry if registry is not None else get_client_registry()
+        self._metrics = self._registry.metrics
+        self._instrument_clients = instrument_clients
+        self._credentials: Optional["Credentials"] = None
         
         # Initialize authentication on instantiation
         self._initialize_authentication()
     
+    def for_project(self, project_id: str) -> "GCPClientManager":
+        """
+        Get a client manager for another project sharing this manager's registry.
+        
+        Used to address per-tenant projects without re-authenticating or
+        opening new transports for project-agnostic services.
+        
+        Args:
+            project_id: GCP project ID for the new manager
+            
+        Returns:
+            GCPClientManager bound to the given project
+        """
+        return GCPClientManager(
+            project_id=project_id,
+            registry=self._registry,
+            instrument_clients=self._instrument_clients
+        )
+    
     def _initialize_authentication(self) -> None:
         """
         Initialize GCP authentication using Application Default Credentials.
@@ -87,29 +271,34 @@ class GCPClientManager:
         2. gcloud user credentials
         3. Metadata service (when running on GCP)
         
+        The credentials are resolved once per process by the client registry
+        and shared by every manager.
+        
         Raises:
             AuthenticationError: If authentication fails
         """
-        try:
-            self._credentials, detected_project = default()
-            
-            # Use detected project if none was explicitly provided
-            if not self._project_id and detected_project:
-                self._project_id = detected_project
-            
-            logger.info(
-                f"GCP authentication initialized successfully for project: {self._project_id}"
-            )
-            
-        except Exception as error:
-            error_message = f"Failed to initialize GCP authentication: {str(error)}"
-            logger.error(error_message)
-            raise AuthenticationError(error_message)
+        self._credentials, detected_project = self._registry.get_default_credentials()
+        
+        # Use detected project if none was explicitly provided
+        if not self._project_id and detected_project:
+            self._project_id = detected_project
+        
+        logger.debug(
+            "GCP authentication initialized successfully for project: "
+            f"{self._project_id}"
+        )
     
     def _get_cached_client(self, client_key: str, client_factory) -> Any:
         """
         Get a cached client instance or create a new one if not cached.
         
+        Clients are resolved through the client registry, keyed by
+        (client_key, project) for project-scoped clients and by
+        (client_key, None) otherwise, so every manager reuses the same
+        instance. Creation is single-flight per key in the registry.
+        Loop-bound asyncio clients are cached with the running event loop
+        and rebuilt if requested from a different one.
+        
         Args:
             client_key: Unique key for caching the client instance
             client_factory: Function that creates the client instance
@@ -117,22 +306,57 @@ class GCPClientManager:
         Returns:
             The client instance
         """
-        if client_key not in self._client_cache:
-            try:
-                self._client_cache[client_key] = client_factory()
-                logger.debug(f"Created and cached new {client_key} client")
-            except Exception as error:
-                error_message = f"Failed to create {client_key} client: {str(error)}"
-                logger.error(error_message)
-                raise AuthenticationError(error_message, service=client_key)
+        scope = self._project_id if client_key in PROJECT_SCOPED_CLIENTS else None
+        loop = _get_running_loop() if client_key in LOOP_BOUND_CLIENTS else None
+        try:
+            client = self._registry.get_client(
+                client_key, scope, client_factory, loop=loop
+            )
+        except Exception as error:
+            error_message = f"Failed to create {client_key} client: {str(error)}"
+            logger.error(error_message)
+            raise AuthenticationError(error_message, service=client_key)
         
-        return self._client_cache[client_key]
+        # Async adapters delegate to an already instrumented sync client
+        is_adapter = (
+            client_key.endswith('_async') and client_key not in LOOP_BOUND_CLIENTS
+        )
+        if self._instrument_clients and not is_adapter:
+            client = InstrumentedClient(client, client_key, self._metrics)
+        return client
+    
+    def _get_blocking_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool used by async adapters for blocking client calls.
+        
+        Returns:
+            The registry's shared ThreadPoolExecutor
+        """
+        return self._registry.get_blocking_executor()
+    
+    def _get_async_adapter(self, client_key: str, sync_getter) -> AsyncClientAdapter:
+        """
+        Get a cached compatibility adapter around a synchronous client.
+        
+        Used for services whose client library has no asyncio transport.
+        
+        Args:
+            client_key: Cache key of the synchronous client
+            sync_getter: Accessor returning the synchronous client
+            
+        Returns:
+            AsyncClientAdapter wrapping the synchronous client
+        """
+        return self._get_cached_client(
+            f'{client_key}_async',
+            lambda: AsyncClientAdapter(sync_getter(), self._get_blocking_executor())
+        )
     
     # ========================================================================
     # Resource Management Clients
     # ========================================================================
     
-    def get_projects_client(self) -> resourcemanager_v3.ProjectsClient:
+    def get_projects_client(self) -> "resourcemanager_v3.ProjectsClient":
         """
         Get or create a Resource Manager Projects client.
         
@@ -143,10 +367,29 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'projects',
-            lambda: resourcemanager_v3.ProjectsClient(credentials=self._credentials)
+            lambda: _load_library('resourcemanager_v3').ProjectsClient(
+                credentials=self._credentials
+            )
         )
     
-    def get_billing_client(self) -> billing_v1.CloudBillingClient:
+    def get_projects_async_client(self) -> "resourcemanager_v3.ProjectsAsyncClient":
+        """
+        Get or create an asyncio Resource Manager Projects client.
+        
+        Must be called from within the event loop that will use the client,
+        since the underlying gRPC channel is bound to that loop.
+        
+        Returns:
+            Authenticated ProjectsAsyncClient instance
+        """
+        return self._get_cached_client(
+            'projects_async',
+            lambda: _load_library('resourcemanager_v3').ProjectsAsyncClient(
+                credentials=self._credentials
+            )
+        )
+    
+    def get_billing_client(self) -> "billing_v1.CloudBillingClient":
         """
         Get or create a Cloud Billing client.
         
@@ -157,14 +400,32 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'billing',
-            lambda: billing_v1.CloudBillingClient(credentials=self._credentials)
+            lambda: _load_library('billing_v1').CloudBillingClient(
+                credentials=self._credentials
+            )
+        )
+    
+    def get_billing_async_client(self) -> "billing_v1.CloudBillingAsyncClient":
+        """
+        Get or create an asyncio Cloud Billing client.
+        
+        Must be called from within the event loop that will use the client.
+        
+        Returns:
+            Authenticated CloudBillingAsyncClient instance
+        """
+        return self._get_cached_client(
+            'billing_async',
+            lambda: _load_library('billing_v1').CloudBillingAsyncClient(
+                credentials=self._credentials
+            )
         )
     
     # ========================================================================
     # Identity and Access Management Clients
     # ========================================================================
     
-    def get_iam_client(self) -> iam_admin_v1.IAMClient:
+    def get_iam_client(self) -> "iam_admin_v1.IAMClient":
         """
         Get or create an IAM Admin client.
         
@@ -176,14 +437,32 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'iam',
-            lambda: iam_admin_v1.IAMClient(credentials=self._credentials)
+            lambda: _load_library('iam_admin_v1').IAMClient(
+                credentials=self._credentials
+            )
+        )
+    
+    def get_iam_async_client(self) -> "iam_admin_v1.IAMAsyncClient":
+        """
+        Get or create an asyncio IAM Admin client.
+        
+        Must be called from within the event loop that will use the client.
+        
+        Returns:
+            Authenticated IAMAsyncClient instance
+        """
+        return self._get_cached_client(
+            'iam_async',
+            lambda: _load_library('iam_admin_v1').IAMAsyncClient(
+                credentials=self._credentials
+            )
         )
     
     # ========================================================================
     # Security and Secret Management Clients
     # ========================================================================
     
-    def get_secrets_client(self) -> secretmanager.SecretManagerServiceClient:
+    def get_secrets_client(self) -> "secretmanager.SecretManagerServiceClient":
         """
         Get or create a Secret Manager client.
         
@@ -195,14 +474,34 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'secrets',
-            lambda: secretmanager.SecretManagerServiceClient(credentials=self._credentials)
+            lambda: _load_library('secretmanager').SecretManagerServiceClient(
+                credentials=self._credentials
+            )
+        )
+    
+    def get_secrets_async_client(
+        self
+    ) -> "secretmanager.SecretManagerServiceAsyncClient":
+        """
+        Get or create an asyncio Secret Manager client.
+        
+        Must be called from within the event loop that will use the client.
+        
+        Returns:
+            Authenticated SecretManagerServiceAsyncClient instance
+        """
+        return self._get_cached_client(
+            'secrets_async',
+            lambda: _load_library('secretmanager').SecretManagerServiceAsyncClient(
+                credentials=self._credentials
+            )
         )
     
     # ========================================================================
     # Storage Clients
     # ========================================================================
     
-    def get_storage_client(self) -> storage.Client:
+    def get_storage_client(self) -> "storage.Client":
         """
         Get or create a Cloud Storage client.
         
@@ -214,17 +513,29 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'storage',
-            lambda: storage.Client(
+            lambda: _load_library('storage').Client(
                 credentials=self._credentials,
                 project=self._project_id
             )
         )
     
+    def get_storage_async_client(self) -> AsyncClientAdapter:
+        """
+        Get or create an async adapter around the Cloud Storage client.
+        
+        The Cloud Storage library has no asyncio transport, so calls are
+        run on the client manager's blocking I/O thread pool.
+        
+        Returns:
+            AsyncClientAdapter wrapping the Cloud Storage Client
+        """
+        return self._get_async_adapter('storage', self.get_storage_client)
+    
     # ========================================================================
     # Compute Engine Clients
     # ========================================================================
     
-    def get_instances_client(self) -> compute_v1.InstancesClient:
+    def get_instances_client(self) -> "compute_v1.InstancesClient":
         """
         Get or create a Compute Engine Instances client.
         
@@ -236,10 +547,24 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'compute_instances',
-            lambda: compute_v1.InstancesClient(credentials=self._credentials)
+            lambda: _load_library('compute_v1').InstancesClient(
+                credentials=self._credentials
+            )
         )
     
-    def get_networks_client(self) -> compute_v1.NetworksClient:
+    def get_instances_async_client(self) -> AsyncClientAdapter:
+        """
+        Get or create an async adapter around the Compute Engine Instances client.
+        
+        The Compute Engine library is REST-only and has no asyncio transport,
+        so calls are run on the client manager's blocking I/O thread pool.
+        
+        Returns:
+            AsyncClientAdapter wrapping the InstancesClient
+        """
+        return self._get_async_adapter('compute_instances', self.get_instances_client)
+    
+    def get_networks_client(self) -> "compute_v1.NetworksClient":
         """
         Get or create a Compute Engine Networks client.
         
@@ -250,10 +575,21 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'compute_networks',
-            lambda: compute_v1.NetworksClient(credentials=self._credentials)
+            lambda: _load_library('compute_v1').NetworksClient(
+                credentials=self._credentials
+            )
         )
     
-    def get_firewalls_client(self) -> compute_v1.FirewallsClient:
+    def get_networks_async_client(self) -> AsyncClientAdapter:
+        """
+        Get or create an async adapter around the Compute Engine Networks client.
+        
+        Returns:
+            AsyncClientAdapter wrapping the NetworksClient
+        """
+        return self._get_async_adapter('compute_networks', self.get_networks_client)
+    
+    def get_firewalls_client(self) -> "compute_v1.FirewallsClient":
         """
         Get or create a Compute Engine Firewalls client.
         
@@ -264,10 +600,21 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'compute_firewalls',
-            lambda: compute_v1.FirewallsClient(credentials=self._credentials)
+            lambda: _load_library('compute_v1').FirewallsClient(
+                credentials=self._credentials
+            )
         )
     
-    def get_operations_client(self) -> compute_v1.GlobalOperationsClient:
+    def get_firewalls_async_client(self) -> AsyncClientAdapter:
+        """
+        Get or create an async adapter around the Compute Engine Firewalls client.
+        
+        Returns:
+            AsyncClientAdapter wrapping the FirewallsClient
+        """
+        return self._get_async_adapter('compute_firewalls', self.get_firewalls_client)
+    
+    def get_operations_client(self) -> "compute_v1.GlobalOperationsClient":
         """
         Get or create a Compute Engine Global Operations client.
         
@@ -278,14 +625,27 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'compute_operations',
-            lambda: compute_v1.GlobalOperationsClient(credentials=self._credentials)
+            lambda: _load_library('compute_v1').GlobalOperationsClient(
+                credentials=self._credentials
+            )
+        )
+    
+    def get_operations_async_client(self) -> AsyncClientAdapter:
+        """
+        Get or create an async adapter around the Global Operations client.
+        
+        Returns:
+            AsyncClientAdapter wrapping the GlobalOperationsClient
+        """
+        return self._get_async_adapter(
+            'compute_operations', self.get_operations_client
         )
     
     # ========================================================================
     # Cloud Run Clients
     # ========================================================================
     
-    def get_run_services_client(self) -> run_v2.ServicesClient:
+    def get_run_services_client(self) -> "run_v2.ServicesClient":
         """
         Get or create a Cloud Run Services client.
         
@@ -297,7 +657,25 @@ class GCPClientManager:
         """
         return self._get_cached_client(
             'run_services',
-            lambda: run_v2.ServicesClient(credentials=self._credentials)
+            lambda: _load_library('run_v2').ServicesClient(
+                credentials=self._credentials
+            )
+        )
+    
+    def get_run_services_async_client(self) -> "run_v2.ServicesAsyncClient":
+        """
+        Get or create an asyncio Cloud Run Services client.
+        
+        Must be called from within the event loop that will use the client.
+        
+        Returns:
+            Authenticated ServicesAsyncClient instance
+        """
+        return self._get_cached_client(
+            'run_services_async',
+            lambda: _load_library('run_v2').ServicesAsyncClient(
+                credentials=self._credentials
+            )
         )
     
     # ========================================================================
@@ -313,7 +691,29 @@ class GCPClientManager:
         """
         return self._project_id
     
-    def get_credentials(self) -> Credentials:
+    def get_registry(self) -> ClientRegistry:
+        """
+        Get the client registry backing this manager.
+        
+        Returns:
+            The ClientRegistry sharing credentials and clients
+        """
+        return self._registry
+    
+    def get_metrics(self) -> ClientMetrics:
+        """
+        Get the client metrics collector.
+        
+        Metrics are process-wide (shared through the registry). Call counts
+        and latencies are only recorded for managers created with
+        instrument_clients=True.
+        
+        Returns:
+            ClientMetrics with snapshot() and to_prometheus() exporters
+        """
+        return self._metrics
+    
+    def get_credentials(self) -> "Credentials":
         """
         Get the current credentials.
         
@@ -326,11 +726,15 @@ class GCPClientManager:
         """
         Clear all cached client instances.
         
-        This forces recreation of all clients on next access, which can be
-        useful if credentials have been refreshed or if there are connection
-        issues.
-        """
-        self._client_cache.clear()
+        This closes and drops this manager's project-scoped clients in the
+        registry, forcing their recreation on next access. Shared,
+        project-agnostic clients stay in the registry for other managers;
+        use ``get_client_registry().clear()`` to drop those as well, e.g.
+        if credentials have been rotated.
+        """
+        for client_key in PROJECT_SCOPED_CLIENTS:
+            self._registry.evict(client_key, self._project_id)
+        
         logger.info("Cleared all cached GCP client instances")
     
     def get_cache_info(self) -> Dict[str, bool]:
@@ -340,15 +744,171 @@ class GCPClientManager:
         Returns:
             Dictionary mapping client names to whether they are cached
         """
+        client_keys = list(CLIENT_ACCESSORS)
+        client_keys += [f'{client_key}_async' for client_key in CLIENT_ACCESSORS]
         return {
-            client_key: client_key in self._client_cache
-            for client_key in [
-                'projects', 'billing', 'iam', 'secrets', 'storage',
-                'compute_instances', 'compute_networks', 'compute_firewalls',
-                'compute_operations', 'run_services'
-            ]
+            client_key: (
+                client_key,
+                self._project_id if client_key in PROJECT_SCOPED_CLIENTS else None
+            ) in self._registry
+            for client_key in client_keys
         }
     
+    # ========================================================================
+    # Warm-up
+    # ========================================================================
+    
+    def warm_up(
+        self,
+        services: Optional[Iterable[str]] = None,
+        fetch_token: bool = True,
+        connect: bool = True
+    ) -> Dict[str, float]:
+        """
+        Build clients ahead of traffic so first requests don't pay setup cost.
+        
+        Intended for long-lived API workers: call once during startup, before
+        the worker starts accepting requests. The chosen clients are created
+        concurrently, their gRPC channels are optionally connected, and the
+        access token is fetched so that the first provisioning calls after a
+        deploy see steady-state latency. Warm-up is best effort: a service
+        that fails is logged and left out of the result, and the others are
+        still warmed.
+        
+        Args:
+            services: Client keys to warm up (see CLIENT_ACCESSORS). Defaults
+                     to all synchronous clients.
+            fetch_token: Whether to pre-fetch the OAuth access token
+            connect: Whether to wait for gRPC channels to become ready.
+                    REST-only clients (Compute Engine, Cloud Storage) have no
+                    channel and are skipped.
+            
+        Returns:
+            Dictionary mapping each service warmed up (and 'access_token' if
+            fetched) to its warm-up time in seconds
+            
+        Raises:
+            ValueError: If an unknown service is requested
+        """
+        services = list(CLIENT_ACCESSORS if services is None else services)
+        unknown = [service for service in services if service not in CLIENT_ACCESSORS]
+        if unknown:
+            raise ValueError(f"Unknown GCP client services: {', '.join(unknown)}")
+        
+        timings: Dict[str, float] = {}
+        tasks = len(services) + (1 if fetch_token else 0)
+        if not tasks:
+            return timings
+        
+        with ThreadPoolExecutor(
+            max_workers=tasks, thread_name_prefix="gcp-warm-up"
+        ) as pool:
+            futures = {
+                pool.submit(self._warm_up_client, service, connect): service
+                for service in services
+            }
+            if fetch_token:
+                futures[pool.submit(self._prefetch_access_token)] = 'access_token'
+            
+            for future in as_completed(futures):
+                try:
+                    timings[futures[future]] = future.result()
+                except Exception as error:
+                    logger.warning(
+                        f"Failed to warm up {futures[future]}: {str(error)}"
+                    )
+        
+        logger.info(
+            "Warmed up GCP clients: " + ", ".join(
+                f"{name}={duration * 1000:.0f}ms"
+                for name, duration in sorted(timings.items())
+            )
+        )
+        return timings
+    
+    def _warm_up_client(self, service: str, connect: bool) -> float:
+        """
+        Create one client and optionally connect its gRPC channel.
+        
+        Args:
+            service: Client key from CLIENT_ACCESSORS
+            connect: Whether to wait for the gRPC channel to become ready
+            
+        Returns:
+            Time taken in seconds
+        """
+        started = time.perf_counter()
+        client = getattr(self, CLIENT_ACCESSORS[service])()
+        
+        channel = getattr(getattr(client, 'transport', None), 'grpc_channel', None)
+        if connect and channel is not None:
+            import grpc
+            
+            try:
+                grpc.channel_ready_future(channel).result(
+                    timeout=WARM_UP_CONNECT_TIMEOUT
+                )
+            except grpc.FutureTimeoutError:
+                logger.warning(
+                    f"Timed out connecting {service} channel during warm-up"
+                )
+        
+        return time.perf_counter() - started
+    
+    def _prefetch_access_token(self) -> float:
+        """
+        Refresh the shared credentials so the first API call has a valid token.
+        
+        Goes through the registry's CredentialRefresher, so a concurrent
+        background or request-path refresh is not duplicated.
+        
+        Returns:
+            Time taken in seconds
+            
+        Raises:
+            AuthenticationError: If the token refresh fails
+        """
+        started = time.perf_counter()
+        self._registry.get_credential_refresher().ensure_fresh()
+        return time.perf_counter() - started
+    
+    # ========================================================================
+    # Credential Refresh
+    # ========================================================================
+    
+    def start_credential_refresh(
+        self,
+        refresh_margin: Optional[float] = None,
+        jitter: Optional[float] = None
+    ) -> "CredentialRefresher":
+        """
+        Start refreshing the shared credentials in the background.
+        
+        The access token is renewed ahead of expiry so that client calls
+        never pay for a synchronous token refresh on the request path.
+        Credentials are shared process-wide, so one call covers every
+        GCPClientManager on the same registry.
+        
+        Args:
+            refresh_margin: Seconds before expiry at which to refresh
+            jitter: Maximum random extra lead time per refresh
+            
+        Returns:
+            The running CredentialRefresher, whose get_stats() exposes
+            refresh latency and failure counters
+        """
+        refresher = self._registry.get_credential_refresher()
+        if refresh_margin is not None:
+            refresher.refresh_margin = refresh_margin
+        if jitter is not None:
+            refresher.jitter = jitter
+        refresher.start()
+        return refresher
+    
+    def stop_credential_refresh(self) -> None:
+        """Stop the background credential refresh thread, if running."""
+        self._registry.get_credential_refresher().stop()
+    
     def __enter__(self):
         """Context manager entry."""
         return self
@@ -0,0 +1,276 @@
+"""
+Background Credential Refresh for GCP Clients
+
+Application Default Credentials hand out OAuth access tokens that expire
+after roughly an hour. Left alone, the client libraries refresh the token
+lazily on the request path, so every hour some unlucky API call pays for a
+synchronous token fetch, and several threads may refresh at the same time.
+
+The CredentialRefresher renews the shared credentials ahead of expiry from a
+daemon thread, with random jitter so that many workers do not hit the token
+endpoint at the same moment. Refreshes are coordinated across threads: one
+refresh runs at a time, and callers that were waiting for it reuse its
+result instead of refreshing again.
+
+Usage:
+    refresher = client_manager.start_credential_refresh()
+    ...
+    stats = refresher.get_stats()
+"""
+
+import datetime
+import logging
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from nlyzer.gcp.exceptions import AuthenticationError
+
+if TYPE_CHECKING:
+    from google.auth.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+# Refresh this many seconds before the token expires. Must exceed
+# google-auth's own refresh threshold (225s) so clients never see the token
+# as stale and refresh it themselves.
+DEFAULT_REFRESH_MARGIN = 300.0
+
+# Upper bound of the random extra lead time added to each scheduled refresh
+DEFAULT_REFRESH_JITTER = 60.0
+
+# Delay before retrying after a failed background refresh
+DEFAULT_RETRY_INTERVAL = 15.0
+
+
+class CredentialRefresher:
+    """
+    Keeps shared GCP credentials refreshed ahead of token expiry.
+    
+    Attributes:
+        refresh_margin: Seconds before expiry at which a refresh is due
+        jitter: Maximum random extra lead time for scheduled refreshes
+        retry_interval: Seconds between background retries after a failure
+    
+    Thread Safety:
+    Refreshes are serialized by a lock. A thread that waited for another
+    thread's refresh returns without refreshing again if the credentials
+    are no longer due.
+    """
+    
+    def __init__(
+        self,
+        credentials: "Credentials",
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        jitter: float = DEFAULT_REFRESH_JITTER,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL
+    ):
+        """
+        Initialize the refresher.
+        
+        Args:
+            credentials: Credentials object shared by the GCP clients
+            refresh_margin: Seconds before expiry at which to refresh
+            jitter: Maximum random extra lead time for scheduled refreshes
+            retry_interval: Seconds between background retries after a failure
+        """
+        self._credentials = credentials
+        self.refresh_margin = refresh_margin
+        self.jitter = jitter
+        self.retry_interval = retry_interval
+        
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self._refresh_count = 0
+        self._failure_count = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._last_latency: Optional[float] = None
+        self._last_error: Optional[str] = None
+    
+    # ========================================================================
+    # Refresh
+    # ========================================================================
+    
+    def seconds_until_expiry(self) -> Optional[float]:
+        """
+        Get the remaining lifetime of the current access token.
+        
+        Returns:
+            Seconds until expiry, or None if the token has no known expiry
+            (e.g. it has never been fetched)
+        """
+        expiry = getattr(self._credentials, 'expiry', None)
+        if expiry is None:
+            return None
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.datetime.utcnow()
+        return (expiry - now).total_seconds()
+    
+    def needs_refresh(self) -> bool:
+        """
+        Check whether the token is missing or within the refresh margin.
+        
+        Returns:
+            True if the credentials should be refreshed now
+        """
+        if not getattr(self._credentials, 'token', None):
+            return True
+        remaining = self.seconds_until_expiry()
+        return remaining is not None and remaining <= self.refresh_margin
+    
+    def ensure_fresh(self) -> float:
+        """
+        Refresh the credentials if they are due, coordinating with other threads.
+        
+        Safe to call on the request path: if the token is fresh this returns
+        immediately without taking a lock.
+        
+        Returns:
+            Seconds spent waiting for or performing a refresh (0 if none)
+        
+        Raises:
+            AuthenticationError: If the refresh fails
+        """
+        if not self.needs_refresh():
+            return 0.0
+        
+        started = time.perf_counter()
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.needs_refresh():
+                self._refresh_locked()
+        return time.perf_counter() - started
+    
+    def refresh(self) -> None:
+        """
+        Refresh the credentials unconditionally.
+        
+        Raises:
+            AuthenticationError: If the refresh fails
+        """
+        with self._refresh_lock:
+            self._refresh_locked()
+    
+    def _refresh_locked(self) -> None:
+        """Perform a refresh and record metrics. Caller holds the refresh lock."""
+        from google.auth.transport.requests import Request
+        
+        started = time.perf_counter()
+        try:
+            self._credentials.refresh(Request())
+        except Exception as error:
+            self._failure_count += 1
+            self._last_error = str(error)
+            error_message = f"Failed to refresh GCP credentials: {str(error)}"
+            logger.error(error_message)
+            raise AuthenticationError(error_message)
+        
+        latency = time.perf_counter() - started
+        self._refresh_count += 1
+        self._total_latency += latency
+        self._max_latency = max(self._max_latency, latency)
+        self._last_latency = latency
+        self._last_error = None
+        logger.debug(f"Refreshed GCP credentials in {latency * 1000:.0f}ms")
+    
+    # ========================================================================
+    # Background Thread
+    # ========================================================================
+    
+    def start(self) -> None:
+        """Start the background refresh thread. Does nothing if already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="gcp-credential-refresher", daemon=True
+        )
+        self._thread.start()
+        logger.info("Started background GCP credential refresh")
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background refresh thread.
+        
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background refresh thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _next_refresh_delay(self) -> Optional[float]:
+        """
+        Compute how long to sleep before the next scheduled refresh.
+        
+        Returns:
+            Seconds until the token enters the refresh margin, minus a random
+            jitter so that workers sharing a deploy spread their refreshes.
+            None if the token never expires.
+        """
+        if not getattr(self._credentials, 'token', None):
+            return 0.0
+        remaining = self.seconds_until_expiry()
+        if remaining is None:
+            return None
+        lead = self.refresh_margin + random.uniform(0, self.jitter)
+        return max(0.0, remaining - lead)
+    
+    def _run(self) -> None:
+        """Background loop: sleep until the next refresh is due, then refresh."""
+        while not self._stop_event.is_set():
+            delay = self._next_refresh_delay()
+            if delay is None:
+                logger.info("GCP credentials do not expire; background refresh stopped")
+                break
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            
+            try:
+                with self._refresh_lock:
+                    # Refresh if due, even within the jitter window
+                    remaining = self.seconds_until_expiry()
+                    due = self.refresh_margin + self.jitter
+                    if remaining is None or remaining <= due:
+                        self._refresh_locked()
+            except AuthenticationError:
+                if self._stop_event.wait(self.retry_interval):
+                    break
+    
+    # ========================================================================
+    # Metrics
+    # ========================================================================
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get refresh counters and latencies.
+        
+        Returns:
+            Dictionary with refresh and failure counts, last/average/max
+            refresh latency in seconds, the last error and the seconds
+            remaining until token expiry
+        """
+        return {
+            "running": self.running,
+            "refresh_count": self._refresh_count,
+            "failure_count": self._failure_count,
+            "last_latency_seconds": self._last_latency,
+            "avg_latency_seconds": (
+                self._total_latency / self._refresh_count
+                if self._refresh_count else None
+            ),
+            "max_latency_seconds": self._max_latency,
+            "last_error": self._last_error,
+            "seconds_until_expiry": self.seconds_until_expiry()
+        }
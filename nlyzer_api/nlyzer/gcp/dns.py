@@ -1,13 +1,14 @@
 """
 DNS Management Module for Tenant Provisioning
 
-This module handles programmatic DNS record creation and management via the
-Namecheap API. It follows the Principle of Least Privilege with credentials
-stored securely in GCP Secret Manager.
+This module handles programmatic DNS record creation and management through
+a pluggable DNS provider: the Namecheap API by default, or Cloud DNS. It
+follows the Principle of Least Privilege with credentials stored securely
+in GCP Secret Manager.
 
 The DNSManager class provides methods to:
 - Create DNS A records for tenant subdomains
-- Validate DNS propagation
+- Validate DNS propagation, for one name or many names at once
 - Manage DNS lifecycle for tenant infrastructure
 
 Security Features:
@@ -25,20 +26,51 @@ Usage:
 """
 
 import asyncio
+import heapq
 import logging
 import socket
-from typing import Dict, Optional, List, Any
+from dataclasses import dataclass, field
 from datetime import datetime
-
-from google.cloud import secretmanager
-from google.api_core import exceptions as gcp_exceptions
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from nlyzer.core.config import settings
 from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.dns_providers import (
+    CloudDNSProvider,
+    DNSProvider,
+    DNSProviderError,
+    NamecheapProvider,
+)
+from nlyzer.gcp.dns_resolver import AsyncDNSResolver, DNSQueryError, backoff_delay
+from nlyzer.gcp.dns_zone import (
+    ACTION_NOT_FOUND,
+    ACTION_UNCHANGED,
+    MutationResult,
+    RecordMutation,
+)
 from nlyzer.gcp.exceptions import ProvisioningError
+from nlyzer.gcp.namecheap import NamecheapTransport
+from nlyzer.gcp.secrets import SecretCache, get_secret_cache
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for the wait between DNS propagation checks
+DEFAULT_PROPAGATION_MAX_DELAY = 120.0
+
+# Overall time budget for a DNS propagation check, in seconds
+DEFAULT_PROPAGATION_DEADLINE = 900.0
+
+# Maximum concurrent DNS queries issued by validate_many
+DEFAULT_PROPAGATION_CONCURRENCY = 50
+
+# Secret Manager secrets holding the Namecheap API credentials
+NAMECHEAP_SECRET_NAMES = (
+    "namecheap-api-user",
+    "namecheap-api-key",
+    "namecheap-username",
+    "namecheap-client-ip",
+)
+
 
 class DNSConfigurationError(ProvisioningError):
     """Raised when DNS configuration fails."""
@@ -61,42 +93,92 @@ class DNSConfigurationError(ProvisioningError):
         )
 
 
+@dataclass
+class PropagationResult:
+    """
+    Outcome of a propagation check for one name in validate_many().
+    
+    Attributes:
+        fqdn: Full domain name checked
+        expected_ip: IP address the name should resolve to
+        propagated: Whether the name resolved to the expected IP
+        resolved_ips: Addresses returned by the last successful query
+        attempts: Number of queries made for this name
+        elapsed_seconds: Time from the start of the batch to this result
+        error: Last resolution error, if the last query failed
+    """
+    
+    fqdn: str
+    expected_ip: str
+    propagated: bool
+    resolved_ips: List[str] = field(default_factory=list)
+    attempts: int = 0
+    elapsed_seconds: float = 0.0
+    error: Optional[str] = None
+
+
 class DNSManager:
     """
-    Manages DNS operations for tenant provisioning via Namecheap API.
+    Manages DNS operations for tenant provisioning.
+    
+    This class provides a secure interface to the DNS provider backing the
+    base domain, handling credential management, record creation, and
+    validation. All operations are logged for audit compliance.
     
-    This class provides a secure interface to the Namecheap DNS API,
-    handling credential management, record creation, and validation.
-    All operations are logged for audit compliance.
+    The provider is chosen by settings.DNS_PROVIDER: "namecheap" (default),
+    whose whole-zone writes are coalesced across concurrent callers, or
+    "cloud_dns", which changes only the record sets touched by each write.
     
     Attributes:
-        _api_client: Namecheap API client instance
+        _provider: DNS provider backend (DNSProvider)
         _base_domain: Base domain for tenant subdomains
         _sandbox_mode: Whether to use Namecheap sandbox
     """
     
-    def __init__(self, client_manager: Optional[GCPClientManager] = None):
+    def __init__(
+        self,
+        client_manager: Optional[GCPClientManager] = None,
+        secret_cache: Optional[SecretCache] = None,
+        resolver: Optional[AsyncDNSResolver] = None,
+        provider: Optional[DNSProvider] = None
+    ):
         """
         Initialize the DNS Manager.
         
         Args:
             client_manager: Optional GCP client manager for Secret Manager access
+            secret_cache: Optional secret cache. Defaults to the process-wide
+                         cache, shared by every DNSManager.
+            resolver: Optional DNS resolver for propagation checks. Defaults
+                     to querying the zone's authoritative nameservers.
+            provider: Optional DNS provider backend. Defaults to the one
+                     selected by settings.DNS_PROVIDER, created on first use.
         """
-        self._api_client = None
+        self._provider = provider
         self._base_domain = settings.NAMECHEAP_BASE_DOMAIN
         self._sandbox_mode = settings.NAMECHEAP_SANDBOX_MODE
         self._client_manager = client_manager or GCPClientManager()
         
-        # Initialize the Namecheap client on first use
-        self._initialized = False
+        # Share the process-wide cache so that managers created per request
+        # or per batch do not each fetch the credentials again
+        self._secret_cache = secret_cache or get_secret_cache()
+        
+        # Create the default provider on first use
+        self._initialized = provider is not None
+        self._init_task: Optional[asyncio.Task] = None
+        
+        self._resolver = resolver or AsyncDNSResolver()
     
     async def _initialize_client(self) -> None:
         """
-        Initialize Namecheap API client with credentials from Secret Manager.
+        Ensure the DNS provider is initialized, exactly once.
         
-        This method retrieves API credentials from GCP Secret Manager and
-        initializes the namecheapapi client. Credentials are cached for
-        the lifetime of the DNSManager instance.
+        Initialization is single-flight: concurrent first callers on a fresh
+        instance all await the same initialization task instead of each
+        fetching the secrets and building their own provider. The task is
+        shielded, so a cancelled caller does not abort it for the others.
+        If initialization fails, every waiter receives the error and the
+        next call starts a new attempt.
         
         Raises:
             DNSConfigurationError: If credential retrieval or client init fails
@@ -104,39 +186,62 @@ class DNSManager:
         if self._initialized:
             return
         
+        loop = asyncio.get_running_loop()
+        task = self._init_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._create_provider())
+            self._init_task = task
+        
+        await asyncio.shield(task)
+    
+    async def _create_provider(self) -> None:
+        """
+        Initialize the DNS provider selected by settings.DNS_PROVIDER.
+        
+        Cloud DNS uses the client manager's credentials; the provisioning
+        service account already holds roles/dns.admin. For Namecheap, this
+        method retrieves API credentials from GCP Secret Manager and
+        initializes the pooled, rate-limited Namecheap transport. The
+        secrets are fetched concurrently through the shared secret cache, so
+        initialization costs at most one Secret Manager round trip and is
+        free when another instance has already read them.
+        
+        Raises:
+            DNSConfigurationError: If credential retrieval or provider init fails
+        """
+        provider_name = getattr(settings, "DNS_PROVIDER", "namecheap")
         try:
-            logger.info("Initializing Namecheap API client")
+            logger.info(f"Initializing DNS provider: {provider_name}")
             
-            # Import here to avoid dependency issues if not installed
-            try:
-                from namecheapapi import DomainAPI
-            except ImportError:
-                raise DNSConfigurationError(
-                    "namecheapapi package not installed. Run: poetry add namecheapapi"
+            if provider_name == "cloud_dns":
+                self._provider = CloudDNSProvider(
+                    self._client_manager,
+                    managed_zone=getattr(
+                        settings, "CLOUD_DNS_MANAGED_ZONE",
+                        self._base_domain.replace(".", "-")
+                    ),
+                    domain=self._base_domain
                 )
-            
-            # Retrieve credentials from Secret Manager
-            secrets_client = self._client_manager.get_secrets_client()
-            
-            api_user = await self._get_secret(secrets_client, "namecheap-api-user")
-            api_key = await self._get_secret(secrets_client, "namecheap-api-key")
-            username = await self._get_secret(secrets_client, "namecheap-username")
-            client_ip = await self._get_secret(secrets_client, "namecheap-client-ip")
-            
-            # Initialize Namecheap client
-            self._api_client = DomainAPI(
-                api_user=api_user,
-                api_key=api_key,
-                username=username,
-                client_ip=client_ip,
-                sandbox=self._sandbox_mode
-            )
+            else:
+                # Retrieve credentials from Secret Manager
+                secrets = await self._get_secrets(NAMECHEAP_SECRET_NAMES)
+                
+                transport = NamecheapTransport(
+                    api_user=secrets["namecheap-api-user"],
+                    api_key=secrets["namecheap-api-key"],
+                    username=secrets["namecheap-username"],
+                    client_ip=secrets["namecheap-client-ip"],
+                    sandbox=self._sandbox_mode
+                )
+                self._provider = NamecheapProvider(transport, self._base_domain)
             
             self._initialized = True
-            logger.info(f"Namecheap client initialized (sandbox={self._sandbox_mode})")
+            logger.info(f"DNS provider initialized: {self._provider.name}")
             
         except Exception as error:
-            error_msg = f"Failed to initialize Namecheap client: {str(error)}"
+            error_msg = (
+                f"Failed to initialize DNS provider {provider_name}: {str(error)}"
+            )
             logger.error(error_msg)
             raise DNSConfigurationError(error_msg)
     
@@ -150,7 +255,7 @@ class DNSManager:
         """
         Creates a DNS A record for the tenant subdomain.
         
-        This method creates a new DNS record in Namecheap for the tenant's
+        This method creates a new DNS record with the DNS provider for the tenant's
         subdomain, pointing to the Global Load Balancer's static IP address.
         The operation is idempotent - if the record already exists with the
         same IP, it will be updated.
@@ -190,68 +295,58 @@ class DNSManager:
                 f"Creating DNS {record_type} record: {fqdn} → {ip_address} (TTL={ttl})"
             )
             
-            # Get existing DNS records for the domain
-            existing_records = await self._get_existing_records()
-            
-            # Check if record already exists
-            existing_record = self._find_existing_record(
-                existing_records, subdomain, record_type
-            )
-            
-            if existing_record:
-                if existing_record.get("Address") == ip_address:
-                    logger.info(f"DNS record already exists with correct IP: {fqdn}")
-                    return {
-                        "status": "success",
-                        "fqdn": fqdn,
-                        "ip_address": ip_address,
-                        "ttl": ttl,
-                        "created_at": datetime.utcnow().isoformat(),
-                        "action": "unchanged"
-                    }
-                else:
-                    logger.info(
-                        f"Updating existing DNS record: {fqdn} "
-                        f"from {existing_record.get('Address')} to {ip_address}"
-                    )
-                    # Remove old record
-                    existing_records = [
-                        r for r in existing_records 
-                        if not (r.get("HostName") == subdomain and 
-                               r.get("RecordType") == record_type)
-                    ]
-            
-            # Add new record
-            new_record = {
-                "HostName": subdomain,
-                "RecordType": record_type,
-                "Address": ip_address,
-                "TTL": str(ttl)
-            }
-            existing_records.append(new_record)
-            
-            # Update DNS records in Namecheap
-            result = await self._set_dns_records(existing_records)
-            
-            if self._is_operation_successful(result):
-                logger.info(f"Successfully configured DNS record for {fqdn}")
-                
+            # Idempotent re-runs are answered from the provider's cached view
+            existing = self._provider.lookup(subdomain, record_type)
+            if existing and existing[0].get("Address") == ip_address:
+                logger.info(f"DNS record already exists with correct IP: {fqdn}")
                 return {
                     "status": "success",
                     "fqdn": fqdn,
                     "ip_address": ip_address,
                     "ttl": ttl,
                     "created_at": datetime.utcnow().isoformat(),
-                    "action": "updated" if existing_record else "created"
+                    "action": "unchanged"
                 }
-            else:
-                error_msg = self._extract_error_message(result)
+            
+            try:
+                (mutation,) = await self._provider.apply([RecordMutation(
+                    "upsert", subdomain, record_type, ip_address, ttl
+                )])
+            except DNSProviderError as error:
                 raise DNSConfigurationError(
-                    f"Namecheap API returned failure",
+                    str(error),
                     subdomain=subdomain,
                     ip_address=ip_address,
-                    namecheap_error=error_msg
+                    namecheap_error=error.provider_error
                 )
+            
+            if mutation.action == ACTION_UNCHANGED:
+                logger.info(f"DNS record already exists with correct IP: {fqdn}")
+                return {
+                    "status": "success",
+                    "fqdn": fqdn,
+                    "ip_address": ip_address,
+                    "ttl": ttl,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "action": "unchanged"
+                }
+            
+            if mutation.previous_address is not None:
+                logger.info(
+                    f"Updated existing DNS record: {fqdn} "
+                    f"from {mutation.previous_address} to {ip_address}"
+                )
+            
+            logger.info(f"Successfully configured DNS record for {fqdn}")
+            
+            return {
+                "status": "success",
+                "fqdn": fqdn,
+                "ip_address": ip_address,
+                "ttl": ttl,
+                "created_at": datetime.utcnow().isoformat(),
+                "action": mutation.action
+            }
                 
         except DNSConfigurationError:
             raise
@@ -289,17 +384,8 @@ class DNSManager:
             fqdn = f"{subdomain}.{self._base_domain}"
             logger.info(f"Removing DNS {record_type} record: {fqdn}")
             
-            # Get existing records
-            existing_records = await self._get_existing_records()
-            
-            # Filter out the record to remove
-            updated_records = [
-                r for r in existing_records
-                if not (r.get("HostName") == subdomain and 
-                       r.get("RecordType") == record_type)
-            ]
-            
-            if len(updated_records) == len(existing_records):
+            # Skip the provider round trip if its cached view shows no such record
+            if self._provider.lookup(subdomain, record_type) == []:
                 logger.info(f"DNS record not found: {fqdn}")
                 return {
                     "status": "success",
@@ -307,58 +393,124 @@ class DNSManager:
                     "action": "not_found"
                 }
             
-            # Update DNS records
-            result = await self._set_dns_records(updated_records)
+            (mutation,) = await self._provider.apply([
+                RecordMutation("remove", subdomain, record_type)
+            ])
             
-            if self._is_operation_successful(result):
-                logger.info(f"Successfully removed DNS record: {fqdn}")
+            if mutation.action == ACTION_NOT_FOUND:
+                logger.info(f"DNS record not found: {fqdn}")
                 return {
                     "status": "success",
                     "fqdn": fqdn,
-                    "action": "removed"
+                    "action": "not_found"
                 }
-            else:
-                error_msg = self._extract_error_message(result)
-                raise DNSConfigurationError(
-                    f"Failed to remove DNS record",
-                    subdomain=subdomain,
-                    namecheap_error=error_msg
-                )
+            
+            logger.info(f"Successfully removed DNS record: {fqdn}")
+            return {
+                "status": "success",
+                "fqdn": fqdn,
+                "action": "removed"
+            }
                 
+        except DNSProviderError as error:
+            error_msg = f"Failed to remove DNS record: {str(error)}"
+            logger.error(error_msg)
+            raise DNSConfigurationError(
+                error_msg,
+                subdomain=subdomain,
+                namecheap_error=error.provider_error
+            )
         except Exception as error:
             error_msg = f"Failed to remove DNS record: {str(error)}"
             logger.error(error_msg)
             raise DNSConfigurationError(error_msg, subdomain=subdomain)
     
+    async def get_zone_records(self) -> List[Dict[str, Any]]:
+        """
+        Fetches every host record of the base domain from the DNS provider.
+        
+        Returns:
+            List of host records with HostName, RecordType, Address and TTL
+        """
+        await self._initialize_client()
+        return await self._get_existing_records()
+    
+    async def apply_record_mutations(
+        self,
+        mutations: List[RecordMutation]
+    ) -> List[MutationResult]:
+        """
+        Applies a group of record changes with a single provider write.
+        
+        With Namecheap, the mutations go through the same coalescing writer
+        as configure_namecheap_dns_record and remove_dns_record, so they are
+        serialized with concurrent single-record changes. With Cloud DNS,
+        they are submitted as one change set.
+        
+        Args:
+            mutations: Upserts and removals to apply, in order
+            
+        Returns:
+            MutationResult for each mutation, in the same order
+            
+        Raises:
+            DNSConfigurationError: If the zone could not be read or written
+        """
+        await self._initialize_client()
+        
+        try:
+            return await self._provider.apply(mutations)
+        except Exception as error:
+            error_msg = f"Failed to apply DNS record changes: {str(error)}"
+            logger.error(error_msg)
+            raise DNSConfigurationError(
+                error_msg,
+                namecheap_error=getattr(error, "provider_error", None)
+            )
+    
     async def validate_dns_propagation(
         self, 
         fqdn: str, 
         expected_ip: str,
         max_attempts: int = 10,
-        delay_seconds: int = 30
+        delay_seconds: int = 30,
+        max_delay_seconds: float = DEFAULT_PROPAGATION_MAX_DELAY,
+        deadline_seconds: float = DEFAULT_PROPAGATION_DEADLINE
     ) -> bool:
         """
         Validates that DNS record has propagated.
         
-        This method performs DNS resolution to verify that the newly
-        created record is resolvable and returns the expected IP address.
-        It will retry with exponential backoff to account for propagation delay.
+        This method queries the zone's authoritative nameservers directly,
+        without blocking the event loop, to verify that the newly created
+        record returns the expected IP address. Recursive resolver caches
+        are bypassed so a stale cached answer cannot delay the check.
+        It retries with capped, jittered exponential backoff until the
+        record resolves, max_attempts is reached or the deadline passes.
         
         Args:
             fqdn: Full domain name to check
             expected_ip: Expected IP address
             max_attempts: Maximum number of validation attempts
             delay_seconds: Initial delay between attempts
+            max_delay_seconds: Upper bound for the delay between attempts
+            deadline_seconds: Overall time budget for the check
             
         Returns:
             True if DNS resolves correctly, False otherwise
         """
         logger.info(f"Validating DNS propagation for {fqdn} → {expected_ip}")
         
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_seconds
+        attempts = 0
+        
         for attempt in range(max_attempts):
+            attempts += 1
             try:
-                # Perform DNS resolution
-                resolved_ips = socket.gethostbyname_ex(fqdn)[2]
+                resolved_ips = await asyncio.wait_for(
+                    self._resolver.resolve_a(fqdn),
+                    max(deadline - loop.time(), 0)
+                )
                 
                 if expected_ip in resolved_ips:
                     logger.info(
@@ -371,80 +523,200 @@ class DNSManager:
                         f"{fqdn} resolves to {resolved_ips}, expected {expected_ip}"
                     )
                     
-            except socket.gaierror as error:
+            except (DNSQueryError, asyncio.TimeoutError) as error:
                 logger.warning(
                     f"DNS resolution failed (attempt {attempt + 1}): "
-                    f"{fqdn} - {str(error)}"
+                    f"{fqdn} - {str(error) or 'deadline exceeded'}"
                 )
             
-            # Wait before next attempt (exponential backoff)
-            if attempt < max_attempts - 1:
-                wait_time = delay_seconds * (2 ** attempt)
-                logger.info(f"Waiting {wait_time} seconds before retry...")
+            # Wait before next attempt, without overrunning the deadline
+            remaining = deadline - loop.time()
+            if attempt < max_attempts - 1 and remaining > 0:
+                wait_time = min(
+                    backoff_delay(attempt, delay_seconds, max_delay_seconds),
+                    remaining
+                )
+                logger.info(f"Waiting {wait_time:.1f} seconds before retry...")
                 await asyncio.sleep(wait_time)
+            elif remaining <= 0:
+                break
         
         logger.error(
-            f"DNS validation failed after {max_attempts} attempts: "
+            f"DNS validation failed after {attempts} attempts: "
             f"{fqdn} does not resolve to {expected_ip}"
         )
         return False
     
+    async def validate_many(
+        self,
+        fqdn_to_ip: Dict[str, str],
+        max_concurrency: int = DEFAULT_PROPAGATION_CONCURRENCY,
+        max_attempts: int = 10,
+        delay_seconds: float = 30,
+        max_delay_seconds: float = DEFAULT_PROPAGATION_MAX_DELAY,
+        deadline_seconds: float = DEFAULT_PROPAGATION_DEADLINE
+    ) -> AsyncIterator[PropagationResult]:
+        """
+        Validates DNS propagation for many names, yielding results as they settle.
+        
+        All names share one poll scheduler: each name has its own capped,
+        jittered backoff schedule, and due checks are started from a single
+        loop with at most max_concurrency queries in flight. A result is
+        yielded as soon as a name resolves to its expected IP or runs out
+        of attempts or time, so callers can stream progress.
+        
+        Closing the iterator early cancels any checks still in flight and
+        waits for them to finish.
+        
+        Args:
+            fqdn_to_ip: Mapping of full domain name to expected IP address
+            max_concurrency: Maximum concurrent DNS queries
+            max_attempts: Maximum number of queries per name
+            delay_seconds: Initial delay between queries for a name
+            max_delay_seconds: Upper bound for the delay between queries
+            deadline_seconds: Overall time budget for the whole batch
+        
+        Yields:
+            PropagationResult for each name, in completion order
+        """
+        logger.info(f"Validating DNS propagation for {len(fqdn_to_ip)} names")
+        
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + deadline_seconds
+        
+        # Heap of (due time, sequence, fqdn); the sequence breaks ties
+        schedule: List[Tuple[float, int, str]] = [
+            (started, sequence, fqdn) for sequence, fqdn in enumerate(fqdn_to_ip)
+        ]
+        sequence = len(schedule)
+        attempts: Dict[str, int] = {fqdn: 0 for fqdn in fqdn_to_ip}
+        in_flight: Dict[asyncio.Task, str] = {}
+        propagated_count = 0
+        
+        try:
+            while schedule or in_flight:
+                now = loop.time()
+                while (
+                    schedule and schedule[0][0] <= now
+                    and len(in_flight) < max_concurrency
+                ):
+                    _, _, fqdn = heapq.heappop(schedule)
+                    attempts[fqdn] += 1
+                    task = loop.create_task(self._resolve_until(fqdn, deadline))
+                    in_flight[task] = fqdn
+                
+                # Wake for the next completed query or the next due check
+                timeout = None
+                if schedule and len(in_flight) < max_concurrency:
+                    timeout = max(schedule[0][0] - now, 0)
+                if not in_flight:
+                    await asyncio.sleep(timeout)
+                    continue
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for task in done:
+                    fqdn = in_flight.pop(task)
+                    expected_ip = fqdn_to_ip[fqdn]
+                    resolved_ips, error = task.result()
+                    
+                    if expected_ip in resolved_ips:
+                        propagated_count += 1
+                        yield PropagationResult(
+                            fqdn, expected_ip, True, resolved_ips,
+                            attempts[fqdn], loop.time() - started
+                        )
+                        continue
+                    
+                    retry_at = loop.time() + backoff_delay(
+                        attempts[fqdn] - 1, delay_seconds, max_delay_seconds
+                    )
+                    if attempts[fqdn] >= max_attempts or retry_at >= deadline:
+                        logger.warning(
+                            f"DNS validation failed after {attempts[fqdn]} attempts: "
+                            f"{fqdn} does not resolve to {expected_ip}"
+                        )
+                        yield PropagationResult(
+                            fqdn, expected_ip, False, resolved_ips,
+                            attempts[fqdn], loop.time() - started, error
+                        )
+                        continue
+                    
+                    heapq.heappush(schedule, (retry_at, sequence, fqdn))
+                    sequence += 1
+        finally:
+            for task in in_flight:
+                task.cancel()
+            # Let the cancelled queries release their sockets before returning
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        
+        logger.info(
+            f"DNS propagation confirmed for {propagated_count} of "
+            f"{len(fqdn_to_ip)} names in {loop.time() - started:.1f}s"
+        )
+    
     # ========================================================================
     # Private Helper Methods
     # ========================================================================
     
-    async def _get_secret(
-        self, 
-        client: secretmanager.SecretManagerServiceClient,
-        secret_name: str
-    ) -> str:
+    async def _resolve_until(
+        self,
+        fqdn: str,
+        deadline: float
+    ) -> Tuple[List[str], Optional[str]]:
         """
-        Retrieve secret value from GCP Secret Manager.
+        Resolve a name, giving up at the given event loop time.
+        
+        Returns:
+            Resolved addresses (empty on failure) and the error message, if any
+        """
+        remaining = deadline - asyncio.get_running_loop().time()
+        try:
+            resolved_ips = await asyncio.wait_for(
+                self._resolver.resolve_a(fqdn), max(remaining, 0)
+            )
+            return resolved_ips, None
+        except (DNSQueryError, asyncio.TimeoutError) as error:
+            return [], str(error) or "deadline exceeded"
+    
+    async def _get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """
+        Retrieve secret values from GCP Secret Manager concurrently.
         
         Args:
-            client: Secret Manager client
-            secret_name: Name of the secret to retrieve
+            secret_names: Names of the secrets to retrieve
             
         Returns:
-            The secret value as a string
+            Dictionary mapping each secret name to its value
             
         Raises:
             DNSConfigurationError: If secret retrieval fails
         """
+        from google.api_core import exceptions as gcp_exceptions
+        
         try:
-            name = f"projects/{settings.GCP_PROJECT_ID}/secrets/{secret_name}/versions/latest"
-            response = client.access_secret_version(request={"name": name})
-            return response.payload.data.decode("UTF-8")
-        except gcp_exceptions.NotFound:
+            return await self._secret_cache.get_many(
+                secret_names, project_id=settings.GCP_PROJECT_ID
+            )
+        except gcp_exceptions.NotFound as error:
             raise DNSConfigurationError(
-                f"Secret not found in Secret Manager: {secret_name}"
+                f"Secret not found in Secret Manager: {str(error)}"
             )
         except Exception as error:
             raise DNSConfigurationError(
-                f"Failed to retrieve secret {secret_name}: {str(error)}"
+                f"Failed to retrieve secrets {', '.join(secret_names)}: {str(error)}"
             )
     
     async def _get_existing_records(self) -> List[Dict[str, Any]]:
         """
-        Retrieve existing DNS records from Namecheap.
+        Retrieve existing DNS records from the DNS provider.
         
         Returns:
             List of existing DNS records
         """
-        result = self._api_client.domains_dns_getHosts(self._base_domain)
-        return result.get("DomainDNSGetHostsResult", {}).get("host", [])
-    
-    async def _set_dns_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """
-        Update DNS records in Namecheap.
-        
-        Args:
-            records: List of DNS records to set
-            
-        Returns:
-            API response from Namecheap
-        """
-        return self._api_client.domains_dns_setHosts(self._base_domain, records)
+        return await self._provider.list_records()
     
     def _sanitize_subdomain(self, subdomain: str) -> str:
         """
@@ -488,51 +760,4 @@ class DNSManager:
             socket.inet_aton(ip_address)
             return True
         except socket.error:
-            return False
-    
-    def _find_existing_record(
-        self, 
-        records: List[Dict[str, Any]], 
-        subdomain: str, 
-        record_type: str
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Find an existing DNS record matching subdomain and type.
-        
-        Args:
-            records: List of existing records
-            subdomain: Subdomain to find
-            record_type: Record type to match
-            
-        Returns:
-            The matching record dict or None
-        """
-        for record in records:
-            if (record.get("HostName") == subdomain and 
-                record.get("RecordType") == record_type):
-                return record
-        return None
-    
-    def _is_operation_successful(self, result: Dict[str, Any]) -> bool:
-        """
-        Check if Namecheap API operation was successful.
-        
-        Args:
-            result: API response from Namecheap
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return result.get("DomainDNSSetHostsResult", {}).get("IsSuccess") == "true"
-    
-    def _extract_error_message(self, result: Dict[str, Any]) -> str:
-        """
-        Extract error message from Namecheap API response.
-        
-        Args:
-            result: API response from Namecheap
-            
-        Returns:
-            Error message string
-        """
-        return str(result.get("DomainDNSSetHostsResult", {}).get("Warnings", result))
\ No newline at end of file
+            return False
\ No newline at end of file
@@ -0,0 +1,520 @@
+"""
+DNS Provider Backends
+
+DNSManager stores tenant host records through a DNSProvider. Providers
+differ mainly in how they write:
+
+- NamecheapProvider: Namecheap only supports whole-zone updates, so every
+  write is a read-modify-write of the entire host list. Concurrent changes
+  are coalesced into one getHosts/setHosts cycle per flush window.
+- CloudDNSProvider: Cloud DNS accepts per-record change sets, so a write
+  reads and replaces only the record sets it touches, at a cost independent
+  of how many tenants share the base domain.
+- InMemoryDNSProvider: a dict-backed zone for tests and benchmarks.
+
+All providers exchange host records in the same shape Namecheap uses:
+dicts with HostName (relative to the zone, "@" for the apex), RecordType,
+Address and TTL.
+
+Usage:
+    provider = CloudDNSProvider(client_manager, "nlyzer-com", "nlyzer.com")
+    dns_manager = DNSManager(provider=provider)
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional
+
+from nlyzer.gcp.dns_zone import (
+    DEFAULT_FLUSH_WINDOW,
+    DEFAULT_MAX_BATCH_SIZE,
+    MutationResult,
+    RecordKey,
+    RecordMutation,
+    ZoneSnapshot,
+    ZoneWriteCoalescer,
+    apply_mutation,
+    flatten_index,
+    index_records,
+)
+
+if TYPE_CHECKING:
+    from nlyzer.gcp.clients import GCPClientManager
+    from nlyzer.gcp.namecheap import NamecheapTransport
+
+logger = logging.getLogger(__name__)
+
+CLOUD_DNS_API_URL = "https://dns.googleapis.com/dns/v1"
+
+# Seconds before a Cloud DNS API request is abandoned
+DEFAULT_CLOUD_DNS_TIMEOUT = 30.0
+
+# Attempts to submit a Cloud DNS change set when a record set was modified
+# concurrently between reading it and submitting the change
+DEFAULT_CLOUD_DNS_CONFLICT_RETRIES = 3
+
+
+class DNSProviderError(Exception):
+    """
+    Raised when a DNS provider rejects or fails a request.
+    
+    Attributes:
+        provider_error: Error details reported by the provider
+    """
+    
+    def __init__(self, message: str, provider_error: Optional[str] = None):
+        super().__init__(message)
+        self.provider_error = provider_error
+
+
+class DNSProvider(ABC):
+    """
+    Backend storing the host records of the platform's base domain.
+    """
+    
+    name = "dns"
+    
+    @abstractmethod
+    async def list_records(self) -> List[Dict[str, Any]]:
+        """
+        Get every host record in the zone.
+        
+        Returns:
+            Host records with HostName, RecordType, Address and TTL
+        """
+    
+    @abstractmethod
+    async def apply(self, mutations: List[RecordMutation]) -> List[MutationResult]:
+        """
+        Apply a group of record changes atomically where the provider allows.
+        
+        Args:
+            mutations: Upserts and removals, applied in order
+        
+        Returns:
+            MutationResult for each mutation, in the same order
+        
+        Raises:
+            DNSProviderError: If the provider rejects the change
+        """
+    
+    def lookup(
+        self,
+        host_name: str,
+        record_type: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up records from the provider's cached view of the zone.
+        
+        Used to answer idempotent changes without an API call. Providers
+        without a cache return None, meaning "unknown".
+        
+        Args:
+            host_name: Host name relative to the zone
+            record_type: DNS record type
+        
+        Returns:
+            The matching records (an empty list if the host has none), or
+            None if the provider cannot answer without an API call
+        """
+        return None
+    
+    async def aclose(self) -> None:
+        """Release connections held by the provider."""
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider-specific statistics."""
+        return {}
+
+
+class NamecheapProvider(DNSProvider):
+    """
+    Namecheap backend with whole-zone writes coalesced per flush window.
+    
+    Every zone read refreshes an indexed snapshot and every successful
+    write replaces it, so lookups of recently seen records are free.
+    Namecheap API errors and failed HTTP requests are raised as
+    DNSProviderError.
+    """
+    
+    name = "namecheap"
+    
+    def __init__(
+        self,
+        transport: "NamecheapTransport",
+        domain: str,
+        flush_window: float = DEFAULT_FLUSH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ):
+        """
+        Initialize the provider.
+        
+        Args:
+            transport: Rate-limited Namecheap API transport
+            domain: Domain whose hosts are managed, e.g. "nlyzer.com"
+            flush_window: Seconds to collect changes before a zone write
+            max_batch_size: Maximum changes applied per zone write
+        """
+        self._transport = transport
+        self._domain = domain
+        self._snapshot = ZoneSnapshot()
+        self._writer = ZoneWriteCoalescer(
+            self.list_records, self._write_zone, flush_window, max_batch_size
+        )
+    
+    async def list_records(self) -> List[Dict[str, Any]]:
+        result = await self._call("getHosts", self._transport.get_hosts(self._domain))
+        records = result.get("DomainDNSGetHostsResult", {}).get("host", [])
+        self._snapshot.store(records)
+        return records
+    
+    async def apply(self, mutations: List[RecordMutation]) -> List[MutationResult]:
+        return await self._writer.submit_many(mutations)
+    
+    def lookup(
+        self,
+        host_name: str,
+        record_type: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        return self._snapshot.lookup(host_name, record_type)
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "writer": self._writer.get_stats(),
+            "snapshot": self._snapshot.get_stats(),
+            "transport": self._transport.get_stats()
+        }
+    
+    async def _write_zone(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Replace the zone's host list, raising if Namecheap reports failure."""
+        try:
+            result = await self._call(
+                "setHosts", self._transport.set_hosts(self._domain, records)
+            )
+        except Exception:
+            self._snapshot.invalidate()
+            raise
+        
+        status = result.get("DomainDNSSetHostsResult", {})
+        if status.get("IsSuccess") == "true":
+            self._snapshot.store(records)
+        else:
+            # The zone state is unknown after a rejected write
+            self._snapshot.invalidate()
+            raise DNSProviderError(
+                "Namecheap API returned failure",
+                provider_error=str(status.get("Warnings", result))
+            )
+        return result
+    
+    async def _call(self, command: str, call: Awaitable) -> Dict[str, Any]:
+        """Await a transport call, raising its errors as DNSProviderError."""
+        import httpx
+        
+        from nlyzer.gcp.namecheap import NamecheapAPIError
+        
+        try:
+            return await call
+        except NamecheapAPIError as error:
+            raise DNSProviderError(
+                f"Namecheap API rejected {command}", provider_error=str(error)
+            ) from error
+        except httpx.HTTPError as error:
+            raise DNSProviderError(
+                f"Namecheap API request {command} failed: {error!r}",
+                provider_error=str(error)
+            ) from error
+
+
+class CloudDNSProvider(DNSProvider):
+    """
+    Cloud DNS backend submitting per-record change sets.
+    
+    A write reads the current record set of each key it touches, applies
+    the mutations to those record sets only, and submits one change with
+    the old sets as deletions and the new ones as additions. Cloud DNS
+    applies the change atomically and rejects it if a deleted set no
+    longer matches; the change is then recomputed from fresh reads.
+    
+    The REST API is called over a pooled httpx connection with the client
+    manager's credentials. The google-cloud-dns library has no single
+    record-set read, so using it would turn every write into a zone listing.
+    """
+    
+    name = "cloud_dns"
+    
+    def __init__(
+        self,
+        client_manager: "GCPClientManager",
+        managed_zone: str,
+        domain: str,
+        project_id: Optional[str] = None,
+        api_url: str = CLOUD_DNS_API_URL,
+        timeout: float = DEFAULT_CLOUD_DNS_TIMEOUT,
+        conflict_retries: int = DEFAULT_CLOUD_DNS_CONFLICT_RETRIES
+    ):
+        """
+        Initialize the provider.
+        
+        Args:
+            client_manager: GCP client manager supplying credentials
+            managed_zone: Cloud DNS managed zone name (not the DNS name)
+            domain: DNS name of the zone, e.g. "nlyzer.com"
+            project_id: Project owning the zone. Defaults to the client
+                       manager's project.
+            api_url: Cloud DNS API base URL
+            timeout: Seconds before a request is abandoned
+            conflict_retries: Attempts when a change conflicts with a
+                             concurrent one
+        """
+        self._client_manager = client_manager
+        self._managed_zone = managed_zone
+        self._dns_name = f"{domain.rstrip('.')}."
+        self._project_id = project_id or client_manager.get_project_id()
+        self._api_url = api_url
+        self._timeout = timeout
+        self._conflict_retries = conflict_retries
+        
+        self._client = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self._requests = 0
+        self._changes = 0
+        self._conflicts = 0
+    
+    async def list_records(self) -> List[Dict[str, Any]]:
+        records = []
+        page_token = None
+        while True:
+            params = {"pageToken": page_token} if page_token else None
+            response = await self._request("GET", "rrsets", params=params)
+            for rrset in response.get("rrsets", []):
+                records.extend(self._to_host_records(rrset))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return records
+    
+    async def apply(self, mutations: List[RecordMutation]) -> List[MutationResult]:
+        keys = list(dict.fromkeys(mutation.key for mutation in mutations))
+        
+        for attempt in range(self._conflict_retries):
+            current = dict(zip(keys, await asyncio.gather(
+                *(self._get_rrset(key) for key in keys)
+            )))
+            index: Dict[RecordKey, List[Dict[str, Any]]] = {}
+            for key in keys:
+                if current[key] is not None:
+                    index[key] = self._to_host_records(current[key])
+            before = {key: list(records) for key, records in index.items()}
+            
+            results = [apply_mutation(index, mutation) for mutation in mutations]
+            
+            changed = [key for key in keys if index.get(key) != before.get(key)]
+            if not changed:
+                return results
+            
+            deletions = [current[key] for key in changed if current[key] is not None]
+            additions = [
+                self._to_rrset(key, index[key]) for key in changed if key in index
+            ]
+            try:
+                change = await self._request(
+                    "POST", "changes",
+                    json={"additions": additions, "deletions": deletions}
+                )
+            except _ConflictError:
+                self._conflicts += 1
+                logger.info(
+                    f"Cloud DNS change conflicted with a concurrent update; "
+                    f"retrying (attempt {attempt + 1}/{self._conflict_retries})"
+                )
+                continue
+            
+            self._changes += 1
+            for result in results:
+                if result.changed:
+                    result.write_result = change
+            return results
+        
+        raise DNSProviderError(
+            f"Cloud DNS change kept conflicting after {self._conflict_retries} "
+            f"attempts"
+        )
+    
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self._requests,
+            "changes": self._changes,
+            "conflicts": self._conflicts
+        }
+    
+    # ========================================================================
+    # Private Helper Methods
+    # ========================================================================
+    
+    def _fqdn(self, host_name: str) -> str:
+        """Convert a zone-relative host name to a Cloud DNS record name."""
+        if host_name in ("@", ""):
+            return self._dns_name
+        return f"{host_name}.{self._dns_name}"
+    
+    def _host_name(self, fqdn: str) -> str:
+        """Convert a Cloud DNS record name to a zone-relative host name."""
+        if fqdn == self._dns_name:
+            return "@"
+        return fqdn[:-len(self._dns_name) - 1]
+    
+    def _to_host_records(self, rrset: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Expand a record set into one host record per value."""
+        host_name = self._host_name(rrset["name"])
+        return [
+            {
+                "HostName": host_name,
+                "RecordType": rrset["type"],
+                "Address": rrdata,
+                "TTL": str(rrset.get("ttl", ""))
+            }
+            for rrdata in rrset.get("rrdatas", [])
+        ]
+    
+    def _to_rrset(
+        self,
+        key: RecordKey,
+        records: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Collapse the host records of one key into a record set."""
+        return {
+            "name": self._fqdn(key[0]),
+            "type": key[1],
+            "ttl": int(records[0].get("TTL") or 300),
+            "rrdatas": [record["Address"] for record in records]
+        }
+    
+    async def _get_rrset(self, key: RecordKey) -> Optional[Dict[str, Any]]:
+        """Read one record set, or None if it does not exist."""
+        path = f"rrsets/{self._fqdn(key[0])}/{key[1]}"
+        try:
+            return await self._request("GET", path)
+        except _NotFoundError:
+            return None
+    
+    def _get_client(self):
+        """Get the pooled HTTP client for the running event loop."""
+        import httpx
+        
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self._timeout)
+            self._client_loop = loop
+        return self._client
+    
+    async def _authorization_header(self) -> Dict[str, str]:
+        """Build the bearer token header from the shared credentials."""
+        refresher = self._client_manager.get_registry().get_credential_refresher()
+        if refresher.needs_refresh():
+            await asyncio.to_thread(refresher.ensure_fresh)
+        token = self._client_manager.get_credentials().token
+        return {"Authorization": f"Bearer {token}"}
+    
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Call the managed zone's REST API and decode the JSON response."""
+        url = (
+            f"{self._api_url}/projects/{self._project_id}"
+            f"/managedZones/{self._managed_zone}/{path}"
+        )
+        headers = await self._authorization_header()
+        self._requests += 1
+        response = await self._get_client().request(
+            method, url, headers=headers, **kwargs
+        )
+        
+        if response.status_code == 404:
+            raise _NotFoundError(path)
+        if response.status_code in (409, 412):
+            raise _ConflictError(path)
+        if response.status_code >= 400:
+            raise DNSProviderError(
+                f"Cloud DNS API returned HTTP {response.status_code} for {path}",
+                provider_error=response.text
+            )
+        return response.json()
+
+
+class _NotFoundError(Exception):
+    """Internal signal for a missing record set."""
+
+
+class _ConflictError(Exception):
+    """Internal signal for a change rejected by a concurrent modification."""
+
+
+class InMemoryDNSProvider(DNSProvider):
+    """
+    Dict-backed zone for tests and benchmarks.
+    
+    Writes are O(1) per mutation. An optional per-call latency simulates a
+    remote API.
+    """
+    
+    name = "memory"
+    
+    def __init__(
+        self,
+        records: Optional[List[Dict[str, Any]]] = None,
+        latency: float = 0.0
+    ):
+        """
+        Initialize the provider.
+        
+        Args:
+            records: Initial host records
+            latency: Seconds each list or apply call takes
+        """
+        self._index = index_records([dict(record) for record in records or []])
+        self._latency = latency
+        
+        self._list_calls = 0
+        self._apply_calls = 0
+        self._mutations = 0
+    
+    async def list_records(self) -> List[Dict[str, Any]]:
+        self._list_calls += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return [dict(record) for record in flatten_index(self._index)]
+    
+    async def apply(self, mutations: List[RecordMutation]) -> List[MutationResult]:
+        self._apply_calls += 1
+        self._mutations += len(mutations)
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return [apply_mutation(self._index, mutation) for mutation in mutations]
+    
+    def lookup(
+        self,
+        host_name: str,
+        record_type: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        return list(self._index.get((host_name, record_type), ()))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "records": sum(len(records) for records in self._index.values()),
+            "list_calls": self._list_calls,
+            "apply_calls": self._apply_calls,
+            "mutations": self._mutations
+        }
@@ -0,0 +1,460 @@
+"""
+Desired-State DNS Reconciliation
+
+configure_namecheap_dns_record and remove_dns_record change DNS one record
+at a time. Repairing the whole fleet that way costs at least one zone read
+and write per tenant. The DNSReconciler instead takes the complete desired
+set of tenant records (typically loaded from the database), diffs it
+against the live zone fetched once, and applies the minimal change set in a
+single batched zone write, whatever the number of tenants.
+
+Features:
+- Dry-run plans that list what would be created, updated and removed
+- Deletion limited to records the caller declares as owned, so records
+  managed elsewhere (www, MX, verification TXT records) are never touched
+- Periodic reconciliation on the event loop, optionally audit-only
+- Drift metrics for the last run and cumulative totals
+
+This module is a library: nlyzer_api holds no tenant table to load the
+desired records from, so it does not start a reconciler itself. The
+service that owns the tenant records supplies load_desired and owns, and
+calls start() on application startup and stop() on shutdown.
+
+Usage:
+    async def load_desired():
+        return [DesiredRecord(t.subdomain, t.load_balancer_ip) for t in tenants]
+    
+    reconciler = DNSReconciler(dns_manager, load_desired, owns=is_tenant_record)
+    result = await reconciler.reconcile(dry_run=True)
+    for line in result.plan.describe():
+        print(line)
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+from nlyzer.gcp.dns_zone import (
+    ACTION_CREATED,
+    ACTION_REMOVED,
+    ACTION_UPDATED,
+    RecordKey,
+    RecordMutation,
+    index_records,
+)
+
+if TYPE_CHECKING:
+    from nlyzer.gcp.dns import DNSManager
+
+logger = logging.getLogger(__name__)
+
+# Seconds between periodic reconciliation runs
+DEFAULT_RECONCILE_INTERVAL = 900.0
+
+# Upper bound of the random delay added to each periodic run
+DEFAULT_RECONCILE_JITTER = 60.0
+
+
+@dataclass
+class DesiredRecord:
+    """
+    A host record that should exist in the zone.
+    
+    Attributes:
+        host_name: Host name relative to the zone (e.g. "acme-corp")
+        address: Record value (e.g. the load balancer IP)
+        record_type: DNS record type
+        ttl: TTL in seconds, used when the record is created or updated
+    """
+    
+    host_name: str
+    address: str
+    record_type: str = "A"
+    ttl: int = 300
+    
+    @property
+    def key(self) -> RecordKey:
+        return (self.host_name, self.record_type)
+
+
+@dataclass
+class RecordChange:
+    """
+    One planned change to the zone.
+    
+    Attributes:
+        action: created, updated or removed
+        host_name: Host name relative to the zone
+        record_type: DNS record type
+        address: New record value (None for removals)
+        previous_address: Current record value (None for creations)
+        ttl: TTL for creations and updates
+    """
+    
+    action: str
+    host_name: str
+    record_type: str
+    address: Optional[str] = None
+    previous_address: Optional[str] = None
+    ttl: Optional[int] = None
+    
+    def to_mutation(self) -> RecordMutation:
+        """Convert the change into a mutation for the zone writer."""
+        if self.action == ACTION_REMOVED:
+            return RecordMutation("remove", self.host_name, self.record_type)
+        return RecordMutation(
+            "upsert", self.host_name, self.record_type, self.address, self.ttl
+        )
+    
+    def describe(self) -> str:
+        """Render the change as a one-line, diff-style description."""
+        name = f"{self.host_name} {self.record_type}"
+        if self.action == ACTION_CREATED:
+            return f"+ {name} {self.address}"
+        if self.action == ACTION_UPDATED:
+            return f"~ {name} {self.previous_address} -> {self.address}"
+        return f"- {name} {self.previous_address}"
+
+
+@dataclass
+class ReconcilePlan:
+    """
+    Minimal change set that brings the live zone to the desired state.
+    
+    Attributes:
+        creates: Desired records missing from the zone
+        updates: Desired records whose live value differs
+        deletes: Owned records that are no longer desired
+        unchanged: Number of desired records already in sync
+    """
+    
+    creates: List[RecordChange] = field(default_factory=list)
+    updates: List[RecordChange] = field(default_factory=list)
+    deletes: List[RecordChange] = field(default_factory=list)
+    unchanged: int = 0
+    
+    @property
+    def changes(self) -> List[RecordChange]:
+        """All planned changes, creations first."""
+        return self.creates + self.updates + self.deletes
+    
+    @property
+    def is_empty(self) -> bool:
+        """Whether the zone already matches the desired state."""
+        return not (self.creates or self.updates or self.deletes)
+    
+    def describe(self) -> List[str]:
+        """Render the plan as diff-style lines, e.g. for dry-run output."""
+        return [change.describe() for change in self.changes]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the plan as plain data.
+        
+        Returns:
+            Dictionary with change counts and the diff-style change list
+        """
+        return {
+            "create": len(self.creates),
+            "update": len(self.updates),
+            "delete": len(self.deletes),
+            "unchanged": self.unchanged,
+            "changes": self.describe()
+        }
+
+
+@dataclass
+class ReconcileResult:
+    """
+    Outcome of one reconciliation run.
+    
+    Attributes:
+        plan: The computed change set
+        dry_run: Whether changes were only planned
+        applied: Whether a zone write was performed
+        started_at: UTC timestamp of the run
+        duration_seconds: Wall-clock duration of the run
+    """
+    
+    plan: ReconcilePlan
+    dry_run: bool
+    applied: bool
+    started_at: str
+    duration_seconds: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the result as plain data."""
+        return {
+            "dry_run": self.dry_run,
+            "applied": self.applied,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration_seconds,
+            "plan": self.plan.to_dict()
+        }
+
+
+def plan_reconciliation(
+    live_records: List[Dict[str, Any]],
+    desired: Iterable[DesiredRecord],
+    owns: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> ReconcilePlan:
+    """
+    Diff the live zone against the desired records.
+    
+    Records are compared by the address of the first live record with the
+    same host name and type, the same way the zone writer decides whether
+    an upsert changes anything, so every planned change results in a write.
+    
+    Args:
+        live_records: Host records as returned by the DNS provider
+        desired: Records that should exist
+        owns: Predicate selecting live records this reconciler manages.
+              Owned records that are not desired are deleted. If None,
+              nothing is deleted.
+    
+    Returns:
+        The minimal change set
+    
+    Raises:
+        ValueError: If two desired records for the same host name and type
+                    disagree
+    """
+    index = index_records(live_records)
+    
+    desired_by_key: Dict[RecordKey, DesiredRecord] = {}
+    for record in desired:
+        previous = desired_by_key.get(record.key)
+        if previous is not None and previous.address != record.address:
+            raise ValueError(
+                f"Conflicting desired records for {record.host_name} "
+                f"{record.record_type}: {previous.address} and {record.address}"
+            )
+        desired_by_key[record.key] = record
+    
+    plan = ReconcilePlan()
+    for key, record in desired_by_key.items():
+        existing = index.get(key)
+        if not existing:
+            plan.creates.append(RecordChange(
+                ACTION_CREATED, record.host_name, record.record_type,
+                record.address, None, record.ttl
+            ))
+        elif existing[0].get("Address") != record.address:
+            plan.updates.append(RecordChange(
+                ACTION_UPDATED, record.host_name, record.record_type,
+                record.address, existing[0].get("Address"), record.ttl
+            ))
+        else:
+            plan.unchanged += 1
+    
+    if owns is not None:
+        for key, records in index.items():
+            if key not in desired_by_key and all(owns(r) for r in records):
+                plan.deletes.append(RecordChange(
+                    ACTION_REMOVED, key[0], key[1],
+                    previous_address=records[0].get("Address")
+                ))
+    
+    return plan
+
+
+class DNSReconciler:
+    """
+    Converges the live zone on a desired set of records.
+    
+    Each run costs one zone read to plan and, only if there is drift, one
+    coalesced read-modify-write to apply, regardless of how many records are
+    desired or changed.
+    """
+    
+    def __init__(
+        self,
+        dns_manager: "DNSManager",
+        desired_state: Callable[[], Awaitable[Iterable[DesiredRecord]]],
+        owns: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        interval: float = DEFAULT_RECONCILE_INTERVAL,
+        jitter: float = DEFAULT_RECONCILE_JITTER
+    ):
+        """
+        Initialize the reconciler.
+        
+        Args:
+            dns_manager: DNS manager used to read and write the zone
+            desired_state: Coroutine function returning the desired records,
+                          e.g. a database query over active tenants
+            owns: Predicate selecting live records that may be deleted when
+                  no longer desired. If None, nothing is deleted.
+            interval: Seconds between periodic runs
+            jitter: Maximum random delay added to each periodic run
+        """
+        self._dns_manager = dns_manager
+        self._desired_state = desired_state
+        self._owns = owns
+        self.interval = interval
+        self.jitter = jitter
+        
+        self._task: Optional[asyncio.Task] = None
+        
+        self._runs = 0
+        self._failures = 0
+        self._records_repaired = 0
+        self._last_result: Optional[ReconcileResult] = None
+        self._last_error: Optional[str] = None
+    
+    async def plan(self) -> ReconcilePlan:
+        """
+        Compute the change set without applying it.
+        
+        Returns:
+            The current ReconcilePlan
+        """
+        desired = list(await self._desired_state())
+        live_records = await self._dns_manager.get_zone_records()
+        return plan_reconciliation(live_records, desired, self._owns)
+    
+    async def reconcile(self, dry_run: bool = False) -> ReconcileResult:
+        """
+        Run one reconciliation.
+        
+        Args:
+            dry_run: Only compute and log the plan
+        
+        Returns:
+            ReconcileResult with the plan and whether it was applied
+        
+        Raises:
+            DNSConfigurationError: If the zone could not be read or written
+            ValueError: If the desired records conflict
+        """
+        started_at = datetime.utcnow().isoformat()
+        started = time.perf_counter()
+        self._runs += 1
+        
+        try:
+            plan = await self.plan()
+            applied = False
+            if not plan.is_empty and not dry_run:
+                await self._dns_manager.apply_record_mutations(
+                    [change.to_mutation() for change in plan.changes]
+                )
+                applied = True
+                self._records_repaired += len(plan.changes)
+        except Exception as error:
+            self._failures += 1
+            self._last_error = str(error)
+            raise
+        
+        result = ReconcileResult(
+            plan, dry_run, applied, started_at, time.perf_counter() - started
+        )
+        self._last_result = result
+        self._last_error = None
+        
+        summary = (
+            f"{len(plan.creates)} to create, {len(plan.updates)} to update, "
+            f"{len(plan.deletes)} to delete, {plan.unchanged} in sync"
+        )
+        if plan.is_empty:
+            logger.info(f"DNS zone in sync ({plan.unchanged} records)")
+        elif dry_run:
+            logger.info(f"DNS drift detected (dry run): {summary}")
+            for line in plan.describe():
+                logger.info(f"  {line}")
+        else:
+            logger.info(f"DNS drift repaired: {summary}")
+        
+        return result
+    
+    # ========================================================================
+    # Periodic Reconciliation
+    # ========================================================================
+    
+    def start(self, dry_run: bool = False) -> None:
+        """
+        Start periodic reconciliation on the running event loop.
+        
+        Does nothing if already running.
+        
+        Args:
+            dry_run: Only report drift instead of repairing it
+        """
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(dry_run))
+        logger.info(
+            f"Started periodic DNS reconciliation every {self.interval:.0f}s "
+            f"(dry_run={dry_run})"
+        )
+    
+    async def stop(self) -> None:
+        """Stop periodic reconciliation and wait for the current run to end."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    @property
+    def running(self) -> bool:
+        """Whether periodic reconciliation is running."""
+        return self._task is not None and not self._task.done()
+    
+    async def _run(self, dry_run: bool) -> None:
+        """Periodic loop: reconcile, then sleep for the interval plus jitter."""
+        while True:
+            try:
+                await self.reconcile(dry_run=dry_run)
+            except Exception as error:
+                logger.error(f"Periodic DNS reconciliation failed: {str(error)}")
+            await asyncio.sleep(self.interval + random.uniform(0, self.jitter))
+    
+    # ========================================================================
+    # Metrics
+    # ========================================================================
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get drift metrics.
+        
+        Returns:
+            Dictionary with run and failure counts, total records repaired,
+            the last error, and for the last successful run its drift counts
+            (missing, mismatched, extraneous, in_sync), timestamp and duration
+        """
+        stats: Dict[str, Any] = {
+            "running": self.running,
+            "runs": self._runs,
+            "failures": self._failures,
+            "records_repaired": self._records_repaired,
+            "last_error": self._last_error,
+            "last_run": None
+        }
+        result = self._last_result
+        if result is not None:
+            stats["last_run"] = {
+                "started_at": result.started_at,
+                "duration_seconds": result.duration_seconds,
+                "dry_run": result.dry_run,
+                "applied": result.applied,
+                "missing": len(result.plan.creates),
+                "mismatched": len(result.plan.updates),
+                "extraneous": len(result.plan.deletes),
+                "in_sync": result.plan.unchanged
+            }
+        return stats
@@ -0,0 +1,540 @@
+"""
+Asyncio DNS Resolver for Propagation Checks
+
+A minimal, dependency-free DNS client that speaks the DNS wire protocol over
+UDP on the asyncio event loop. It exists for DNS propagation validation:
+
+- socket.gethostbyname_ex blocks the event loop for the whole lookup
+- the system's recursive resolver caches answers (including negative ones)
+  for their TTL, so right after a record is created it keeps reporting the
+  old state even though the authoritative servers already serve the new one
+
+AsyncDNSResolver therefore looks up the zone's authoritative nameservers
+once, through the system resolvers, and then queries them directly with
+recursion disabled. For tests, point it at a local UDP stub by passing
+explicit nameservers.
+
+Usage:
+    resolver = AsyncDNSResolver()
+    addresses = await resolver.resolve_a("acme-corp.nlyzer.com")
+    
+    stub = AsyncDNSResolver(nameservers=[("127.0.0.1", 5353)])
+"""
+
+import asyncio
+import logging
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+
+# Seconds to wait for a single UDP response before trying the next server
+DEFAULT_QUERY_TIMEOUT = 2.0
+
+# Seconds authoritative nameserver addresses are cached per zone
+DEFAULT_NAMESERVER_CACHE_TTL = 3600.0
+
+# Used when /etc/resolv.conf lists no nameservers
+FALLBACK_NAMESERVERS = ("8.8.8.8", "1.1.1.1")
+
+RESOLV_CONF_PATH = "/etc/resolv.conf"
+
+# Record types and classes (RFC 1035)
+TYPE_A = 1
+TYPE_NS = 2
+TYPE_CNAME = 5
+CLASS_IN = 1
+
+# Response codes
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+_FLAG_QR = 0x8000
+_FLAG_AA = 0x0400
+_FLAG_TC = 0x0200
+_FLAG_RD = 0x0100
+
+_HEADER = struct.Struct("!HHHHHH")
+_RR_FIXED = struct.Struct("!HHIH")
+
+Nameserver = Tuple[str, int]
+
+
+class DNSQueryError(Exception):
+    """Raised when no nameserver returned a usable response."""
+
+
+@dataclass
+class ResourceRecord:
+    """
+    A parsed resource record.
+    
+    Attributes:
+        name: Owner name, without the trailing dot
+        rtype: Record type code
+        ttl: Time to live in seconds
+        data: Address for A records, target name for NS/CNAME records,
+              raw bytes for everything else
+    """
+    
+    name: str
+    rtype: int
+    ttl: int
+    data: Union[str, bytes]
+
+
+@dataclass
+class DNSResponse:
+    """
+    A parsed DNS response message.
+    
+    Attributes:
+        rcode: Response code (0 = NOERROR, 3 = NXDOMAIN)
+        authoritative: Whether the AA flag was set
+        truncated: Whether the TC flag was set
+        answers: Answer section
+        authority: Authority section
+        additional: Additional section
+    """
+    
+    rcode: int
+    authoritative: bool
+    truncated: bool
+    answers: List[ResourceRecord] = field(default_factory=list)
+    authority: List[ResourceRecord] = field(default_factory=list)
+    additional: List[ResourceRecord] = field(default_factory=list)
+
+
+# ============================================================================
+# Wire Format
+# ============================================================================
+
+def build_query(
+    query_id: int,
+    name: str,
+    rtype: int = TYPE_A,
+    recursion_desired: bool = False
+) -> bytes:
+    """
+    Encode a single-question DNS query.
+    
+    Args:
+        query_id: 16-bit message ID
+        name: Domain name to query
+        rtype: Record type code
+        recursion_desired: Set the RD flag (needed for recursive resolvers)
+    
+    Returns:
+        The encoded query message
+    """
+    flags = _FLAG_RD if recursion_desired else 0
+    header = _HEADER.pack(query_id, flags, 1, 0, 0, 0)
+    return header + _encode_name(name) + struct.pack("!HH", rtype, CLASS_IN)
+
+
+def parse_response(message: bytes) -> DNSResponse:
+    """
+    Decode a DNS response message.
+    
+    Args:
+        message: Raw response bytes
+    
+    Returns:
+        The parsed DNSResponse
+    
+    Raises:
+        DNSQueryError: If the message is malformed
+    """
+    try:
+        _, flags, qdcount, ancount, nscount, arcount = _HEADER.unpack_from(message)
+        offset = _HEADER.size
+        for _ in range(qdcount):
+            _, offset = _decode_name(message, offset)
+            offset += 4
+        
+        sections = []
+        for count in (ancount, nscount, arcount):
+            records = []
+            for _ in range(count):
+                record, offset = _decode_record(message, offset)
+                records.append(record)
+            sections.append(records)
+    except (struct.error, IndexError, UnicodeDecodeError) as error:
+        raise DNSQueryError(f"Malformed DNS response: {str(error)}")
+    
+    if not flags & _FLAG_QR:
+        raise DNSQueryError("Malformed DNS response: QR flag not set")
+    
+    return DNSResponse(
+        rcode=flags & 0x000F,
+        authoritative=bool(flags & _FLAG_AA),
+        truncated=bool(flags & _FLAG_TC),
+        answers=sections[0],
+        authority=sections[1],
+        additional=sections[2]
+    )
+
+
+def _encode_name(name: str) -> bytes:
+    """Encode a domain name as a sequence of length-prefixed labels."""
+    encoded = b""
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("idna")
+        if not 0 < len(raw) <= 63:
+            raise DNSQueryError(f"Invalid DNS label in {name!r}")
+        encoded += bytes([len(raw)]) + raw
+    return encoded + b"\x00"
+
+
+def _decode_name(message: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Decode a possibly compressed domain name.
+    
+    Returns:
+        The name and the offset just past it in the original position
+    """
+    labels = []
+    end_offset = None
+    jumps = 0
+    while True:
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            # Compression pointer (RFC 1035 section 4.1.4)
+            jumps += 1
+            if jumps > 32:
+                raise DNSQueryError("Malformed DNS response: compression loop")
+            if end_offset is None:
+                end_offset = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(message[offset:offset + length].decode("ascii"))
+        offset += length
+    return ".".join(labels), end_offset if end_offset is not None else offset
+
+
+def _decode_record(message: bytes, offset: int) -> Tuple[ResourceRecord, int]:
+    """Decode one resource record starting at offset."""
+    name, offset = _decode_name(message, offset)
+    rtype, _, ttl, rdlength = _RR_FIXED.unpack_from(message, offset)
+    offset += _RR_FIXED.size
+    rdata_end = offset + rdlength
+    if rdata_end > len(message):
+        raise DNSQueryError("Malformed DNS response: truncated record data")
+    
+    data: Union[str, bytes]
+    if rtype == TYPE_A and rdlength == 4:
+        data = ".".join(str(octet) for octet in message[offset:rdata_end])
+    elif rtype in (TYPE_NS, TYPE_CNAME):
+        data, _ = _decode_name(message, offset)
+    else:
+        data = message[offset:rdata_end]
+    return ResourceRecord(name, rtype, ttl, data), rdata_end
+
+
+def read_system_nameservers(path: str = RESOLV_CONF_PATH) -> List[Nameserver]:
+    """
+    Read the recursive resolvers configured in resolv.conf.
+    
+    Args:
+        path: Path of the resolv.conf file
+    
+    Returns:
+        Nameserver addresses, or FALLBACK_NAMESERVERS if none are configured
+    """
+    nameservers = []
+    try:
+        with open(path) as resolv_conf:
+            for line in resolv_conf:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    nameservers.append((fields[1], DNS_PORT))
+    except OSError:
+        pass
+    return nameservers or [(address, DNS_PORT) for address in FALLBACK_NAMESERVERS]
+
+
+# ============================================================================
+# Transport
+# ============================================================================
+
+class _DatagramQuery(asyncio.DatagramProtocol):
+    """Datagram protocol resolving a future with the matching response."""
+    
+    def __init__(self, query_id: int, response: asyncio.Future):
+        self._query_id = query_id
+        self._response = response
+    
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        # Ignore stray datagrams that do not answer our query
+        if len(data) < 2 or struct.unpack_from("!H", data)[0] != self._query_id:
+            return
+        if not self._response.done():
+            self._response.set_result(data)
+    
+    def error_received(self, exc: Exception) -> None:
+        if not self._response.done():
+            self._response.set_exception(exc)
+    
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if not self._response.done():
+            self._response.set_exception(
+                exc or ConnectionError("DNS socket closed")
+            )
+
+
+class AsyncDNSResolver:
+    """
+    Non-blocking resolver that queries authoritative nameservers directly.
+    
+    With explicit ``nameservers``, every query goes to those servers. This
+    is how a local UDP stub is used in tests. Without them, the
+    authoritative servers of each name's zone are discovered through the
+    system's recursive resolvers and cached for ``nameserver_cache_ttl``
+    seconds.
+    """
+    
+    def __init__(
+        self,
+        nameservers: Optional[Sequence[Union[str, Nameserver]]] = None,
+        bootstrap_nameservers: Optional[Sequence[Union[str, Nameserver]]] = None,
+        timeout: float = DEFAULT_QUERY_TIMEOUT,
+        nameserver_cache_ttl: float = DEFAULT_NAMESERVER_CACHE_TTL
+    ):
+        """
+        Initialize the resolver.
+        
+        Args:
+            nameservers: Servers to query instead of discovering the
+                        authoritative ones, as "host" or (host, port)
+            bootstrap_nameservers: Recursive resolvers used to discover
+                                  authoritative servers. Defaults to the
+                                  nameservers in /etc/resolv.conf.
+            timeout: Seconds to wait for each server's response
+            nameserver_cache_ttl: Seconds to cache discovered nameservers
+        """
+        self._nameservers = self._normalize(nameservers) if nameservers else None
+        self._bootstrap = (
+            self._normalize(bootstrap_nameservers)
+            if bootstrap_nameservers else read_system_nameservers()
+        )
+        self._timeout = timeout
+        self._nameserver_cache_ttl = nameserver_cache_ttl
+        self._authoritative: Dict[str, Tuple[List[Nameserver], float]] = {}
+    
+    async def resolve_a(self, fqdn: str) -> List[str]:
+        """
+        Resolve the IPv4 addresses of a name from its authoritative servers.
+        
+        CNAME chains within the answer section are followed.
+        
+        Args:
+            fqdn: Fully qualified domain name
+        
+        Returns:
+            The IPv4 addresses served for the name (empty for NXDOMAIN or
+            when the name has no A records)
+        
+        Raises:
+            DNSQueryError: If no nameserver answered
+        """
+        nameservers = self._nameservers
+        if nameservers is None:
+            nameservers = await self.find_authoritative_nameservers(fqdn)
+        response = await self.query(fqdn, TYPE_A, nameservers)
+        if response.rcode == RCODE_NXDOMAIN:
+            return []
+        if response.rcode != RCODE_NOERROR:
+            raise DNSQueryError(
+                f"DNS query for {fqdn} failed with rcode {response.rcode}"
+            )
+        return _addresses_for(fqdn, response.answers)
+    
+    async def find_authoritative_nameservers(self, fqdn: str) -> List[Nameserver]:
+        """
+        Find the authoritative nameservers of the zone containing a name.
+        
+        The name and its parents are queried for NS records, most specific
+        first, through the bootstrap resolvers.
+        
+        Args:
+            fqdn: Fully qualified domain name
+        
+        Returns:
+            Addresses of the zone's authoritative nameservers
+        
+        Raises:
+            DNSQueryError: If no nameservers could be found
+        """
+        labels = fqdn.rstrip(".").lower().split(".")
+        candidates = [".".join(labels[i:]) for i in range(len(labels) - 1)]
+        
+        now = time.monotonic()
+        for zone in candidates:
+            cached = self._authoritative.get(zone)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+        
+        for zone in candidates:
+            response = await self.query(
+                zone, TYPE_NS, self._bootstrap, recursion_desired=True
+            )
+            hosts = [
+                record.data for record in response.answers
+                if record.rtype == TYPE_NS and record.name.lower() == zone
+            ]
+            if not hosts:
+                continue
+            
+            nameservers = await self._resolve_nameserver_hosts(hosts, response)
+            if nameservers:
+                self._authoritative[zone] = (
+                    nameservers, time.monotonic() + self._nameserver_cache_ttl
+                )
+                logger.debug(f"Authoritative nameservers for {zone}: {hosts}")
+                return nameservers
+        
+        raise DNSQueryError(f"No authoritative nameservers found for {fqdn}")
+    
+    async def query(
+        self,
+        name: str,
+        rtype: int,
+        nameservers: Sequence[Nameserver],
+        recursion_desired: bool = False
+    ) -> DNSResponse:
+        """
+        Send a query to each nameserver in turn until one responds.
+        
+        Args:
+            name: Domain name to query
+            rtype: Record type code
+            nameservers: Servers to try, in order
+            recursion_desired: Set the RD flag
+        
+        Returns:
+            The first response received
+        
+        Raises:
+            DNSQueryError: If every server timed out or failed
+        """
+        errors = []
+        for nameserver in nameservers:
+            query_id = random.getrandbits(16)
+            message = build_query(query_id, name, rtype, recursion_desired)
+            try:
+                raw = await self._exchange(message, query_id, nameserver)
+                return parse_response(raw)
+            except (asyncio.TimeoutError, OSError, DNSQueryError) as error:
+                host, port = nameserver
+                errors.append(f"{host}:{port}: {str(error) or 'timeout'}")
+        raise DNSQueryError(f"DNS query for {name} failed: {'; '.join(errors)}")
+    
+    # ========================================================================
+    # Private Helper Methods
+    # ========================================================================
+    
+    async def _exchange(
+        self,
+        message: bytes,
+        query_id: int,
+        nameserver: Nameserver
+    ) -> bytes:
+        """Send one UDP query and wait for the matching response."""
+        loop = asyncio.get_running_loop()
+        response = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramQuery(query_id, response), remote_addr=nameserver
+        )
+        try:
+            transport.sendto(message)
+            return await asyncio.wait_for(response, self._timeout)
+        finally:
+            transport.close()
+    
+    async def _resolve_nameserver_hosts(
+        self,
+        hosts: List[str],
+        response: DNSResponse
+    ) -> List[Nameserver]:
+        """Map nameserver host names to addresses, preferring glue records."""
+        addresses = []
+        for host in hosts:
+            glue = _addresses_for(host, response.additional)
+            if not glue:
+                try:
+                    answer = await self.query(
+                        host, TYPE_A, self._bootstrap, recursion_desired=True
+                    )
+                    glue = _addresses_for(host, answer.answers)
+                except DNSQueryError as error:
+                    logger.warning(
+                        f"Could not resolve nameserver {host}: {str(error)}"
+                    )
+            addresses.extend((address, DNS_PORT) for address in glue)
+        return list(dict.fromkeys(addresses))
+    
+    @staticmethod
+    def _normalize(nameservers: Sequence[Union[str, Nameserver]]) -> List[Nameserver]:
+        """Convert "host" entries to (host, DNS_PORT) tuples."""
+        return [
+            (server, DNS_PORT) if isinstance(server, str) else tuple(server)
+            for server in nameservers
+        ]
+
+
+def _addresses_for(name: str, records: List[ResourceRecord]) -> List[str]:
+    """Collect A record addresses for a name, following CNAMEs in records."""
+    target = name.rstrip(".").lower()
+    seen = set()
+    while target not in seen:
+        seen.add(target)
+        addresses = [
+            record.data for record in records
+            if record.rtype == TYPE_A and record.name.lower() == target
+        ]
+        if addresses:
+            return addresses
+        aliases = [
+            record.data for record in records
+            if record.rtype == TYPE_CNAME and record.name.lower() == target
+        ]
+        if not aliases:
+            break
+        target = aliases[0].lower()
+    return []
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    jitter: bool = True
+) -> float:
+    """
+    Compute a capped exponential backoff delay.
+    
+    With jitter the delay is drawn uniformly from the upper half of the
+    capped value, so concurrent pollers spread out without ever retrying
+    much sooner than intended.
+    
+    Args:
+        attempt: Zero-based attempt number
+        base_delay: Delay before the first retry
+        max_delay: Upper bound for any delay
+        jitter: Whether to randomize the delay
+    
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    delay = min(max_delay, base_delay * (2 ** min(attempt, 32)))
+    if jitter:
+        delay = random.uniform(delay / 2, delay)
+    return delay
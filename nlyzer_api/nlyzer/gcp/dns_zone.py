@@ -0,0 +1,483 @@
+"""
+Zone Snapshots and Write Coalescing for DNS Management
+
+Namecheap only supports whole-zone updates: setting one host record means
+reading every host with domains_dns_getHosts and writing the full list back
+with domains_dns_setHosts. Done per call, onboarding N tenants costs 2N
+whole-zone round trips, and two concurrent read-modify-write cycles can
+silently overwrite each other's changes.
+
+The ZoneWriteCoalescer queues record mutations from concurrent callers and
+applies everything pending in a single read-modify-write per flush window.
+Flushes are serialized, so no update is lost to a concurrent write from the
+same process, and each caller's future resolves with the outcome of its
+own mutation.
+
+The ZoneSnapshot keeps the last known zone contents in memory, indexed by
+(HostName, RecordType), so lookups are O(1) regardless of zone size and
+idempotent re-runs can be answered without calling the provider. Snapshots
+expire after max_age seconds and are replaced with what we wrote after each
+successful write of our own.
+
+Usage:
+    snapshot = ZoneSnapshot(max_age=300)
+    if snapshot.lookup("acme-corp", "A") is None:
+        ...
+    writer = ZoneWriteCoalescer(read_zone, write_zone)
+    result = await writer.upsert("acme-corp", "A", "34.102.136.180", 300)
+    if result.changed and not is_successful(result.write_result):
+        ...
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait after the first queued mutation before flushing, so that
+# concurrent callers land in the same batch
+DEFAULT_FLUSH_WINDOW = 0.05
+
+# Maximum number of mutations applied in a single zone write
+DEFAULT_MAX_BATCH_SIZE = 500
+
+# Seconds a zone snapshot is trusted for lookups. Records edited outside the
+# platform (e.g. in the Namecheap dashboard) may go unnoticed for this long.
+DEFAULT_SNAPSHOT_MAX_AGE = 300.0
+
+RecordKey = Tuple[str, str]
+
+ACTION_CREATED = "created"
+ACTION_UPDATED = "updated"
+ACTION_UNCHANGED = "unchanged"
+ACTION_REMOVED = "removed"
+ACTION_NOT_FOUND = "not_found"
+
+
+@dataclass
+class RecordMutation:
+    """
+    A single queued change to a host record.
+    
+    Attributes:
+        operation: "upsert" or "remove"
+        host_name: Host name relative to the zone (e.g. "acme-corp")
+        record_type: DNS record type (e.g. "A")
+        address: Record value for upserts
+        ttl: Record TTL in seconds for upserts
+    """
+    
+    operation: str
+    host_name: str
+    record_type: str
+    address: Optional[str] = None
+    ttl: Optional[int] = None
+    
+    @property
+    def key(self) -> RecordKey:
+        return (self.host_name, self.record_type)
+
+
+@dataclass
+class MutationResult:
+    """
+    Outcome of one mutation within a flushed batch.
+    
+    Attributes:
+        action: One of created, updated, unchanged, removed, not_found
+        previous_address: Address of the record before an update or removal
+        write_result: Provider response of the batch write, or None if the
+                     mutation required no write
+    """
+    
+    action: str
+    previous_address: Optional[str] = None
+    write_result: Optional[Dict[str, Any]] = None
+    
+    @property
+    def changed(self) -> bool:
+        """Whether the mutation modified the zone."""
+        return self.action in (ACTION_CREATED, ACTION_UPDATED, ACTION_REMOVED)
+
+
+def index_records(
+    records: List[Dict[str, Any]]
+) -> Dict[RecordKey, List[Dict[str, Any]]]:
+    """
+    Group host records by (HostName, RecordType), preserving zone order.
+    
+    Args:
+        records: Host records as returned by the DNS provider
+    
+    Returns:
+        Ordered mapping of record key to the records with that key
+    """
+    index: Dict[RecordKey, List[Dict[str, Any]]] = {}
+    for record in records:
+        key = (record.get("HostName"), record.get("RecordType"))
+        index.setdefault(key, []).append(record)
+    return index
+
+
+def flatten_index(index: Dict[RecordKey, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Flatten an index built by index_records back into a host record list."""
+    return [record for records in index.values() for record in records]
+
+
+def apply_mutation(
+    index: Dict[RecordKey, List[Dict[str, Any]]],
+    mutation: RecordMutation
+) -> MutationResult:
+    """
+    Apply one mutation to an indexed zone in place.
+    
+    Upserts replace every record with the same host name and type, matching
+    the previous per-call behaviour of DNSManager. An upsert whose address
+    already matches the first existing record is a no-op.
+    
+    Args:
+        index: Zone index built by index_records
+        mutation: Mutation to apply
+    
+    Returns:
+        MutationResult describing what changed (write_result is not set)
+    """
+    existing = index.get(mutation.key)
+    previous_address = existing[0].get("Address") if existing else None
+    
+    if mutation.operation == "remove":
+        if not existing:
+            return MutationResult(ACTION_NOT_FOUND)
+        del index[mutation.key]
+        return MutationResult(ACTION_REMOVED, previous_address)
+    
+    if existing and previous_address == mutation.address:
+        return MutationResult(ACTION_UNCHANGED, previous_address)
+    
+    index.pop(mutation.key, None)
+    index[mutation.key] = [{
+        "HostName": mutation.host_name,
+        "RecordType": mutation.record_type,
+        "Address": mutation.address,
+        "TTL": str(mutation.ttl)
+    }]
+    return MutationResult(
+        ACTION_UPDATED if existing else ACTION_CREATED, previous_address
+    )
+
+
+class ZoneSnapshot:
+    """
+    Cached, indexed copy of a DNS zone's host records.
+    
+    The snapshot is only consulted while it is younger than ``max_age``;
+    after that, lookups report a miss so that callers go back to the
+    provider. Zone writes must never be based on a cached snapshot, since
+    they replace the whole zone and would drop records changed out of band.
+    The snapshot is therefore refreshed from every full zone read and
+    replaced with the written records after each successful write.
+    """
+    
+    def __init__(self, max_age: float = DEFAULT_SNAPSHOT_MAX_AGE):
+        """
+        Initialize an empty snapshot.
+        
+        Args:
+            max_age: Seconds the snapshot is trusted after being stored
+        """
+        self.max_age = max_age
+        self._index: Optional[Dict[RecordKey, List[Dict[str, Any]]]] = None
+        self._stored_at = 0.0
+        
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+    
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the snapshot holds zone contents younger than max_age."""
+        return (
+            self._index is not None
+            and time.monotonic() - self._stored_at < self.max_age
+        )
+    
+    def store(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Replace the snapshot with the zone's current host records.
+        
+        Args:
+            records: Complete host record list, as read from or written to
+                    the provider
+        """
+        self._index = index_records(records)
+        self._stored_at = time.monotonic()
+    
+    def invalidate(self) -> None:
+        """Discard the snapshot, e.g. after a failed or unconfirmed write."""
+        if self._index is not None:
+            self._invalidations += 1
+        self._index = None
+    
+    def lookup(
+        self,
+        host_name: str,
+        record_type: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the records for a host name and type in constant time.
+        
+        Args:
+            host_name: Host name relative to the zone
+            record_type: DNS record type
+        
+        Returns:
+            The matching records (an empty list if the host has none), or
+            None if the snapshot is missing or stale
+        """
+        if not self.is_fresh:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return list(self._index.get((host_name, record_type), ()))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get snapshot statistics.
+        
+        Returns:
+            Dictionary with freshness, age in seconds, number of indexed
+            records, lookup hits and misses, and invalidations
+        """
+        return {
+            "fresh": self.is_fresh,
+            "age_seconds": (
+                time.monotonic() - self._stored_at
+                if self._index is not None else None
+            ),
+            "records": (
+                sum(len(records) for records in self._index.values())
+                if self._index is not None else 0
+            ),
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations
+        }
+
+
+class ZoneWriteCoalescer:
+    """
+    Batches record mutations into one read-modify-write per flush window.
+    
+    The first mutation queued on an idle coalescer starts a flush task that
+    waits ``flush_window`` seconds, then reads the zone once, applies every
+    pending mutation in submission order, writes the zone once if anything
+    changed, and resolves each caller with its own MutationResult. Mutations
+    queued during a flush are picked up by the next one. Errors raised while
+    reading or writing the zone are propagated to every caller in the batch,
+    and if the flush task is cancelled, so is every caller still waiting on it.
+    
+    A group of mutations submitted with submit_many() is never split across
+    flushes, so it is applied with a single zone write.
+    """
+    
+    def __init__(
+        self,
+        read_zone: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        write_zone: Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+        flush_window: float = DEFAULT_FLUSH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ):
+        """
+        Initialize the coalescer.
+        
+        Args:
+            read_zone: Coroutine function returning the current host records
+            write_zone: Coroutine function replacing the zone's host records
+                       and returning the provider response
+            flush_window: Seconds to collect mutations before flushing
+            max_batch_size: Maximum mutations applied per zone write
+        """
+        self._read_zone = read_zone
+        self._write_zone = write_zone
+        self._flush_window = flush_window
+        self._max_batch_size = max_batch_size
+        
+        self._pending: List[Tuple[List[RecordMutation], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        self._flushes = 0
+        self._writes = 0
+        self._mutations = 0
+    
+    async def upsert(
+        self,
+        host_name: str,
+        record_type: str,
+        address: str,
+        ttl: int
+    ) -> MutationResult:
+        """
+        Queue creation or update of a host record and wait for the flush.
+        
+        Returns:
+            MutationResult for this record
+        """
+        return await self.submit(
+            RecordMutation("upsert", host_name, record_type, address, ttl)
+        )
+    
+    async def remove(self, host_name: str, record_type: str) -> MutationResult:
+        """
+        Queue removal of a host record and wait for the flush.
+        
+        Returns:
+            MutationResult for this record
+        """
+        return await self.submit(RecordMutation("remove", host_name, record_type))
+    
+    async def submit(self, mutation: RecordMutation) -> MutationResult:
+        """
+        Queue a mutation and wait for the batch containing it to be flushed.
+        
+        Args:
+            mutation: Mutation to apply
+        
+        Returns:
+            MutationResult for this mutation
+        """
+        results = await self.submit_many([mutation])
+        return results[0]
+    
+    async def submit_many(
+        self,
+        mutations: List[RecordMutation]
+    ) -> List[MutationResult]:
+        """
+        Queue a group of mutations to be applied in the same zone write.
+        
+        Args:
+            mutations: Mutations to apply, in order
+        
+        Returns:
+            MutationResult for each mutation, in the same order
+        """
+        if not mutations:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(mutations), future))
+        
+        task = self._flush_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            # Drop mutations left behind by a previous, no longer running loop
+            self._pending = [
+                (queued, waiter) for queued, waiter in self._pending
+                if waiter.get_loop() is loop
+            ]
+            self._flush_task = loop.create_task(self._flush_loop())
+            self._flush_task.add_done_callback(self._flush_loop_done)
+        
+        return await future
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get batching statistics.
+        
+        Returns:
+            Dictionary with mutations submitted, flushes run, zone writes
+            performed and mutations currently pending
+        """
+        return {
+            "mutations": self._mutations,
+            "flushes": self._flushes,
+            "writes": self._writes,
+            "pending": sum(len(mutations) for mutations, _ in self._pending)
+        }
+    
+    async def _flush_loop(self) -> None:
+        """Flush pending mutations until the queue is empty."""
+        while self._pending:
+            await asyncio.sleep(self._flush_window)
+            # Take whole groups up to the batch size, but at least one group
+            count = size = 0
+            for mutations, _ in self._pending:
+                if count and size + len(mutations) > self._max_batch_size:
+                    break
+                count += 1
+                size += len(mutations)
+            batch = self._pending[:count]
+            del self._pending[:count]
+            await self._flush(batch)
+    
+    def _flush_loop_done(self, task: asyncio.Task) -> None:
+        """
+        Cancel the callers still queued for a flush task that was cancelled.
+        
+        Runs as the task's done callback rather than in the coroutine, since
+        a task cancelled before its first step never runs its body.
+        """
+        if not task.cancelled():
+            # Mutations queued after a finished loop belong to the next task
+            return
+        remaining = []
+        for mutations, future in self._pending:
+            if future.get_loop() is task.get_loop():
+                future.cancel()
+            else:
+                remaining.append((mutations, future))
+        self._pending = remaining
+    
+    async def _flush(
+        self,
+        batch: List[Tuple[List[RecordMutation], asyncio.Future]]
+    ) -> None:
+        """Resolve every caller in a batch with the outcome of applying it."""
+        try:
+            grouped_results = await self._apply(batch)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, future), group in zip(batch, grouped_results):
+                if not future.done():
+                    future.set_result(group)
+        finally:
+            # A cancelled flush must not leave its callers waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+    
+    async def _apply(
+        self,
+        batch: List[Tuple[List[RecordMutation], asyncio.Future]]
+    ) -> List[List[MutationResult]]:
+        """Apply one batch of mutations with a single zone read and write."""
+        self._flushes += 1
+        self._mutations += sum(len(mutations) for mutations, _ in batch)
+        
+        index = index_records(await self._read_zone())
+        grouped_results = [
+            [apply_mutation(index, mutation) for mutation in mutations]
+            for mutations, _ in batch
+        ]
+        results = [result for group in grouped_results for result in group]
+        
+        write_result = None
+        if any(result.changed for result in results):
+            write_result = await self._write_zone(flatten_index(index))
+            self._writes += 1
+        
+        logger.debug(
+            f"Flushed {len(results)} DNS mutations with "
+            f"{1 if write_result is not None else 0} zone write(s)"
+        )
+        
+        for result in results:
+            if result.changed:
+                result.write_result = write_result
+        return grouped_results
@@ -6,7 +6,8 @@ integration module, providing clear error categories and detailed error
 information for debugging and monitoring.
 """
 
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Any, Dict, Optional
 
 
 class ProvisioningError(Exception):
@@ -22,8 +23,13 @@ class ProvisioningError(Exception):
         project_id: GCP project ID involved in the error (if applicable)
         operation: The specific operation that failed
         details: Additional error context and debugging information
+        retryable: Whether retrying may succeed. None defers to the
+                  underlying GCP error, if any (see
+                  nlyzer.gcp.resilience.is_transient).
     """
     
+    retryable: Optional[bool] = None
+    
     def __init__(
         self, 
         message: str,
@@ -60,6 +66,8 @@ class TenantAlreadyExistsError(ProvisioningError):
     and billing conflicts.
     """
     
+    retryable = False
+    
     def __init__(self, tenant_id: str, existing_project_id: Optional[str] = None):
         message = f"Tenant {tenant_id} already has provisioned infrastructure"
         if existing_project_id:
@@ -73,6 +81,71 @@ class TenantAlreadyExistsError(ProvisioningError):
         )
 
 
+class ProvisioningInProgressError(ProvisioningError):
+    """
+    Raised when another worker is provisioning or tearing down the tenant.
+    
+    Only one attempt may hold a tenant's provisioning run at a time. The
+    run is leased to its worker, so a crashed worker blocks the tenant only
+    until its lease expires; the operation can be retried after that.
+    """
+    
+    retryable = True
+    
+    def __init__(self, tenant_id: str, lease_expires_at: Optional[datetime] = None):
+        message = f"Provisioning of tenant {tenant_id} is already in progress"
+        if lease_expires_at is not None:
+            message += f" (lease expires at {lease_expires_at.isoformat()}Z)"
+        
+        super().__init__(
+            message=message,
+            tenant_id=tenant_id,
+            operation="tenant_provisioning",
+            details=(
+                {"lease_expires_at": lease_expires_at.isoformat()}
+                if lease_expires_at else {}
+            )
+        )
+        self.lease_expires_at = lease_expires_at
+
+
+class RunLeaseLostError(ProvisioningError):
+    """
+    Raised when an attempt writes to a provisioning run it no longer holds.
+    
+    This happens to a worker whose lease expired and whose run was taken
+    over by a newer attempt, or deleted. Its writes are rejected so that
+    they cannot overwrite the newer attempt's checkpoints; the worker
+    should stop.
+    """
+    
+    retryable = False
+    
+    def __init__(
+        self,
+        tenant_id: str,
+        attempt: int,
+        current_attempt: Optional[int] = None
+    ):
+        message = (
+            f"Provisioning attempt {attempt} of tenant {tenant_id} no longer "
+            "holds its run"
+        )
+        if current_attempt is None:
+            message += " (the run was deleted)"
+        elif current_attempt != attempt:
+            message += f" (taken over by attempt {current_attempt})"
+        
+        super().__init__(
+            message=message,
+            tenant_id=tenant_id,
+            operation="tenant_provisioning",
+            details={"attempt": attempt, "current_attempt": current_attempt}
+        )
+        self.attempt = attempt
+        self.current_attempt = current_attempt
+
+
 class ResourceCreationError(ProvisioningError):
     """
     Raised when GCP resource creation fails.
@@ -104,6 +177,7 @@ class ResourceCreationError(ProvisioningError):
             operation=f"create_{resource_type}",
             details=details
         )
+        self.gcp_error = gcp_error
 
 
 class AuthenticationError(ProvisioningError):
@@ -115,6 +189,8 @@ class AuthenticationError(ProvisioningError):
     or insufficient permissions.
     """
     
+    retryable = False
+    
     def __init__(self, message: str, service: Optional[str] = None):
         full_message = f"GCP authentication failed: {message}"
         if service:
@@ -141,7 +217,8 @@ class NetworkingError(ProvisioningError):
         message: str,
         tenant_id: Optional[str] = None,
         project_id: Optional[str] = None,
-        network_resource: Optional[str] = None
+        network_resource: Optional[str] = None,
+        gcp_error: Optional[Exception] = None
     ):
         super().__init__(
             message=f"Networking configuration failed: {message}",
@@ -150,6 +227,7 @@ class NetworkingError(ProvisioningError):
             operation="networking_setup",
             details={"network_resource": network_resource} if network_resource else {}
         )
+        self.gcp_error = gcp_error
 
 
 class DeploymentValidationError(ProvisioningError):
@@ -203,4 +281,31 @@ class CleanupError(ProvisioningError):
             project_id=project_id,
             operation="cleanup",
             details={"failed_resources": failed_resources or []}
-        )
\ No newline at end of file
+        )
+
+
+class CircuitOpenError(ProvisioningError):
+    """
+    Raised instead of calling a GCP service whose circuit breaker is open.
+    
+    This error occurs while a service (or one of its regions) keeps failing
+    with transient errors. Calls fail fast until the breaker lets a probe
+    call through, so an outage does not pile up retries; the operation can
+    be retried once the service recovers.
+    """
+    
+    retryable = True
+    
+    def __init__(
+        self,
+        service: str,
+        region: Optional[str] = None,
+        retry_after: float = 0.0
+    ):
+        target = f"{service} in {region}" if region else service
+        super().__init__(
+            message=f"Circuit open for {target}; retry in {retry_after:.0f}s",
+            operation="gcp_call",
+            details={"service": service, "region": region, "retry_after": retry_after}
+        )
+        self.retry_after = retry_after
@@ -0,0 +1,343 @@
+"""
+Client Metrics for GCP Integrations
+
+This module records how the GCP client layer behaves at runtime so we can see
+which APIs dominate provisioning time:
+
+- client cache hits and misses per service
+- client creation count and latency per service
+- client evictions from the process-wide registry
+- API call counts, error counts and latencies per service and method,
+  captured by wrapping the clients handed out by GCPClientManager
+
+Metrics can be exported as a plain dict snapshot or in the Prometheus text
+exposition format, e.g. from a /metrics endpoint.
+
+Usage:
+    metrics = client_manager.get_metrics()
+    snapshot = metrics.snapshot()
+    body = metrics.to_prometheus()  # serve with PROMETHEUS_CONTENT_TYPE
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+# Content type for serving to_prometheus() output over HTTP
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds in seconds, covering fast cached calls up to
+# long-running provisioning operations
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+METRIC_PREFIX = "nlyzer_gcp"
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram compatible with Prometheus histograms.
+    
+    Not thread-safe on its own; ClientMetrics serializes access.
+    """
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, seconds)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram as count, total, mean and max seconds."""
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.max
+        }
+    
+    def prometheus_lines(self, name: str, labels: str) -> List[str]:
+        """Render the histogram as Prometheus bucket, sum and count samples."""
+        lines = []
+        cumulative = 0
+        separator = "," if labels else ""
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            lines.append(
+                f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class ClientMetrics:
+    """
+    Thread-safe collector of GCP client cache and API call metrics.
+    
+    One instance is shared process-wide through the ClientRegistry, so the
+    numbers cover every GCPClientManager in the process.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache_hits: Dict[str, int] = defaultdict(int)
+        self._cache_misses: Dict[str, int] = defaultdict(int)
+        self._evictions: Dict[str, int] = defaultdict(int)
+        self._creation_latency: Dict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self._call_errors: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._call_latency: Dict[Tuple[str, str], LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+    
+    # ========================================================================
+    # Recording
+    # ========================================================================
+    
+    def record_cache_hit(self, service: str) -> None:
+        """Record a client lookup served from cache."""
+        with self._lock:
+            self._cache_hits[service] += 1
+    
+    def record_cache_miss(self, service: str) -> None:
+        """Record a client lookup that had to resolve or build the client."""
+        with self._lock:
+            self._cache_misses[service] += 1
+    
+    def record_creation(self, service: str, seconds: float) -> None:
+        """Record construction of a new client instance."""
+        with self._lock:
+            self._creation_latency[service].observe(seconds)
+    
+    def record_eviction(self, service: str) -> None:
+        """Record a client dropped from the registry."""
+        with self._lock:
+            self._evictions[service] += 1
+    
+    def record_call(
+        self,
+        service: str,
+        method: str,
+        seconds: float,
+        error: bool = False
+    ) -> None:
+        """
+        Record one API call made through an instrumented client.
+        
+        Args:
+            service: Client service name (e.g. 'secrets')
+            method: Client method name (e.g. 'access_secret_version')
+            seconds: Call duration
+            error: Whether the call raised
+        """
+        key = (service, method)
+        with self._lock:
+            self._call_latency[key].observe(seconds)
+            if error:
+                self._call_errors[key] += 1
+    
+    def reset(self) -> None:
+        """Discard all recorded metrics."""
+        with self._lock:
+            self._cache_hits.clear()
+            self._cache_misses.clear()
+            self._evictions.clear()
+            self._creation_latency.clear()
+            self._call_errors.clear()
+            self._call_latency.clear()
+    
+    # ========================================================================
+    # Export
+    # ========================================================================
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a point-in-time copy of all metrics as plain data.
+        
+        Returns:
+            Dictionary with per-service cache, creation and eviction figures
+            under "clients" and per-method call figures under "calls",
+            keyed as "service.method"
+        """
+        with self._lock:
+            services = (
+                set(self._cache_hits) | set(self._cache_misses)
+                | set(self._evictions) | set(self._creation_latency)
+            )
+            clients = {
+                service: {
+                    "cache_hits": self._cache_hits.get(service, 0),
+                    "cache_misses": self._cache_misses.get(service, 0),
+                    "evictions": self._evictions.get(service, 0),
+                    "creation": (
+                        self._creation_latency[service].to_dict()
+                        if service in self._creation_latency
+                        else LatencyHistogram().to_dict()
+                    )
+                }
+                for service in sorted(services)
+            }
+            calls = {
+                f"{service}.{method}": dict(
+                    histogram.to_dict(),
+                    errors=self._call_errors.get((service, method), 0)
+                )
+                for (service, method), histogram in sorted(self._call_latency.items())
+            }
+        return {"clients": clients, "calls": calls}
+    
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            Exposition text, to be served with PROMETHEUS_CONTENT_TYPE
+        """
+        lines: List[str] = []
+        
+        def counter(name: str, help_text: str, samples: Dict[str, int]) -> None:
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in samples.items():
+                lines.append(f"{metric}{{{labels}}} {value}")
+        
+        def histogram(
+            name: str, help_text: str, samples: Dict[str, LatencyHistogram]
+        ) -> None:
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, value in samples.items():
+                lines.extend(value.prometheus_lines(metric, labels))
+        
+        def service_label(service: str) -> str:
+            return f'service="{service}"'
+        
+        def call_labels(key: Tuple[str, str]) -> str:
+            return f'service="{key[0]}",method="{key[1]}"'
+        
+        with self._lock:
+            counter(
+                "client_cache_hits_total",
+                "Client lookups served from cache.",
+                {service_label(k): v for k, v in sorted(self._cache_hits.items())}
+            )
+            counter(
+                "client_cache_misses_total",
+                "Client lookups that resolved or built a client.",
+                {service_label(k): v for k, v in sorted(self._cache_misses.items())}
+            )
+            counter(
+                "client_evictions_total",
+                "Clients evicted from the process-wide registry.",
+                {service_label(k): v for k, v in sorted(self._evictions.items())}
+            )
+            histogram(
+                "client_creation_seconds",
+                "Time to construct a client instance.",
+                {
+                    service_label(k): v
+                    for k, v in sorted(self._creation_latency.items())
+                }
+            )
+            counter(
+                "api_call_errors_total",
+                "API calls that raised an exception.",
+                {call_labels(k): v for k, v in sorted(self._call_errors.items())}
+            )
+            histogram(
+                "api_call_seconds",
+                "API call latency by service and method.",
+                {call_labels(k): v for k, v in sorted(self._call_latency.items())}
+            )
+        
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedClient:
+    """
+    Transparent proxy that records call counts and latencies of a GCP client.
+    
+    Attribute access is forwarded to the wrapped client. Callable attributes
+    are wrapped so each call is timed and reported to ClientMetrics under
+    the client's service name and the method name; coroutine methods of
+    asyncio clients are timed until the awaited call completes.
+    """
+    
+    def __init__(self, client: Any, service: str, metrics: ClientMetrics):
+        """
+        Wrap a client.
+        
+        Args:
+            client: The GCP client instance to wrap
+            service: Service name to report calls under
+            metrics: Collector receiving the call metrics
+        """
+        self._client = client
+        self._service = service
+        self._metrics = metrics
+    
+    @property
+    def wrapped_client(self) -> Any:
+        """The underlying, uninstrumented client."""
+        return self._client
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+        
+        service, metrics = self._service, self._metrics
+        
+        if inspect.iscoroutinefunction(attribute):
+            @functools.wraps(attribute)
+            async def _timed_async(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = await attribute(*args, **kwargs)
+                except Exception:
+                    metrics.record_call(
+                        service, name, time.perf_counter() - started, error=True
+                    )
+                    raise
+                metrics.record_call(service, name, time.perf_counter() - started)
+                return result
+            
+            return _timed_async
+        
+        @functools.wraps(attribute)
+        def _timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = attribute(*args, **kwargs)
+            except Exception:
+                metrics.record_call(
+                    service, name, time.perf_counter() - started, error=True
+                )
+                raise
+            metrics.record_call(service, name, time.perf_counter() - started)
+            return result
+        
+        return _timed
+    
+    def __repr__(self) -> str:
+        return f"InstrumentedClient({self._service}, {self._client!r})"
@@ -0,0 +1,506 @@
+"""
+Rate-Limited Namecheap API Transport
+
+This module talks to the Namecheap XML API directly over a pooled,
+keep-alive httpx connection instead of through the synchronous namecheapapi
+client, which opened a new connection per call and had to run in a worker
+thread.
+
+Namecheap enforces per-account API limits (20 calls per minute, 700 per
+hour, 8000 per day). All calls go through a token bucket shared by every
+coroutine in the process, so bursts are smoothed out before they reach
+Namecheap. If Namecheap still throttles a call (HTTP 429/503 or a
+"too many requests" API error), it is retried with capped exponential
+backoff, honouring Retry-After when present.
+
+Usage:
+    transport = NamecheapTransport(api_user, api_key, username, client_ip)
+    hosts = await transport.get_hosts("nlyzer.com")
+    result = await transport.set_hosts("nlyzer.com", records)
+    await transport.aclose()
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+from nlyzer.gcp.dns_resolver import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+NAMECHEAP_API_URL = "https://api.namecheap.com/xml.response"
+NAMECHEAP_SANDBOX_API_URL = "https://api.sandbox.namecheap.com/xml.response"
+
+# Namecheap allows 20 API calls per minute per account
+DEFAULT_RATE_PER_SECOND = 20 / 60
+DEFAULT_BURST = 20
+
+# Connection pool size for the shared HTTP client. At Namecheap's request
+# rate a handful of keep-alive connections carries all traffic.
+DEFAULT_MAX_CONNECTIONS = 5
+
+# Seconds before an API request is abandoned
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+# Retries after a throttled response, and the backoff applied between them
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_DELAY = 2.0
+DEFAULT_MAX_RETRY_DELAY = 60.0
+
+# HTTP statuses and Namecheap error numbers that indicate throttling
+THROTTLE_STATUS_CODES = (429, 503)
+THROTTLE_ERROR_NUMBERS = ("500000",)
+
+
+class NamecheapAPIError(Exception):
+    """
+    Raised when the Namecheap API returns an error response.
+    
+    Attributes:
+        number: Namecheap error number, if reported
+        throttled: Whether the error indicates rate limiting
+    """
+    
+    def __init__(
+        self,
+        message: str,
+        number: Optional[str] = None,
+        throttled: bool = False
+    ):
+        super().__init__(message)
+        self.number = number
+        self.throttled = throttled
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared across coroutines and event loops.
+    
+    Tokens are reserved under a lock, and a caller that finds the bucket
+    empty sleeps (without holding the lock) until its reserved token is
+    due. Waiters are therefore served in arrival order, and the bucket
+    never admits more than ``burst`` calls at once or ``rate`` calls per
+    second on average.
+    """
+    
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_PER_SECOND,
+        burst: int = DEFAULT_BURST
+    ):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        
+        self._acquired = 0
+        self._total_wait = 0.0
+    
+    def reserve(self) -> float:
+        """
+        Take a token, going into debt if the bucket is empty.
+        
+        Returns:
+            Seconds the caller must wait before using the token
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            self._acquired += 1
+            self._total_wait += wait
+            return wait
+    
+    async def acquire(self) -> float:
+        """
+        Wait until a token is available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def penalize(self, seconds: float) -> None:
+        """
+        Withhold tokens for the given time, e.g. after being throttled.
+        
+        Args:
+            seconds: Seconds during which no new calls should be admitted
+        """
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+    
+    def set_rate(self, rate: float) -> None:
+        """
+        Change the refill rate.
+        
+        Tokens accrued so far are credited at the old rate first.
+        
+        Args:
+            rate: New number of tokens added per second
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self.rate = rate
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get limiter statistics.
+        
+        Returns:
+            Dictionary with tokens currently available, calls admitted and
+            total seconds callers spent waiting
+        """
+        with self._lock:
+            return {
+                "tokens": self._tokens,
+                "acquired": self._acquired,
+                "total_wait_seconds": self._total_wait
+            }
+
+
+class NamecheapTransport:
+    """
+    Async Namecheap XML API client with pooling, rate limiting and retries.
+    
+    The underlying httpx.AsyncClient is bound to the event loop it was
+    created on, so a new one is created if the transport is used from a
+    different loop.
+    """
+    
+    def __init__(
+        self,
+        api_user: str,
+        api_key: str,
+        username: str,
+        client_ip: str,
+        sandbox: bool = False,
+        rate_limiter: Optional[TokenBucket] = None,
+        api_url: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY
+    ):
+        """
+        Initialize the transport.
+        
+        Args:
+            api_user: Namecheap API user
+            api_key: Namecheap API key
+            username: Namecheap account user name
+            client_ip: Whitelisted client IP sent with each request
+            sandbox: Use the Namecheap sandbox endpoint
+            rate_limiter: Token bucket to draw from. Defaults to the
+                         process-wide Namecheap limiter.
+            api_url: Override the endpoint, e.g. for a local fake server
+            max_connections: Maximum pooled HTTP connections
+            timeout: Seconds before a request is abandoned
+            max_retries: Retries after throttled responses
+            retry_delay: Initial backoff after a throttled response
+            max_retry_delay: Upper bound for the backoff
+        """
+        self._credentials = {
+            "ApiUser": api_user,
+            "ApiKey": api_key,
+            "UserName": username,
+            "ClientIp": client_ip
+        }
+        self._api_url = api_url or (
+            NAMECHEAP_SANDBOX_API_URL if sandbox else NAMECHEAP_API_URL
+        )
+        self._rate_limiter = rate_limiter or get_namecheap_rate_limiter()
+        self._max_connections = max_connections
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        
+        self._client = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self._requests = 0
+        self._throttled = 0
+    
+    # ========================================================================
+    # DNS Commands
+    # ========================================================================
+    
+    async def get_hosts(self, domain: str) -> Dict[str, Any]:
+        """
+        Get all host records of a domain (namecheap.domains.dns.getHosts).
+        
+        Args:
+            domain: Domain name, e.g. "nlyzer.com"
+        
+        Returns:
+            {"DomainDNSGetHostsResult": {"host": [...]}} with each host as a
+            dict with HostName, RecordType, Address, TTL and MXPref
+        
+        Raises:
+            NamecheapAPIError: If the API returns an error
+        """
+        sld, tld = self._split_domain(domain)
+        response = await self.call(
+            "namecheap.domains.dns.getHosts", SLD=sld, TLD=tld
+        )
+        
+        result = self._find(response, "DomainDNSGetHostsResult")
+        hosts = [
+            {
+                "HostName": host.get("Name"),
+                "RecordType": host.get("Type"),
+                "Address": host.get("Address"),
+                "TTL": host.get("TTL"),
+                "MXPref": host.get("MXPref")
+            }
+            for host in (result.iter() if result is not None else ())
+            if self._local_name(host.tag) == "host"
+        ]
+        return {"DomainDNSGetHostsResult": {"host": hosts}}
+    
+    async def set_hosts(
+        self,
+        domain: str,
+        records: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Replace all host records of a domain (namecheap.domains.dns.setHosts).
+        
+        Args:
+            domain: Domain name, e.g. "nlyzer.com"
+            records: Complete host record list
+        
+        Returns:
+            {"DomainDNSSetHostsResult": {...}} with the result attributes,
+            including IsSuccess ("true" or "false")
+        
+        Raises:
+            NamecheapAPIError: If the API returns an error
+        """
+        sld, tld = self._split_domain(domain)
+        params = {"SLD": sld, "TLD": tld}
+        for index, record in enumerate(records, start=1):
+            params[f"HostName{index}"] = record["HostName"]
+            params[f"RecordType{index}"] = record["RecordType"]
+            params[f"Address{index}"] = record["Address"]
+            if record.get("TTL"):
+                params[f"TTL{index}"] = record["TTL"]
+            if record.get("MXPref"):
+                params[f"MXPref{index}"] = record["MXPref"]
+        
+        response = await self.call("namecheap.domains.dns.setHosts", **params)
+        result = self._find(response, "DomainDNSSetHostsResult")
+        attributes = dict(result.attrib) if result is not None else {}
+        return {"DomainDNSSetHostsResult": attributes}
+    
+    # ========================================================================
+    # Transport
+    # ========================================================================
+    
+    async def call(self, command: str, **params: Any) -> ET.Element:
+        """
+        Call a Namecheap API command, retrying throttled requests.
+        
+        Args:
+            command: API command, e.g. "namecheap.domains.dns.getHosts"
+            **params: Command parameters
+        
+        Returns:
+            The parsed ApiResponse element
+        
+        Raises:
+            NamecheapAPIError: If the API returns an error, or is still
+                throttling after max_retries retries
+        """
+        data = dict(self._credentials, Command=command, **params)
+        
+        for attempt in range(self._max_retries + 1):
+            await self._rate_limiter.acquire()
+            retry_after = None
+            try:
+                return await self._request(data)
+            except _ThrottledResponse as throttled:
+                retry_after = throttled.retry_after
+                error = NamecheapAPIError(
+                    f"Namecheap API throttled {command}", throttled=True
+                )
+            except NamecheapAPIError as api_error:
+                if not api_error.throttled:
+                    raise
+                error = api_error
+            
+            self._throttled += 1
+            if attempt == self._max_retries:
+                break
+            delay = retry_after or backoff_delay(
+                attempt, self._retry_delay, self._max_retry_delay
+            )
+            # Drain the shared bucket so that every caller backs off, this
+            # one included: its next acquire() waits out the delay
+            self._rate_limiter.penalize(delay)
+            logger.warning(
+                f"Namecheap API throttled {command}; retrying in {delay:.1f}s "
+                f"(retry {attempt + 1}/{self._max_retries})"
+            )
+        
+        raise error
+    
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get transport statistics.
+        
+        Returns:
+            Dictionary with HTTP requests sent, throttled responses and the
+            rate limiter's statistics
+        """
+        return {
+            "requests": self._requests,
+            "throttled": self._throttled,
+            "rate_limiter": self._rate_limiter.get_stats()
+        }
+    
+    # ========================================================================
+    # Private Helper Methods
+    # ========================================================================
+    
+    def _get_client(self):
+        """Get the pooled HTTP client for the running event loop."""
+        import httpx
+        
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections
+                )
+            )
+            self._client_loop = loop
+        return self._client
+    
+    async def _request(self, data: Dict[str, Any]) -> ET.Element:
+        """Send one request and parse the XML response."""
+        client = self._get_client()
+        self._requests += 1
+        # POST keeps large setHosts requests out of the URL
+        response = await client.post(self._api_url, data=data)
+        
+        if response.status_code in THROTTLE_STATUS_CODES:
+            raise _ThrottledResponse(self._parse_retry_after(response))
+        response.raise_for_status()
+        
+        try:
+            root = ET.fromstring(response.content)
+        except ET.ParseError as error:
+            raise NamecheapAPIError(
+                f"Invalid XML from Namecheap API: {str(error)}"
+            )
+        
+        if root.get("Status", "").upper() == "ERROR":
+            number, message = self._first_error(root)
+            throttled = (
+                number in THROTTLE_ERROR_NUMBERS
+                or "too many requests" in message.lower()
+            )
+            raise NamecheapAPIError(
+                f"Namecheap API error {number}: {message}",
+                number=number,
+                throttled=throttled
+            )
+        return root
+    
+    @staticmethod
+    def _parse_retry_after(response: Any) -> Optional[float]:
+        """Read a Retry-After header given in seconds."""
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
+    
+    @classmethod
+    def _first_error(cls, root: ET.Element) -> Tuple[Optional[str], str]:
+        """Extract the first error number and message from a response."""
+        for element in root.iter():
+            if cls._local_name(element.tag) == "Error":
+                return element.get("Number"), (element.text or "").strip()
+        return None, "unknown error"
+    
+    @classmethod
+    def _find(cls, root: ET.Element, name: str) -> Optional[ET.Element]:
+        """Find the first element with the given name, ignoring namespaces."""
+        for element in root.iter():
+            if cls._local_name(element.tag) == name:
+                return element
+        return None
+    
+    @staticmethod
+    def _local_name(tag: str) -> str:
+        """Strip the XML namespace from a tag."""
+        return tag.rsplit("}", 1)[-1]
+    
+    @staticmethod
+    def _split_domain(domain: str) -> Tuple[str, str]:
+        """Split a domain into Namecheap's SLD and TLD parameters."""
+        sld, _, tld = domain.partition(".")
+        return sld, tld
+
+
+class _ThrottledResponse(Exception):
+    """Internal signal for an HTTP-level throttling response."""
+    
+    def __init__(self, retry_after: Optional[float]):
+        super().__init__("throttled")
+        self.retry_after = retry_after
+
+
+_rate_limiter: Optional[TokenBucket] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_namecheap_rate_limiter() -> TokenBucket:
+    """
+    Get the process-wide Namecheap rate limiter, creating it on first use.
+    
+    Namecheap's limits apply per account, so every transport in the process
+    shares this bucket by default.
+    
+    Returns:
+        The shared TokenBucket instance
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = TokenBucket()
+    return _rate_limiter
@@ -0,0 +1,381 @@
+"""
+Shared Long-Running Operation Poller
+
+Creating a project, an instance or a Cloud Run service returns a
+long-running operation. Waiting on each one with its own result() call
+costs a poll loop per operation, and for Compute Engine, whose client is
+synchronous, a worker thread blocked for the whole operation. With dozens
+of tenants in flight that is hundreds of threads and poll loops.
+
+OperationPoller multiplexes every outstanding operation of an event loop
+onto a single polling task:
+
+- Compute Engine operations are batched per project: one
+  globalOperations.aggregatedList call, filtered to the pending operation
+  names, reports on all zonal and global operations of the project.
+- Other long-running operations (Resource Manager, Cloud Run) are
+  refreshed with a single GetOperation call each, on the event loop.
+
+Each operation is first checked after an initial delay chosen by the
+caller, usually close to how long the operation typically takes, and
+then at intervals growing up to a maximum. Callers await a per-operation
+future, so no thread is held while waiting.
+
+Usage:
+    poller = get_operation_poller()
+    result = await poller.wait(operation, timeout=300, initial_delay=20)
+    await poller.wait_compute(
+        operation, project_id, operations_client, timeout=300
+    )
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first check of an operation, unless the caller knows
+# better
+DEFAULT_INITIAL_DELAY = 2.0
+
+# Poll interval growth after each check that finds an operation running,
+# and its upper bound
+POLL_INTERVAL_MULTIPLIER = 1.5
+DEFAULT_MAX_INTERVAL = 15.0
+
+# Poll calls in flight at once
+DEFAULT_MAX_CONCURRENT_POLLS = 16
+
+# Operations per aggregatedList call; keeps the filter expression short
+MAX_OPERATIONS_PER_LIST = 50
+
+_COMPUTE = "compute"
+_LONG_RUNNING = "long_running"
+
+
+@dataclass(eq=False)
+class _PendingOperation:
+    """An operation being waited on, and when to check it next."""
+    
+    kind: str
+    name: str
+    operation: Any
+    future: asyncio.Future
+    due: float
+    interval: float
+    project_id: Optional[str] = None
+    client: Any = None
+    polls: int = field(default=0)
+
+
+class OperationPoller:
+    """
+    Polls all outstanding long-running operations of one event loop.
+    
+    The polling task starts with the first operation and exits once none
+    are pending.
+    """
+    
+    def __init__(
+        self,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_concurrent_polls: int = DEFAULT_MAX_CONCURRENT_POLLS
+    ):
+        """
+        Initialize the poller.
+        
+        Args:
+            max_interval: Longest wait between two checks of an operation
+            max_concurrent_polls: Poll calls in flight at once
+        """
+        self.max_interval = max_interval
+        self._semaphore = asyncio.Semaphore(max_concurrent_polls)
+        self._pending: List[_PendingOperation] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        
+        self._registered = 0
+        self._poll_calls = 0
+        self._completed = 0
+        self._failed = 0
+        self._max_pending = 0
+    
+    async def wait(
+        self,
+        operation: Any,
+        timeout: float,
+        initial_delay: float = DEFAULT_INITIAL_DELAY
+    ) -> Any:
+        """
+        Wait for an asyncio long-running operation.
+        
+        Accepts the google.api_core AsyncOperation returned by async gRPC
+        clients such as ProjectsAsyncClient and the Cloud Run
+        ServicesAsyncClient.
+        
+        Args:
+            operation: The operation returned by the create/delete call
+            timeout: Seconds to wait before giving up
+            initial_delay: Seconds before the first check
+        
+        Returns:
+            The operation's result
+        
+        Raises:
+            TimeoutError: If the operation does not finish in time
+            The operation's error, if it failed
+        """
+        return await self._wait(_PendingOperation(
+            kind=_LONG_RUNNING,
+            name=operation.operation.name,
+            operation=operation,
+            future=asyncio.get_running_loop().create_future(),
+            due=0.0,
+            interval=initial_delay
+        ), timeout)
+    
+    async def wait_compute(
+        self,
+        operation: Any,
+        project_id: str,
+        operations_client: Any,
+        timeout: float,
+        initial_delay: float = DEFAULT_INITIAL_DELAY
+    ) -> Any:
+        """
+        Wait for a Compute Engine operation (zonal, regional or global).
+        
+        Args:
+            operation: The ExtendedOperation returned by insert/delete
+            project_id: Project the operation runs in
+            operations_client: Async Global Operations client, used for
+                              the batched status checks
+            timeout: Seconds to wait before giving up
+            initial_delay: Seconds before the first check
+        
+        Returns:
+            The finished compute_v1.Operation
+        
+        Raises:
+            TimeoutError: If the operation does not finish in time
+            google.api_core.exceptions.GoogleAPICallError: If it failed
+        """
+        return await self._wait(_PendingOperation(
+            kind=_COMPUTE,
+            name=operation.name,
+            operation=operation,
+            future=asyncio.get_running_loop().create_future(),
+            due=0.0,
+            interval=initial_delay,
+            project_id=project_id,
+            client=operations_client
+        ), timeout)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get poller statistics.
+        
+        Returns:
+            Dictionary with pending, registered, completed and failed
+            operations, the peak number pending at once and the number of
+            poll API calls made
+        """
+        return {
+            "pending": len(self._pending),
+            "registered": self._registered,
+            "completed": self._completed,
+            "failed": self._failed,
+            "max_pending": self._max_pending,
+            "poll_calls": self._poll_calls
+        }
+    
+    # ========================================================================
+    # Private Helper Methods
+    # ========================================================================
+    
+    async def _wait(self, pending: _PendingOperation, timeout: float) -> Any:
+        """Register an operation and wait for its future."""
+        loop = asyncio.get_running_loop()
+        pending.due = loop.time() + pending.interval
+        self._pending.append(pending)
+        self._registered += 1
+        self._max_pending = max(self._max_pending, len(self._pending))
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        self._wakeup.set()
+        
+        try:
+            return await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Operation {pending.name} did not finish within {timeout}s"
+            ) from None
+        finally:
+            # Stops polling for operations whose waiter gave up
+            if not pending.future.done():
+                pending.future.cancel()
+    
+    async def _run(self) -> None:
+        """Polling task: check due operations until none are pending."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pending = [item for item in self._pending if not item.future.done()]
+            if not self._pending:
+                return
+            
+            now = loop.time()
+            due = [item for item in self._pending if item.due <= now]
+            if not due:
+                self._wakeup.clear()
+                next_due = min(item.due for item in self._pending)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), next_due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            await asyncio.gather(*self._poll_calls_for(due))
+    
+    def _poll_calls_for(self, due: List[_PendingOperation]) -> List:
+        """Plan the poll calls that check every due operation."""
+        calls = [
+            self._poll_long_running(item)
+            for item in due if item.kind == _LONG_RUNNING
+        ]
+        
+        # A project is listed once for all of its pending compute
+        # operations, including those not due yet
+        due_projects = {item.project_id for item in due if item.kind == _COMPUTE}
+        by_project = defaultdict(list)
+        for item in self._pending:
+            if item.kind == _COMPUTE and item.project_id in due_projects:
+                by_project[item.project_id].append(item)
+        for project_id, items in by_project.items():
+            for start in range(0, len(items), MAX_OPERATIONS_PER_LIST):
+                batch = items[start:start + MAX_OPERATIONS_PER_LIST]
+                calls.append(self._poll_compute(project_id, batch))
+        return calls
+    
+    async def _poll_long_running(self, item: _PendingOperation) -> None:
+        """Refresh one asyncio long-running operation."""
+        async with self._semaphore:
+            self._poll_calls += 1
+            item.polls += 1
+            try:
+                done = await item.operation.done()
+            except Exception as error:
+                logger.warning(f"Failed to poll operation {item.name}: {error}")
+                self._reschedule(item)
+                return
+        
+        if not done:
+            self._reschedule(item)
+            return
+        try:
+            # Already refreshed, so no further API call
+            self._resolve(item, result=await item.operation.result())
+        except Exception as error:
+            self._resolve(item, error=error)
+    
+    async def _poll_compute(
+        self,
+        project_id: str,
+        items: List[_PendingOperation]
+    ) -> None:
+        """Check a project's compute operations with one list call."""
+        names = {item.name for item in items}
+        async with self._semaphore:
+            self._poll_calls += 1
+            try:
+                response = await items[0].client.aggregated_list(request={
+                    "project": project_id,
+                    "filter": " OR ".join(
+                        f'(name = "{name}")' for name in sorted(names)
+                    ),
+                    "return_partial_success": True
+                })
+                # The first page holds every match; iterating the pager
+                # could fetch more pages on the event loop thread
+                operations = {
+                    operation.name: operation
+                    for scoped_list in response.items.values()
+                    for operation in scoped_list.operations
+                    if operation.name in names
+                }
+            except Exception as error:
+                logger.warning(
+                    f"Failed to poll compute operations in {project_id}: {error}"
+                )
+                operations = {}
+        
+        for item in items:
+            item.polls += 1
+            operation = operations.get(item.name)
+            if operation is None or operation.status.name != "DONE":
+                self._reschedule(item)
+            elif operation.error and operation.error.errors:
+                self._resolve(item, error=_compute_operation_error(operation))
+            else:
+                self._resolve(item, result=operation)
+    
+    def _reschedule(self, item: _PendingOperation) -> None:
+        """Check an operation again after a longer interval."""
+        item.interval = min(self.max_interval, item.interval * POLL_INTERVAL_MULTIPLIER)
+        item.due = asyncio.get_running_loop().time() + item.interval
+    
+    def _resolve(
+        self,
+        item: _PendingOperation,
+        result: Any = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """Complete an operation's future."""
+        if item.future.done():
+            return
+        if error is not None:
+            self._failed += 1
+            item.future.set_exception(error)
+        else:
+            self._completed += 1
+            item.future.set_result(result)
+        logger.debug(f"Operation {item.name} finished after {item.polls} polls")
+
+
+def _compute_operation_error(operation: Any) -> Exception:
+    """Build the exception ExtendedOperation.result() raises for a failed operation."""
+    from google.api_core import exceptions as gcp_exceptions
+    
+    errors = list(operation.error.errors)
+    message = operation.http_error_message or errors[0].message
+    return gcp_exceptions.from_http_status(
+        operation.http_error_status_code or 500, message, errors=errors
+    )
+
+
+# One poller per event loop; futures and the polling task are loop-bound
+_pollers = weakref.WeakKeyDictionary()
+_pollers_lock = threading.Lock()
+
+
+def get_operation_poller() -> OperationPoller:
+    """
+    Get the operation poller of the running event loop, creating it on
+    first use.
+    
+    Must be called from a coroutine.
+    
+    Returns:
+        The OperationPoller shared by all coroutines on this loop
+    """
+    loop = asyncio.get_running_loop()
+    with _pollers_lock:
+        poller = _pollers.get(loop)
+        if poller is None:
+            poller = OperationPoller()
+            _pollers[loop] = poller
+    return poller
@@ -0,0 +1,1473 @@
+"""
+GCP Tenant Provisioning Orchestrator
+
+This module implements the complete Infrastructure as Code workflow for
+creating isolated tenant environments on Google Cloud Platform.
+
+Provisioning is declared as a step graph (see nlyzer.gcp.step_graph)
+instead of a fixed sequence, and steps run as soon as the resources they
+need exist:
+
+    1. create_project
+    2. link_billing, create_service_account, store_secrets and
+       create_config_storage, after the project
+    3. deploy_weaviate and setup_networking, after billing;
+       deploy_nlweb, after billing, the service account, secrets and config
+    4. setup_custom_domain, after deploy_nlweb (only if requested)
+    5. validate_deployment, after everything else
+
+Compute Engine and Cloud Run need billing on the project, so they wait
+for it; the service account, secrets and config bucket only need the
+project. NLWeb reaches Weaviate through the instance's internal DNS name,
+which is known before the instance exists, so the two deployments
+overlap. Every run logs its critical path, the chain of steps that
+determined the total time.
+
+Runs are checkpointed: each step's output is persisted as soon as the step
+succeeds (see nlyzer.gcp.checkpoints). A failed run keeps its resources,
+and calling provision_new_tenant again resumes it: completed steps are
+skipped once a quick check confirms their resources still exist, and only
+the rest run. abandon_provisioning deletes a failed run's resources
+instead, and deprovision_tenant offboards a tenant. Both tear resources
+down in reverse dependency order, independent ones concurrently (see
+nlyzer.gcp.teardown).
+
+When the warm pool is enabled (see nlyzer.gcp.warm_pool), a new run
+claims a project that was created and billed ahead of time and starts
+with the tenant-specific steps.
+
+Every GCP call goes through the retry budgets and circuit breakers of
+nlyzer.gcp.resilience: transient errors are retried, and calls to a
+service or region that keeps failing are shed at once.
+
+Each run is traced (see nlyzer.gcp.tracing): a span for the run, one per
+step and one per GCP call, so the time of individual runs can be broken
+down after the fact.
+
+Security Requirements:
+- All operations use principle of least privilege
+- Complete tenant isolation at project level
+- Comprehensive audit logging
+- Rollback capabilities for failed deployments
+
+Usage:
+    result = await provision_new_tenant(tenant_id, config)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from nlyzer.core.config import settings
+from nlyzer.gcp.checkpoints import (
+    RUN_FAILED,
+    RUN_SUCCEEDED,
+    CheckpointStore,
+    get_checkpoint_store,
+)
+from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.dns_resolver import backoff_delay
+from nlyzer.gcp.exceptions import (
+    CleanupError,
+    DeploymentValidationError,
+    NetworkingError,
+    ProvisioningInProgressError,
+    ResourceCreationError,
+    TenantAlreadyExistsError,
+)
+from nlyzer.gcp.operations import get_operation_poller
+from nlyzer.gcp.resilience import with_resilience
+from nlyzer.gcp.step_graph import Step, StepGraph, StepGraphExecutor
+from nlyzer.gcp.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from nlyzer.gcp.dns import DNSManager
+    from nlyzer.gcp.teardown import TeardownAction
+    from nlyzer.gcp.warm_pool import WarmPool
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for long-running GCP operations
+PROJECT_CREATION_TIMEOUT = 120.0
+COMPUTE_OPERATION_TIMEOUT = 300.0
+CLOUD_RUN_DEPLOY_TIMEOUT = 300.0
+
+# Seconds before the first status check of each operation. Operations
+# rarely finish sooner, so earlier checks would only cost API calls.
+PROJECT_CREATION_POLL_DELAY = 20.0
+PROJECT_DELETION_POLL_DELAY = 5.0
+PROJECT_ACTIVATION_POLL_DELAY = 5.0
+INSTANCE_CREATION_POLL_DELAY = 20.0
+FIREWALL_CREATION_POLL_DELAY = 5.0
+CLOUD_RUN_DEPLOY_POLL_DELAY = 20.0
+INSTANCE_DELETION_POLL_DELAY = 30.0
+FIREWALL_DELETION_POLL_DELAY = 5.0
+CLOUD_RUN_DELETION_POLL_DELAY = 5.0
+
+# Steps whose resources live outside the tenant project, so deleting the
+# project does not remove them
+EXTERNAL_RESOURCE_STEPS = frozenset({"setup_custom_domain"})
+
+# Checkpoint of the project ID create_project is about to create. Saved
+# before the create call, so that an attempt resuming after a crash asks
+# for the same project instead of leaking one under a new random ID.
+PROJECT_ID_INTENT = "create_project.intended_id"
+
+# Checkpoint of the bucket name create_config_storage is about to create,
+# saved before the create call for the same reason as PROJECT_ID_INTENT
+BUCKET_NAME_INTENT = "create_config_storage.intended_name"
+
+# Time budget for the post-deployment health check, and the cap on the wait
+# between attempts
+VALIDATION_TIMEOUT = 300.0
+VALIDATION_MAX_DELAY = 15.0
+
+# Roles granted to the tenant's NLWeb service account in its own project
+TENANT_SERVICE_ACCOUNT_ROLES = (
+    "roles/storage.objectViewer",
+    "roles/secretmanager.secretAccessor",
+)
+
+WEAVIATE_MACHINE_TYPE = "e2-standard-2"
+WEAVIATE_DISK_SIZE_GB = 50
+WEAVIATE_PORT = 8080
+
+NLWEB_CPU_LIMIT = "2000m"
+NLWEB_MEMORY_LIMIT = "4Gi"
+
+# Weaviate runs as a container on Container-Optimized OS
+WEAVIATE_STARTUP_SCRIPT = f"""#!/bin/bash
+mkdir -p /var/lib/weaviate
+docker run -d --restart=always --name weaviate \\
+  -p {WEAVIATE_PORT}:8080 \\
+  -v /var/lib/weaviate:/var/lib/weaviate \\
+  -e PERSISTENCE_DATA_PATH=/var/lib/weaviate \\
+  -e AUTHENTICATION_ANONYMOUS_ACCESS_ENABLED=true \\
+  -e DEFAULT_VECTORIZER_MODULE=none \\
+  semitechnologies/weaviate:latest
+"""
+
+
+@dataclass
+class ProvisioningContext:
+    """
+    State shared by the steps of one provisioning run.
+    
+    Attributes:
+        tenant_id: Tenant being provisioned
+        config: Tenant configuration passed to provision_new_tenant
+        client_manager: Client manager for the control-plane project
+        outputs: Return value of each finished step, by step name
+        dns_manager: DNS manager for the custom domain. Created on first
+                    use unless shared by the caller.
+        checkpoint_store: Store of the run, for steps that checkpoint
+                         progress before they finish
+        attempt: Attempt number returned by the store's start_run, which
+                fences the run's checkpoint writes
+    """
+    
+    tenant_id: str
+    config: Dict[str, Any]
+    client_manager: GCPClientManager
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    dns_manager: Optional["DNSManager"] = None
+    checkpoint_store: Optional[CheckpointStore] = None
+    attempt: int = 0
+    
+    @property
+    def project_id(self) -> Optional[str]:
+        """The tenant project, once create_project has finished."""
+        return self.outputs.get("create_project")
+    
+    @property
+    def short_id(self) -> str:
+        """Tenant ID prefix used in resource names with length limits."""
+        return self.tenant_id.lower()[:8]
+    
+    def project_client_manager(self) -> GCPClientManager:
+        """Client manager bound to the tenant project."""
+        return self.client_manager.for_project(self.project_id)
+    
+    def get_dns_manager(self) -> "DNSManager":
+        """DNS manager for the custom domain, created on first use."""
+        if self.dns_manager is None:
+            from nlyzer.gcp.dns import DNSManager
+            
+            self.dns_manager = DNSManager(client_manager=self.client_manager)
+        return self.dns_manager
+    
+    async def save_output(self, name: str, output: Any) -> None:
+        """Record intermediate progress of a step, checkpointing it."""
+        self.outputs[name] = output
+        if self.checkpoint_store is not None:
+            await self.checkpoint_store.save_checkpoint(
+                self.tenant_id, name, output, self.attempt
+            )
+    
+    async def discard_output(self, name: str) -> None:
+        """Forget intermediate progress recorded with save_output."""
+        if self.outputs.pop(name, None) is not None and self.checkpoint_store:
+            await self.checkpoint_store.discard_checkpoints(
+                self.tenant_id, [name], self.attempt
+            )
+
+
+async def provision_new_tenant(
+    tenant_id: str,
+    config: Dict,
+    client_manager: Optional[GCPClientManager] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    warm_pool: Optional["WarmPool"] = None
+) -> Dict[str, Any]:
+    """
+    Orchestrates the complete creation of all GCP resources for a new tenant.
+    
+    This function implements the automated provisioning handshake defined in
+    the UNIFIED_ARCHITECTURAL_BLUEPRINT.md, creating:
+    - Isolated GCP Project
+    - Tenant-specific service accounts
+    - Secure credential storage
+    - Weaviate vector database instance
+    - NLWeb Cloud Run service
+    - Network security policies
+    
+    Independent steps run concurrently; see PROVISIONING_GRAPH. If an
+    earlier attempt for the tenant failed, this call resumes it from its
+    checkpoints. A new run claims a pre-provisioned project from the warm
+    pool when one is ready, skipping project creation and billing.
+    
+    Args:
+        tenant_id: Unique identifier for the tenant (UUID format)
+        config: Tenant configuration containing:
+            - agent_type: Type of AI agent (sales, support, etc.)
+            - data_source_type: Source platform (shopify, woocommerce, etc.)
+            - credentials: API keys and authentication tokens
+            - custom_domain: Optional subdomain of the platform's base
+              domain to point at the load balancer
+            - load_balancer_ip: Static IP for custom_domain. Defaults to
+              settings.GLOBAL_LOAD_BALANCER_IP.
+        client_manager: Optional GCP client manager for the control-plane
+                       project
+        checkpoint_store: Optional checkpoint store. Defaults to the
+                         process-wide store.
+        warm_pool: Optional warm pool. Defaults to the process-wide pool,
+                  if settings.WARM_POOL_SIZE enables it.
+    
+    Returns:
+        Dict containing:
+            - status: "success" or "failed"
+            - project_id: Created GCP project identifier
+            - nlweb_url: Deployed NLWeb service endpoint
+            - weaviate_url: Vector database endpoint
+            - config_bucket: GCS bucket for configuration files
+            - service_account: Email of the NLWeb service account
+            - execution: Per-step timings and the critical path
+            - attempt: Number of this attempt for the tenant
+            - error_message: Error details if deployment failed
+    
+    Raises:
+        TenantAlreadyExistsError: If the tenant was already provisioned
+        ProvisioningInProgressError: If another attempt for the tenant is
+                                    running
+    """
+    with get_tracer().span("provision_tenant", tenant_id=tenant_id) as span:
+        result = await _provision_tenant(
+            tenant_id, config, client_manager, checkpoint_store, warm_pool
+        )
+        span.set_attributes(
+            status=result["status"],
+            attempt=result["attempt"],
+            failed_step=result.get("failed_step"),
+            critical_path=result["execution"]["critical_path"]
+        )
+        if result["status"] != "success":
+            span.set_error(result["error_message"])
+        return result
+
+
+async def _provision_tenant(
+    tenant_id: str,
+    config: Dict,
+    client_manager: Optional[GCPClientManager],
+    checkpoint_store: Optional[CheckpointStore],
+    warm_pool: Optional["WarmPool"]
+) -> Dict[str, Any]:
+    """Runs or resumes the provisioning graph; see provision_new_tenant."""
+    store = checkpoint_store or get_checkpoint_store()
+    
+    # Claims the run, or raises if it succeeded or another attempt holds it
+    state = await store.start_run(tenant_id)
+    if state.outputs:
+        logger.info(
+            f"Resuming provisioning for tenant_id: {tenant_id} "
+            f"(attempt {state.attempts}, {len(state.outputs)} steps checkpointed)"
+        )
+    else:
+        logger.info(f"Starting tenant provisioning for tenant_id: {tenant_id}")
+        
+        if warm_pool is None:
+            from nlyzer.gcp.warm_pool import get_warm_pool
+            
+            warm_pool = get_warm_pool()
+        project = await warm_pool.claim(tenant_id) if warm_pool else None
+        if project is not None:
+            # Checkpointed like a resumed run, so the executor verifies and
+            # skips the steps the pool already ran
+            for step_name, output in project.provisioning_outputs().items():
+                await store.save_checkpoint(
+                    tenant_id, step_name, output, state.attempts
+                )
+            state.outputs.update(project.provisioning_outputs())
+    
+    get_tracer().set_trace_attributes(project_id=state.outputs.get("create_project"))
+    context = ProvisioningContext(
+        tenant_id=tenant_id,
+        config=config,
+        client_manager=with_resilience(client_manager or GCPClientManager()),
+        outputs=dict(state.outputs),
+        checkpoint_store=store,
+        attempt=state.attempts
+    )
+    
+    async def save_checkpoint(step_name: str, output: Any) -> None:
+        await store.save_checkpoint(tenant_id, step_name, output, state.attempts)
+        if step_name == "create_project":
+            get_tracer().set_trace_attributes(project_id=output)
+    
+    executor = StepGraphExecutor(PROVISIONING_GRAPH, on_step_succeeded=save_checkpoint)
+    report = await executor.execute(context)
+    
+    stale = [name for name in state.outputs if name not in context.outputs]
+    if stale:
+        await store.discard_checkpoints(tenant_id, stale, state.attempts)
+    
+    logger.info(
+        f"Provisioning for tenant {tenant_id} took {report.elapsed_seconds:.1f}s "
+        f"({report.sequential_seconds:.1f}s of step time); critical path: "
+        f"{' -> '.join(report.critical_path)}"
+    )
+    
+    if not report.succeeded:
+        logger.error(
+            f"Provisioning failed for tenant {tenant_id} at step "
+            f"{report.failed_step}: {str(report.error)}"
+        )
+        
+        # Resources are kept so that the next attempt can resume
+        await store.finish_run(
+            tenant_id, state.attempts, RUN_FAILED, report.failed_step,
+            str(report.error)
+        )
+        
+        return {
+            "status": "failed",
+            "error_message": str(report.error),
+            "failed_step": report.failed_step,
+            "tenant_id": tenant_id,
+            "attempt": state.attempts,
+            "execution": report.to_dict()
+        }
+    
+    await store.finish_run(tenant_id, state.attempts, RUN_SUCCEEDED)
+    
+    outputs = context.outputs
+    return {
+        "status": "success",
+        "project_id": context.project_id,
+        "nlweb_url": outputs["setup_custom_domain"] or outputs["deploy_nlweb"],
+        "weaviate_url": _weaviate_url(outputs["deploy_weaviate"]),
+        "config_bucket": outputs["create_config_storage"][0],
+        "service_account": outputs["create_service_account"],
+        "attempt": state.attempts,
+        "execution": report.to_dict()
+    }
+
+
+async def abandon_provisioning(
+    tenant_id: str,
+    client_manager: Optional[GCPClientManager] = None,
+    checkpoint_store: Optional[CheckpointStore] = None
+) -> Dict[str, Any]:
+    """
+    Gives up on a failed provisioning run and deletes what it created.
+    
+    Tears down the run's resources (see deprovision_tenant), then forgets
+    its checkpoints so the tenant can be provisioned from scratch.
+    
+    Args:
+        tenant_id: Tenant whose failed run to abandon
+        client_manager: Optional GCP client manager for the control-plane
+                       project
+        checkpoint_store: Optional checkpoint store. Defaults to the
+                         process-wide store.
+    
+    Returns:
+        Dict with status ("abandoned" or "not_found"), project_id and,
+        if anything was torn down, the teardown report
+    
+    Raises:
+        TenantAlreadyExistsError: If the tenant was provisioned successfully
+        ProvisioningInProgressError: If an attempt for the tenant is running
+        CleanupError: If resources could not be deleted; the checkpoints
+                     are kept so that a later call retries them
+    """
+    store = checkpoint_store or get_checkpoint_store()
+    state = await store.load(tenant_id)
+    if state is None:
+        return {"status": "not_found", "tenant_id": tenant_id, "project_id": None}
+    if state.status == RUN_SUCCEEDED:
+        raise TenantAlreadyExistsError(tenant_id, state.outputs.get("create_project"))
+    if state.in_progress:
+        raise ProvisioningInProgressError(tenant_id, state.lease_expires_at)
+    
+    result = await _tear_down_tenant(tenant_id, state.outputs, client_manager, store)
+    logger.info(f"Abandoned provisioning for tenant_id: {tenant_id}")
+    return {**result, "status": "abandoned"}
+
+
+async def deprovision_tenant(
+    tenant_id: str,
+    client_manager: Optional[GCPClientManager] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    dns_manager: Optional["DNSManager"] = None
+) -> Dict[str, Any]:
+    """
+    Offboards a tenant by deleting every resource provisioned for it.
+    
+    The resources recorded in the tenant's checkpoints are deleted in
+    reverse dependency order, independent ones concurrently, each retried
+    on its own (see nlyzer.gcp.teardown); the project goes last. Refused
+    while a provisioning attempt for the tenant holds its run.
+    
+    Args:
+        tenant_id: Tenant to offboard
+        client_manager: Optional GCP client manager for the control-plane
+                       project
+        checkpoint_store: Optional checkpoint store. Defaults to the
+                         process-wide store.
+        dns_manager: Optional DNS manager, shared when offboarding many
+                    tenants so their record removals are batched
+    
+    Returns:
+        Dict with status ("deprovisioned" or "not_found"), project_id and,
+        if anything was torn down, the teardown report
+    
+    Raises:
+        ProvisioningInProgressError: If an attempt for the tenant is running
+        CleanupError: If resources could not be deleted; the checkpoints
+                     are kept so that a later call retries them
+    """
+    store = checkpoint_store or get_checkpoint_store()
+    state = await store.load(tenant_id)
+    if state is None:
+        return {"status": "not_found", "tenant_id": tenant_id, "project_id": None}
+    if state.in_progress:
+        raise ProvisioningInProgressError(tenant_id, state.lease_expires_at)
+    
+    result = await _tear_down_tenant(
+        tenant_id, state.outputs, client_manager, store, dns_manager
+    )
+    logger.info(f"Deprovisioned tenant_id: {tenant_id}")
+    return {**result, "status": "deprovisioned"}
+
+
+# ============================================================================
+# Provisioning Steps
+# ============================================================================
+
+async def _create_gcp_project(context: ProvisioningContext) -> str:
+    """
+    Creates a new isolated GCP project for the tenant.
+    
+    The project ID is checkpointed as PROJECT_ID_INTENT before the create
+    call and reused by later attempts until the project exists, so a crash
+    mid-creation cannot leave a project behind that no checkpoint names.
+    
+    Uses: google.cloud.resourcemanager_v3.ProjectsAsyncClient
+    """
+    projects_client = context.client_manager.get_projects_async_client()
+    
+    project_id = context.outputs.get(PROJECT_ID_INTENT)
+    if project_id is None:
+        # Generate unique project ID (GCP requirement: lowercase, hyphens, 6-30 chars)
+        project_id = f"nlyzer-tenant-{context.short_id}-{uuid4().hex[:8]}"
+        await context.save_output(PROJECT_ID_INTENT, project_id)
+    
+    try:
+        try:
+            operation = await projects_client.create_project(request={
+                "project": {
+                    "project_id": project_id,
+                    "display_name": f"NLyzer Tenant {context.tenant_id}"[:30],
+                    "parent": f"folders/{settings.GCP_TENANT_FOLDER_ID}",
+                    "labels": {
+                        "environment": "production",
+                        "tenant-id": context.tenant_id,
+                        "managed-by": "nlyzer-provisioner"
+                    }
+                }
+            })
+        except Exception as error:
+            # Created by a retried call whose first response was lost
+            if not _is_already_exists(error):
+                raise
+            if not await _wait_for_tenant_project(context, projects_client, project_id):
+                # Not ours to use; the next attempt picks another ID
+                await context.discard_output(PROJECT_ID_INTENT)
+                raise
+        else:
+            # Project creation typically takes 30-60 seconds
+            await get_operation_poller().wait(
+                operation, PROJECT_CREATION_TIMEOUT,
+                initial_delay=PROJECT_CREATION_POLL_DELAY
+            )
+    except Exception as error:
+        raise ResourceCreationError(
+            "project", str(error), tenant_id=context.tenant_id,
+            project_id=project_id, gcp_error=error
+        )
+    
+    # From here on the create_project checkpoint names the project
+    await context.discard_output(PROJECT_ID_INTENT)
+    logger.info(f"Created GCP project: {project_id}")
+    return project_id
+
+
+async def _setup_project_billing(context: ProvisioningContext) -> None:
+    """
+    Links the tenant project to the organization billing account.
+    
+    Uses: google.cloud.billing_v1.CloudBillingAsyncClient
+    """
+    billing_client = context.client_manager.get_billing_async_client()
+    
+    try:
+        await billing_client.update_project_billing_info(request={
+            "name": f"projects/{context.project_id}",
+            "project_billing_info": {
+                "billing_account_name": (
+                    f"billingAccounts/{settings.GCP_BILLING_ACCOUNT_ID}"
+                )
+            }
+        })
+    except Exception as error:
+        raise ResourceCreationError(
+            "billing_link", str(error), tenant_id=context.tenant_id,
+            project_id=context.project_id, gcp_error=error
+        )
+    
+    logger.info(f"Configured billing for project: {context.project_id}")
+
+
+async def _create_tenant_service_account(context: ProvisioningContext) -> str:
+    """
+    Creates a service account for the tenant's NLWeb Cloud Run service.
+    
+    Uses: google.cloud.iam_admin_v1.IAMAsyncClient
+    """
+    iam_client = context.client_manager.get_iam_async_client()
+    account_id = f"nlweb-service-{context.short_id}"
+    
+    try:
+        try:
+            created_account = await iam_client.create_service_account(request={
+                "name": f"projects/{context.project_id}",
+                "account_id": account_id,
+                "service_account": {
+                    "display_name": (
+                        f"NLWeb Service Account for Tenant {context.tenant_id}"
+                    ),
+                    "description": (
+                        "Service account for NLWeb Cloud Run service access to "
+                        "GCS and Weaviate"
+                    )
+                }
+            })
+            email = created_account.email
+        except Exception as error:
+            # Created by an earlier attempt that failed before its checkpoint
+            if not _is_already_exists(error):
+                raise
+            email = f"{account_id}@{context.project_id}.iam.gserviceaccount.com"
+        
+        # Grant necessary permissions to the service account
+        await _configure_service_account_permissions(context, email)
+    except Exception as error:
+        raise ResourceCreationError(
+            "service_account", str(error), tenant_id=context.tenant_id,
+            project_id=context.project_id, gcp_error=error
+        )
+    
+    logger.info(f"Created service account: {email}")
+    return email
+
+
+async def _store_tenant_secrets(context: ProvisioningContext) -> List[str]:
+    """
+    Securely stores tenant API keys and credentials in Secret Manager.
+    
+    All credentials are stored concurrently.
+    
+    Uses: google.cloud.secretmanager.SecretManagerServiceAsyncClient
+    """
+    secrets_client = context.client_manager.get_secrets_async_client()
+    credentials = context.config.get("credentials", {})
+    
+    async def store(key: str, value: str) -> str:
+        secret_name = f"projects/{context.project_id}/secrets/{_secret_id(key)}"
+        try:
+            await secrets_client.create_secret(request={
+                "parent": f"projects/{context.project_id}",
+                "secret_id": _secret_id(key),
+                "secret": {
+                    "replication": {"automatic": {}},
+                    "labels": {
+                        "managed-by": "nlyzer-provisioner",
+                        "credential-type": key.lower()
+                    }
+                }
+            })
+        except Exception as error:
+            # Created by an earlier attempt; the new version supersedes it
+            if not _is_already_exists(error):
+                raise
+        
+        # Add secret version with actual value
+        version = await secrets_client.add_secret_version(request={
+            "parent": secret_name,
+            "payload": {"data": value.encode("utf-8")}
+        })
+        return version.name
+    
+    try:
+        secret_versions = list(await asyncio.gather(
+            *(store(key, value) for key, value in credentials.items())
+        ))
+    except Exception as error:
+        raise ResourceCreationError(
+            "secret", str(error), tenant_id=context.tenant_id,
+            project_id=context.project_id, gcp_error=error
+        )
+    
+    logger.info(f"Stored {len(secret_versions)} secrets in Secret Manager")
+    return secret_versions
+
+
+async def _create_config_storage(context: ProvisioningContext) -> Tuple[str, str]:
+    """
+    Creates GCS bucket and uploads tenant-specific nlweb_config.yml.
+    
+    The bucket name is checkpointed as BUCKET_NAME_INTENT before the create
+    call and reused by later attempts until the step succeeds, so a crash
+    mid-creation cannot leave a second bucket in the tenant project.
+    
+    Uses: google.cloud.storage.Client
+    """
+    storage_client = context.project_client_manager().get_storage_async_client()
+    
+    bucket_name = context.outputs.get(BUCKET_NAME_INTENT)
+    if bucket_name is None:
+        bucket_name = (
+            f"nlyzer-config-{context.tenant_id.lower()}-{uuid4().hex[:8]}"[:63]
+        )
+        await context.save_output(BUCKET_NAME_INTENT, bucket_name)
+    
+    try:
+        try:
+            # Same region as Cloud Run
+            bucket = await storage_client.create_bucket(
+                bucket_name,
+                project=context.project_id,
+                location=_region()
+            )
+        except Exception as error:
+            # Bucket names are global, but this one is random per tenant:
+            # a conflict means a retried call whose first response was lost,
+            # or an earlier attempt that created the bucket
+            if not _is_already_exists(error):
+                raise
+            bucket = await storage_client.lookup_bucket(bucket_name)
+            if bucket is None:
+                # Not ours to use; the next attempt picks another name
+                await context.discard_output(BUCKET_NAME_INTENT)
+                raise
+        
+        config_content = _generate_nlweb_config(context.project_id, context.config)
+        blob = bucket.blob("nlweb_config.yml")
+        await storage_client.run_blocking(
+            blob.upload_from_string, config_content,
+            content_type="application/x-yaml"
+        )
+    except Exception as error:
+        raise ResourceCreationError(
+            "config_bucket", str(error), tenant_id=context.tenant_id,
+            project_id=context.project_id, gcp_error=error
+        )
+    
+    # From here on the create_config_storage checkpoint names the bucket
+    await context.discard_output(BUCKET_NAME_INTENT)
+    config_gcs_path = _config_gcs_path(bucket_name)
+    logger.info(f"Created configuration storage: {config_gcs_path}")
+    return bucket_name, config_gcs_path
+
+
+async def _deploy_weaviate_instance(context: ProvisioningContext) -> str:
+    """
+    Deploys a Weaviate vector database instance on Google Compute Engine.
+    
+    Uses: google.cloud.compute_v1.InstancesClient
+    
+    Returns:
+        Internal IP address of the instance
+    """
+    compute_client = context.client_manager.get_instances_async_client()
+    
+    project_id = context.project_id
+    instance_name = _weaviate_instance_name(context)
+    zone = _zone()
+    
+    try:
+        await _insert_if_missing(context, compute_client, request={
+            "project": project_id,
+            "zone": zone,
+            "instance_resource": {
+                "name": instance_name,
+                "machine_type": f"zones/{zone}/machineTypes/{WEAVIATE_MACHINE_TYPE}",
+                "disks": [{
+                    "boot": True,
+                    "auto_delete": True,
+                    "initialize_params": {
+                        "source_image": (
+                            "projects/cos-cloud/global/images/family/cos-stable"
+                        ),
+                        "disk_size_gb": WEAVIATE_DISK_SIZE_GB
+                    }
+                }],
+                "network_interfaces": [{
+                    "network": f"projects/{project_id}/global/networks/default"
+                }],
+                "metadata": {
+                    "items": [{
+                        "key": "startup-script",
+                        "value": WEAVIATE_STARTUP_SCRIPT
+                    }]
+                },
+                "tags": {"items": ["weaviate-server"]},
+                "labels": {
+                    "tenant-id": context.tenant_id,
+                    "service": "weaviate"
+                }
+            }
+        }, poll_delay=INSTANCE_CREATION_POLL_DELAY)
+        
+        instance = await compute_client.get(
+            project=project_id, zone=zone, instance=instance_name
+        )
+    except Exception as error:
+        raise ResourceCreationError(
+            "weaviate_instance", str(error), tenant_id=context.tenant_id,
+            project_id=project_id, gcp_error=error
+        )
+    
+    internal_ip = instance.network_interfaces[0].network_i_p
+    logger.info(f"Deployed Weaviate instance: {_weaviate_url(internal_ip)}")
+    return internal_ip
+
+
+async def _setup_tenant_networking(context: ProvisioningContext) -> str:
+    """
+    Configures firewall rules for tenant isolation.
+    
+    Uses: google.cloud.compute_v1.FirewallsClient
+    
+    Returns:
+        Name of the firewall rule allowing internal Weaviate access
+    """
+    firewall_client = context.client_manager.get_firewalls_async_client()
+    rule_name = f"allow-weaviate-{context.short_id}"
+    
+    try:
+        await _insert_if_missing(context, firewall_client, request={
+            "project": context.project_id,
+            "firewall_resource": {
+                "name": rule_name,
+                "allowed": [{
+                    "I_p_protocol": "tcp",
+                    "ports": [str(WEAVIATE_PORT)]
+                }],
+                "source_ranges": ["10.0.0.0/8"],  # Only internal traffic
+                "target_tags": ["weaviate-server"],
+                "description": (
+                    f"Allow internal access to Weaviate for tenant {context.tenant_id}"
+                )
+            }
+        }, poll_delay=FIREWALL_CREATION_POLL_DELAY)
+    except Exception as error:
+        raise NetworkingError(
+            str(error), tenant_id=context.tenant_id,
+            project_id=context.project_id, network_resource=rule_name,
+            gcp_error=error
+        )
+    
+    logger.info(f"Configured tenant networking for project: {context.project_id}")
+    return rule_name
+
+
+async def _deploy_nlweb_to_cloud_run(context: ProvisioningContext) -> str:
+    """
+    Deploys the customized NLWeb engine to Cloud Run.
+    
+    Uses: google.cloud.run_v2.ServicesAsyncClient
+    
+    Returns:
+        URL of the deployed service
+    """
+    run_client = context.client_manager.get_run_services_async_client()
+    outputs = context.outputs
+    _, config_gcs_path = outputs["create_config_storage"]
+    parent = f"projects/{context.project_id}/locations/{_region()}"
+    service_id = f"nlweb-{context.short_id}"
+    
+    try:
+        operation = await run_client.create_service(request={
+            "parent": parent,
+            "service_id": service_id,
+            "service": {
+                "labels": {
+                    "tenant-id": context.tenant_id,
+                    "managed-by": "nlyzer-provisioner"
+                },
+                "template": {
+                    "service_account": outputs["create_service_account"],
+                    "containers": [{
+                        "image": (
+                            f"{settings.ARTIFACT_REGISTRY_URL}/nlweb-extension:latest"
+                        ),
+                        "env": [
+                            {"name": "NLWEB_CONFIG_PATH", "value": config_gcs_path},
+                            {
+                                "name": "WEAVIATE_URL",
+                                "value": _weaviate_url(_weaviate_hostname(context))
+                            },
+                            {"name": "GCP_PROJECT_ID", "value": context.project_id}
+                        ],
+                        "resources": {
+                            "limits": {
+                                "cpu": NLWEB_CPU_LIMIT,
+                                "memory": NLWEB_MEMORY_LIMIT
+                            }
+                        }
+                    }]
+                }
+            }
+        })
+        
+        # Wait for deployment
+        deployed_service = await get_operation_poller().wait(
+            operation, CLOUD_RUN_DEPLOY_TIMEOUT,
+            initial_delay=CLOUD_RUN_DEPLOY_POLL_DELAY
+        )
+    except Exception as error:
+        if not _is_already_exists(error):
+            raise ResourceCreationError(
+                "cloud_run_service", str(error), tenant_id=context.tenant_id,
+                project_id=context.project_id, gcp_error=error
+            )
+        # Deployed by an earlier attempt that failed before its checkpoint
+        try:
+            deployed_service = await run_client.get_service(
+                request={"name": f"{parent}/services/{service_id}"}
+            )
+        except Exception as get_error:
+            raise ResourceCreationError(
+                "cloud_run_service", str(get_error), tenant_id=context.tenant_id,
+                project_id=context.project_id, gcp_error=get_error
+            )
+    
+    logger.info(f"Deployed NLWeb service: {deployed_service.uri}")
+    return deployed_service.uri
+
+
+async def _setup_custom_domain(context: ProvisioningContext) -> str:
+    """
+    Points the tenant's subdomain of the base domain at the load balancer.
+    
+    Returns:
+        HTTPS URL of the custom domain
+    """
+    ip_address = context.config.get("load_balancer_ip") or getattr(
+        settings, "GLOBAL_LOAD_BALANCER_IP", None
+    )
+    if not ip_address:
+        raise ResourceCreationError(
+            "custom_domain", "no load balancer IP configured",
+            tenant_id=context.tenant_id, project_id=context.project_id
+        )
+    
+    result = await context.get_dns_manager().configure_namecheap_dns_record(
+        subdomain=context.config["custom_domain"],
+        ip_address=ip_address
+    )
+    
+    custom_url = f"https://{result['fqdn']}"
+    logger.info(f"Configured custom domain: {custom_url}")
+    return custom_url
+
+
+async def _validate_deployment(context: ProvisioningContext) -> None:
+    """
+    Waits for the NLWeb service to pass its health check.
+    
+    Weaviate only has an internal address, so it is checked by NLWeb
+    itself as part of its /health endpoint.
+    
+    Raises:
+        DeploymentValidationError: If the service is not healthy in time
+    """
+    import httpx
+    
+    nlweb_url = context.outputs["deploy_nlweb"]
+    health_url = f"{nlweb_url.rstrip('/')}/health"
+    deadline = time.monotonic() + VALIDATION_TIMEOUT
+    attempt = 0
+    last_error = "no response"
+    
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        while True:
+            attempt += 1
+            try:
+                response = await client.get(health_url)
+                if response.status_code == 200:
+                    logger.info(
+                        f"Deployment validation successful for tenant: "
+                        f"{context.tenant_id}"
+                    )
+                    return
+                last_error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as error:
+                last_error = str(error) or type(error).__name__
+            
+            delay = backoff_delay(attempt, 1.0, VALIDATION_MAX_DELAY)
+            if time.monotonic() + delay > deadline:
+                break
+            await asyncio.sleep(delay)
+    
+    raise DeploymentValidationError(
+        "nlweb", f"health check failed after {attempt} attempts: {last_error}",
+        tenant_id=context.tenant_id, project_id=context.project_id,
+        endpoint_url=health_url
+    )
+
+
+# ============================================================================
+# Teardown Steps
+# ============================================================================
+
+async def _delete_custom_domain(
+    context: ProvisioningContext,
+    url: Optional[str]
+) -> None:
+    """Removes the DNS record of the tenant's custom domain, if it has one."""
+    if url is None:
+        return
+    subdomain = urlparse(url).hostname.split(".", 1)[0]
+    await context.get_dns_manager().remove_dns_record(subdomain)
+
+
+async def _delete_nlweb(context: ProvisioningContext, _: str) -> None:
+    """Deletes the NLWeb Cloud Run service."""
+    run_client = context.client_manager.get_run_services_async_client()
+    operation = await run_client.delete_service(request={
+        "name": (
+            f"projects/{context.project_id}/locations/{_region()}"
+            f"/services/nlweb-{context.short_id}"
+        )
+    })
+    await get_operation_poller().wait(
+        operation, CLOUD_RUN_DEPLOY_TIMEOUT,
+        initial_delay=CLOUD_RUN_DELETION_POLL_DELAY
+    )
+
+
+async def _delete_networking(context: ProvisioningContext, rule_name: str) -> None:
+    """Deletes the Weaviate firewall rule."""
+    firewall_client = context.client_manager.get_firewalls_async_client()
+    operation = await firewall_client.delete(
+        project=context.project_id, firewall=rule_name
+    )
+    await get_operation_poller().wait_compute(
+        operation, context.project_id,
+        context.client_manager.get_operations_async_client(),
+        COMPUTE_OPERATION_TIMEOUT, initial_delay=FIREWALL_DELETION_POLL_DELAY
+    )
+
+
+async def _delete_weaviate(context: ProvisioningContext, _: str) -> None:
+    """Deletes the Weaviate instance; its boot disk is auto-deleted."""
+    compute_client = context.client_manager.get_instances_async_client()
+    operation = await compute_client.delete(
+        project=context.project_id, zone=_zone(),
+        instance=_weaviate_instance_name(context)
+    )
+    await get_operation_poller().wait_compute(
+        operation, context.project_id,
+        context.client_manager.get_operations_async_client(),
+        COMPUTE_OPERATION_TIMEOUT, initial_delay=INSTANCE_DELETION_POLL_DELAY
+    )
+
+
+async def _delete_config_storage(
+    context: ProvisioningContext,
+    output: List[str]
+) -> None:
+    """Deletes the config bucket together with its objects."""
+    storage_client = context.project_client_manager().get_storage_async_client()
+    bucket_name, _ = output
+    bucket = await storage_client.bucket(bucket_name)
+    await storage_client.run_blocking(bucket.delete, force=True)
+
+
+async def _delete_secrets(context: ProvisioningContext, versions: List[str]) -> None:
+    """Deletes the tenant's secrets, concurrently."""
+    secrets_client = context.client_manager.get_secrets_async_client()
+    
+    async def delete(secret_name: str) -> None:
+        try:
+            await secrets_client.delete_secret(request={"name": secret_name})
+        except Exception as error:
+            if not _is_not_found(error):
+                raise
+    
+    secret_names = {version.rsplit("/versions/", 1)[0] for version in versions}
+    await asyncio.gather(*(delete(name) for name in sorted(secret_names)))
+
+
+async def _delete_service_account(context: ProvisioningContext, email: str) -> None:
+    """Deletes the NLWeb service account."""
+    iam_client = context.client_manager.get_iam_async_client()
+    await iam_client.delete_service_account(
+        request={"name": f"projects/{context.project_id}/serviceAccounts/{email}"}
+    )
+
+
+async def _delete_project(context: ProvisioningContext, project_id: str) -> None:
+    """
+    Deletes the tenant project.
+    
+    Deleting the project removes every resource created inside it,
+    including those created by a step that failed before its checkpoint.
+    """
+    logger.info(f"Deleting tenant project: {project_id}")
+    projects_client = context.client_manager.get_projects_async_client()
+    operation = await projects_client.delete_project(
+        request={"name": f"projects/{project_id}"}
+    )
+    await get_operation_poller().wait(
+        operation, PROJECT_CREATION_TIMEOUT,
+        initial_delay=PROJECT_DELETION_POLL_DELAY
+    )
+
+
+# ============================================================================
+# Checkpoint Verification
+# ============================================================================
+# Run before a resumed attempt for every checkpointed step. Returning False
+# re-runs the step and everything that depends on it.
+
+async def _verify_project(context: ProvisioningContext, project_id: str) -> bool:
+    projects_client = context.client_manager.get_projects_async_client()
+    project = await _get_if_exists(
+        projects_client.get_project(request={"name": f"projects/{project_id}"})
+    )
+    return project is not None and project.state.name == "ACTIVE"
+
+
+async def _verify_billing(context: ProvisioningContext, _: None) -> bool:
+    billing_client = context.client_manager.get_billing_async_client()
+    billing_info = await billing_client.get_project_billing_info(
+        request={"name": f"projects/{context.project_id}"}
+    )
+    return bool(billing_info.billing_enabled)
+
+
+async def _verify_service_account(context: ProvisioningContext, email: str) -> bool:
+    iam_client = context.client_manager.get_iam_async_client()
+    return await _exists(iam_client.get_service_account(
+        request={"name": f"projects/{context.project_id}/serviceAccounts/{email}"}
+    ))
+
+
+async def _verify_secrets(context: ProvisioningContext, versions: List[str]) -> bool:
+    secrets_client = context.client_manager.get_secrets_async_client()
+    found = await asyncio.gather(*(
+        _exists(secrets_client.get_secret_version(request={"name": version}))
+        for version in versions
+    ))
+    return all(found)
+
+
+async def _verify_config_storage(
+    context: ProvisioningContext,
+    output: List[str]
+) -> bool:
+    storage_client = context.project_client_manager().get_storage_async_client()
+    bucket_name, _ = output
+    return await storage_client.lookup_bucket(bucket_name) is not None
+
+
+async def _verify_weaviate(context: ProvisioningContext, internal_ip: str) -> bool:
+    compute_client = context.client_manager.get_instances_async_client()
+    instance = await _get_if_exists(compute_client.get(
+        project=context.project_id, zone=_zone(),
+        instance=_weaviate_instance_name(context)
+    ))
+    return (
+        instance is not None
+        and instance.network_interfaces[0].network_i_p == internal_ip
+    )
+
+
+async def _verify_networking(context: ProvisioningContext, rule_name: str) -> bool:
+    firewall_client = context.client_manager.get_firewalls_async_client()
+    return await _exists(
+        firewall_client.get(project=context.project_id, firewall=rule_name)
+    )
+
+
+async def _verify_nlweb(context: ProvisioningContext, url: str) -> bool:
+    run_client = context.client_manager.get_run_services_async_client()
+    service = await _get_if_exists(run_client.get_service(request={
+        "name": (
+            f"projects/{context.project_id}/locations/{_region()}"
+            f"/services/nlweb-{context.short_id}"
+        )
+    }))
+    return service is not None and service.uri == url
+
+
+PROVISIONING_GRAPH = StepGraph([
+    Step("create_project", _create_gcp_project, verify=_verify_project),
+    Step(
+        "link_billing", _setup_project_billing,
+        requires=("create_project",), verify=_verify_billing
+    ),
+    Step(
+        "create_service_account", _create_tenant_service_account,
+        requires=("create_project",), verify=_verify_service_account
+    ),
+    Step(
+        "store_secrets", _store_tenant_secrets,
+        requires=("create_project",), verify=_verify_secrets
+    ),
+    Step(
+        "create_config_storage", _create_config_storage,
+        requires=("create_project",), verify=_verify_config_storage
+    ),
+    Step(
+        "deploy_weaviate", _deploy_weaviate_instance,
+        requires=("link_billing",), verify=_verify_weaviate
+    ),
+    Step(
+        "setup_networking", _setup_tenant_networking,
+        requires=("link_billing",), verify=_verify_networking
+    ),
+    Step(
+        "deploy_nlweb", _deploy_nlweb_to_cloud_run,
+        requires=(
+            "link_billing", "create_service_account", "store_secrets",
+            "create_config_storage"
+        ),
+        verify=_verify_nlweb
+    ),
+    Step(
+        "setup_custom_domain", _setup_custom_domain,
+        requires=("deploy_nlweb",),
+        condition=lambda context: bool(context.config.get("custom_domain"))
+    ),
+    Step(
+        "validate_deployment", _validate_deployment,
+        requires=(
+            "deploy_weaviate", "deploy_nlweb", "setup_networking",
+            "setup_custom_domain"
+        )
+    ),
+])
+
+# How to delete what each step created. Billing ends with the project;
+# validation creates nothing.
+TEARDOWN_ACTIONS: Dict[str, "TeardownAction"] = {
+    "create_project": _delete_project,
+    "create_service_account": _delete_service_account,
+    "store_secrets": _delete_secrets,
+    "create_config_storage": _delete_config_storage,
+    "deploy_weaviate": _delete_weaviate,
+    "setup_networking": _delete_networking,
+    "deploy_nlweb": _delete_nlweb,
+    "setup_custom_domain": _delete_custom_domain,
+}
+
+
+# ============================================================================
+# Private Helper Functions
+# ============================================================================
+
+async def _configure_service_account_permissions(
+    context: ProvisioningContext,
+    service_account_email: str
+) -> None:
+    """
+    Grants the tenant service account its roles on the tenant project.
+    
+    Uses: google.cloud.resourcemanager_v3.ProjectsAsyncClient
+    """
+    projects_client = context.client_manager.get_projects_async_client()
+    resource = f"projects/{context.project_id}"
+    member = f"serviceAccount:{service_account_email}"
+    
+    policy = await projects_client.get_iam_policy(request={"resource": resource})
+    granted = {
+        binding.role for binding in policy.bindings if member in binding.members
+    }
+    missing = [role for role in TENANT_SERVICE_ACCOUNT_ROLES if role not in granted]
+    if not missing:
+        return
+    
+    for role in missing:
+        policy.bindings.add(role=role, members=[member])
+    await projects_client.set_iam_policy(
+        request={"resource": resource, "policy": policy}
+    )
+
+
+async def _insert_if_missing(
+    context: ProvisioningContext,
+    client,
+    request: Dict,
+    poll_delay: float
+) -> None:
+    """
+    Inserts a Compute Engine resource and waits for the operation.
+    
+    A resource left behind by an earlier attempt is reused as is. The wait
+    goes through the shared operation poller rather than a blocked thread.
+    """
+    try:
+        operation = await client.insert(request=request)
+    except Exception as error:
+        if _is_already_exists(error):
+            return
+        raise
+    await get_operation_poller().wait_compute(
+        operation, request["project"],
+        context.client_manager.get_operations_async_client(),
+        COMPUTE_OPERATION_TIMEOUT, initial_delay=poll_delay
+    )
+
+
+async def _wait_for_tenant_project(
+    context: ProvisioningContext,
+    projects_client,
+    project_id: str
+) -> bool:
+    """
+    Waits for an existing project to become active, if it is the tenant's.
+    
+    The operation of the call that created it is lost, so the project's
+    state is polled instead. A project that is not visible yet is polled
+    until it is.
+    
+    Returns:
+        True once the project is active, False if it is labelled for
+        another tenant or being deleted
+    """
+    deadline = time.monotonic() + PROJECT_CREATION_TIMEOUT
+    attempt = 0
+    while True:
+        project = await _get_if_exists(projects_client.get_project(
+            request={"name": f"projects/{project_id}"}
+        ))
+        if project is not None:
+            if (
+                project.labels.get("tenant-id") != context.tenant_id
+                or project.state.name == "DELETE_REQUESTED"
+            ):
+                return False
+            if project.state.name == "ACTIVE":
+                return True
+        if time.monotonic() >= deadline:
+            raise asyncio.TimeoutError(
+                f"Project {project_id} not active after {PROJECT_CREATION_TIMEOUT:.0f}s"
+            )
+        await asyncio.sleep(backoff_delay(
+            attempt, PROJECT_ACTIVATION_POLL_DELAY, VALIDATION_MAX_DELAY
+        ))
+        attempt += 1
+
+
+async def _get_if_exists(call: Awaitable) -> Any:
+    """Awaits a get call, returning None if the resource does not exist."""
+    try:
+        return await call
+    except Exception as error:
+        if _is_not_found(error):
+            return None
+        raise
+
+
+async def _exists(call: Awaitable) -> bool:
+    """Awaits a get call, returning whether the resource exists."""
+    return await _get_if_exists(call) is not None
+
+
+def _config_gcs_path(bucket_name: str) -> str:
+    """GCS path of the tenant's nlweb_config.yml in its config bucket."""
+    return f"gs://{bucket_name}/nlweb_config.yml"
+
+
+def _is_already_exists(error: Exception) -> bool:
+    """Whether a GCP error means the resource already exists (HTTP 409)."""
+    from google.api_core import exceptions as gcp_exceptions
+    
+    # Aborted is also a 409, but means a concurrent modification
+    return (
+        isinstance(error, gcp_exceptions.Conflict)
+        and not isinstance(error, gcp_exceptions.Aborted)
+    )
+
+
+def _is_not_found(error: Exception) -> bool:
+    """Whether a GCP error means the resource does not exist (HTTP 404)."""
+    from google.api_core import exceptions as gcp_exceptions
+    
+    return isinstance(error, gcp_exceptions.NotFound)
+
+
+async def _tear_down_tenant(
+    tenant_id: str,
+    resources: Dict[str, Any],
+    client_manager: Optional[GCPClientManager],
+    store: CheckpointStore,
+    dns_manager: Optional["DNSManager"] = None
+) -> Dict[str, Any]:
+    """
+    Deletes a tenant's checkpointed resources and then its checkpoints.
+    
+    A project or config bucket that was being created when its attempt
+    stopped is deleted as well; if it was never created, there is nothing
+    to delete.
+    
+    Raises:
+        CleanupError: If resources could not be deleted
+    """
+    from nlyzer.gcp.teardown import tear_down
+    
+    if PROJECT_ID_INTENT in resources and "create_project" not in resources:
+        resources = {**resources, "create_project": resources[PROJECT_ID_INTENT]}
+    if BUCKET_NAME_INTENT in resources and "create_config_storage" not in resources:
+        bucket_name = resources[BUCKET_NAME_INTENT]
+        resources = {
+            **resources,
+            "create_config_storage": (bucket_name, _config_gcs_path(bucket_name))
+        }
+    context = ProvisioningContext(
+        tenant_id=tenant_id,
+        config={},
+        client_manager=with_resilience(client_manager or GCPClientManager()),
+        outputs=dict(resources),
+        dns_manager=dns_manager
+    )
+    with get_tracer().span(
+        "teardown_tenant", tenant_id=tenant_id, project_id=context.project_id
+    ) as span:
+        report = await tear_down(
+            PROVISIONING_GRAPH, resources, TEARDOWN_ACTIONS, context
+        )
+        span.set_attributes(
+            deleted=report.deleted,
+            failed=sorted(report.failed),
+            critical_path=report.execution.critical_path
+        )
+        if not report.succeeded:
+            span.set_error(f"Failed to delete {', '.join(sorted(report.failed))}")
+    
+    # Deleting the project also deletes whatever inside it failed to delete
+    if "create_project" in report.deleted:
+        leftovers = [name for name in report.failed if name in EXTERNAL_RESOURCE_STEPS]
+    else:
+        leftovers = list(report.failed)
+    if leftovers:
+        raise CleanupError(
+            "; ".join(f"{name}: {report.failed[name]}" for name in leftovers),
+            tenant_id=tenant_id,
+            project_id=context.project_id,
+            failed_resources=leftovers
+        )
+    
+    await store.delete_run(tenant_id)
+    logger.info(
+        f"Tore down {len(report.deleted)} resource groups of tenant {tenant_id} "
+        f"in {report.execution.elapsed_seconds:.1f}s; critical path: "
+        f"{' -> '.join(report.execution.critical_path)}"
+    )
+    return {
+        "tenant_id": tenant_id,
+        "project_id": context.project_id,
+        "teardown": report.to_dict()
+    }
+
+
+def _generate_nlweb_config(project_id: str, config: Dict) -> str:
+    """
+    Generates nlweb_config.yml for the tenant.
+    
+    JSON is valid YAML, so the document is serialized with the standard
+    library. Credentials are referenced by secret name, never inlined.
+    """
+    document = {
+        "project_id": project_id,
+        "agent_type": config.get("agent_type"),
+        "data_source_type": config.get("data_source_type"),
+        "secrets": {
+            key: f"projects/{project_id}/secrets/{_secret_id(key)}/versions/latest"
+            for key in config.get("credentials", {})
+        }
+    }
+    return json.dumps(document, indent=2) + "\n"
+
+
+def _secret_id(credential_key: str) -> str:
+    """Secret Manager ID for a tenant credential."""
+    return f"tenant-{credential_key.lower().replace('_', '-')}"
+
+
+def _weaviate_instance_name(context: ProvisioningContext) -> str:
+    """Compute Engine instance name of the tenant's Weaviate server."""
+    return f"weaviate-{context.short_id}"
+
+
+def _weaviate_hostname(context: ProvisioningContext) -> str:
+    """Zonal internal DNS name of the Weaviate instance."""
+    return (
+        f"{_weaviate_instance_name(context)}.{_zone()}"
+        f".c.{context.project_id}.internal"
+    )
+
+
+def _weaviate_url(host: str) -> str:
+    """Weaviate endpoint for an instance's internal IP or hostname."""
+    return f"http://{host}:{WEAVIATE_PORT}"
+
+
+def _region() -> str:
+    """Region for tenant Cloud Run services and buckets."""
+    return getattr(settings, "GCP_REGION", None) or "us-central1"
+
+
+def _zone() -> str:
+    """Zone for tenant Compute Engine instances."""
+    return getattr(settings, "GCP_ZONE", None) or "us-central1-a"
@@ -0,0 +1,540 @@
+"""
+GCP API Quota Budgets
+
+GCP rate-limits API calls per consumer project, i.e. per control-plane
+project for every call the provisioner makes, no matter which tenant
+project the call targets. Provisioning many tenants at once therefore
+shares one set of quotas, and calls beyond them fail with HTTP 429 /
+RESOURCE_EXHAUSTED.
+
+This module keeps a client-side budget per quota so calls are paced
+before GCP has to reject them:
+
+- API budgets, keyed by service name (e.g. "compute.googleapis.com"), and
+  optional method budgets for calls with their own, lower quota (e.g.
+  project creation)
+- Regional budgets for APIs whose quotas are per region (Compute Engine,
+  Cloud Run), keyed by service name and region
+
+Each budget is a token bucket whose rate adapts: it is halved whenever a
+call is throttled and creeps back towards the configured rate with every
+successful call. Throttled calls are retried with backoff instead of
+failing the provisioning step.
+
+Usage:
+    quotas = get_quota_manager()
+    client_manager = QuotaLimitedClientManager(GCPClientManager(), quotas)
+    projects_client = client_manager.get_projects_async_client()
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from nlyzer.gcp.dns_resolver import backoff_delay
+from nlyzer.gcp.namecheap import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QuotaLimit:
+    """
+    Sustained request rate and burst allowed by a quota.
+    
+    Attributes:
+        rate: Requests per second
+        burst: Requests that may be sent at once
+    """
+    
+    rate: float
+    burst: int
+
+
+# Budgets per API, and per method where a call has its own quota. Set below
+# the GCP defaults so other callers of the control-plane project keep
+# headroom.
+DEFAULT_API_QUOTAS = {
+    "cloudresourcemanager.googleapis.com": QuotaLimit(rate=8.0, burst=10),
+    # Project creation and deletion are limited separately and far more tightly
+    "cloudresourcemanager.googleapis.com/create_project": QuotaLimit(rate=0.5, burst=5),
+    "cloudresourcemanager.googleapis.com/delete_project": QuotaLimit(rate=0.5, burst=5),
+    "cloudbilling.googleapis.com": QuotaLimit(rate=4.0, burst=5),
+    "iam.googleapis.com": QuotaLimit(rate=5.0, burst=5),
+    "iam.googleapis.com/create_service_account": QuotaLimit(rate=1.0, burst=3),
+    "secretmanager.googleapis.com": QuotaLimit(rate=8.0, burst=20),
+    "storage.googleapis.com": QuotaLimit(rate=5.0, burst=10),
+    "compute.googleapis.com": QuotaLimit(rate=15.0, burst=20),
+    "run.googleapis.com": QuotaLimit(rate=2.0, burst=5),
+}
+
+# Budgets applied per region for APIs with regional quotas
+DEFAULT_REGIONAL_QUOTAS = {
+    "compute.googleapis.com": QuotaLimit(rate=8.0, burst=10),
+    "run.googleapis.com": QuotaLimit(rate=1.0, burst=3),
+}
+
+# Service behind each async client accessor of GCPClientManager
+CLIENT_SERVICES = {
+    "get_projects_async_client": "cloudresourcemanager.googleapis.com",
+    "get_billing_async_client": "cloudbilling.googleapis.com",
+    "get_iam_async_client": "iam.googleapis.com",
+    "get_secrets_async_client": "secretmanager.googleapis.com",
+    "get_storage_async_client": "storage.googleapis.com",
+    "get_instances_async_client": "compute.googleapis.com",
+    "get_networks_async_client": "compute.googleapis.com",
+    "get_firewalls_async_client": "compute.googleapis.com",
+    "get_operations_async_client": "compute.googleapis.com",
+    "get_run_services_async_client": "run.googleapis.com",
+}
+
+# Adaptive rate: multiplied by this on every throttled call...
+THROTTLE_BACKOFF_FACTOR = 0.5
+# ...never below this fraction of the configured rate...
+MIN_RATE_FRACTION = 0.05
+# ...and raised by this fraction of the configured rate per successful call
+RECOVERY_FRACTION = 0.05
+
+# Throttled calls already in flight when the rate was cut report in right
+# after it; the rate is cut at most once within this many seconds
+THROTTLE_COOLDOWN = 1.0
+
+# Retries of a throttled call, and the backoff applied between them. With
+# these values a call keeps trying for several minutes before giving up.
+DEFAULT_MAX_THROTTLE_RETRIES = 8
+DEFAULT_THROTTLE_RETRY_DELAY = 1.0
+DEFAULT_MAX_THROTTLE_RETRY_DELAY = 60.0
+
+# Client attributes that are not API calls and bypass the budgets
+_UNMETERED_ATTRIBUTES = frozenset({"run_blocking", "sync_client"})
+
+_LOCATION_PATTERN = re.compile(r"(?:^|/)(?:locations|regions|zones)/([a-z0-9-]+)")
+
+
+class QuotaBudget:
+    """
+    Adaptive token bucket for one quota.
+    
+    Shared by every coroutine calling the API, so the combined rate of all
+    concurrent provisioning runs stays within the quota.
+    """
+    
+    def __init__(self, name: str, limit: QuotaLimit):
+        """
+        Initialize a budget at its configured rate.
+        
+        Args:
+            name: Quota key, used in logs and statistics
+            limit: Configured rate and burst
+        """
+        self.name = name
+        self.limit = limit
+        self._bucket = TokenBucket(rate=limit.rate, burst=limit.burst)
+        self._lock = threading.Lock()
+        self._reduced_at = float("-inf")
+        
+        self._throttled = 0
+    
+    @property
+    def rate(self) -> float:
+        """Current, possibly reduced, request rate."""
+        return self._bucket.rate
+    
+    async def acquire(self) -> float:
+        """
+        Wait until the budget admits a call.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        return await self._bucket.acquire()
+    
+    def record_success(self) -> None:
+        """Raise the rate back towards the configured limit."""
+        if self._bucket.rate < self.limit.rate:
+            with self._lock:
+                self._bucket.set_rate(min(
+                    self.limit.rate,
+                    self._bucket.rate + self.limit.rate * RECOVERY_FRACTION
+                ))
+    
+    def record_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Slow down after GCP rejected a call for exceeding the quota.
+        
+        Args:
+            retry_after: Seconds GCP asked to wait, if known. Defaults to
+                        one token interval at the reduced rate.
+        """
+        with self._lock:
+            self._throttled += 1
+            now = time.monotonic()
+            reduce = now - self._reduced_at >= THROTTLE_COOLDOWN
+            if reduce:
+                self._reduced_at = now
+                self._bucket.set_rate(max(
+                    self.limit.rate * MIN_RATE_FRACTION,
+                    self._bucket.rate * THROTTLE_BACKOFF_FACTOR
+                ))
+            rate = self._bucket.rate
+            self._bucket.penalize(
+                retry_after if retry_after is not None else 1.0 / rate
+            )
+        if reduce:
+            logger.warning(f"Quota {self.name} throttled; rate reduced to {rate:.2f}/s")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get budget statistics.
+        
+        Returns:
+            Dictionary with configured and current rate, throttled calls and
+            the token bucket statistics
+        """
+        return {
+            "limit_rate": self.limit.rate,
+            "rate": self._bucket.rate,
+            "throttled": self._throttled,
+            **self._bucket.get_stats()
+        }
+
+
+class QuotaManager:
+    """
+    Registry of quota budgets, created on first use.
+    """
+    
+    def __init__(
+        self,
+        api_quotas: Optional[Dict[str, QuotaLimit]] = None,
+        regional_quotas: Optional[Dict[str, QuotaLimit]] = None,
+        max_throttle_retries: int = DEFAULT_MAX_THROTTLE_RETRIES,
+        throttle_retry_delay: float = DEFAULT_THROTTLE_RETRY_DELAY,
+        max_throttle_retry_delay: float = DEFAULT_MAX_THROTTLE_RETRY_DELAY
+    ):
+        """
+        Initialize the manager.
+        
+        Args:
+            api_quotas: Budgets by service name or "service/method".
+                       Defaults to DEFAULT_API_QUOTAS.
+            regional_quotas: Per-region budgets by service name. Defaults
+                            to DEFAULT_REGIONAL_QUOTAS.
+            max_throttle_retries: Retries of a throttled call
+            throttle_retry_delay: Initial backoff after a throttled call
+            max_throttle_retry_delay: Upper bound for the backoff
+        """
+        self.api_quotas = DEFAULT_API_QUOTAS if api_quotas is None else api_quotas
+        self.regional_quotas = (
+            DEFAULT_REGIONAL_QUOTAS if regional_quotas is None else regional_quotas
+        )
+        self.max_throttle_retries = max_throttle_retries
+        self.throttle_retry_delay = throttle_retry_delay
+        self.max_throttle_retry_delay = max_throttle_retry_delay
+        
+        self._budgets: Dict[str, QuotaBudget] = {}
+        self._lock = threading.Lock()
+    
+    def budgets_for(
+        self,
+        service: str,
+        method: str,
+        region: Optional[str] = None
+    ) -> List[QuotaBudget]:
+        """
+        Get every budget a call draws from.
+        
+        Args:
+            service: Service name, e.g. "compute.googleapis.com"
+            method: Client method name, e.g. "insert"
+            region: Region the call targets, if any
+        
+        Returns:
+            Budgets of the API, the method and the region that apply
+        """
+        keys = [
+            (key, self.api_quotas[key])
+            for key in (service, f"{service}/{method}")
+            if key in self.api_quotas
+        ]
+        if region and service in self.regional_quotas:
+            keys.append((f"{service}@{region}", self.regional_quotas[service]))
+        return [self._get_budget(key, limit) for key, limit in keys]
+    
+    async def call(
+        self,
+        service: str,
+        method: str,
+        region: Optional[str],
+        func,
+        *args,
+        **kwargs
+    ) -> Any:
+        """
+        Make an API call within its budgets, retrying throttled attempts.
+        
+        Args:
+            service: Service name
+            method: Client method name
+            region: Region the call targets, if any
+            func: Coroutine function making the call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            The call's result
+        
+        Raises:
+            The call's error, including a quota error once the retries
+            are exhausted
+        """
+        budgets = self.budgets_for(service, method, region)
+        attempt = 0
+        while True:
+            for budget in budgets:
+                await budget.acquire()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as error:
+                if not is_quota_error(error) or attempt >= self.max_throttle_retries:
+                    raise
+                for budget in budgets:
+                    budget.record_throttled()
+                delay = backoff_delay(
+                    attempt, self.throttle_retry_delay, self.max_throttle_retry_delay
+                )
+                logger.info(
+                    f"{service} {method} throttled (attempt {attempt + 1}); "
+                    f"retrying in {delay:.1f}s"
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            
+            for budget in budgets:
+                budget.record_success()
+            return result
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics of every budget used so far.
+        
+        Returns:
+            Budget statistics by quota key
+        """
+        with self._lock:
+            budgets = dict(self._budgets)
+        return {key: budget.get_stats() for key, budget in budgets.items()}
+    
+    def _get_budget(self, key: str, limit: QuotaLimit) -> QuotaBudget:
+        """Get or create the budget for a quota key."""
+        budget = self._budgets.get(key)
+        if budget is None:
+            with self._lock:
+                budget = self._budgets.get(key)
+                if budget is None:
+                    budget = QuotaBudget(key, limit)
+                    self._budgets[key] = budget
+        return budget
+
+
+class QuotaLimitedClient:
+    """
+    Wrapper that routes every API call of a client through its budgets.
+    
+    Coroutine methods are metered; other attributes, and run_blocking on
+    AsyncClientAdapter, are returned unchanged.
+    """
+    
+    def __init__(
+        self,
+        client: Any,
+        service: str,
+        quotas: QuotaManager,
+        on_exhausted=None
+    ):
+        """
+        Wrap an async client.
+        
+        Args:
+            client: Async GCP client or AsyncClientAdapter
+            service: Service name of the client
+            quotas: Quota manager holding the budgets
+            on_exhausted: Optional callable invoked when a call gives up
+                         after exhausting its throttle retries
+        """
+        self._client = client
+        self._service = service
+        self._quotas = quotas
+        self._on_exhausted = on_exhausted
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if name in _UNMETERED_ATTRIBUTES or not inspect.iscoroutinefunction(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        async def _call(*args, **kwargs):
+            try:
+                return await self._quotas.call(
+                    self._service, name, request_region(args, kwargs),
+                    attribute, *args, **kwargs
+                )
+            except Exception as error:
+                if is_quota_error(error):
+                    logger.error(
+                        f"{self._service} {name} still throttled after all retries"
+                    )
+                    if self._on_exhausted is not None:
+                        self._on_exhausted(self._service, name)
+                raise
+        
+        return _call
+
+
+class QuotaLimitedClientManager:
+    """
+    GCPClientManager facade whose async clients respect quota budgets.
+    
+    Any attribute other than the async client accessors is forwarded to
+    the wrapped manager.
+    """
+    
+    def __init__(
+        self,
+        client_manager: Any,
+        quotas: Optional[QuotaManager] = None,
+        on_exhausted=None
+    ):
+        """
+        Wrap a client manager.
+        
+        Args:
+            client_manager: GCPClientManager to wrap
+            quotas: Quota manager holding the budgets. Defaults to the
+                   process-wide manager.
+            on_exhausted: Optional callable invoked with the service and
+                         method of a call that stayed throttled after all
+                         retries
+        """
+        self._client_manager = client_manager
+        self._quotas = quotas or get_quota_manager()
+        self._on_exhausted = on_exhausted
+    
+    @property
+    def wrapped(self) -> Any:
+        """The wrapped client manager."""
+        return self._client_manager
+    
+    def for_project(self, project_id: str) -> "QuotaLimitedClientManager":
+        """
+        Get a facade for another project that shares the same budgets.
+        
+        Budgets are per consumer project, which stays the control-plane
+        project when calls target a tenant project.
+        """
+        return QuotaLimitedClientManager(
+            self._client_manager.for_project(project_id),
+            self._quotas,
+            on_exhausted=self._on_exhausted
+        )
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client_manager, name)
+        service = CLIENT_SERVICES.get(name)
+        if service is None:
+            return attribute
+        
+        def _get_client():
+            return QuotaLimitedClient(
+                attribute(), service, self._quotas,
+                on_exhausted=self._on_exhausted
+            )
+        
+        return _get_client
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """
+    Whether an error means a GCP quota or rate limit was exceeded.
+    
+    Args:
+        error: Exception raised by a GCP client call
+    
+    Returns:
+        True for HTTP 429 and gRPC RESOURCE_EXHAUSTED errors
+    """
+    from google.api_core import exceptions as gcp_exceptions
+    
+    return isinstance(error, gcp_exceptions.TooManyRequests)
+
+
+def request_region(args: tuple, kwargs: Dict[str, Any]) -> Optional[str]:
+    """
+    Find the region a call targets from its request.
+    
+    Looks at the zone/region fields of Compute Engine requests and at
+    resource names such as "projects/p/locations/us-central1".
+    
+    Args:
+        args: Positional arguments of the client call
+        kwargs: Keyword arguments of the client call
+    
+    Returns:
+        The region, or None if the call is global or names no location
+    """
+    request = kwargs.get("request")
+    if request is None and args:
+        request = args[0]
+    fields = dict(kwargs)
+    if isinstance(request, dict):
+        fields.update(request)
+    
+    for key in ("region", "zone"):
+        value = fields.get(key)
+        if isinstance(value, str) and value:
+            return _zone_region(value.rsplit("/", 1)[-1]) if key == "zone" else value
+    for key in ("parent", "name"):
+        value = fields.get(key)
+        if isinstance(value, str):
+            match = _LOCATION_PATTERN.search(value)
+            if match:
+                return _zone_region(match.group(1))
+    return None
+
+
+def _zone_region(location: str) -> str:
+    """Map a zone such as "us-central1-a" to its region; regions pass through."""
+    parts = location.split("-")
+    if len(parts) == 3 and len(parts[2]) == 1:
+        return f"{parts[0]}-{parts[1]}"
+    return location
+
+
+# Process-wide quota manager, created on first use
+_quota_manager: Optional[QuotaManager] = None
+_quota_manager_lock = threading.Lock()
+
+
+def get_quota_manager() -> QuotaManager:
+    """
+    Get the process-wide quota manager, creating it on first use.
+    
+    Quotas are shared by every call from the control-plane project, so all
+    provisioning in the process draws from the same budgets by default.
+    
+    Returns:
+        The shared QuotaManager instance
+    """
+    global _quota_manager
+    if _quota_manager is None:
+        with _quota_manager_lock:
+            if _quota_manager is None:
+                _quota_manager = QuotaManager()
+    return _quota_manager
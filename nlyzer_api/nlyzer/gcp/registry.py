@@ -0,0 +1,353 @@
+"""
+Process-Wide GCP Client Registry
+
+This module provides a single, process-wide registry that owns the expensive
+parts of talking to Google Cloud: the Application Default Credentials and the
+client instances (and therefore their gRPC/HTTP transports).
+
+Every GCPClientManager in the process resolves its credentials and clients
+through the registry, so creating a manager per tenant or per DNSManager no
+longer repeats google.auth.default() or opens new channels. Clients are keyed
+by (service, project): services whose clients are project-agnostic (the
+project is passed per request) share one instance across all tenant
+projects, while project-bound clients such as Cloud Storage get one entry per
+project. Asyncio clients are additionally tied to the event loop they were
+created on. The number of cached clients is bounded with LRU eviction, so a
+control plane handling thousands of tenant projects keeps flat memory.
+Clients that leave the registry are dropped, not closed: other managers or
+coroutines may still be using them, and their transports are released when
+the last reference goes away.
+
+Usage:
+    registry = get_client_registry()
+    credentials, detected_project = registry.get_default_credentials()
+    client = registry.get_client('storage', 'tenant-project', factory)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from nlyzer.gcp.credentials import CredentialRefresher
+from nlyzer.gcp.exceptions import AuthenticationError
+from nlyzer.gcp.metrics import ClientMetrics
+
+if TYPE_CHECKING:
+    from google.auth.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cached client instances across all services and projects
+DEFAULT_MAX_CLIENTS = 256
+
+# Maximum number of worker threads used to run blocking client calls for
+# services that do not ship an asyncio transport (Cloud Storage, Compute Engine)
+BLOCKING_IO_WORKERS = 16
+
+RegistryKey = Tuple[str, Optional[str]]
+
+# A cached client and the event loop it is bound to (None if loop-agnostic)
+RegistryEntry = Tuple[Any, Optional[asyncio.AbstractEventLoop]]
+
+
+def _application_default_credentials() -> Tuple["Credentials", Optional[str]]:
+    """
+    Resolve Application Default Credentials, importing google.auth on first use.
+    
+    Returns:
+        Tuple of (credentials, detected_project_id)
+    """
+    from google.auth import default
+    
+    return default()
+
+
+class ClientRegistry:
+    """
+    Shared cache of GCP credentials and client instances.
+    
+    Clients are stored in LRU order under a (service, project_id) key, with
+    project_id set to None for clients that can serve any project. When the
+    registry holds more than ``max_clients`` entries the least recently used
+    one is dropped. An asyncio client serves the event loop it was created
+    on; requested from another loop, it is replaced. Replaced, evicted and
+    cleared clients are only dereferenced, never closed, since callers that
+    obtained them earlier may still be using them.
+    
+    Thread Safety:
+    Credential resolution and client creation are single-flight: concurrent
+    callers for the same key wait for one factory call. Creation of
+    different keys proceeds in parallel.
+    
+    Attributes:
+        metrics: Process-wide ClientMetrics for all managers on this registry
+    """
+    
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS):
+        """
+        Initialize the registry.
+        
+        Args:
+            max_clients: Maximum number of client instances to keep cached
+        """
+        if max_clients < 1:
+            raise ValueError("max_clients must be at least 1")
+        
+        self._max_clients = max_clients
+        self._clients: "OrderedDict[RegistryKey, RegistryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._creation_locks: Dict[RegistryKey, threading.Lock] = {}
+        
+        self._credentials: Optional["Credentials"] = None
+        self._detected_project: Optional[str] = None
+        self._credentials_lock = threading.Lock()
+        self._refresher: Optional[CredentialRefresher] = None
+        
+        self._blocking_executor: Optional[ThreadPoolExecutor] = None
+        
+        self.metrics = ClientMetrics()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    # ========================================================================
+    # Credentials
+    # ========================================================================
+    
+    def get_default_credentials(self) -> Tuple["Credentials", Optional[str]]:
+        """
+        Get the process-wide Application Default Credentials.
+        
+        google.auth.default() is called once per process; later callers
+        receive the same credentials object.
+        
+        Returns:
+            Tuple of (credentials, detected_project_id)
+        
+        Raises:
+            AuthenticationError: If authentication fails
+        """
+        if self._credentials is not None:
+            return self._credentials, self._detected_project
+        
+        with self._credentials_lock:
+            if self._credentials is None:
+                try:
+                    credentials, detected_project = _application_default_credentials()
+                except Exception as error:
+                    error_message = (
+                        f"Failed to initialize GCP authentication: {str(error)}"
+                    )
+                    logger.error(error_message)
+                    raise AuthenticationError(error_message)
+                
+                self._detected_project = detected_project
+                self._credentials = credentials
+                logger.info("Resolved process-wide GCP Application Default Credentials")
+        
+        return self._credentials, self._detected_project
+    
+    def get_credential_refresher(self) -> CredentialRefresher:
+        """
+        Get the refresher coordinating token refreshes for the shared credentials.
+        
+        The refresher is created on first use but not started; call
+        ``start()`` on it (or GCPClientManager.start_credential_refresh())
+        to enable background refresh.
+        
+        Returns:
+            CredentialRefresher for the process-wide credentials
+        
+        Raises:
+            AuthenticationError: If authentication fails
+        """
+        credentials, _ = self.get_default_credentials()
+        with self._credentials_lock:
+            if self._refresher is None:
+                self._refresher = CredentialRefresher(credentials)
+            return self._refresher
+    
+    # ========================================================================
+    # Clients
+    # ========================================================================
+    
+    def get_client(
+        self,
+        service: str,
+        project_id: Optional[str],
+        client_factory: Callable[[], Any],
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Any:
+        """
+        Get a cached client or create it with the given factory.
+        
+        Args:
+            service: Service name of the client (e.g. 'secrets', 'storage')
+            project_id: Project the client is bound to, or None if the
+                       client can serve any project
+            client_factory: Function that creates the client instance
+            loop: Event loop an asyncio client is bound to, or None for
+                 clients usable from any thread. A client cached for
+                 another loop is replaced.
+        
+        Returns:
+            The client instance
+        """
+        key = (service, project_id)
+        
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[1] is loop:
+                self._clients.move_to_end(key)
+                self._hits += 1
+                self.metrics.record_cache_hit(service)
+                return entry[0]
+            creation_lock = self._creation_locks.setdefault(key, threading.Lock())
+        
+        with creation_lock:
+            with self._lock:
+                entry = self._clients.get(key)
+                if entry is not None and entry[1] is loop:
+                    self._clients.move_to_end(key)
+                    self._hits += 1
+                    self.metrics.record_cache_hit(service)
+                    return entry[0]
+            
+            self.metrics.record_cache_miss(service)
+            started = time.perf_counter()
+            client = client_factory()
+            self.metrics.record_creation(service, time.perf_counter() - started)
+            
+            with self._lock:
+                self._misses += 1
+                if self._clients.pop(key, None) is not None:
+                    logger.debug(f"Replaced {service} client of another event loop")
+                self._clients[key] = (client, loop)
+                self._evict_over_capacity()
+                self._creation_locks.pop(key, None)
+        
+        logger.debug(f"Registered new {service} client (project={project_id})")
+        return client
+    
+    def _evict_over_capacity(self) -> None:
+        """
+        Drop least recently used clients until within capacity.
+        
+        The caller holds the lock.
+        """
+        while len(self._clients) > self._max_clients:
+            (service, project_id), _ = self._clients.popitem(last=False)
+            self._evictions += 1
+            self.metrics.record_eviction(service)
+            logger.debug(f"Evicted {service} client (project={project_id})")
+    
+    def evict(self, service: str, project_id: Optional[str] = None) -> bool:
+        """
+        Remove a single client from the registry.
+        
+        Args:
+            service: Service name of the client
+            project_id: Project the client is bound to, or None
+        
+        Returns:
+            True if a client was removed, False if it was not cached
+        """
+        with self._lock:
+            return self._clients.pop((service, project_id), None) is not None
+    
+    def evict_project(self, project_id: str) -> int:
+        """
+        Remove all clients bound to a project, e.g. after tenant deletion.
+        
+        Args:
+            project_id: Project whose clients should be dropped
+        
+        Returns:
+            Number of clients removed
+        """
+        with self._lock:
+            keys = [key for key in self._clients if key[1] == project_id]
+            for key in keys:
+                del self._clients[key]
+        return len(keys)
+    
+    def get_blocking_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the shared thread pool for blocking client calls.
+        
+        Used by async adapters around clients without an asyncio transport.
+        A dedicated, bounded pool keeps slow GCP calls from starving the
+        event loop's default executor.
+        
+        Returns:
+            The process-wide ThreadPoolExecutor
+        """
+        with self._lock:
+            if self._blocking_executor is None:
+                self._blocking_executor = ThreadPoolExecutor(
+                    max_workers=BLOCKING_IO_WORKERS,
+                    thread_name_prefix="gcp-blocking-io"
+                )
+            return self._blocking_executor
+    
+    def clear(self) -> None:
+        """
+        Drop all cached clients and the credentials.
+        
+        The next access re-runs google.auth.default() and recreates clients.
+        """
+        with self._lock:
+            self._clients.clear()
+            self._creation_locks.clear()
+        with self._credentials_lock:
+            if self._refresher is not None:
+                self._refresher.stop()
+                self._refresher = None
+            self._credentials = None
+            self._detected_project = None
+        logger.info("Cleared process-wide GCP client registry")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get registry size and cache statistics.
+        
+        Returns:
+            Dictionary with size, max_clients, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "size": len(self._clients),
+                "max_clients": self._max_clients,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions
+            }
+    
+    def __len__(self) -> int:
+        return len(self._clients)
+    
+    def __contains__(self, key: RegistryKey) -> bool:
+        return key in self._clients
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Get the process-wide client registry, creating it on first use.
+    
+    Returns:
+        The shared ClientRegistry instance
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
@@ -0,0 +1,633 @@
+"""
+Retry Policies, Retry Budgets and Circuit Breakers for GCP Calls
+
+Every GCP client call made during provisioning goes through this layer:
+
+- Classification: is_transient decides whether a failure may go away on
+  its own (503, 500, 504, 429, aborted transactions, timeouts) or is
+  permanent (not found, permission denied, invalid argument). Provisioning
+  errors carry a retryable flag and otherwise defer to the GCP error they
+  wrap.
+- Retry policy: transient failures are retried with capped exponential
+  backoff and jitter; permanent ones are raised at once. Throttled calls
+  (429) are left to the quota budgets of nlyzer.gcp.quotas.
+- Retry budgets, per service: retries may add at most a fraction of the
+  service's recent requests (plus a small floor). During an outage the
+  budget runs dry quickly, so retries cannot multiply the load on a
+  struggling service.
+- Circuit breakers, per service and region: after a run of transient
+  failures the breaker opens and calls fail immediately with
+  CircuitOpenError. After a cooldown a single probe call is let through;
+  its outcome closes the breaker or reopens it for twice as long.
+- Tracing: every attempt is traced as a client span (see
+  nlyzer.gcp.tracing), so retries show up in a run's trace.
+
+A regional incident therefore costs a handful of failed calls per region
+instead of thousands of doomed retries, while calls to healthy regions and
+services proceed normally.
+
+Usage:
+    client_manager = with_resilience(GCPClientManager())
+    projects_client = client_manager.get_projects_async_client()
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from nlyzer.gcp.dns_resolver import backoff_delay
+from nlyzer.gcp.exceptions import CircuitOpenError, ProvisioningError
+from nlyzer.gcp.quotas import CLIENT_SERVICES, is_quota_error, request_region
+from nlyzer.gcp.tracing import SPAN_KIND_CLIENT, get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Retries of a transient failure, and the backoff between them
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_MAX_RETRY_DELAY = 20.0
+
+# Retries allowed per service: this fraction of the requests of the last
+# RETRY_BUDGET_WINDOW seconds, plus RETRY_BUDGET_MIN_RETRIES
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN_RETRIES = 10
+RETRY_BUDGET_WINDOW = 60.0
+
+# Consecutive transient failures that open a breaker, and how long it
+# stays open before a probe; the cooldown doubles up to the maximum while
+# probes keep failing
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+BREAKER_MAX_RESET_TIMEOUT = 120.0
+
+# Circuit breaker states
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Client attributes that are not API calls and are not wrapped
+_UNWRAPPED_ATTRIBUTES = frozenset({"run_blocking", "sync_client"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often and how patiently to retry transient failures.
+    
+    Attributes:
+        max_attempts: Attempts per call, including the first
+        initial_delay: Backoff before the first retry
+        max_delay: Upper bound for the backoff
+    """
+    
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    initial_delay: float = DEFAULT_RETRY_DELAY
+    max_delay: float = DEFAULT_MAX_RETRY_DELAY
+
+
+class RetryBudget:
+    """
+    Caps the retries of one service relative to its request volume.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        ratio: float = RETRY_BUDGET_RATIO,
+        min_retries: int = RETRY_BUDGET_MIN_RETRIES,
+        window: float = RETRY_BUDGET_WINDOW
+    ):
+        """
+        Initialize the budget.
+        
+        Args:
+            name: Service the budget applies to
+            ratio: Retries allowed per request within the window
+            min_retries: Retries allowed within the window regardless of
+                        the request volume
+            window: Seconds of history considered
+        """
+        self.name = name
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+        self._denied = 0
+    
+    def record_request(self) -> None:
+        """Count a first attempt."""
+        with self._lock:
+            self._requests.append(time.monotonic())
+    
+    def try_acquire_retry(self) -> bool:
+        """
+        Take a retry from the budget.
+        
+        Returns:
+            True if the retry may be made, False if the budget is spent
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            allowed = self.min_retries + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                self._denied += 1
+                return False
+            self._retries.append(time.monotonic())
+            return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get budget statistics.
+        
+        Returns:
+            Dictionary with requests and retries in the current window and
+            the number of retries denied so far
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "denied": self._denied
+            }
+    
+    def _prune(self, now: float) -> None:
+        """Drop history older than the window."""
+        for history in (self._requests, self._retries):
+            while history and now - history[0] > self.window:
+                history.popleft()
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while a service or region keeps failing.
+    """
+    
+    def __init__(
+        self,
+        service: str,
+        region: Optional[str] = None,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT
+    ):
+        """
+        Initialize the breaker in the closed state.
+        
+        Args:
+            service: Service the breaker guards
+            region: Region the breaker guards, or None for global calls
+            failure_threshold: Consecutive transient failures that open it
+            reset_timeout: Seconds open before the first probe
+            max_reset_timeout: Upper bound for the doubling cooldown
+        """
+        self.service = service
+        self.region = region
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._cooldown = reset_timeout
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        
+        self._times_opened = 0
+        self._rejected = 0
+    
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        return self._state
+    
+    def before_call(self) -> bool:
+        """
+        Admit or reject a call.
+        
+        Returns:
+            True if the call is the probe of a half-open breaker
+        
+        Raises:
+            CircuitOpenError: If the breaker is open, or half open with its
+                             probe call still in flight
+        """
+        with self._lock:
+            if self._state == BREAKER_CLOSED:
+                return False
+            
+            remaining = self._opened_at + self._cooldown - time.monotonic()
+            if self._state == BREAKER_OPEN and remaining <= 0:
+                self._state = BREAKER_HALF_OPEN
+            if self._state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"Circuit half open for {self._target()}; probing")
+                return True
+            
+            self._rejected += 1
+            raise CircuitOpenError(self.service, self.region, max(0.0, remaining))
+    
+    def record_success(self) -> None:
+        """Record a call that succeeded, or failed for a permanent reason."""
+        with self._lock:
+            if self._state != BREAKER_CLOSED:
+                logger.info(f"Circuit closed for {self._target()}")
+            self._state = BREAKER_CLOSED
+            self._failures = 0
+            self._cooldown = self.reset_timeout
+            self._probe_in_flight = False
+    
+    def abandon_probe(self) -> None:
+        """
+        Release a probe call that ended without an outcome, e.g. was
+        cancelled.
+        
+        Says nothing about the service, so the breaker stays half open and
+        the next call probes instead.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Record a call that failed with a transient error."""
+        with self._lock:
+            if self._state == BREAKER_HALF_OPEN:
+                self._cooldown = min(self.max_reset_timeout, self._cooldown * 2)
+                self._open()
+                return
+            self._failures += 1
+            if (
+                self._state == BREAKER_CLOSED
+                and self._failures >= self.failure_threshold
+            ):
+                self._open()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker statistics.
+        
+        Returns:
+            Dictionary with the state, consecutive failures, current
+            cooldown, times opened and calls rejected
+        """
+        return {
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "cooldown_seconds": self._cooldown,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected
+        }
+    
+    def _open(self) -> None:
+        """Open the breaker; the caller holds the lock."""
+        self._state = BREAKER_OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._times_opened += 1
+        logger.warning(
+            f"Circuit open for {self._target()} after {self._failures} "
+            f"consecutive failures; probing again in {self._cooldown:.0f}s"
+        )
+    
+    def _target(self) -> str:
+        return f"{self.service} in {self.region}" if self.region else self.service
+
+
+class ResilienceManager:
+    """
+    Registry of retry budgets and circuit breakers, created on first use.
+    """
+    
+    def __init__(
+        self,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget_ratio: float = RETRY_BUDGET_RATIO,
+        retry_budget_min_retries: int = RETRY_BUDGET_MIN_RETRIES,
+        retry_budget_window: float = RETRY_BUDGET_WINDOW,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT
+    ):
+        """
+        Initialize the manager.
+        
+        Args:
+            retry_policy: Retry policy for every call. Defaults to
+                         RetryPolicy().
+            retry_budget_ratio: Retries allowed per request, per service
+            retry_budget_min_retries: Retries allowed per service and
+                                     window regardless of volume
+            retry_budget_window: Seconds of history the budgets consider
+            failure_threshold: Consecutive transient failures that open a
+                              breaker
+            reset_timeout: Seconds a breaker stays open before a probe
+            max_reset_timeout: Upper bound for the breaker cooldown
+        """
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_min_retries = retry_budget_min_retries
+        self.retry_budget_window = retry_budget_window
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def budget_for(self, service: str) -> RetryBudget:
+        """Get the retry budget of a service."""
+        budget = self._budgets.get(service)
+        if budget is None:
+            with self._lock:
+                budget = self._budgets.setdefault(service, RetryBudget(
+                    service, self.retry_budget_ratio,
+                    self.retry_budget_min_retries, self.retry_budget_window
+                ))
+        return budget
+    
+    def breaker_for(self, service: str, region: Optional[str] = None) -> CircuitBreaker:
+        """Get the circuit breaker of a service, in a region if given."""
+        key = f"{service}@{region}" if region else service
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(
+                    service, region, self.failure_threshold,
+                    self.reset_timeout, self.max_reset_timeout
+                ))
+        return breaker
+    
+    async def call(
+        self,
+        service: str,
+        method: str,
+        region: Optional[str],
+        func,
+        *args,
+        **kwargs
+    ) -> Any:
+        """
+        Make an API call through its breaker, retrying transient failures.
+        
+        Args:
+            service: Service name
+            method: Client method name
+            region: Region the call targets, if any
+            func: Coroutine function making the call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            The call's result
+        
+        Raises:
+            CircuitOpenError: If the breaker rejects the call
+            The call's error, if it is permanent or retries are exhausted
+        """
+        breaker = self.breaker_for(service, region)
+        budget = self.budget_for(service)
+        budget.record_request()
+        attempt = 0
+        while True:
+            probe = breaker.before_call()
+            try:
+                with get_tracer().span(
+                    f"{service}.{method}", SPAN_KIND_CLIENT, gcp_service=service,
+                    gcp_method=method, gcp_region=region, attempt=attempt + 1
+                ):
+                    result = await func(*args, **kwargs)
+            except Exception as error:
+                # Throttling means the service is up, just busy; pacing and
+                # retrying throttled calls is left to nlyzer.gcp.quotas
+                throttled = is_quota_error(error)
+                transient = is_transient(error) and not throttled
+                if transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                
+                attempt += 1
+                if not transient or attempt >= self.retry_policy.max_attempts:
+                    raise
+                if not budget.try_acquire_retry():
+                    logger.warning(
+                        f"Retry budget of {service} spent; not retrying {method}"
+                    )
+                    raise
+                
+                delay = backoff_delay(
+                    attempt - 1, self.retry_policy.initial_delay,
+                    self.retry_policy.max_delay
+                )
+                logger.info(
+                    f"{service} {method} failed ({type(error).__name__}, attempt "
+                    f"{attempt}); retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled: the outcome is unknown, but a half-open breaker
+                # must not wait for this probe forever
+                if probe:
+                    breaker.abandon_probe()
+                raise
+            
+            breaker.record_success()
+            return result
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics of every budget and breaker used so far.
+        
+        Returns:
+            Dictionary with "retry_budgets" by service and "breakers" by
+            service and region
+        """
+        with self._lock:
+            budgets = dict(self._budgets)
+            breakers = dict(self._breakers)
+        return {
+            "retry_budgets": {
+                key: budget.get_stats() for key, budget in budgets.items()
+            },
+            "breakers": {
+                key: breaker.get_stats() for key, breaker in breakers.items()
+            }
+        }
+
+
+class ResilientClient:
+    """
+    Wrapper that routes every API call of a client through the resilience
+    layer.
+    
+    Coroutine methods are wrapped; other attributes, and run_blocking on
+    AsyncClientAdapter, are returned unchanged.
+    """
+    
+    def __init__(self, client: Any, service: str, resilience: ResilienceManager):
+        """
+        Wrap an async client.
+        
+        Args:
+            client: Async GCP client or AsyncClientAdapter
+            service: Service name of the client
+            resilience: Manager holding the budgets and breakers
+        """
+        self._client = client
+        self._service = service
+        self._resilience = resilience
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if name in _UNWRAPPED_ATTRIBUTES or not inspect.iscoroutinefunction(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        async def _call(*args, **kwargs):
+            return await self._resilience.call(
+                self._service, name, request_region(args, kwargs),
+                attribute, *args, **kwargs
+            )
+        
+        return _call
+
+
+class ResilientClientManager:
+    """
+    GCPClientManager facade whose async clients retry transient failures
+    and respect circuit breakers.
+    
+    Any attribute other than the async client accessors is forwarded to
+    the wrapped manager.
+    """
+    
+    def __init__(
+        self,
+        client_manager: Any,
+        resilience: Optional[ResilienceManager] = None
+    ):
+        """
+        Wrap a client manager.
+        
+        Args:
+            client_manager: GCPClientManager to wrap, possibly already
+                           wrapped by QuotaLimitedClientManager
+            resilience: Manager holding the budgets and breakers. Defaults
+                       to the process-wide manager.
+        """
+        self._client_manager = client_manager
+        self._resilience = resilience or get_resilience_manager()
+    
+    @property
+    def wrapped(self) -> Any:
+        """The wrapped client manager."""
+        return self._client_manager
+    
+    def for_project(self, project_id: str) -> "ResilientClientManager":
+        """Get a facade for another project that shares the same breakers."""
+        return ResilientClientManager(
+            self._client_manager.for_project(project_id), self._resilience
+        )
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client_manager, name)
+        service = CLIENT_SERVICES.get(name)
+        if service is None:
+            return attribute
+        
+        def _get_client():
+            return ResilientClient(attribute(), service, self._resilience)
+        
+        return _get_client
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether a failed operation may succeed if it is tried again.
+    
+    Provisioning errors use their retryable flag, or else the GCP error
+    they wrap or were raised from. GCP errors are transient for HTTP 429,
+    500, 502, 503 and 504 and for aborted transactions; other client
+    errors are permanent. Timeouts and connection errors are transient.
+    
+    Args:
+        error: The exception raised
+    
+    Returns:
+        True if the failure is transient, False if it is permanent
+    """
+    from google.api_core import exceptions as gcp_exceptions
+    
+    seen = set()
+    while isinstance(error, ProvisioningError) and id(error) not in seen:
+        seen.add(id(error))
+        if error.retryable is not None:
+            return error.retryable
+        error = (
+            getattr(error, "gcp_error", None) or error.__cause__ or error.__context__
+        )
+    
+    if error is None:
+        return False
+    return isinstance(error, (
+        gcp_exceptions.TooManyRequests,
+        gcp_exceptions.InternalServerError,
+        gcp_exceptions.BadGateway,
+        gcp_exceptions.ServiceUnavailable,
+        gcp_exceptions.GatewayTimeout,
+        gcp_exceptions.Aborted,
+        gcp_exceptions.Unknown,
+        asyncio.TimeoutError,
+        TimeoutError,
+        ConnectionError
+    ))
+
+
+def with_resilience(client_manager: Any) -> Any:
+    """
+    Wrap a client manager in the process-wide resilience layer, once.
+    
+    Args:
+        client_manager: GCPClientManager or a facade over one
+    
+    Returns:
+        The client manager itself if it is already resilient, otherwise a
+        ResilientClientManager over it
+    """
+    if isinstance(client_manager, ResilientClientManager):
+        return client_manager
+    return ResilientClientManager(client_manager)
+
+
+# Process-wide resilience manager, created on first use
+_resilience_manager: Optional[ResilienceManager] = None
+_resilience_manager_lock = threading.Lock()
+
+
+def get_resilience_manager() -> ResilienceManager:
+    """
+    Get the process-wide resilience manager, creating it on first use.
+    
+    Breakers and retry budgets describe the health of GCP services as seen
+    from this process, so all provisioning shares them by default.
+    
+    Returns:
+        The shared ResilienceManager instance
+    """
+    global _resilience_manager
+    if _resilience_manager is None:
+        with _resilience_manager_lock:
+            if _resilience_manager is None:
+                _resilience_manager = ResilienceManager()
+    return _resilience_manager
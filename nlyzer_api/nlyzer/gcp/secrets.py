@@ -0,0 +1,319 @@
+"""
+Shared Secret Manager Cache
+
+This module provides a process-wide, TTL-based cache in front of GCP Secret
+Manager. Platform credentials such as the Namecheap API keys are read by
+every worker and every DNSManager instance; without a cache each of them
+calls access_secret_version for ``versions/latest`` on every
+initialization, so Secret Manager quota use grows with the number of workers.
+
+Features:
+- TTL for mutable versions ("latest" and other aliases)
+- Pinned numeric versions are immutable and cached until evicted
+- Negative caching of NotFound, so a missing secret is not retried on
+  every call
+- Single-flight fetches: concurrent readers of the same secret share one
+  request, which runs as its own task so that a cancelled reader does not
+  abort it for the others
+- Concurrent batch fetch via get_many(), so reading N secrets costs one
+  round trip of wall-clock time instead of N
+
+Usage:
+    cache = get_secret_cache()
+    api_key = await cache.get("namecheap-api-key")
+    values = await cache.get_many(["namecheap-api-user", "namecheap-api-key"])
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from nlyzer.gcp.clients import GCPClientManager
+
+logger = logging.getLogger(__name__)
+
+# Seconds a value read from a mutable version alias (e.g. "latest") is reused
+DEFAULT_SECRET_TTL = 300.0
+
+# Seconds a NotFound result is remembered before Secret Manager is asked again
+DEFAULT_NEGATIVE_TTL = 60.0
+
+# Maximum number of secret versions kept in memory
+DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass
+class _CacheEntry:
+    """Cached secret value, or a remembered NotFound if value is None."""
+    
+    value: Optional[str]
+    expires_at: float
+
+
+class SecretCache:
+    """
+    TTL- and version-aware cache for Secret Manager secret payloads.
+    
+    Entries are keyed by the full version resource name
+    (projects/{project}/secrets/{secret}/versions/{version}).
+    
+    Thread Safety:
+    The entry table is guarded by a lock and may be shared across threads
+    and event loops. Single-flight deduplication applies to callers on the
+    same event loop.
+    """
+    
+    def __init__(
+        self,
+        client_manager: Optional[GCPClientManager] = None,
+        ttl: float = DEFAULT_SECRET_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Initialize the secret cache.
+        
+        Args:
+            client_manager: GCP client manager used to reach Secret Manager
+            ttl: Seconds to cache values of mutable version aliases
+            negative_ttl: Seconds to cache NotFound results
+            max_entries: Maximum number of cached secret versions
+        """
+        self._client_manager = client_manager or GCPClientManager()
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        self._hits = 0
+        self._misses = 0
+        self._fetches = 0
+        self._not_found = 0
+    
+    # ========================================================================
+    # Lookups
+    # ========================================================================
+    
+    async def get(
+        self,
+        secret_id: str,
+        version: str = "latest",
+        project_id: Optional[str] = None
+    ) -> str:
+        """
+        Get a secret value, fetching it from Secret Manager on a cache miss.
+        
+        Args:
+            secret_id: Secret name (e.g. "namecheap-api-key")
+            version: Version number to pin, or an alias such as "latest"
+            project_id: Project owning the secret. Defaults to the client
+                       manager's project.
+        
+        Returns:
+            The secret payload decoded as UTF-8
+        
+        Raises:
+            google.api_core.exceptions.NotFound: If the secret or version
+                does not exist (possibly served from the negative cache)
+            google.api_core.exceptions.GoogleAPICallError: On other API errors
+        """
+        name = self._version_name(secret_id, version, project_id)
+        
+        entry = self._lookup(name)
+        if entry is not None:
+            return self._unwrap(name, entry)
+        
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(name)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(name, version))
+            task.add_done_callback(functools.partial(self._fetch_done, name))
+            self._inflight[name] = task
+        
+        # Shielded, so a cancelled caller does not abort the fetch for the
+        # other callers awaiting it
+        return self._unwrap(name, await asyncio.shield(task))
+    
+    async def get_many(
+        self,
+        secret_ids: Iterable[str],
+        version: str = "latest",
+        project_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Get several secrets concurrently.
+        
+        Secret Manager has no batch access API, so misses are fetched in
+        parallel; the total latency is that of the slowest single fetch.
+        
+        Args:
+            secret_ids: Secret names to read
+            version: Version number or alias applied to every secret
+            project_id: Project owning the secrets
+        
+        Returns:
+            Dictionary mapping each secret name to its value
+        
+        Raises:
+            google.api_core.exceptions.NotFound: If any secret does not exist
+            google.api_core.exceptions.GoogleAPICallError: On other API errors
+        """
+        secret_ids = list(dict.fromkeys(secret_ids))
+        values = await asyncio.gather(
+            *(self.get(secret_id, version, project_id) for secret_id in secret_ids)
+        )
+        return dict(zip(secret_ids, values))
+    
+    def invalidate(
+        self,
+        secret_id: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> int:
+        """
+        Drop cached entries, e.g. after rotating a secret.
+        
+        Args:
+            secret_id: Secret whose versions to drop. Drops everything if None.
+            project_id: Project owning the secret
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if secret_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            
+            prefix = self._version_name(secret_id, "", project_id)
+            names = [name for name in self._entries if name.startswith(prefix)]
+            for name in names:
+                del self._entries[name]
+            return len(names)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with size, hits, misses, Secret Manager fetches and
+            NotFound responses
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "fetches": self._fetches,
+                "not_found": self._not_found
+            }
+    
+    # ========================================================================
+    # Private Helper Methods
+    # ========================================================================
+    
+    def _version_name(
+        self,
+        secret_id: str,
+        version: str,
+        project_id: Optional[str]
+    ) -> str:
+        """Build the full secret version resource name."""
+        project = project_id or self._client_manager.get_project_id()
+        return f"projects/{project}/secrets/{secret_id}/versions/{version}"
+    
+    def _lookup(self, name: str) -> Optional[_CacheEntry]:
+        """Return a live cache entry, dropping it if expired."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(name)
+                self._hits += 1
+                return entry
+            if entry is not None:
+                del self._entries[name]
+            self._misses += 1
+            return None
+    
+    def _store(self, name: str, entry: _CacheEntry) -> None:
+        """Insert an entry, evicting the least recently used beyond capacity."""
+        with self._lock:
+            self._entries[name] = entry
+            self._entries.move_to_end(name)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+    
+    async def _fetch(self, name: str, version: str) -> _CacheEntry:
+        """
+        Read one secret version from Secret Manager and cache the result.
+        
+        Returns:
+            The new cache entry (value None for NotFound)
+        """
+        from google.api_core import exceptions as gcp_exceptions
+        
+        client = self._client_manager.get_secrets_async_client()
+        with self._lock:
+            self._fetches += 1
+        
+        try:
+            response = await client.access_secret_version(request={"name": name})
+        except gcp_exceptions.NotFound:
+            with self._lock:
+                self._not_found += 1
+            entry = _CacheEntry(None, time.monotonic() + self._negative_ttl)
+            self._store(name, entry)
+            logger.warning(f"Secret not found in Secret Manager: {name}")
+            return entry
+        
+        # Numeric versions are immutable, so only aliases need a TTL
+        ttl = float("inf") if version.isdigit() else self._ttl
+        entry = _CacheEntry(
+            response.payload.data.decode("UTF-8"), time.monotonic() + ttl
+        )
+        self._store(name, entry)
+        return entry
+    
+    def _fetch_done(self, name: str, task: asyncio.Task) -> None:
+        """Forget a finished fetch task."""
+        if self._inflight.get(name) is task:
+            del self._inflight[name]
+        # Mark the exception retrieved if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    @staticmethod
+    def _unwrap(name: str, entry: _CacheEntry) -> str:
+        """Return the entry's value, raising NotFound for negative entries."""
+        if entry.value is None:
+            from google.api_core import exceptions as gcp_exceptions
+            
+            raise gcp_exceptions.NotFound(f"Secret version not found: {name}")
+        return entry.value
+
+
+_secret_cache: Optional[SecretCache] = None
+_secret_cache_lock = threading.Lock()
+
+
+def get_secret_cache() -> SecretCache:
+    """
+    Get the process-wide secret cache, creating it on first use.
+    
+    Returns:
+        The shared SecretCache instance
+    """
+    global _secret_cache
+    if _secret_cache is None:
+        with _secret_cache_lock:
+            if _secret_cache is None:
+                _secret_cache = SecretCache()
+    return _secret_cache
@@ -0,0 +1,450 @@
+"""
+Declarative Step Graph Executor
+
+Provisioning is a set of steps with explicit dependencies rather than a
+fixed sequence. A StepGraph declares the steps and what each one requires;
+StepGraphExecutor runs every step as soon as all of its requirements have
+finished, so independent steps (e.g. billing, the service account and the
+config bucket, which only need the project) run concurrently.
+
+Each run produces an ExecutionReport with per-step start and finish times
+and the critical path: the chain of steps that determined the total
+wall-clock time. Shortening any step off that path does not make the run
+faster.
+
+Executions are resumable. Outputs already present in the context when the
+execution starts are treated as checkpoints of steps finished by an
+earlier attempt: those steps are not run again, after an optional check
+that what they created still exists. An on_step_succeeded callback lets
+the caller persist each new checkpoint before dependent steps start.
+
+Every step that runs is traced as a span (see nlyzer.gcp.tracing), nested
+under the span that was current when the execution started.
+
+Usage:
+    graph = StepGraph([
+        Step("create_project", create_project),
+        Step("link_billing", link_billing, requires=("create_project",)),
+        Step("create_bucket", create_bucket, requires=("create_project",)),
+    ])
+    report = await StepGraphExecutor(graph).execute(context)
+    print(report.critical_path, report.elapsed_seconds)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from nlyzer.gcp.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Step outcomes recorded in StepRecord.status
+STEP_SUCCEEDED = "succeeded"
+STEP_FAILED = "failed"
+STEP_SKIPPED = "skipped"
+STEP_RESTORED = "restored"
+STEP_NOT_RUN = "not_run"
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    One node of a step graph.
+    
+    Attributes:
+        name: Unique step name; the step's return value is stored in the
+             context's outputs under this name
+        run: Coroutine function called with the execution context
+        requires: Names of the steps that must finish first
+        condition: Optional predicate on the context. If it returns False
+                  when the step becomes ready, the step is skipped, its
+                  output is None, and its dependents still run.
+        verify: Optional coroutine function called with the context and a
+               restored output; returns whether the resources behind that
+               output still exist. Restored outputs of steps without
+               verify are trusted.
+    """
+    
+    name: str
+    run: Callable[[Any], Awaitable[Any]]
+    requires: Tuple[str, ...] = ()
+    condition: Optional[Callable[[Any], bool]] = None
+    verify: Optional[Callable[[Any, Any], Awaitable[bool]]] = None
+
+
+class StepGraph:
+    """
+    Validated, immutable set of steps forming a directed acyclic graph.
+    """
+    
+    def __init__(self, steps: Iterable[Step]):
+        """
+        Build and validate the graph.
+        
+        Args:
+            steps: Steps of the graph, in any order
+        
+        Raises:
+            ValueError: If step names repeat, a requirement is unknown, or
+                       the requirements contain a cycle
+        """
+        self._steps: Dict[str, Step] = {}
+        for step in steps:
+            if step.name in self._steps:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            self._steps[step.name] = step
+        
+        self._dependents: Dict[str, List[str]] = {name: [] for name in self._steps}
+        for step in self._steps.values():
+            for requirement in step.requires:
+                if requirement not in self._steps:
+                    raise ValueError(
+                        f"Step {step.name} requires unknown step {requirement}"
+                    )
+                self._dependents[requirement].append(step.name)
+        
+        self._order = self._topological_order()
+    
+    @property
+    def steps(self) -> Dict[str, Step]:
+        """Steps by name."""
+        return dict(self._steps)
+    
+    @property
+    def order(self) -> List[str]:
+        """Step names in a valid sequential execution order."""
+        return list(self._order)
+    
+    def dependents(self, name: str) -> List[str]:
+        """Names of the steps that directly require the given step."""
+        return list(self._dependents[name])
+    
+    def descendants(self, name: str) -> List[str]:
+        """Names of all steps that directly or transitively require the given step."""
+        found = []
+        stack = list(self._dependents[name])
+        while stack:
+            dependent = stack.pop()
+            if dependent not in found:
+                found.append(dependent)
+                stack.extend(self._dependents[dependent])
+        return [step_name for step_name in self._order if step_name in found]
+    
+    def _topological_order(self) -> List[str]:
+        """Order the steps so that requirements come first (Kahn's algorithm)."""
+        pending = {name: len(step.requires) for name, step in self._steps.items()}
+        ready = [name for name, count in pending.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in self._dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        
+        if len(order) != len(self._steps):
+            cyclic = sorted(name for name in self._steps if name not in order)
+            raise ValueError(f"Step requirements contain a cycle: {', '.join(cyclic)}")
+        return order
+
+
+@dataclass
+class StepRecord:
+    """
+    Timing and outcome of one step in an execution.
+    
+    Times are seconds since the start of the execution.
+    """
+    
+    name: str
+    status: str = STEP_NOT_RUN
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    
+    @property
+    def duration(self) -> float:
+        """Seconds the step ran, or 0 if it did not run."""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a dictionary for logging and JSON."""
+        return {
+            "name": self.name,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration,
+            "error": self.error
+        }
+
+
+@dataclass
+class ExecutionReport:
+    """
+    Outcome of one step graph execution.
+    
+    Attributes:
+        steps: Record for every step in the graph, in execution order
+        elapsed_seconds: Wall-clock time of the whole execution
+        critical_path: Names of the steps on the longest chain of
+                      dependencies, from first to last
+        invalidated: Restored steps whose resources were found missing,
+                    together with their descendants; these were run again
+        failed_step: Name of the first step that failed, if any
+        error: Exception raised by the failed step, if any
+    """
+    
+    steps: Dict[str, StepRecord] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+    invalidated: List[str] = field(default_factory=list)
+    failed_step: Optional[str] = None
+    error: Optional[BaseException] = None
+    
+    @property
+    def succeeded(self) -> bool:
+        """Whether every step succeeded, was skipped or was restored."""
+        return self.failed_step is None
+    
+    @property
+    def sequential_seconds(self) -> float:
+        """Time the same steps would have taken run one after another."""
+        return sum(record.duration for record in self.steps.values())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a dictionary for logging and JSON."""
+        return {
+            "succeeded": self.succeeded,
+            "elapsed_seconds": self.elapsed_seconds,
+            "sequential_seconds": self.sequential_seconds,
+            "critical_path": list(self.critical_path),
+            "invalidated": list(self.invalidated),
+            "failed_step": self.failed_step,
+            "error": str(self.error) if self.error is not None else None,
+            "steps": [record.to_dict() for record in self.steps.values()]
+        }
+
+
+class StepGraphExecutor:
+    """
+    Runs the steps of a StepGraph concurrently, respecting requirements.
+    
+    A step starts as soon as all the steps it requires have finished. When
+    a step fails, no further steps are started, but steps already running
+    are allowed to finish: abandoning a half-finished cloud API call would
+    leave resources that nothing knows about. If the execution itself is
+    cancelled, running steps are cancelled too.
+    """
+    
+    def __init__(
+        self,
+        graph: StepGraph,
+        on_step_succeeded: Optional[Callable[[str, Any], Awaitable[None]]] = None
+    ):
+        """
+        Initialize the executor.
+        
+        Args:
+            graph: Step graph to execute
+            on_step_succeeded: Optional coroutine function called with the
+                              name and output of each step that succeeds,
+                              before its dependents start. If it raises,
+                              the step counts as failed.
+        """
+        self._graph = graph
+        self._on_step_succeeded = on_step_succeeded
+    
+    async def execute(self, context: Any) -> ExecutionReport:
+        """
+        Execute the graph.
+        
+        Step failures do not raise; they are reported through the returned
+        report's failed_step and error.
+        
+        Args:
+            context: Object passed to every step. Must have an ``outputs``
+                    dict; each step's return value is stored there under
+                    the step's name before its dependents start. Outputs
+                    present before the call are restored checkpoints;
+                    invalidated ones are removed from the dict.
+        
+        Returns:
+            ExecutionReport with timings, outcome and critical path
+        """
+        graph = self._graph
+        steps = graph.steps
+        report = ExecutionReport(
+            steps={name: StepRecord(name) for name in graph.order}
+        )
+        pending = {name: len(step.requires) for name, step in steps.items()}
+        running: Dict[asyncio.Task, str] = {}
+        started = time.perf_counter()
+        
+        def now() -> float:
+            return time.perf_counter() - started
+        
+        restored = await self._verify_restored(context, report)
+        if report.failed_step is not None:
+            report.elapsed_seconds = now()
+            return report
+        
+        def complete(name: str) -> None:
+            for dependent in graph.dependents(name):
+                pending[dependent] -= 1
+                if pending[dependent] == 0 and report.failed_step is None:
+                    launch(dependent)
+        
+        def launch(name: str) -> None:
+            step = steps[name]
+            record = report.steps[name]
+            record.started_at = now()
+            if name in restored:
+                record.status = STEP_RESTORED
+                record.finished_at = record.started_at
+                complete(name)
+                return
+            if step.condition is not None and not step.condition(context):
+                record.status = STEP_SKIPPED
+                record.finished_at = record.started_at
+                context.outputs[name] = None
+                logger.debug(f"Skipped step {name}: condition not met")
+                complete(name)
+                return
+            running[asyncio.ensure_future(self._run_step(step, context))] = name
+        
+        # Restored roots launch their dependents right away, so collect the
+        # roots before launching any
+        roots = [name for name in graph.order if pending[name] == 0]
+        for name in roots:
+            launch(name)
+        
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name = running.pop(task)
+                    record = report.steps[name]
+                    record.finished_at = now()
+                    
+                    error = task.exception()
+                    if error is not None:
+                        record.status = STEP_FAILED
+                        record.error = str(error)
+                        logger.error(
+                            f"Step {name} failed after {record.duration:.2f}s: {error}"
+                        )
+                        if report.failed_step is None:
+                            report.failed_step = name
+                            report.error = error
+                        continue
+                    
+                    record.status = STEP_SUCCEEDED
+                    context.outputs[name] = task.result()
+                    logger.debug(f"Step {name} finished in {record.duration:.2f}s")
+                    complete(name)
+        except asyncio.CancelledError:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+        
+        report.elapsed_seconds = now()
+        report.critical_path = self._critical_path(report)
+        return report
+    
+    async def _run_step(self, step: Step, context: Any) -> Any:
+        """Run one step in a span and report its output before dependents start."""
+        with get_tracer().span(step.name, step=step.name):
+            output = await step.run(context)
+            if self._on_step_succeeded is not None:
+                await self._on_step_succeeded(step.name, output)
+        return output
+    
+    async def _verify_restored(
+        self,
+        context: Any,
+        report: ExecutionReport
+    ) -> List[str]:
+        """
+        Check restored outputs and drop those whose resources are gone.
+        
+        All verifications run concurrently. A step that fails verification
+        is invalidated together with its descendants, since they were built
+        on what it created. If a verification raises, the execution is
+        reported as failed at that step rather than guessing: re-running a
+        step whose resources may still exist could duplicate them.
+        
+        Returns:
+            Names of the restored steps that remain valid
+        """
+        graph = self._graph
+        steps = graph.steps
+        restored = [name for name in graph.order if name in context.outputs]
+        to_verify = [name for name in restored if steps[name].verify is not None]
+        
+        results = await asyncio.gather(
+            *(steps[name].verify(context, context.outputs[name]) for name in to_verify),
+            return_exceptions=True
+        )
+        
+        invalid = set()
+        for name, result in zip(to_verify, results):
+            if isinstance(result, BaseException):
+                report.steps[name].status = STEP_FAILED
+                report.steps[name].error = str(result)
+                report.failed_step = report.failed_step or name
+                report.error = report.error or result
+                logger.error(f"Could not verify restored step {name}: {result}")
+            elif not result:
+                logger.info(f"Resources of restored step {name} no longer exist")
+                invalid.add(name)
+                invalid.update(graph.descendants(name))
+        
+        report.invalidated = [
+            name for name in restored if name in invalid
+        ]
+        for name in report.invalidated:
+            context.outputs.pop(name, None)
+        return [name for name in restored if name not in invalid]
+    
+    def _critical_path(self, report: ExecutionReport) -> List[str]:
+        """
+        Find the chain of steps that determined the execution's duration.
+        
+        Starting from the step that finished last, repeatedly follow the
+        requirement that finished last, since that is the one the step was
+        waiting for. Skipped and restored steps take no time and are left out.
+        """
+        steps = self._graph.steps
+        finished = {
+            name: record for name, record in report.steps.items()
+            if record.finished_at is not None
+        }
+        if not finished:
+            return []
+        
+        path = []
+        name = max(finished, key=lambda step_name: finished[step_name].finished_at)
+        while name is not None:
+            if finished[name].status not in (STEP_SKIPPED, STEP_RESTORED):
+                path.append(name)
+            requirements = [
+                requirement for requirement in steps[name].requires
+                if requirement in finished
+            ]
+            name = max(
+                requirements,
+                key=lambda step_name: finished[step_name].finished_at,
+                default=None
+            )
+        path.reverse()
+        return path
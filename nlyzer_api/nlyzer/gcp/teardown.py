@@ -0,0 +1,210 @@
+"""
+Dependency-Ordered Teardown
+
+Deletes what a step graph created, in reverse dependency order. A
+resource is deleted only after everything built on it is gone (the Cloud
+Run service before the service account it runs as, every resource before
+its project), and resources that do not depend on each other are deleted
+concurrently. The teardown graph is derived from the step graph and the
+outputs of the steps that actually ran, so nothing is deleted that was
+never created.
+
+Each deletion is retried on its own with backoff. A resource that is
+already gone counts as deleted. A deletion that still fails after its
+retries is reported, but does not stop the resources that depend on it
+from being deleted: deleting a tenant project removes whatever inside it
+could not be deleted individually.
+
+Usage:
+    report = await tear_down(
+        PROVISIONING_GRAPH, context.outputs, TEARDOWN_ACTIONS, context
+    )
+    if not report.succeeded:
+        print(report.failed)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping
+
+from nlyzer.gcp.dns_resolver import backoff_delay
+from nlyzer.gcp.resilience import is_transient
+from nlyzer.gcp.step_graph import ExecutionReport, Step, StepGraph, StepGraphExecutor
+
+logger = logging.getLogger(__name__)
+
+# Attempts per deletion, and the backoff between them
+TEARDOWN_MAX_ATTEMPTS = 4
+TEARDOWN_RETRY_DELAY = 2.0
+MAX_TEARDOWN_RETRY_DELAY = 30.0
+
+# Deletes what one step created. Called with the caller's context and the
+# step's output.
+TeardownAction = Callable[[Any, Any], Awaitable[None]]
+
+
+@dataclass
+class TeardownReport:
+    """
+    Outcome of one teardown.
+    
+    Attributes:
+        deleted: Steps whose resources were deleted or already gone
+        failed: Error message by step, for deletions that gave up
+        execution: Timings and critical path of the teardown graph
+    """
+    
+    deleted: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    execution: ExecutionReport = field(default_factory=ExecutionReport)
+    
+    @property
+    def succeeded(self) -> bool:
+        """Whether every resource was deleted."""
+        return not self.failed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a dictionary for logging and JSON."""
+        return {
+            "succeeded": self.succeeded,
+            "deleted": list(self.deleted),
+            "failed": dict(self.failed),
+            "execution": self.execution.to_dict()
+        }
+
+
+@dataclass
+class _TeardownRun:
+    """Context of the teardown graph's executor."""
+    
+    target: Any
+    resources: Mapping[str, Any]
+    report: TeardownReport
+    outputs: Dict[str, Any] = field(default_factory=dict)
+
+
+def build_teardown_graph(
+    graph: StepGraph,
+    created: Iterable[str],
+    actions: Mapping[str, TeardownAction]
+) -> StepGraph:
+    """
+    Build the graph that deletes what a step graph created.
+    
+    Every created step with a teardown action becomes a teardown step that
+    requires the teardown of all created steps depending on it, directly
+    or through steps without resources of their own.
+    
+    Args:
+        graph: The step graph that created the resources
+        created: Names of the steps that ran
+        actions: Teardown action by step name; steps without one own no
+                resources (or none that outlive their dependencies)
+    
+    Returns:
+        The teardown StepGraph; step names match the creating steps
+    """
+    created = set(created)
+    steps = []
+    for name in graph.order:
+        if name not in created or name not in actions:
+            continue
+        requires = tuple(
+            dependent for dependent in graph.descendants(name)
+            if dependent in created and dependent in actions
+        )
+        steps.append(Step(name, _teardown_step(name, actions[name]), requires=requires))
+    return StepGraph(steps)
+
+
+async def tear_down(
+    graph: StepGraph,
+    resources: Mapping[str, Any],
+    actions: Mapping[str, TeardownAction],
+    context: Any
+) -> TeardownReport:
+    """
+    Delete the resources created by a step graph.
+    
+    Args:
+        graph: The step graph that created the resources
+        resources: Output of each step that ran, by step name, e.g. the
+                  checkpoints of a provisioning run
+        actions: Teardown action by step name
+        context: Passed to every teardown action
+    
+    Returns:
+        TeardownReport listing deleted and failed resources
+    """
+    report = TeardownReport()
+    teardown_graph = build_teardown_graph(graph, resources, actions)
+    run = _TeardownRun(target=context, resources=resources, report=report)
+    
+    report.execution = await StepGraphExecutor(teardown_graph).execute(run)
+    report.deleted = [
+        name for name in teardown_graph.order if name not in report.failed
+    ]
+    return report
+
+
+# ============================================================================
+# Private Helper Functions
+# ============================================================================
+
+def _teardown_step(
+    name: str,
+    action: TeardownAction
+) -> Callable[[Any], Awaitable[None]]:
+    """Wrap a teardown action in retries that never fail the teardown graph."""
+    
+    async def run(teardown: _TeardownRun) -> None:
+        output = teardown.resources[name]
+        for attempt in range(TEARDOWN_MAX_ATTEMPTS):
+            try:
+                await action(teardown.target, output)
+                return
+            except Exception as error:
+                if _is_not_found(error):
+                    logger.info(f"Resources of step {name} are already gone")
+                    return
+                if attempt + 1 == TEARDOWN_MAX_ATTEMPTS or not _is_retryable(error):
+                    logger.error(f"Failed to tear down step {name}: {str(error)}")
+                    teardown.report.failed[name] = str(error)
+                    return
+                delay = backoff_delay(
+                    attempt, TEARDOWN_RETRY_DELAY, MAX_TEARDOWN_RETRY_DELAY
+                )
+                logger.warning(
+                    f"Teardown of step {name} failed ({str(error)}); "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+    
+    return run
+
+
+def _is_not_found(error: Exception) -> bool:
+    """Whether an error means the resource does not exist."""
+    from google.api_core import exceptions as gcp_exceptions
+    
+    return isinstance(error, gcp_exceptions.NotFound)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed deletion may succeed when tried again.
+    
+    GCP errors are retried if they are transient (see
+    nlyzer.gcp.resilience.is_transient) and on conflicts, which usually
+    mean a resource is still in use by one being deleted; other client
+    errors such as PermissionDenied will not go away. Errors from outside
+    the GCP client libraries (DNS providers, open circuits) are retried.
+    """
+    from google.api_core import exceptions as gcp_exceptions
+    
+    if isinstance(error, gcp_exceptions.Conflict):
+        return True
+    if isinstance(error, gcp_exceptions.GoogleAPICallError):
+        return is_transient(error)
+    return True
@@ -0,0 +1,519 @@
+"""
+Span Tracing for Provisioning Runs
+
+Metrics (see nlyzer.gcp.metrics) say how long API calls take on average;
+traces say where the minutes of one particular run went. Every
+provisioning and teardown run is recorded as a trace:
+
+- a root span for the run, with its outcome and critical path
+- a span for each step of the step graph
+- a span for each attempt of a GCP client call, nested under the step
+  that made it (emitted by nlyzer.gcp.resilience)
+
+Spans carry tenant_id and project_id attributes, named like the fields of
+ProvisioningError.to_dict(), so traces and error reports can be joined.
+A span that fails records the error's type and message, plus the
+operation of provisioning errors.
+
+Finished traces are handed to exporters. OTLPJsonFileExporter appends them
+to a local file in the OTLP/JSON encoding, one ExportTraceServiceRequest
+per line, which the OpenTelemetry Collector's file receiver and most
+tracing backends can import. scripts/provisioning_trace_report.py reads
+such files and reports per-step p50/p95 and the most common critical
+paths across runs.
+
+Spans are propagated through contextvars, so steps running concurrently
+in their own tasks, and blocking client calls run on the thread pool by
+AsyncClientAdapter, nest under the right parent.
+
+Usage:
+    tracer = get_tracer()
+    tracer.add_exporter(OTLPJsonFileExporter("/var/log/nlyzer/traces.jsonl"))
+    
+    with tracer.span("provision_tenant", tenant_id=tenant_id) as span:
+        ...
+        span.set_attributes(status="success")
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resource and instrumentation scope reported with every exported span
+SERVICE_NAME = "nlyzer-api"
+INSTRUMENTATION_SCOPE = "nlyzer.gcp"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Attributes shared by every span of a trace once known, e.g. project_id
+# after create_project
+TRACE_ATTRIBUTES = ("tenant_id", "project_id")
+
+# Finished spans kept by InMemorySpanExporter
+DEFAULT_MAX_SPANS = 10000
+
+# Span of the code currently running, in this task or thread
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    "nlyzer_current_span", default=None
+)
+
+
+@dataclass
+class _Trace:
+    """Spans of one trace, collected until its root span ends."""
+    
+    trace_id: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    finished: List["Span"] = field(default_factory=list)
+    exported: bool = False
+
+
+@dataclass
+class Span:
+    """
+    One timed operation within a trace.
+    
+    Attributes:
+        name: Operation name, e.g. a step name or "secrets.get_secret"
+        trace_id: 32 hex digit ID shared by all spans of the trace
+        span_id: 16 hex digit ID of this span
+        parent_span_id: ID of the enclosing span, None for a root span
+        kind: SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT
+        start_time_ns: Start as nanoseconds since the Unix epoch
+        end_time_ns: End as nanoseconds since the Unix epoch, once ended
+        attributes: Attributes of the span
+        status_code: STATUS_UNSET, STATUS_OK or STATUS_ERROR
+        status_message: Error message if the span failed
+    """
+    
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_time_ns: int = 0
+    end_time_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_UNSET
+    status_message: str = ""
+    _trace: Optional[_Trace] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def duration_seconds(self) -> float:
+        """Duration of the span, or 0.0 while it is running."""
+        if self.end_time_ns is None:
+            return 0.0
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+    
+    def set_attributes(self, **attributes: Any) -> None:
+        """Set attributes of the span; None values are ignored."""
+        for key, value in attributes.items():
+            if value is not None:
+                self.attributes[key] = value
+    
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed without an exception, e.g. a failed run."""
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+    
+    def record_error(self, error: BaseException) -> None:
+        """
+        Mark the span as failed with an exception.
+        
+        Provisioning errors add their operation and the tenant and project
+        they name, as in ProvisioningError.to_dict().
+        """
+        from nlyzer.gcp.exceptions import ProvisioningError
+        
+        self.set_error(str(error))
+        self.attributes["error_type"] = type(error).__name__
+        if isinstance(error, ProvisioningError):
+            error_dict = error.to_dict()
+            self.set_attributes(
+                tenant_id=error_dict["tenant_id"],
+                project_id=error_dict["project_id"],
+                operation=error_dict["operation"]
+            )
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        """Encode the span as an OTLP/JSON Span object."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class SpanExporter(ABC):
+    """Receives finished spans, in batches of one trace where possible."""
+    
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Export finished spans."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the most recent finished spans in memory."""
+    
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+    
+    def get_finished_spans(self) -> List[Span]:
+        """Get the spans kept so far, oldest first."""
+        with self._lock:
+            return list(self._spans)
+    
+    def clear(self) -> None:
+        """Discard the spans kept so far."""
+        with self._lock:
+            self._spans.clear()
+
+
+class OTLPJsonFileExporter(SpanExporter):
+    """
+    Appends spans to a file as OTLP/JSON, one ExportTraceServiceRequest
+    per line.
+    """
+    
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        """
+        Initialize the exporter.
+        
+        Args:
+            path: File to append to; created with its directory if missing
+            service_name: service.name resource attribute of the spans
+        """
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(
+            to_otlp_request(spans, self.service_name), separators=(",", ":")
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(line + "\n")
+
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to the exporters.
+    
+    Spans of a trace are exported together when its root span ends. Spans
+    that end after their root span, e.g. of background work the run
+    started, are exported on their own.
+    """
+    
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        """
+        Initialize the tracer.
+        
+        Args:
+            exporters: Exporters receiving finished spans. Without any,
+                      spans are timed but dropped.
+        """
+        self._exporters: List[SpanExporter] = list(exporters or [])
+        self._lock = threading.Lock()
+        self._spans_started = 0
+        self._export_errors = 0
+    
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        """Add an exporter for spans that end from now on."""
+        with self._lock:
+            self._exporters = self._exporters + [exporter]
+    
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        """Stop exporting to an exporter."""
+        with self._lock:
+            self._exporters = [item for item in self._exporters if item is not exporter]
+    
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        **attributes: Any
+    ) -> Iterator[Span]:
+        """
+        Time a block of code as a span, nested under the current span.
+        
+        An exception raised in the block marks the span as failed and
+        propagates. tenant_id and project_id attributes apply to the whole
+        trace: spans ending later in the trace get them too.
+        
+        Args:
+            name: Operation name
+            kind: SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT
+            **attributes: Attributes of the span; None values are ignored
+        
+        Yields:
+            The running Span
+        """
+        parent = _current_span.get()
+        if parent is not None and parent._trace is not None:
+            trace = parent._trace
+        else:
+            trace = _Trace(trace_id=secrets.token_hex(16))
+        
+        span = Span(
+            name=name,
+            trace_id=trace.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent is not None else None,
+            kind=kind,
+            start_time_ns=time.time_ns(),
+            _trace=trace
+        )
+        span.set_attributes(**attributes)
+        self.set_trace_attributes(span, **attributes)
+        self._spans_started += 1
+        
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.record_error(error)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_ns = time.time_ns()
+            if span.status_code == STATUS_UNSET:
+                span.status_code = STATUS_OK
+            self._finish(span)
+    
+    def set_trace_attributes(
+        self,
+        span: Optional[Span] = None,
+        **attributes: Any
+    ) -> None:
+        """
+        Set tenant_id and project_id for every span of a trace.
+        
+        Args:
+            span: Any span of the trace. Defaults to the current span; does
+                 nothing outside of a span.
+            **attributes: Values of TRACE_ATTRIBUTES; others are ignored
+        """
+        span = span or _current_span.get()
+        if span is None or span._trace is None:
+            return
+        for key in TRACE_ATTRIBUTES:
+            if attributes.get(key) is not None:
+                span._trace.attributes[key] = attributes[key]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get tracer statistics.
+        
+        Returns:
+            Dictionary with spans started, exporters and failed exports
+        """
+        return {
+            "spans_started": self._spans_started,
+            "exporters": len(self._exporters),
+            "export_errors": self._export_errors
+        }
+    
+    def _finish(self, span: Span) -> None:
+        """Collect an ended span and export its trace if it was the root."""
+        trace = span._trace
+        for key, value in trace.attributes.items():
+            span.attributes.setdefault(key, value)
+        
+        if trace.exported:
+            self._export([span])
+        elif span.parent_span_id is None:
+            trace.exported = True
+            trace.finished.append(span)
+            spans, trace.finished = trace.finished, []
+            self._export(spans)
+        else:
+            trace.finished.append(span)
+    
+    def _export(self, spans: List[Span]) -> None:
+        """Hand spans to every exporter; failures are logged, not raised."""
+        for exporter in self._exporters:
+            try:
+                exporter.export(spans)
+            except Exception as error:
+                self._export_errors += 1
+                logger.warning(f"Failed to export {len(spans)} spans: {str(error)}")
+
+
+def current_span() -> Optional[Span]:
+    """Get the span of the code currently running, if any."""
+    return _current_span.get()
+
+
+def to_otlp_request(
+    spans: List[Span],
+    service_name: str = SERVICE_NAME
+) -> Dict[str, Any]:
+    """
+    Encode spans as an OTLP/JSON ExportTraceServiceRequest.
+    
+    Args:
+        spans: Finished spans
+        service_name: service.name resource attribute
+    
+    Returns:
+        The request as a JSON-serializable dict
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": _otlp_attributes({"service.name": service_name})
+            },
+            "scopeSpans": [{
+                "scope": {"name": INSTRUMENTATION_SCOPE},
+                "spans": [span.to_otlp() for span in spans]
+            }]
+        }]
+    }
+
+
+def read_otlp_json(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the spans of an OTLP/JSON lines file.
+    
+    Args:
+        path: File written by OTLPJsonFileExporter or an OpenTelemetry
+             Collector file exporter
+    
+    Returns:
+        One dict per span with name, trace_id, span_id, parent_span_id,
+        duration_seconds, start_time_ns, status_code, status_message and
+        attributes decoded to plain values
+    """
+    spans = []
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            for resource_spans in request.get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        start = int(span["startTimeUnixNano"])
+                        end = int(span["endTimeUnixNano"])
+                        status = span.get("status", {})
+                        spans.append({
+                            "name": span["name"],
+                            "trace_id": span["traceId"],
+                            "span_id": span["spanId"],
+                            "parent_span_id": span.get("parentSpanId") or None,
+                            "start_time_ns": start,
+                            "duration_seconds": (end - start) / 1e9,
+                            "status_code": status.get("code", STATUS_UNSET),
+                            "status_message": status.get("message", ""),
+                            "attributes": {
+                                attribute["key"]: _from_any_value(attribute["value"])
+                                for attribute in span.get("attributes", [])
+                            }
+                        })
+    return spans
+
+
+# Process-wide tracer, created on first use
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer, creating it on first use.
+    
+    Traces are written to settings.PROVISIONING_TRACE_FILE when it is set;
+    more exporters can be added with Tracer.add_exporter.
+    
+    Returns:
+        The shared Tracer instance
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                from nlyzer.core.config import settings
+                
+                tracer = Tracer()
+                trace_file = getattr(settings, "PROVISIONING_TRACE_FILE", None)
+                if trace_file:
+                    tracer.add_exporter(OTLPJsonFileExporter(trace_file))
+                _tracer = tracer
+    return _tracer
+
+
+# ============================================================================
+# Private Helper Functions
+# ============================================================================
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Encode attributes as OTLP/JSON KeyValue objects."""
+    return [
+        {"key": key, "value": _to_any_value(value)}
+        for key, value in attributes.items()
+    ]
+
+
+def _to_any_value(value: Any) -> Dict[str, Any]:
+    """Encode a value as an OTLP/JSON AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_to_any_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _from_any_value(value: Dict[str, Any]) -> Any:
+    """Decode an OTLP/JSON AnyValue."""
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return float(value["doubleValue"])
+    if "arrayValue" in value:
+        return [_from_any_value(item) for item in value["arrayValue"].get("values", [])]
+    return value.get("stringValue")
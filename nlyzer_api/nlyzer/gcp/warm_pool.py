@@ -0,0 +1,727 @@
+"""
+Warm Pool of Pre-Provisioned Tenant Projects
+
+Creating a project and linking billing takes close to a minute and sits
+at the head of every provisioning run. The warm pool does this work
+ahead of time: it keeps a number of generic projects that are created,
+billed and networked but belong to no tenant. A new tenant claims one,
+the project is relabelled for the tenant, and provisioning continues
+with the tenant-specific steps only (see provision_new_tenant).
+
+Pool state lives in a WarmPoolStore so that several API processes share
+one pool and a claim hands out each project exactly once:
+
+- SQLAlchemyWarmPoolStore: WarmPoolProject rows in the platform database
+- InMemoryWarmPoolStore: process-local, for tests and local development
+
+Lifecycle of a pool project:
+
+    warming -> ready -> claimed (removed from the store)
+        \\          \\
+         -> (deleted when warming fails, stalls or a ready project ages out)
+
+A claim removes the project from the store in the same transaction, so
+the pool only ever holds unclaimed projects and does not grow with the
+number of tenants. From then on the project is tracked by the tenant's
+provisioning checkpoints.
+
+Refills run in the background: periodically, and right after a claim.
+The pool size follows WarmPoolPolicy, which grows the pool with recent
+demand between a minimum and a maximum.
+
+The process-wide pool starts its refills itself: get_warm_pool starts
+them on the running event loop, so the first provisioning run of a
+process warms the pool. Call get_warm_pool during application startup
+to have projects ready before the first signup, and stop the refills
+on shutdown:
+
+    pool = get_warm_pool()        # on startup, inside the event loop
+    ...
+    if pool is not None:
+        await pool.stop()         # on shutdown
+
+A WarmPool created directly is started with start().
+
+Usage:
+    result = await provision_new_tenant(tenant_id, config)
+"""
+
+import asyncio
+import copy
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from nlyzer.core.config import settings
+from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.operations import get_operation_poller
+from nlyzer.gcp.resilience import with_resilience
+
+logger = logging.getLogger(__name__)
+
+# Pool project states. Warming and ready projects are stored in
+# WarmPoolProject.status; claimed is only the state of a returned claim.
+POOL_WARMING = "warming"
+POOL_READY = "ready"
+POOL_CLAIMED = "claimed"
+
+# Pool size bounds. The default minimum comes from settings.WARM_POOL_SIZE;
+# without it the pool is disabled.
+DEFAULT_MAX_POOL_SIZE = 20
+
+# Ready projects older than this are replaced, so pooled projects never
+# drift far from the current project template
+DEFAULT_MAX_AGE = 7 * 24 * 3600.0
+
+# Claims counted for the demand-based pool size, and the time it takes to
+# warm a replacement project
+DEFAULT_DEMAND_WINDOW = 3600.0
+DEFAULT_WARMUP_LEAD_TIME = 120.0
+
+# Projects warmed at the same time, and seconds between background refills
+DEFAULT_MAX_CONCURRENT_WARMUPS = 5
+DEFAULT_REFILL_INTERVAL = 60.0
+
+# Projects stuck in warming for longer than this were abandoned, e.g. by a
+# crashed process, and are deleted
+WARMUP_TIMEOUT = 900.0
+
+# Claimed projects that fail to relabel are discarded; claiming gives up
+# and falls back to a fresh project after this many
+MAX_CLAIM_ATTEMPTS = 3
+
+PROJECT_OPERATION_TIMEOUT = 120.0
+NETWORK_OPERATION_TIMEOUT = 300.0
+PROJECT_CREATION_POLL_DELAY = 20.0
+PROJECT_UPDATE_POLL_DELAY = 1.0
+PROJECT_DELETION_POLL_DELAY = 5.0
+NETWORK_CREATION_POLL_DELAY = 10.0
+
+# Labels of an unclaimed pool project
+POOL_LABELS = {
+    "environment": "production",
+    "managed-by": "nlyzer-provisioner",
+    "nlyzer-pool": "warm",
+}
+
+
+@dataclass
+class WarmProject:
+    """
+    A project in the warm pool.
+    
+    Attributes:
+        project_id: GCP project ID
+        status: POOL_WARMING, POOL_READY or POOL_CLAIMED
+        created_at: When warming started
+        ready_at: When warming finished
+        claimed_by: Tenant that claimed the project
+        claimed_at: When the project was claimed
+    """
+    
+    project_id: str
+    status: str = POOL_WARMING
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    ready_at: Optional[datetime] = None
+    claimed_by: Optional[str] = None
+    claimed_at: Optional[datetime] = None
+    
+    def provisioning_outputs(self) -> Dict[str, Any]:
+        """Step outputs the project provides to provision_new_tenant."""
+        return {"create_project": self.project_id, "link_billing": None}
+
+
+@dataclass
+class WarmPoolPolicy:
+    """
+    Size, age and refill policy of the warm pool.
+    
+    The target size is min_size plus the claims expected while a
+    replacement project warms up, based on the claims of the last
+    demand_window seconds, capped at max_size.
+    
+    Attributes:
+        min_size: Ready projects kept even without demand
+        max_size: Upper bound for the pool
+        max_age: Seconds after which a ready project is replaced
+        demand_window: Seconds of claim history used for the target size
+        warmup_lead_time: Seconds it takes to warm a project
+        max_concurrent_warmups: Projects warmed at the same time
+        refill_interval: Seconds between background refills
+    """
+    
+    min_size: int = 0
+    max_size: int = DEFAULT_MAX_POOL_SIZE
+    max_age: float = DEFAULT_MAX_AGE
+    demand_window: float = DEFAULT_DEMAND_WINDOW
+    warmup_lead_time: float = DEFAULT_WARMUP_LEAD_TIME
+    max_concurrent_warmups: int = DEFAULT_MAX_CONCURRENT_WARMUPS
+    refill_interval: float = DEFAULT_REFILL_INTERVAL
+    
+    def target_size(self, recent_claims: int) -> int:
+        """
+        Get the number of projects the pool should hold.
+        
+        Args:
+            recent_claims: Claims in the last demand_window seconds
+        
+        Returns:
+            Target number of ready and warming projects
+        """
+        expected = math.ceil(recent_claims * self.warmup_lead_time / self.demand_window)
+        return min(self.max_size, self.min_size + expected)
+
+
+# ============================================================================
+# Pool Stores
+# ============================================================================
+
+class WarmPoolStore(ABC):
+    """
+    Persistence for warm pool projects.
+    """
+    
+    @abstractmethod
+    async def add(self, project_id: str) -> WarmProject:
+        """Record a project that started warming."""
+    
+    @abstractmethod
+    async def mark_ready(self, project_id: str) -> None:
+        """Record that a project finished warming."""
+    
+    @abstractmethod
+    async def claim(self, tenant_id: str) -> Optional[WarmProject]:
+        """
+        Atomically hand the oldest ready project to a tenant.
+        
+        The project is removed from the store as part of the claim.
+        
+        Returns:
+            The claimed project, or None if no project is ready
+        """
+    
+    @abstractmethod
+    async def list(self, status: Optional[str] = None) -> List[WarmProject]:
+        """List pool projects, optionally only those in one state."""
+    
+    @abstractmethod
+    async def remove(self, project_id: str) -> None:
+        """Forget a project, e.g. after it was deleted."""
+
+
+class InMemoryWarmPoolStore(WarmPoolStore):
+    """
+    Process-local warm pool store.
+    """
+    
+    def __init__(self):
+        self._projects: Dict[str, WarmProject] = {}
+    
+    async def add(self, project_id: str) -> WarmProject:
+        project = WarmProject(project_id)
+        self._projects[project_id] = project
+        return copy.copy(project)
+    
+    async def mark_ready(self, project_id: str) -> None:
+        project = self._projects[project_id]
+        project.status = POOL_READY
+        project.ready_at = datetime.utcnow()
+    
+    async def claim(self, tenant_id: str) -> Optional[WarmProject]:
+        ready = [
+            project for project in self._projects.values()
+            if project.status == POOL_READY
+        ]
+        if not ready:
+            return None
+        project = min(ready, key=lambda item: item.ready_at)
+        del self._projects[project.project_id]
+        project.status = POOL_CLAIMED
+        project.claimed_by = tenant_id
+        project.claimed_at = datetime.utcnow()
+        return copy.copy(project)
+    
+    async def list(self, status: Optional[str] = None) -> List[WarmProject]:
+        return [
+            copy.copy(project) for project in self._projects.values()
+            if status is None or project.status == status
+        ]
+    
+    async def remove(self, project_id: str) -> None:
+        self._projects.pop(project_id, None)
+
+
+class SQLAlchemyWarmPoolStore(WarmPoolStore):
+    """
+    Warm pool store backed by the platform database.
+    
+    Claims lock the chosen row (SKIP LOCKED where the database supports
+    it) and delete it, so concurrent claims from several processes never
+    get the same project.
+    """
+    
+    def __init__(self, session_factory):
+        """
+        Initialize the store.
+        
+        Args:
+            session_factory: SQLAlchemy sessionmaker bound to the platform
+                            database
+        """
+        self._session_factory = session_factory
+    
+    async def add(self, project_id: str) -> WarmProject:
+        return await asyncio.to_thread(self._add, project_id)
+    
+    async def mark_ready(self, project_id: str) -> None:
+        await asyncio.to_thread(self._mark_ready, project_id)
+    
+    async def claim(self, tenant_id: str) -> Optional[WarmProject]:
+        return await asyncio.to_thread(self._claim, tenant_id)
+    
+    async def list(self, status: Optional[str] = None) -> List[WarmProject]:
+        return await asyncio.to_thread(self._list, status)
+    
+    async def remove(self, project_id: str) -> None:
+        await asyncio.to_thread(self._remove, project_id)
+    
+    # ========================================================================
+    # Private Helper Methods (run on a worker thread)
+    # ========================================================================
+    
+    @staticmethod
+    def _to_project(row) -> WarmProject:
+        """Convert a WarmPoolProject row to a WarmProject."""
+        return WarmProject(
+            project_id=row.project_id,
+            status=row.status,
+            created_at=row.created_at,
+            ready_at=row.ready_at
+        )
+    
+    def _add(self, project_id: str) -> WarmProject:
+        from nlyzer.db.models import WarmPoolProject
+        
+        with self._session_factory() as session:
+            row = WarmPoolProject(
+                project_id=project_id,
+                status=POOL_WARMING,
+                created_at=datetime.utcnow()
+            )
+            session.add(row)
+            session.commit()
+            return self._to_project(row)
+    
+    def _mark_ready(self, project_id: str) -> None:
+        from nlyzer.db.models import WarmPoolProject
+        
+        with self._session_factory() as session:
+            row = session.query(WarmPoolProject).filter_by(project_id=project_id).one()
+            row.status = POOL_READY
+            row.ready_at = datetime.utcnow()
+            session.commit()
+    
+    def _claim(self, tenant_id: str) -> Optional[WarmProject]:
+        from nlyzer.db.models import WarmPoolProject
+        
+        with self._session_factory() as session:
+            row = (
+                session.query(WarmPoolProject)
+                .filter_by(status=POOL_READY)
+                .order_by(WarmPoolProject.ready_at)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if row is None:
+                return None
+            project = self._to_project(row)
+            session.delete(row)
+            session.commit()
+        
+        project.status = POOL_CLAIMED
+        project.claimed_by = tenant_id
+        project.claimed_at = datetime.utcnow()
+        return project
+    
+    def _list(self, status: Optional[str]) -> List[WarmProject]:
+        from nlyzer.db.models import WarmPoolProject
+        
+        with self._session_factory() as session:
+            query = session.query(WarmPoolProject)
+            if status is not None:
+                query = query.filter_by(status=status)
+            return [self._to_project(row) for row in query.all()]
+    
+    def _remove(self, project_id: str) -> None:
+        from nlyzer.db.models import WarmPoolProject
+        
+        with self._session_factory() as session:
+            session.query(WarmPoolProject).filter_by(project_id=project_id).delete()
+            session.commit()
+
+
+# ============================================================================
+# Warm Pool
+# ============================================================================
+
+class WarmPool:
+    """
+    Keeps pre-provisioned projects ready for new tenants.
+    
+    All methods must be called from the same event loop.
+    """
+    
+    def __init__(
+        self,
+        client_manager: Optional[GCPClientManager] = None,
+        store: Optional[WarmPoolStore] = None,
+        policy: Optional[WarmPoolPolicy] = None
+    ):
+        """
+        Initialize the pool.
+        
+        Args:
+            client_manager: GCP client manager for the control-plane project
+            store: Pool store. Defaults to an in-memory store.
+            policy: Size and refill policy. Defaults to WarmPoolPolicy().
+        """
+        self.client_manager = with_resilience(client_manager or GCPClientManager())
+        self.store = store or InMemoryWarmPoolStore()
+        self.policy = policy or WarmPoolPolicy()
+        
+        self._claims = deque()
+        self._refill_lock = asyncio.Lock()
+        self._refill_requested = asyncio.Event()
+        self._warming: set = set()
+        self._task: Optional[asyncio.Task] = None
+        
+        self._claimed = 0
+        self._misses = 0
+        self._warmed = 0
+        self._warm_failures = 0
+        self._aged_out = 0
+    
+    async def claim(self, tenant_id: str) -> Optional[WarmProject]:
+        """
+        Claim a ready project for a tenant and relabel it.
+        
+        A refill is requested in the background after every claim.
+        
+        Args:
+            tenant_id: Tenant the project is for
+        
+        Returns:
+            The claimed project, or None if the pool is empty
+        """
+        self._claims.append(time.monotonic())
+        self._refill_requested.set()
+        
+        for _ in range(MAX_CLAIM_ATTEMPTS):
+            project = await self.store.claim(tenant_id)
+            if project is None:
+                break
+            try:
+                await self._assign_to_tenant(project.project_id, tenant_id)
+            except Exception as error:
+                logger.error(
+                    f"Failed to assign pool project {project.project_id} "
+                    f"to tenant {tenant_id}: {str(error)}"
+                )
+                await self._discard(project.project_id)
+                continue
+            
+            self._claimed += 1
+            logger.info(f"Tenant {tenant_id} claimed pool project {project.project_id}")
+            return project
+        
+        self._misses += 1
+        logger.info(f"Warm pool empty; tenant {tenant_id} gets a fresh project")
+        return None
+    
+    async def refill(self) -> Dict[str, int]:
+        """
+        Bring the pool to its target size once.
+        
+        Ages out old ready projects, deletes stalled warmups and warms new
+        projects until ready plus warming projects reach the target.
+        
+        Returns:
+            Dict with the target size and the number of projects warmed
+            and retired in this pass
+        """
+        async with self._refill_lock:
+            retired = await self._retire_expired()
+            
+            ready = await self.store.list(POOL_READY)
+            warming = await self.store.list(POOL_WARMING)
+            target = self.policy.target_size(self._recent_claims())
+            deficit = target - len(ready) - len(warming)
+            
+            warmed = 0
+            while deficit > 0:
+                batch = min(deficit, self.policy.max_concurrent_warmups)
+                results = await asyncio.gather(
+                    *(self._warm_project() for _ in range(batch))
+                )
+                warmed += sum(results)
+                deficit -= batch
+                if not all(results):
+                    # Retry on the next pass instead of hammering a
+                    # failing API
+                    break
+            
+            return {"target": target, "warmed": warmed, "retired": retired}
+    
+    def start(self) -> None:
+        """Start refilling the pool in the background on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refill_loop())
+    
+    async def stop(self) -> None:
+        """Stop background refills, waiting for a running pass to finish."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+        
+        Returns:
+            Dictionary with claims served and missed, projects warmed,
+            failed warmups, aged-out projects and recent claim count
+        """
+        return {
+            "claimed": self._claimed,
+            "misses": self._misses,
+            "warmed": self._warmed,
+            "warm_failures": self._warm_failures,
+            "aged_out": self._aged_out,
+            "recent_claims": self._recent_claims()
+        }
+    
+    # ========================================================================
+    # Private Helper Methods
+    # ========================================================================
+    
+    async def _refill_loop(self) -> None:
+        """Refill periodically and whenever a claim asks for it."""
+        while True:
+            self._refill_requested.clear()
+            try:
+                await self.refill()
+            except Exception as error:
+                logger.error(f"Warm pool refill failed: {str(error)}")
+            try:
+                await asyncio.wait_for(
+                    self._refill_requested.wait(), self.policy.refill_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+    
+    def _recent_claims(self) -> int:
+        """Count claims within the policy's demand window."""
+        horizon = time.monotonic() - self.policy.demand_window
+        while self._claims and self._claims[0] < horizon:
+            self._claims.popleft()
+        return len(self._claims)
+    
+    async def _retire_expired(self) -> int:
+        """Delete ready projects past max_age and stalled warmups."""
+        now = datetime.utcnow()
+        max_age = timedelta(seconds=self.policy.max_age)
+        stalled_after = timedelta(seconds=WARMUP_TIMEOUT)
+        
+        expired = [
+            project for project in await self.store.list(POOL_READY)
+            if now - project.ready_at > max_age
+        ] + [
+            project for project in await self.store.list(POOL_WARMING)
+            if project.project_id not in self._warming
+            and now - project.created_at > stalled_after
+        ]
+        await asyncio.gather(
+            *(self._discard(project.project_id) for project in expired)
+        )
+        self._aged_out += len(expired)
+        return len(expired)
+    
+    async def _warm_project(self) -> bool:
+        """Create, bill and network one pool project."""
+        project_id = f"nlyzer-pool-{uuid4().hex[:12]}"
+        await self.store.add(project_id)
+        self._warming.add(project_id)
+        try:
+            await self._create_project(project_id)
+            await self._link_billing(project_id)
+            await self._ensure_network(project_id)
+        except Exception as error:
+            self._warm_failures += 1
+            logger.error(f"Failed to warm pool project {project_id}: {str(error)}")
+            await self._discard(project_id)
+            return False
+        finally:
+            self._warming.discard(project_id)
+        
+        await self.store.mark_ready(project_id)
+        self._warmed += 1
+        logger.info(f"Warm pool project ready: {project_id}")
+        return True
+    
+    async def _create_project(self, project_id: str) -> None:
+        """Create a generic pool project."""
+        projects_client = self.client_manager.get_projects_async_client()
+        operation = await projects_client.create_project(request={
+            "project": {
+                "project_id": project_id,
+                "display_name": "NLyzer Warm Pool",
+                "parent": f"folders/{settings.GCP_TENANT_FOLDER_ID}",
+                "labels": POOL_LABELS
+            }
+        })
+        await get_operation_poller().wait(
+            operation, PROJECT_OPERATION_TIMEOUT,
+            initial_delay=PROJECT_CREATION_POLL_DELAY
+        )
+    
+    async def _link_billing(self, project_id: str) -> None:
+        """Link a pool project to the organization billing account."""
+        billing_client = self.client_manager.get_billing_async_client()
+        await billing_client.update_project_billing_info(request={
+            "name": f"projects/{project_id}",
+            "project_billing_info": {
+                "billing_account_name": (
+                    f"billingAccounts/{settings.GCP_BILLING_ACCOUNT_ID}"
+                )
+            }
+        })
+    
+    async def _ensure_network(self, project_id: str) -> None:
+        """Make sure the project's default VPC network exists."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        networks_client = self.client_manager.get_networks_async_client()
+        try:
+            await networks_client.get(project=project_id, network="default")
+            return
+        except gcp_exceptions.NotFound:
+            pass
+        
+        # Organizations may skip default network creation for new projects
+        operation = await networks_client.insert(request={
+            "project": project_id,
+            "network_resource": {"name": "default", "auto_create_subnetworks": True}
+        })
+        await get_operation_poller().wait_compute(
+            operation, project_id,
+            self.client_manager.get_operations_async_client(),
+            NETWORK_OPERATION_TIMEOUT, initial_delay=NETWORK_CREATION_POLL_DELAY
+        )
+    
+    async def _assign_to_tenant(self, project_id: str, tenant_id: str) -> None:
+        """Relabel a claimed project for its tenant."""
+        projects_client = self.client_manager.get_projects_async_client()
+        operation = await projects_client.update_project(request={
+            "project": {
+                "name": f"projects/{project_id}",
+                "display_name": f"NLyzer Tenant {tenant_id}"[:30],
+                "labels": {
+                    "environment": "production",
+                    "tenant-id": tenant_id,
+                    "managed-by": "nlyzer-provisioner"
+                }
+            },
+            "update_mask": {"paths": ["display_name", "labels"]}
+        })
+        await get_operation_poller().wait(
+            operation, PROJECT_OPERATION_TIMEOUT,
+            initial_delay=PROJECT_UPDATE_POLL_DELAY
+        )
+    
+    async def _discard(self, project_id: str) -> None:
+        """Delete a pool project and forget it; errors are logged."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        try:
+            projects_client = self.client_manager.get_projects_async_client()
+            operation = await projects_client.delete_project(
+                request={"name": f"projects/{project_id}"}
+            )
+            await get_operation_poller().wait(
+                operation, PROJECT_OPERATION_TIMEOUT,
+                initial_delay=PROJECT_DELETION_POLL_DELAY
+            )
+        except gcp_exceptions.NotFound:
+            pass
+        except Exception as error:
+            # Keep the record so the next pass retries the delete
+            logger.error(f"Failed to delete pool project {project_id}: {str(error)}")
+            return
+        await self.store.remove(project_id)
+
+
+# Process-wide pool, created on first use
+_warm_pool: Optional[WarmPool] = None
+_warm_pool_lock = threading.Lock()
+
+
+def get_warm_pool() -> Optional[WarmPool]:
+    """
+    Get the process-wide warm pool, creating it on first use.
+    
+    The pool is enabled by setting settings.WARM_POOL_SIZE to the number
+    of projects to keep ready. Pool state is kept in the platform database
+    when settings.DATABASE_URL is set.
+    
+    Called from a running event loop, this also starts the pool's
+    background refills on that loop, unless they are running already.
+    Called without one, e.g. at import time, the refills start with the
+    first call from the loop.
+    
+    Returns:
+        The shared WarmPool instance, or None if the pool is disabled
+    """
+    global _warm_pool
+    min_size = getattr(settings, "WARM_POOL_SIZE", None) or 0
+    if min_size <= 0:
+        return None
+    
+    if _warm_pool is None:
+        with _warm_pool_lock:
+            if _warm_pool is None:
+                store = None
+                database_url = getattr(settings, "DATABASE_URL", None)
+                if database_url:
+                    from sqlalchemy import create_engine
+                    from sqlalchemy.orm import sessionmaker
+                    
+                    engine = create_engine(database_url, pool_pre_ping=True)
+                    store = SQLAlchemyWarmPoolStore(
+                        sessionmaker(bind=engine, expire_on_commit=False)
+                    )
+                max_size = getattr(settings, "WARM_POOL_MAX_SIZE", None)
+                _warm_pool = WarmPool(
+                    store=store,
+                    policy=WarmPoolPolicy(
+                        min_size=min_size,
+                        max_size=max(min_size, max_size or DEFAULT_MAX_POOL_SIZE)
+                    )
+                )
+    
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _warm_pool
+    _warm_pool.start()
+    return _warm_pool
@@ -0,0 +1,315 @@
+"""
+Throughput benchmarks of the nlyzer.gcp hot paths against the fakes.
+
+Each benchmark runs a fixed number of rounds through benchmark.pedantic,
+with per-round setup outside the timed part, and asserts on the results
+so that a broken fast path cannot pass as a fast one.
+
+For regression checks, save a baseline and compare later runs on the same
+machine class against it:
+
+    pytest tests/benchmarks --benchmark-autosave
+    pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=min:25%
+
+With --benchmark-disable, each benchmark runs its function once as a
+plain test.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from unittest import mock
+
+import pytest
+from fakes import FakeGCP
+
+from nlyzer.gcp.checkpoints import InMemoryCheckpointStore
+from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.dns import DNSManager
+from nlyzer.gcp.dns_providers import InMemoryDNSProvider, NamecheapProvider
+from nlyzer.gcp.namecheap import NamecheapTransport, TokenBucket
+from nlyzer.gcp.provisioning import provision_new_tenant
+from nlyzer.gcp.registry import ClientRegistry
+from nlyzer.gcp.secrets import SecretCache
+
+ROUNDS = 5
+OPERATIONS = 200
+LOOKUPS = 10_000
+BASE_DOMAIN = "nlyzer.com"
+SPEEDUP = 600.0
+TENANTS = 10
+THREADS = 32
+
+
+@pytest.fixture
+def loop():
+    """Event loop shared by a benchmark's setup and timed rounds."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _client_manager(registry=None) -> GCPClientManager:
+    auth = mock.patch(
+        "nlyzer.gcp.registry._application_default_credentials",
+        return_value=(mock.sentinel.credentials, "bench-project"),
+    )
+    with auth:
+        return GCPClientManager(
+            project_id="bench-project",
+            registry=registry if registry is not None else ClientRegistry()
+        )
+
+
+# ============================================================================
+# Client Manager
+# ============================================================================
+
+
+def test_client_for_project(benchmark):
+    manager = _client_manager()
+
+    def for_projects():
+        return {
+            manager.for_project(f"tenant-{i % 100}").get_project_id()
+            for i in range(LOOKUPS)
+        }
+
+    project_ids = benchmark.pedantic(for_projects, rounds=ROUNDS, warmup_rounds=1)
+
+    assert project_ids == {f"tenant-{i}" for i in range(100)}
+
+
+def test_client_cache_miss(benchmark):
+    def misses(manager):
+        return {
+            id(manager._get_cached_client(f"client-{i}", object))
+            for i in range(LOOKUPS)
+        }
+
+    # Room for every key, so that misses are not mixed with evictions
+    clients = benchmark.pedantic(
+        misses,
+        setup=lambda: ((_client_manager(ClientRegistry(max_clients=LOOKUPS)),), {}),
+        rounds=ROUNDS
+    )
+
+    assert len(clients) == LOOKUPS
+
+
+def test_client_cache_hit(benchmark):
+    manager = _client_manager()
+
+    def hits():
+        return {
+            id(manager._get_cached_client("client", object)) for _ in range(LOOKUPS)
+        }
+
+    clients = benchmark.pedantic(hits, rounds=ROUNDS, warmup_rounds=1)
+
+    assert len(clients) == 1
+
+
+@pytest.mark.parametrize("keys", [1, THREADS], ids=["same-key", "different-keys"])
+def test_client_cache_contention(benchmark, keys):
+    def contend(manager, creations):
+        barrier = threading.Barrier(THREADS)
+        lock = threading.Lock()
+
+        def factory_for(key):
+            def factory():
+                with lock:
+                    creations[key] += 1
+                return object()
+            return factory
+
+        def worker(index):
+            key = f"client-{index % keys}"
+            factory = factory_for(key)
+            barrier.wait()
+            for _ in range(LOOKUPS // THREADS):
+                manager._get_cached_client(key, factory)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return creations
+
+    creations = benchmark.pedantic(
+        contend, setup=lambda: ((_client_manager(), Counter()), {}), rounds=ROUNDS
+    )
+
+    # Single-flight: every key is built once, however many threads race
+    assert creations == Counter({f"client-{index}": 1 for index in range(keys)})
+
+
+# ============================================================================
+# Secrets
+# ============================================================================
+
+
+@pytest.fixture
+def secret_backend(fake_gcp):
+    for index in range(OPERATIONS):
+        fake_gcp.secrets[f"secret-{index}"] = f"value-{index}".encode()
+    return fake_gcp
+
+
+def test_secrets_fetch(benchmark, loop, secret_backend):
+    def fetch(cache):
+        return _run_all(
+            loop, (cache.get(f"secret-{index}") for index in range(OPERATIONS))
+        )
+
+    values = benchmark.pedantic(
+        fetch,
+        setup=lambda: ((SecretCache(secret_backend, max_entries=OPERATIONS),), {}),
+        rounds=ROUNDS
+    )
+
+    assert values == [f"value-{index}" for index in range(OPERATIONS)]
+
+
+def test_secrets_cached(benchmark, loop, secret_backend):
+    cache = SecretCache(secret_backend)
+    loop.run_until_complete(cache.get("secret-0"))
+    calls = secret_backend.quotas.calls
+
+    async def read():
+        return {await cache.get("secret-0") for _ in range(LOOKUPS)}
+
+    values = benchmark.pedantic(
+        lambda: loop.run_until_complete(read()), rounds=ROUNDS
+    )
+
+    assert values == {"value-0"}
+    assert secret_backend.quotas.calls == calls
+
+
+# ============================================================================
+# DNS
+# ============================================================================
+
+
+@pytest.fixture(params=["memory", "namecheap"])
+def dns_manager_factory(request, fake_gcp, loop):
+    """
+    Build DNSManagers on each provider backend.
+
+    The in-memory zone measures DNSManager alone; NamecheapProvider adds
+    the coalescing writer and the HTTP round trips to the fake API.
+    """
+    providers = []
+
+    def build() -> DNSManager:
+        if request.param == "memory":
+            provider = InMemoryDNSProvider()
+        else:
+            # The production limiter paces Namecheap to 20 calls a minute;
+            # lift it so the benchmark measures nlyzer's side of the calls
+            transport = NamecheapTransport(
+                "user", "key", "user", "127.0.0.1",
+                rate_limiter=TokenBucket(rate=10000, burst=1000),
+                api_url=request.getfixturevalue("fake_namecheap").url,
+                max_retries=0
+            )
+            provider = NamecheapProvider(transport, BASE_DOMAIN)
+        providers.append(provider)
+        return DNSManager(client_manager=fake_gcp, provider=provider)
+
+    yield build
+    for provider in providers:
+        loop.run_until_complete(provider.aclose())
+
+
+def _run_all(loop, calls):
+    """Run coroutines concurrently on the loop and return their results."""
+    async def gather():
+        return await asyncio.gather(*calls)
+    return loop.run_until_complete(gather())
+
+
+def _configure_all(loop, manager: DNSManager):
+    return _run_all(loop, (
+        manager.configure_namecheap_dns_record(f"t{index}", "10.0.0.1")
+        for index in range(OPERATIONS)
+    ))
+
+
+def _host_names(loop, manager: DNSManager) -> set:
+    records = loop.run_until_complete(manager.get_zone_records())
+    return {record["HostName"] for record in records}
+
+
+def test_dns_configure(benchmark, loop, dns_manager_factory):
+    managers = []
+
+    def setup():
+        managers.append(dns_manager_factory())
+        return (managers[-1],), {}
+
+    results = benchmark.pedantic(
+        lambda manager: _configure_all(loop, manager), setup=setup, rounds=ROUNDS
+    )
+
+    assert {result["status"] for result in results} == {"success"}
+    assert {f"t{index}" for index in range(OPERATIONS)} <= _host_names(
+        loop, managers[-1]
+    )
+
+
+def test_dns_remove(benchmark, loop, dns_manager_factory):
+    managers = []
+
+    def setup():
+        managers.append(dns_manager_factory())
+        _configure_all(loop, managers[-1])
+        return (managers[-1],), {}
+
+    def remove(manager):
+        return _run_all(loop, (
+            manager.remove_dns_record(f"t{index}") for index in range(OPERATIONS)
+        ))
+
+    results = benchmark.pedantic(remove, setup=setup, rounds=ROUNDS)
+
+    assert {result["action"] for result in results} == {"removed"}
+    assert not _host_names(loop, managers[-1]) & {
+        f"t{index}" for index in range(OPERATIONS)
+    }
+
+
+# ============================================================================
+# Provisioning
+# ============================================================================
+
+
+def test_provisioning_end_to_end(benchmark, loop, compress_time, health_url):
+    async def compress():
+        compress_time(SPEEDUP)
+
+    loop.run_until_complete(compress())
+    backend = FakeGCP(SPEEDUP, health_url)
+
+    def provision(round_index):
+        return _run_all(loop, (
+            provision_new_tenant(
+                f"bench{round_index}x{index:02d}",
+                {"credentials": {"API_KEY": "secret"}},
+                client_manager=backend,
+                checkpoint_store=InMemoryCheckpointStore()
+            )
+            for index in range(TENANTS)
+        ))
+
+    rounds = iter(range(ROUNDS))
+    results = benchmark.pedantic(
+        provision, setup=lambda: ((next(rounds),), {}), rounds=ROUNDS
+    )
+
+    assert [result["status"] for result in results] == ["success"] * TENANTS
@@ -0,0 +1,144 @@
+"""
+Shared Fixtures for the nlyzer_api Test Suite
+
+Provides the in-process fakes of fakes.py as fixtures, and a settings
+stub for running nlyzer.gcp without the application's configuration
+module. Process-wide singletons of nlyzer.gcp (resilience, quotas,
+tracing, caches) are reset for every test, so that breakers opened or
+budgets spent by one test cannot leak into the next.
+"""
+
+import sys
+import types
+
+import pytest
+from fakes import FakeGCP, FakeNamecheap, FaultInjector, start_health_server
+
+# Settings the nlyzer.gcp modules read; the application loads them from the
+# environment through nlyzer.core.config
+TEST_SETTINGS = {
+    "GCP_PROJECT_ID": "nlyzer-control-plane",
+    "GCP_REGION": "us-central1",
+    "GCP_ZONE": "us-central1-a",
+    "GCP_TENANT_FOLDER_ID": "123456789",
+    "GCP_BILLING_ACCOUNT_ID": "000000-000000-000000",
+    "ARTIFACT_REGISTRY_URL": "us-central1-docker.pkg.dev/nlyzer/images",
+    "GLOBAL_LOAD_BALANCER_IP": "34.102.136.180",
+    "NAMECHEAP_BASE_DOMAIN": "nlyzer.com",
+    "NAMECHEAP_SANDBOX_MODE": True,
+    "DNS_PROVIDER": "namecheap",
+    "CLOUD_DNS_MANAGED_ZONE": "nlyzer-com",
+    "DATABASE_URL": None,
+    "PROVISIONING_TRACE_FILE": None,
+    "WARM_POOL_SIZE": 0,
+    "WARM_POOL_MAX_SIZE": 20,
+}
+
+
+def _install_settings_stub() -> None:
+    """Register nlyzer.core.config with TEST_SETTINGS unless it exists."""
+    try:
+        import nlyzer.core.config  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    core = types.ModuleType("nlyzer.core")
+    config = types.ModuleType("nlyzer.core.config")
+    config.settings = types.SimpleNamespace(**TEST_SETTINGS)
+    core.config = config
+    sys.modules["nlyzer.core"] = core
+    sys.modules["nlyzer.core.config"] = config
+
+
+_install_settings_stub()
+
+
+@pytest.fixture(autouse=True)
+def reset_singletons(monkeypatch):
+    """Give every test fresh process-wide managers and caches."""
+    from nlyzer.gcp import (
+        checkpoints,
+        namecheap,
+        quotas,
+        resilience,
+        secrets,
+        tracing,
+        warm_pool,
+    )
+
+    for module, name in (
+        (checkpoints, "_checkpoint_store"),
+        (namecheap, "_rate_limiter"),
+        (quotas, "_quota_manager"),
+        (resilience, "_resilience_manager"),
+        (secrets, "_secret_cache"),
+        (tracing, "_tracer"),
+        (warm_pool, "_warm_pool"),
+    ):
+        monkeypatch.setattr(module, name, None)
+
+
+@pytest.fixture
+def fake_gcp():
+    """Fake GCP without quotas and with 1ms calls."""
+    return FakeGCP(quotas={}, latency=0.001)
+
+
+@pytest.fixture
+def faults():
+    """Fault injector wired into the fake_gcp_with_faults fixture."""
+    return FaultInjector()
+
+
+@pytest.fixture
+def fake_gcp_with_faults(faults):
+    """Fake GCP without quotas whose calls fail through `faults`."""
+    return FakeGCP(quotas={}, latency=0.001, faults=faults)
+
+
+@pytest.fixture
+def fake_namecheap():
+    """Running fake Namecheap API with a generous rate limit."""
+    server = FakeNamecheap().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def health_url():
+    """URL of a local endpoint answering 200 to every GET."""
+    server, url = start_health_server()
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def compress_time(monkeypatch):
+    """
+    Put provisioning's poll delays and the operation poller of the running
+    event loop on a time scale compressed by the given speedup.
+
+    Tests running against FakeGCP(speedup) call compress_time(speedup)
+    from their coroutine before provisioning.
+    """
+    from nlyzer.gcp import operations, provisioning, warm_pool
+
+    def compress(speedup: float) -> None:
+        for module in (provisioning, warm_pool):
+            for name in dir(module):
+                if name.endswith("_POLL_DELAY"):
+                    monkeypatch.setattr(
+                        module, name, getattr(module, name) / speedup
+                    )
+        monkeypatch.setattr(
+            operations, "DEFAULT_MAX_INTERVAL",
+            operations.DEFAULT_MAX_INTERVAL / speedup
+        )
+        operations.get_operation_poller().max_interval = (
+            operations.DEFAULT_MAX_INTERVAL
+        )
+
+    return compress
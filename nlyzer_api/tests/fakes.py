@@ -0,0 +1,646 @@
+"""
+In-Process Fakes of GCP and Namecheap for Tests and Benchmarks
+
+Shared by the test suite (through conftest.py) and by the benchmarks in
+scripts/benchmarks, so that both exercise nlyzer.gcp against the same
+backends and never touch real GCP:
+
+- FakeGCP: stands in for GCPClientManager and hands out a fake async
+  client for every service it serves (projects, billing, IAM, Secret
+  Manager, Cloud Storage, Compute Engine instances, networks, firewalls
+  and operations, Cloud Run). Calls take a configurable latency, are
+  metered by sliding-window quotas that reject excess calls with
+  ResourceExhausted like GCP does, and can fail on purpose through a
+  FaultInjector. Long-running operations finish after OPERATION_SECONDS.
+- FakeNamecheap: a local HTTP server speaking the Namecheap XML API
+  (getHosts / setHosts) over an in-memory zone, with a rate limit,
+  per-request latency and injectable API errors.
+- start_health_server: a local endpoint answering 200 to every GET, used
+  as the NLWeb service URL so deployment validation passes.
+
+All times are divided by the speedup passed to FakeGCP, so a test or
+benchmark can simulate hours of provisioning in seconds.
+"""
+
+import asyncio
+import functools
+import itertools
+import random
+import threading
+import time
+import types
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from google.api_core import exceptions as gcp_exceptions
+
+# Quotas enforced by the fake, in calls per minute
+FAKE_QUOTAS_PER_MINUTE = {
+    "cloudresourcemanager.googleapis.com": 600,
+    "cloudresourcemanager.googleapis.com/create_project": 15,
+    "cloudbilling.googleapis.com": 300,
+    "iam.googleapis.com": 600,
+    "iam.googleapis.com/create_service_account": 60,
+    "secretmanager.googleapis.com": 600,
+    "storage.googleapis.com": 600,
+    "compute.googleapis.com": 1200,
+    "compute.googleapis.com@us-central1": 600,
+    "run.googleapis.com": 180,
+    "run.googleapis.com@us-central1": 60,
+}
+
+# Duration of each long-running operation in seconds
+OPERATION_SECONDS = {
+    "create_project": 45.0,
+    "insert_instance": 90.0,
+    "insert_firewall": 20.0,
+    "create_service": 60.0,
+    "delete_project": 5.0,
+    "delete_instance": 40.0,
+    "delete_firewall": 10.0,
+    "delete_service": 15.0,
+}
+
+# Latency of every other call in seconds
+CALL_SECONDS = 0.2
+
+NAMECHEAP_NAMESPACE = "http://api.namecheap.com/xml.response"
+
+
+class QuotaEnforcer:
+    """Sliding-window quotas over simulated minutes."""
+
+    def __init__(self, speedup: float, quotas: dict = None):
+        self.window = 60.0 / speedup
+        self.quotas = FAKE_QUOTAS_PER_MINUTE if quotas is None else quotas
+        self.lock = threading.Lock()
+        self.admitted = defaultdict(deque)
+        self.calls = 0
+        self.throttled = defaultdict(int)
+
+    def admit(self, keys) -> None:
+        with self.lock:
+            self.calls += 1
+            now = time.monotonic()
+            for key in keys:
+                window = self.admitted[key]
+                while window and now - window[0] > self.window:
+                    window.popleft()
+                if len(window) >= self.quotas[key]:
+                    self.throttled[key] += 1
+                    raise gcp_exceptions.ResourceExhausted(f"Quota exceeded for {key}")
+            for key in keys:
+                self.admitted[key].append(now)
+
+
+class FaultInjector:
+    """
+    Makes fake calls fail: a random fraction of all calls, and scripted
+    failures of particular methods.
+    """
+
+    def __init__(self, error_rate: float = 0.0, error=gcp_exceptions.ServiceUnavailable,
+                 seed: int = 0):
+        self.error_rate = error_rate
+        self.error = error
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.scripted = defaultdict(deque)
+        self.injected = defaultdict(int)
+
+    def fail_next(self, method: str, error: Exception, times: int = 1) -> None:
+        """Fail the next calls of a method ("create_secret" or "service/method")."""
+        with self.lock:
+            self.scripted[method].extend([error] * times)
+
+    def check(self, service: str, method: str) -> None:
+        with self.lock:
+            for key in (f"{service}/{method}", method):
+                if self.scripted[key]:
+                    error = self.scripted[key].popleft()
+                    break
+            else:
+                if not self.error_rate or self.random.random() >= self.error_rate:
+                    return
+                error = self.error(f"Injected failure of {service} {method}")
+            self.injected[f"{service}/{method}"] += 1
+        raise error
+
+
+class _Operation:
+    """Async long-running operation that finishes after a fixed time."""
+
+    def __init__(self, seconds: float, value=None):
+        self.done_at = time.monotonic() + seconds
+        self.value = value
+        self.operation = types.SimpleNamespace(
+            name=f"operations/{next(_operation_ids)}"
+        )
+
+    async def done(self) -> bool:
+        return time.monotonic() >= self.done_at
+
+    async def result(self, timeout=None):
+        await asyncio.sleep(max(0.0, self.done_at - time.monotonic()))
+        return self.value
+
+
+class _ComputeOperation:
+    """Compute Engine operation, reported by aggregatedList."""
+
+    def __init__(self, backend: "FakeGCP", project_id: str, seconds: float):
+        self.name = f"operation-{next(_operation_ids)}"
+        self.done_at = time.monotonic() + seconds
+        backend.compute_operations.setdefault(project_id, {})[self.name] = self
+
+
+_operation_ids = itertools.count()
+
+
+class _FakeClient:
+    """Base for fake service clients that meter every call."""
+
+    service = ""
+
+    def __init__(self, backend: "FakeGCP"):
+        self.backend = backend
+
+    async def _call(self, method: str, region=None):
+        quotas = self.backend.quotas.quotas
+        keys = [
+            key for key in (self.service, f"{self.service}/{method}")
+            if key in quotas
+        ]
+        if region and f"{self.service}@{region}" in quotas:
+            keys.append(f"{self.service}@{region}")
+        self.backend.quotas.admit(keys)
+        await asyncio.sleep(self.backend.latency * self.backend.scale)
+        self.backend.faults.check(self.service, method)
+
+    async def run_blocking(self, func, *args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+class _Projects(_FakeClient):
+    service = "cloudresourcemanager.googleapis.com"
+
+    async def create_project(self, request):
+        project = request["project"]
+        if project["project_id"] in self.backend.projects:
+            await self._call("create_project")
+            raise gcp_exceptions.AlreadyExists(
+                f"Project {project['project_id']} exists"
+            )
+        # Created before the call can fail, like a call whose response is lost
+        self.backend.projects[project["project_id"]] = types.SimpleNamespace(
+            state=types.SimpleNamespace(name="ACTIVE"),
+            labels=dict(project.get("labels", {}))
+        )
+        await self._call("create_project")
+        return _Operation(OPERATION_SECONDS["create_project"] * self.backend.scale)
+
+    async def get_project(self, request):
+        await self._call("get_project")
+        project_id = request["name"].split("/")[1]
+        if project_id not in self.backend.projects:
+            raise gcp_exceptions.NotFound(f"Project {project_id} not found")
+        return self.backend.projects[project_id]
+
+    async def update_project(self, request):
+        await self._call("update_project")
+        project = request["project"]
+        stored = self.backend.projects.get(project["name"].split("/")[1])
+        if stored is not None and "labels" in project:
+            stored.labels = dict(project["labels"])
+        return _Operation(0.0)
+
+    async def get_iam_policy(self, request):
+        await self._call("get_iam_policy")
+        return types.SimpleNamespace(bindings=_Bindings())
+
+    async def set_iam_policy(self, request):
+        await self._call("set_iam_policy")
+
+    async def delete_project(self, request):
+        await self._call("delete_project")
+        self.backend.projects.pop(request["name"].split("/")[1], None)
+        return _Operation(OPERATION_SECONDS["delete_project"] * self.backend.scale)
+
+
+class _Bindings(list):
+    def add(self, role, members):
+        self.append(types.SimpleNamespace(role=role, members=list(members)))
+
+
+class _Billing(_FakeClient):
+    service = "cloudbilling.googleapis.com"
+
+    async def update_project_billing_info(self, request):
+        await self._call("update_project_billing_info")
+
+    async def get_project_billing_info(self, request):
+        await self._call("get_project_billing_info")
+        return types.SimpleNamespace(billing_enabled=True)
+
+
+class _IAM(_FakeClient):
+    service = "iam.googleapis.com"
+
+    async def create_service_account(self, request):
+        await self._call("create_service_account")
+        project_id = request["name"].split("/")[-1]
+        return types.SimpleNamespace(
+            email=f"{request['account_id']}@{project_id}.iam.gserviceaccount.com"
+        )
+
+    async def get_service_account(self, request):
+        await self._call("get_service_account")
+        return types.SimpleNamespace(email=request["name"].split("/")[-1])
+
+    async def delete_service_account(self, request):
+        await self._call("delete_service_account")
+
+
+class _Secrets(_FakeClient):
+    service = "secretmanager.googleapis.com"
+
+    async def create_secret(self, request):
+        await self._call("create_secret")
+
+    async def add_secret_version(self, request):
+        await self._call("add_secret_version")
+        payload = request.get("payload") or {}
+        secret_id = request["parent"].split("/")[-1]
+        self.backend.secrets[secret_id] = payload.get("data", b"")
+        return types.SimpleNamespace(name=f"{request['parent']}/versions/1")
+
+    async def access_secret_version(self, request):
+        await self._call("access_secret_version")
+        secret_id = request["name"].split("/")[3]
+        if secret_id not in self.backend.secrets:
+            raise gcp_exceptions.NotFound(f"Secret {secret_id} not found")
+        return types.SimpleNamespace(
+            payload=types.SimpleNamespace(data=self.backend.secrets[secret_id])
+        )
+
+    async def get_secret_version(self, request):
+        await self._call("get_secret_version")
+        secret_id = request["name"].split("/")[3]
+        if secret_id not in self.backend.secrets:
+            raise gcp_exceptions.NotFound(f"Secret {secret_id} not found")
+        return types.SimpleNamespace(name=request["name"])
+
+    async def delete_secret(self, request):
+        await self._call("delete_secret")
+
+
+class _Storage(_FakeClient):
+    service = "storage.googleapis.com"
+
+    async def create_bucket(self, bucket_name, project=None, location=None):
+        if bucket_name in self.backend.buckets:
+            await self._call("create_bucket")
+            raise gcp_exceptions.Conflict(f"Bucket {bucket_name} exists")
+        self.backend.buckets.add(bucket_name)
+        await self._call("create_bucket")
+        return self._bucket()
+
+    async def lookup_bucket(self, bucket_name):
+        await self._call("lookup_bucket")
+        return self._bucket() if bucket_name in self.backend.buckets else None
+
+    async def bucket(self, bucket_name):
+        return types.SimpleNamespace(
+            delete=functools.partial(self._delete_bucket, bucket_name)
+        )
+
+    def _bucket(self):
+        blob = types.SimpleNamespace(
+            upload_from_string=lambda data, content_type=None: None
+        )
+        return types.SimpleNamespace(blob=lambda name: blob)
+
+    def _delete_bucket(self, bucket_name, force=False):
+        time.sleep(self.backend.latency * self.backend.scale)
+        if bucket_name not in self.backend.buckets:
+            raise gcp_exceptions.NotFound(f"Bucket {bucket_name} not found")
+        self.backend.buckets.discard(bucket_name)
+
+
+class _Instances(_FakeClient):
+    service = "compute.googleapis.com"
+
+    async def insert(self, request):
+        await self._call("insert", region=request["zone"].rsplit("-", 1)[0])
+        return _ComputeOperation(
+            self.backend, request["project"],
+            OPERATION_SECONDS["insert_instance"] * self.backend.scale
+        )
+
+    async def get(self, project, zone, instance):
+        await self._call("get", region=zone.rsplit("-", 1)[0])
+        interface = types.SimpleNamespace(network_i_p="10.128.0.2")
+        return types.SimpleNamespace(network_interfaces=[interface])
+
+    async def delete(self, project, zone, instance):
+        await self._call("delete", region=zone.rsplit("-", 1)[0])
+        return _ComputeOperation(
+            self.backend, project,
+            OPERATION_SECONDS["delete_instance"] * self.backend.scale
+        )
+
+
+class _Firewalls(_FakeClient):
+    service = "compute.googleapis.com"
+
+    async def insert(self, request):
+        await self._call("insert")
+        return _ComputeOperation(
+            self.backend, request["project"],
+            OPERATION_SECONDS["insert_firewall"] * self.backend.scale
+        )
+
+    async def get(self, project, firewall):
+        await self._call("get")
+        return types.SimpleNamespace(name=firewall)
+
+    async def delete(self, project, firewall):
+        await self._call("delete")
+        return _ComputeOperation(
+            self.backend, project,
+            OPERATION_SECONDS["delete_firewall"] * self.backend.scale
+        )
+
+
+class _Networks(_FakeClient):
+    service = "compute.googleapis.com"
+
+    async def get(self, project, network):
+        await self._call("get")
+        return types.SimpleNamespace(name=network)
+
+
+class _Operations(_FakeClient):
+    service = "compute.googleapis.com"
+
+    async def aggregated_list(self, request):
+        await self._call("aggregated_list")
+        now = time.monotonic()
+        operations = [
+            types.SimpleNamespace(
+                name=name,
+                status=types.SimpleNamespace(
+                    name="DONE" if now >= operation.done_at else "RUNNING"
+                ),
+                error=None
+            )
+            for name, operation in self.backend.compute_operations.get(
+                request["project"], {}
+            ).items()
+            if f'"{name}"' in request["filter"]
+        ]
+        scoped_list = types.SimpleNamespace(operations=operations)
+        return types.SimpleNamespace(items={"zones/us-central1-a": scoped_list})
+
+
+class _RunServices(_FakeClient):
+    service = "run.googleapis.com"
+
+    async def create_service(self, request):
+        await self._call("create_service", region=request["parent"].split("/")[3])
+        service = types.SimpleNamespace(uri=self.backend.service_url)
+        seconds = OPERATION_SECONDS["create_service"] * self.backend.scale
+        return _Operation(seconds, service)
+
+    async def get_service(self, request):
+        await self._call("get_service", region=request["name"].split("/")[3])
+        return types.SimpleNamespace(uri=self.backend.service_url)
+
+    async def delete_service(self, request):
+        await self._call("delete_service", region=request["name"].split("/")[3])
+        return _Operation(OPERATION_SECONDS["delete_service"] * self.backend.scale)
+
+
+# Fake client class behind each async client accessor of GCPClientManager
+CLIENT_FAKES = {
+    "get_projects_async_client": _Projects,
+    "get_billing_async_client": _Billing,
+    "get_iam_async_client": _IAM,
+    "get_secrets_async_client": _Secrets,
+    "get_storage_async_client": _Storage,
+    "get_instances_async_client": _Instances,
+    "get_firewalls_async_client": _Firewalls,
+    "get_networks_async_client": _Networks,
+    "get_operations_async_client": _Operations,
+    "get_run_services_async_client": _RunServices,
+}
+
+
+class FakeGCP:
+    """
+    Client manager returning quota-enforcing fake clients.
+
+    Args:
+        speedup: Divides every latency and operation time, and the quota
+                window
+        service_url: URL the fake Cloud Run services are reachable at
+        quotas: Calls per minute by key, as FAKE_QUOTAS_PER_MINUTE (the
+                default); an empty dict disables quotas
+        latency: Seconds each call takes, before the speedup
+        faults: FaultInjector for the calls. Defaults to no failures.
+    """
+
+    def __init__(self, speedup: float = 1.0, service_url: str = "http://unused",
+                 quotas: dict = None, latency: float = CALL_SECONDS, faults=None):
+        self.scale = 1.0 / speedup
+        self.service_url = service_url
+        self.latency = latency
+        self.quotas = QuotaEnforcer(speedup, quotas)
+        self.faults = faults or FaultInjector()
+        self.compute_operations = {}
+        self.projects = {}
+        self.buckets = set()
+        self.secrets = {}
+        self._clients = {name: fake(self) for name, fake in CLIENT_FAKES.items()}
+
+    def get_project_id(self) -> str:
+        return "nlyzer-control-plane"
+
+    def for_project(self, project_id: str) -> "FakeGCP":
+        return self
+
+    def __getattr__(self, name: str):
+        if name in self._clients:
+            return lambda: self._clients[name]
+        raise AttributeError(name)
+
+
+class FakeNamecheap(ThreadingHTTPServer):
+    """
+    In-memory Namecheap XML API with a sliding-window rate limit.
+
+    Args:
+        rate: Requests admitted per window
+        window: Seconds of the rate limit window
+        throttle_status: HTTP status of throttled requests, or 0 for an
+                         XML "too many requests" API error
+        retry_after: Retry-After seconds sent with throttled HTTP responses
+        latency: Seconds each request takes
+        error_rate: Fraction of admitted requests answered with an XML
+                    API error
+    """
+
+    daemon_threads = True
+
+    def __init__(self, rate: int = 1000, window: float = 60.0,
+                 throttle_status: int = 429, retry_after: float = 1.0,
+                 latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        super().__init__(("127.0.0.1", 0), _NamecheapHandler)
+        self.rate = rate
+        self.window = window
+        self.throttle_status = throttle_status
+        self.retry_after = retry_after
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.hosts = [{"Name": "www", "Type": "A", "Address": "1.1.1.1", "TTL": "300"}]
+        self.lock = threading.Lock()
+        self.admitted = deque()
+        self.connections = set()
+        self.requests = 0
+        self.commands = Counter()
+        self.throttled = 0
+        self.errors = 0
+        self.peak_in_window = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/xml.response"
+
+    def start(self) -> "FakeNamecheap":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def admit(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            while self.admitted and now - self.admitted[0] > self.window:
+                self.admitted.popleft()
+            if len(self.admitted) >= self.rate:
+                self.throttled += 1
+                return False
+            self.admitted.append(now)
+            self.peak_in_window = max(self.peak_in_window, len(self.admitted))
+            return True
+
+    def inject_error(self) -> bool:
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+
+class _NamecheapHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        server: FakeNamecheap = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        params = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode()).items()
+        }
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+
+        if not server.admit():
+            if server.throttle_status:
+                headers = {"Retry-After": str(server.retry_after)}
+                self._reply(server.throttle_status, "", headers)
+            else:
+                self._reply(200, _error_xml("500000", "Too many requests"))
+            return
+        if server.latency:
+            time.sleep(server.latency)
+        if server.inject_error():
+            self._reply(200, _error_xml("5050900", "Unhandled exception"))
+            return
+
+        command = params.get("Command")
+        with server.lock:
+            server.commands[command] += 1
+        if command == "namecheap.domains.dns.getHosts":
+            with server.lock:
+                hosts = "".join(
+                    f'<host Name="{h["Name"]}" Type="{h["Type"]}" '
+                    f'Address="{h["Address"]}" TTL="{h["TTL"]}"/>'
+                    for h in server.hosts
+                )
+            body = f"<DomainDNSGetHostsResult>{hosts}</DomainDNSGetHostsResult>"
+        elif command == "namecheap.domains.dns.setHosts":
+            hosts = []
+            index = 1
+            while f"HostName{index}" in params:
+                hosts.append({
+                    "Name": params[f"HostName{index}"],
+                    "Type": params[f"RecordType{index}"],
+                    "Address": params[f"Address{index}"],
+                    "TTL": params.get(f"TTL{index}", "1800"),
+                })
+                index += 1
+            with server.lock:
+                server.hosts = hosts
+            body = '<DomainDNSSetHostsResult IsSuccess="true"/>'
+        else:
+            self._reply(200, _error_xml("1010101", f"Unknown command {command}"))
+            return
+
+        self._reply(200, (
+            f'<ApiResponse Status="OK" xmlns="{NAMECHEAP_NAMESPACE}">'
+            f"<CommandResponse>{body}</CommandResponse></ApiResponse>"
+        ))
+
+    def _reply(self, status: int, body: str, headers: dict = None) -> None:
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _error_xml(number: str, message: str) -> str:
+    return (
+        f'<ApiResponse Status="ERROR" xmlns="{NAMECHEAP_NAMESPACE}">'
+        f'<Errors><Error Number="{number}">{message}</Error></Errors></ApiResponse>'
+    )
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_health_server():
+    """
+    Serve 200 to every GET on a local port, in a daemon thread.
+
+    Returns:
+        The server (call shutdown() when done) and its base URL
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
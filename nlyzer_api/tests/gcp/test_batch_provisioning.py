@@ -0,0 +1,105 @@
+"""Tests for batch provisioning against a quota-enforcing fake GCP."""
+
+import pytest
+from fakes import FakeGCP
+
+from nlyzer.gcp import batch_provisioning
+from nlyzer.gcp.batch_provisioning import (
+    TenantRequest,
+    deprovision_tenant_batch,
+    provision_tenant_batch,
+)
+from nlyzer.gcp.checkpoints import InMemoryCheckpointStore
+from nlyzer.gcp.quotas import (
+    DEFAULT_API_QUOTAS,
+    DEFAULT_MAX_THROTTLE_RETRY_DELAY,
+    DEFAULT_REGIONAL_QUOTAS,
+    DEFAULT_THROTTLE_RETRY_DELAY,
+    QuotaLimit,
+    QuotaManager,
+)
+
+SPEEDUP = 600.0
+TENANTS = 30
+CREATE_PROJECT_QUOTA = "cloudresourcemanager.googleapis.com/create_project"
+
+
+def _scaled_quotas(speedup: float) -> QuotaManager:
+    """Scheduler budgets at their defaults, on the fake's time scale."""
+    def scale(quotas):
+        return {
+            key: QuotaLimit(rate=limit.rate * speedup, burst=limit.burst)
+            for key, limit in quotas.items()
+        }
+    return QuotaManager(
+        api_quotas=scale(DEFAULT_API_QUOTAS),
+        regional_quotas=scale(DEFAULT_REGIONAL_QUOTAS),
+        throttle_retry_delay=DEFAULT_THROTTLE_RETRY_DELAY / speedup,
+        max_throttle_retry_delay=DEFAULT_MAX_THROTTLE_RETRY_DELAY / speedup
+    )
+
+
+def _requests(count: int):
+    return [
+        TenantRequest(f"batch{index:04d}", {"credentials": {"API_KEY": "secret"}})
+        for index in range(count)
+    ]
+
+
+async def test_batch_adapts_to_quota_throttling(compress_time, health_url):
+    compress_time(SPEEDUP)
+    backend = FakeGCP(SPEEDUP, health_url)
+
+    result = await provision_tenant_batch(
+        _requests(TENANTS),
+        client_manager=backend,
+        checkpoint_store=InMemoryCheckpointStore(),
+        quotas=_scaled_quotas(SPEEDUP),
+        max_concurrency=TENANTS
+    )
+
+    assert result["status"] == "success"
+    assert len(result["succeeded"]) == TENANTS
+    assert result["failed"] == []
+    # The fake's project-creation quota is below the scheduler's default
+    # budget, so the batch only succeeds by backing off
+    assert backend.quotas.throttled[CREATE_PROJECT_QUOTA]
+    assert result["quota"][CREATE_PROJECT_QUOTA]["throttled"]
+
+
+async def test_duplicate_tenant_ids_are_rejected(fake_gcp):
+    requests = _requests(2) + _requests(1)
+
+    with pytest.raises(ValueError, match="batch0000"):
+        await provision_tenant_batch(requests, client_manager=fake_gcp)
+
+
+async def test_tenant_errors_are_recorded_as_failures(fake_gcp, monkeypatch):
+    async def provision(tenant_id, config, **kwargs):
+        if tenant_id == "batch0001":
+            raise RuntimeError("boom")
+        return {"status": "success", "tenant_id": tenant_id}
+
+    monkeypatch.setattr(batch_provisioning, "provision_new_tenant", provision)
+
+    result = await provision_tenant_batch(_requests(3), client_manager=fake_gcp)
+
+    assert result["status"] == "partial"
+    assert result["succeeded"] == ["batch0000", "batch0002"]
+    assert result["failed"] == ["batch0001"]
+    assert result["results"]["batch0001"]["error_message"] == "boom"
+
+
+async def test_teardown_errors_are_recorded_as_failures(fake_gcp, monkeypatch):
+    async def deprovision(tenant_id, **kwargs):
+        if tenant_id == "gone":
+            raise RuntimeError("boom")
+        return {"status": "deprovisioned", "tenant_id": tenant_id}
+
+    monkeypatch.setattr(batch_provisioning, "deprovision_tenant", deprovision)
+
+    result = await deprovision_tenant_batch(["acme", "gone"], client_manager=fake_gcp)
+
+    assert result["status"] == "partial"
+    assert result["failed"] == ["gone"]
+    assert result["results"]["gone"]["error_message"] == "boom"
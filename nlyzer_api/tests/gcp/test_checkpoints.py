@@ -0,0 +1,157 @@
+"""Tests for claiming provisioning runs in the checkpoint stores."""
+
+import asyncio
+import functools
+
+import pytest
+
+from nlyzer.gcp.checkpoints import (
+    RUN_FAILED,
+    RUN_RUNNING,
+    RUN_SUCCEEDED,
+    InMemoryCheckpointStore,
+    SQLAlchemyCheckpointStore,
+)
+from nlyzer.gcp.exceptions import (
+    ProvisioningError,
+    ProvisioningInProgressError,
+    RunLeaseLostError,
+    TenantAlreadyExistsError,
+)
+
+
+@pytest.fixture(params=["memory", "sqlalchemy"])
+def make_store(request, tmp_path):
+    """Factory of empty stores taking a lease_seconds argument."""
+    if request.param == "memory":
+        yield InMemoryCheckpointStore
+        return
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from nlyzer.db.models import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'runs.db'}")
+    Base.metadata.create_all(engine)
+    yield functools.partial(
+        SQLAlchemyCheckpointStore, sessionmaker(bind=engine, expire_on_commit=False)
+    )
+    engine.dispose()
+
+
+async def test_concurrent_first_attempts_claim_the_run_once(make_store):
+    store = make_store()
+
+    results = await asyncio.gather(
+        *(store.start_run("acme") for _ in range(5)), return_exceptions=True
+    )
+
+    started = [result for result in results if not isinstance(result, Exception)]
+    assert len(started) == 1
+    assert started[0].attempts == 1
+    assert all(
+        isinstance(result, ProvisioningInProgressError)
+        for result in results if isinstance(result, Exception)
+    )
+
+
+async def test_finished_run_can_be_claimed_again(make_store):
+    store = make_store()
+    await store.start_run("acme")
+    await store.finish_run("acme", 1, RUN_FAILED, "create_project", "boom")
+
+    state = await store.start_run("acme")
+
+    assert state.attempts == 2
+    assert state.in_progress
+
+
+async def test_expired_lease_is_taken_over(make_store):
+    store = make_store(lease_seconds=0.05)
+    await store.start_run("acme")
+    await store.save_checkpoint("acme", "create_project", "nlyzer-tenant-acme", 1)
+    await asyncio.sleep(0.1)
+
+    state = await store.start_run("acme")
+
+    assert state.attempts == 2
+    assert state.outputs == {"create_project": "nlyzer-tenant-acme"}
+
+
+async def test_checkpoints_renew_the_lease(make_store):
+    store = make_store(lease_seconds=0.5)
+    await store.start_run("acme")
+    await asyncio.sleep(0.3)
+    await store.save_checkpoint("acme", "create_project", "nlyzer-tenant-acme", 1)
+    await asyncio.sleep(0.3)
+
+    with pytest.raises(ProvisioningInProgressError):
+        await store.start_run("acme")
+
+
+async def test_succeeded_run_is_not_claimed(make_store):
+    store = make_store()
+    await store.start_run("acme")
+    await store.save_checkpoint("acme", "create_project", "nlyzer-tenant-acme", 1)
+    await store.finish_run("acme", 1, RUN_SUCCEEDED)
+
+    with pytest.raises(TenantAlreadyExistsError) as raised:
+        await store.start_run("acme")
+
+    assert raised.value.project_id == "nlyzer-tenant-acme"
+    assert (await store.load("acme")).attempts == 1
+
+
+async def test_writes_of_a_taken_over_attempt_are_rejected(make_store):
+    store = make_store(lease_seconds=0.05)
+    stale = await store.start_run("acme")
+    await asyncio.sleep(0.1)
+    current = await store.start_run("acme")
+    await store.save_checkpoint(
+        "acme", "create_project", "nlyzer-tenant-acme", current.attempts
+    )
+
+    with pytest.raises(RunLeaseLostError) as raised:
+        await store.save_checkpoint(
+            "acme", "create_project", "nlyzer-tenant-other", stale.attempts
+        )
+    with pytest.raises(RunLeaseLostError):
+        await store.discard_checkpoints("acme", ["create_project"], stale.attempts)
+    with pytest.raises(RunLeaseLostError):
+        await store.finish_run("acme", stale.attempts, RUN_FAILED)
+
+    assert raised.value.current_attempt == current.attempts
+    state = await store.load("acme")
+    assert state.outputs == {"create_project": "nlyzer-tenant-acme"}
+    # The run still belongs to the current attempt; its short lease may
+    # have run out by now
+    assert (state.status, state.attempts) == (RUN_RUNNING, current.attempts)
+
+
+async def test_expired_attempt_keeps_writing_until_taken_over(make_store):
+    store = make_store(lease_seconds=0.05)
+    state = await store.start_run("acme")
+    await asyncio.sleep(0.1)
+
+    await store.save_checkpoint(
+        "acme", "create_project", "nlyzer-tenant-acme", state.attempts
+    )
+
+    renewed = await store.load("acme")
+    assert renewed.status == RUN_RUNNING
+    assert renewed.lease_expires_at > state.lease_expires_at
+
+
+async def test_writes_to_a_deleted_run_are_provisioning_errors(make_store):
+    store = make_store()
+    state = await store.start_run("acme")
+    await store.delete_run("acme")
+
+    with pytest.raises(ProvisioningError) as raised:
+        await store.save_checkpoint(
+            "acme", "create_project", "nlyzer-tenant-acme", state.attempts
+        )
+
+    assert isinstance(raised.value, RunLeaseLostError)
+    assert raised.value.current_attempt is None
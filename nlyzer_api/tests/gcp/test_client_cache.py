@@ -0,0 +1,223 @@
+"""Stress tests for the single-flight client cache of GCPClientManager."""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+import pytest
+
+from nlyzer.gcp.clients import CLIENT_ACCESSORS, GCPClientManager
+from nlyzer.gcp.exceptions import AuthenticationError
+from nlyzer.gcp.registry import ClientRegistry
+
+THREADS = 64
+LOOKUPS = 200
+
+
+def _manager(registry=None) -> GCPClientManager:
+    auth = mock.patch(
+        "nlyzer.gcp.registry._application_default_credentials",
+        return_value=(mock.sentinel.credentials, "test-project"),
+    )
+    with auth:
+        return GCPClientManager(
+            project_id="test-project",
+            registry=registry if registry is not None else ClientRegistry()
+        )
+
+
+def _hammer(lookup, keys: int) -> Counter:
+    """Run LOOKUPS lookups on THREADS threads released at once."""
+    creations = Counter()
+    creations_lock = threading.Lock()
+    barrier = threading.Barrier(THREADS)
+
+    def factory_for(key: str):
+        def factory():
+            with creations_lock:
+                creations[key] += 1
+            # Widen the check-then-create window
+            time.sleep(0.005)
+            return object()
+        return factory
+
+    def worker(index: int) -> None:
+        key = f"client-{index % keys}"
+        factory = factory_for(key)
+        barrier.wait()
+        for _ in range(LOOKUPS):
+            lookup(index, key, factory)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return creations
+
+
+def test_same_client_is_created_once():
+    manager = _manager()
+    clients = set()
+
+    def lookup(index, key, factory):
+        clients.add(id(manager._get_cached_client(key, factory)))
+
+    creations = _hammer(lookup, keys=1)
+
+    assert creations == {"client-0": 1}
+    assert len(clients) == 1
+
+
+def test_each_client_is_created_once_under_contention():
+    manager = _manager()
+
+    creations = _hammer(
+        lambda index, key, factory: manager._get_cached_client(key, factory),
+        keys=8
+    )
+
+    assert len(creations) == 8
+    assert set(creations.values()) == {1}
+
+
+def test_managers_sharing_a_registry_create_a_client_once():
+    registry = ClientRegistry()
+    managers = [_manager(registry) for _ in range(THREADS)]
+
+    creations = _hammer(
+        lambda index, key, factory: managers[index]._get_cached_client(
+            key, factory
+        ),
+        keys=1
+    )
+
+    assert creations == {"client-0": 1}
+
+
+def test_failed_creation_is_retried_by_the_next_caller():
+    manager = _manager()
+    attempts = []
+
+    def flaky_factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("transport unavailable")
+        return object()
+
+    with pytest.raises(AuthenticationError):
+        manager._get_cached_client("client", flaky_factory)
+    client = manager._get_cached_client("client", flaky_factory)
+
+    assert client is manager._get_cached_client("client", flaky_factory)
+    assert len(attempts) == 2
+
+
+class ClosableAsyncClient:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.transport = self
+        self.closed_on = None
+
+    async def close(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+def test_evicted_clients_are_dropped_without_being_closed():
+    registry = ClientRegistry(max_clients=1)
+    first = registry.get_client("secrets", None, mock.Mock)
+    second = registry.get_client("iam", None, mock.Mock)
+
+    registry.evict("iam")
+
+    # Other managers may still hold them
+    first.close.assert_not_called()
+    second.close.assert_not_called()
+    assert len(registry) == 0
+    assert registry.get_stats()["evictions"] == 1
+
+
+def test_loop_bound_client_is_replaced_without_being_closed():
+    registry = ClientRegistry()
+    manager = _manager(registry)
+
+    async def lookup():
+        return manager._get_cached_client("secrets_async", ClosableAsyncClient)
+
+    first_loop = asyncio.new_event_loop()
+    stale = first_loop.run_until_complete(lookup())
+    assert first_loop.run_until_complete(lookup()) is stale
+
+    current = asyncio.run(lookup())
+    first_loop.run_until_complete(asyncio.sleep(0))
+    first_loop.close()
+
+    assert current is not stale
+    assert stale.closed_on is None
+    assert current.closed_on is None
+    assert registry.get_stats()["size"] == 1
+
+
+async def test_managers_share_loop_bound_clients():
+    registry = ClientRegistry()
+    first, second = _manager(registry), _manager(registry)
+
+    client = first._get_cached_client("projects_async", ClosableAsyncClient)
+
+    assert second._get_cached_client("projects_async", ClosableAsyncClient) is client
+    assert second.get_cache_info()["projects_async"]
+
+
+def _warm_up_manager():
+    """Manager whose client accessors and token refresh are mocks."""
+    manager = _manager()
+    for accessor in CLIENT_ACCESSORS.values():
+        setattr(manager, accessor, mock.Mock())
+    manager._registry.get_credential_refresher = mock.Mock()
+    return manager
+
+
+def test_warm_up_builds_only_the_requested_clients():
+    manager = _warm_up_manager()
+
+    timings = manager.warm_up(["secrets", "iam"], fetch_token=False, connect=False)
+
+    assert set(timings) == {"secrets", "iam"}
+    for service, accessor in CLIENT_ACCESSORS.items():
+        assert getattr(manager, accessor).called == (service in timings)
+    with pytest.raises(ValueError):
+        manager.warm_up(["dns"])
+
+
+@pytest.mark.parametrize("fetch_token", [True, False])
+@pytest.mark.parametrize("connect", [True, False])
+def test_warm_up_token_fetch_and_connect_are_optional(fetch_token, connect):
+    manager = _warm_up_manager()
+    grpc = mock.Mock()
+
+    with mock.patch.dict(sys.modules, {"grpc": grpc}):
+        timings = manager.warm_up(
+            ["secrets"], fetch_token=fetch_token, connect=connect
+        )
+
+    refresher = manager._registry.get_credential_refresher.return_value
+    assert ("access_token" in timings) == fetch_token
+    assert refresher.ensure_fresh.called == fetch_token
+    assert grpc.channel_ready_future.called == connect
+
+
+def test_failing_service_does_not_abort_the_warm_up():
+    manager = _warm_up_manager()
+    manager.get_iam_client.side_effect = AuthenticationError("iam unavailable")
+    manager._registry.get_credential_refresher.return_value.ensure_fresh.side_effect = (
+        AuthenticationError("token refresh failed")
+    )
+
+    timings = manager.warm_up(["secrets", "iam", "projects"], connect=False)
+
+    assert set(timings) == {"secrets", "projects"}
+    manager.get_secrets_client.assert_called_once_with()
+    manager.get_projects_client.assert_called_once_with()
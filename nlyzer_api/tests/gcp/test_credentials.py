@@ -0,0 +1,124 @@
+"""Tests for the background credential refresher."""
+
+import datetime
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.credentials import CredentialRefresher
+from nlyzer.gcp.exceptions import AuthenticationError
+from nlyzer.gcp.registry import ClientRegistry
+
+TOKEN_LIFETIME = 3600
+
+
+class FakeCredentials:
+    """Credentials whose token expires after `expires_in` seconds."""
+
+    def __init__(self, expires_in: float = None, failures: int = 0):
+        self.token = "initial" if expires_in is not None else None
+        self.expiry = (
+            datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in)
+            if expires_in is not None else None
+        )
+        self.failures = failures
+        self.attempts = 0
+        self.refreshed_at = []
+        self.refreshed = threading.Event()
+
+    def refresh(self, request):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("token endpoint unavailable")
+        self.refreshed_at.append(datetime.datetime.utcnow())
+        self.token = f"token-{len(self.refreshed_at)}"
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=TOKEN_LIFETIME
+        )
+        self.refreshed.set()
+
+
+@pytest.fixture
+def refreshers():
+    """Stop every refresher a test creates."""
+    created = []
+    yield created
+    for refresher in created:
+        refresher.stop(timeout=1)
+
+
+def test_token_is_refreshed_before_it_expires(refreshers):
+    credentials = FakeCredentials(expires_in=0.5)
+    expiry = credentials.expiry
+    refresher = CredentialRefresher(credentials, refresh_margin=0.3, jitter=0)
+    refreshers.append(refresher)
+
+    refresher.start()
+
+    assert credentials.refreshed.wait(timeout=1)
+    assert credentials.refreshed_at[0] < expiry
+    assert refresher.get_stats()["refresh_count"] == 1
+    assert not refresher.needs_refresh()
+
+
+def test_failed_refresh_is_retried(refreshers):
+    credentials = FakeCredentials(failures=2)
+    refresher = CredentialRefresher(credentials, retry_interval=0.01)
+    refreshers.append(refresher)
+
+    refresher.start()
+
+    assert credentials.refreshed.wait(timeout=1)
+    stats = refresher.get_stats()
+    assert credentials.attempts == 3
+    assert stats["failure_count"] == 2
+    assert stats["refresh_count"] == 1
+    assert stats["last_error"] is None
+
+
+def test_request_path_refresh_raises_authentication_errors():
+    refresher = CredentialRefresher(FakeCredentials(failures=1))
+
+    with pytest.raises(AuthenticationError):
+        refresher.ensure_fresh()
+
+    assert refresher.ensure_fresh() > 0
+    assert refresher.ensure_fresh() == 0
+
+
+def test_stopped_refresher_no_longer_refreshes(refreshers):
+    credentials = FakeCredentials(expires_in=0.5)
+    refresher = CredentialRefresher(credentials, refresh_margin=0.3, jitter=0)
+    refreshers.append(refresher)
+    refresher.start()
+
+    refresher.stop(timeout=1)
+    time.sleep(0.4)
+
+    assert not refresher.running
+    assert credentials.attempts == 0
+
+
+def test_start_credential_refresh_runs_until_stopped():
+    credentials = FakeCredentials(expires_in=0.5)
+    auth = mock.patch(
+        "nlyzer.gcp.registry._application_default_credentials",
+        return_value=(credentials, "test-project"),
+    )
+    with auth:
+        manager = GCPClientManager(
+            project_id="test-project", registry=ClientRegistry()
+        )
+        refresher = manager.start_credential_refresh(refresh_margin=0.3, jitter=0)
+
+    try:
+        assert refresher.running
+        assert credentials.refreshed.wait(timeout=1)
+    finally:
+        manager.stop_credential_refresh()
+
+    assert not refresher.running
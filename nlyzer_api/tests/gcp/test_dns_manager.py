@@ -0,0 +1,126 @@
+"""Tests for DNSManager initialization against a fake Secret Manager."""
+
+import asyncio
+import functools
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from nlyzer.gcp import dns, secrets
+from nlyzer.gcp.dns import NAMECHEAP_SECRET_NAMES, DNSConfigurationError, DNSManager
+from nlyzer.gcp.namecheap import NamecheapTransport, TokenBucket
+from nlyzer.gcp.secrets import SecretCache
+
+CONCURRENT_CALLERS = 500
+
+
+@pytest.fixture
+def secret_backend(fake_gcp_with_faults, monkeypatch):
+    """
+    Fake GCP holding the Namecheap API credentials, read through the
+    process-wide secret cache.
+    """
+    for name in NAMECHEAP_SECRET_NAMES:
+        fake_gcp_with_faults.secrets[name] = f"{name}-value".encode()
+    monkeypatch.setattr(
+        secrets, "_secret_cache", SecretCache(fake_gcp_with_faults)
+    )
+    return fake_gcp_with_faults
+
+
+@pytest.fixture
+def provider_builds(monkeypatch):
+    """Count the Namecheap providers DNSManager builds."""
+    builds = []
+    original = dns.NamecheapProvider
+
+    def build(*args, **kwargs):
+        builds.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(dns, "NamecheapProvider", build)
+    return builds
+
+
+async def test_concurrent_first_calls_share_one_initialization(
+    secret_backend, provider_builds
+):
+    manager = DNSManager(client_manager=secret_backend)
+
+    await asyncio.gather(
+        *(manager._initialize_client() for _ in range(CONCURRENT_CALLERS))
+    )
+
+    assert len(provider_builds) == 1
+    assert secret_backend.quotas.calls == len(NAMECHEAP_SECRET_NAMES)
+    transport = provider_builds[0][0]
+    assert transport._credentials["ApiUser"] == "namecheap-api-user-value"
+
+
+async def test_failed_initialization_fails_every_waiter_and_is_retried(
+    secret_backend, faults, provider_builds
+):
+    faults.fail_next(
+        "access_secret_version", gcp_exceptions.PermissionDenied("denied")
+    )
+    manager = DNSManager(client_manager=secret_backend)
+
+    results = await asyncio.gather(
+        *(manager._initialize_client() for _ in range(CONCURRENT_CALLERS)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, DNSConfigurationError) for result in results)
+    assert provider_builds == []
+
+    await manager._initialize_client()
+    assert len(provider_builds) == 1
+
+
+async def test_cancelled_caller_does_not_abort_initialization(
+    secret_backend, provider_builds
+):
+    manager = DNSManager(client_manager=secret_backend)
+
+    first = asyncio.ensure_future(manager._initialize_client())
+    others = [
+        asyncio.ensure_future(manager._initialize_client()) for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.gather(*others)
+
+    assert len(provider_builds) == 1
+
+
+async def test_managers_share_one_secret_fetch(secret_backend, provider_builds):
+    first = DNSManager(client_manager=secret_backend)
+    second = DNSManager(client_manager=secret_backend)
+
+    await asyncio.gather(first._initialize_client(), second._initialize_client())
+
+    assert len(provider_builds) == 2
+    assert secret_backend.quotas.calls == len(NAMECHEAP_SECRET_NAMES)
+
+
+async def test_concurrent_first_records_share_one_initialization(
+    secret_backend, provider_builds, fake_namecheap, monkeypatch
+):
+    monkeypatch.setattr(dns, "NamecheapTransport", functools.partial(
+        NamecheapTransport, api_url=fake_namecheap.url,
+        rate_limiter=TokenBucket(rate=1000, burst=100)
+    ))
+    manager = DNSManager(client_manager=secret_backend)
+
+    results = await asyncio.gather(*(
+        manager.configure_namecheap_dns_record(f"tenant-{index}", "10.0.0.1")
+        for index in range(CONCURRENT_CALLERS)
+    ))
+    await manager._provider.aclose()
+
+    assert {result["action"] for result in results} == {"created"}
+    assert len(provider_builds) == 1
+    assert secret_backend.quotas.calls == len(NAMECHEAP_SECRET_NAMES)
+    hosts = {host["Name"] for host in fake_namecheap.hosts}
+    assert hosts >= {f"tenant-{index}" for index in range(CONCURRENT_CALLERS)}
+    assert fake_namecheap.commands["namecheap.domains.dns.setHosts"] == 1
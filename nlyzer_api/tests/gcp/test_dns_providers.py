@@ -0,0 +1,95 @@
+"""Tests for DNSManager record changes on the DNS provider backends."""
+
+import socket
+
+import pytest
+from fakes import FakeNamecheap
+
+from nlyzer.gcp.dns import DNSConfigurationError, DNSManager
+from nlyzer.gcp.dns_providers import (
+    DNSProviderError,
+    InMemoryDNSProvider,
+    NamecheapProvider,
+)
+from nlyzer.gcp.namecheap import NamecheapTransport, TokenBucket
+
+DOMAIN = "nlyzer.com"
+APEX = {"HostName": "@", "RecordType": "A", "Address": "10.0.0.9", "TTL": "300"}
+
+
+@pytest.fixture
+def zone():
+    return InMemoryDNSProvider([APEX])
+
+
+@pytest.fixture
+def manager(fake_gcp, zone):
+    return DNSManager(client_manager=fake_gcp, provider=zone)
+
+
+def _namecheap(api_url: str) -> NamecheapProvider:
+    transport = NamecheapTransport(
+        "user", "key", "user", "127.0.0.1", api_url=api_url,
+        rate_limiter=TokenBucket(rate=1000, burst=100), max_retries=0
+    )
+    return NamecheapProvider(transport, DOMAIN)
+
+
+async def test_configure_is_idempotent(manager, zone):
+    created = await manager.configure_namecheap_dns_record("acme", "10.0.0.1")
+    again = await manager.configure_namecheap_dns_record("acme", "10.0.0.1")
+
+    assert created["fqdn"] == f"acme.{DOMAIN}"
+    assert again["action"] == "unchanged"
+    assert zone.get_stats()["apply_calls"] == 1
+    assert APEX in await manager.get_zone_records()
+
+
+async def test_configure_replaces_the_address(manager, zone):
+    await manager.configure_namecheap_dns_record("acme", "10.0.0.1")
+
+    await manager.configure_namecheap_dns_record("acme", "10.0.0.2")
+
+    assert zone.lookup("acme", "A")[0]["Address"] == "10.0.0.2"
+    assert len(zone.lookup("acme", "A")) == 1
+
+
+async def test_remove_skips_missing_records(manager, zone):
+    await manager.configure_namecheap_dns_record("acme", "10.0.0.1")
+
+    removed = await manager.remove_dns_record("acme")
+    missing = await manager.remove_dns_record("acme")
+
+    assert removed["action"] == "removed"
+    assert missing["action"] == "not_found"
+    assert zone.get_stats()["apply_calls"] == 2
+    assert await manager.get_zone_records() == [APEX]
+
+
+async def test_namecheap_api_errors_are_provider_errors():
+    server = FakeNamecheap(error_rate=1.0).start()
+    provider = _namecheap(server.url)
+
+    with pytest.raises(DNSProviderError) as raised:
+        await provider.list_records()
+    await provider.aclose()
+    server.shutdown()
+    server.server_close()
+
+    assert raised.value.provider_error
+
+
+async def test_namecheap_transport_errors_are_provider_errors(fake_gcp):
+    # A port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    manager = DNSManager(
+        client_manager=fake_gcp, provider=_namecheap(f"http://127.0.0.1:{port}/")
+    )
+
+    with pytest.raises(DNSConfigurationError) as raised:
+        await manager.configure_namecheap_dns_record("acme", "10.0.0.1")
+    await manager._provider.aclose()
+
+    assert isinstance(raised.value.__context__, DNSProviderError)
@@ -0,0 +1,98 @@
+"""Tests for desired-state DNS reconciliation against an in-memory zone."""
+
+import pytest
+
+from nlyzer.gcp.dns import DNSManager
+from nlyzer.gcp.dns_providers import InMemoryDNSProvider
+from nlyzer.gcp.dns_reconciler import DesiredRecord, DNSReconciler
+
+WWW = {"HostName": "www", "RecordType": "A", "Address": "1.1.1.1", "TTL": "300"}
+TENANT_PREFIX = "t-"
+
+
+def _record(host_name: str, address: str) -> dict:
+    return {"HostName": host_name, "RecordType": "A", "Address": address, "TTL": "300"}
+
+
+def _is_tenant_record(record: dict) -> bool:
+    return record["HostName"].startswith(TENANT_PREFIX)
+
+
+@pytest.fixture
+def zone():
+    return InMemoryDNSProvider([
+        WWW,
+        _record("t-acme", "10.0.0.1"),
+        _record("t-globex", "10.0.0.2"),
+        _record("t-initech", "10.0.0.3"),
+    ])
+
+
+@pytest.fixture
+def reconciler(fake_gcp, zone):
+    desired = [
+        DesiredRecord("t-acme", "10.0.0.1"),
+        DesiredRecord("t-globex", "10.0.0.20"),
+        DesiredRecord("t-umbrella", "10.0.0.4"),
+    ]
+
+    async def load_desired():
+        return desired
+
+    manager = DNSManager(client_manager=fake_gcp, provider=zone)
+    return DNSReconciler(manager, load_desired, owns=_is_tenant_record)
+
+
+async def test_plan_creates_updates_and_deletes(reconciler):
+    plan = await reconciler.plan()
+
+    assert plan.describe() == [
+        "+ t-umbrella A 10.0.0.4",
+        "~ t-globex A 10.0.0.2 -> 10.0.0.20",
+        "- t-initech A 10.0.0.3",
+    ]
+    assert plan.unchanged == 1
+
+
+async def test_reconcile_applies_the_plan_in_one_write(reconciler, zone):
+    result = await reconciler.reconcile()
+
+    assert result.applied
+    assert zone.get_stats()["apply_calls"] == 1
+    assert zone.lookup("t-umbrella", "A")[0]["Address"] == "10.0.0.4"
+    assert zone.lookup("t-globex", "A")[0]["Address"] == "10.0.0.20"
+    assert zone.lookup("t-initech", "A") == []
+    # Records the reconciler does not own are left alone
+    assert zone.lookup("www", "A") == [WWW]
+
+    again = await reconciler.reconcile()
+    assert again.plan.is_empty
+    assert not again.applied
+    assert zone.get_stats()["apply_calls"] == 1
+
+
+async def test_dry_run_makes_no_writes(reconciler, zone):
+    before = await zone.list_records()
+
+    result = await reconciler.reconcile(dry_run=True)
+
+    assert result.dry_run
+    assert not result.applied
+    assert len(result.plan.changes) == 3
+    assert zone.get_stats()["apply_calls"] == 0
+    assert await zone.list_records() == before
+    assert reconciler.get_stats()["last_run"]["missing"] == 1
+    assert reconciler.get_stats()["records_repaired"] == 0
+
+
+async def test_without_owns_nothing_is_deleted(fake_gcp, zone):
+    async def load_desired():
+        return [DesiredRecord("t-acme", "10.0.0.1")]
+
+    manager = DNSManager(client_manager=fake_gcp, provider=zone)
+    reconciler = DNSReconciler(manager, load_desired)
+
+    result = await reconciler.reconcile()
+
+    assert result.plan.is_empty
+    assert zone.lookup("t-initech", "A")[0]["Address"] == "10.0.0.3"
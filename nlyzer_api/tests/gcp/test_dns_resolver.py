@@ -0,0 +1,247 @@
+"""Tests for the asyncio DNS resolver and propagation checks on a local UDP stub."""
+
+import asyncio
+import socket
+import struct
+import time
+
+import pytest
+
+from nlyzer.gcp.dns import DNSManager
+from nlyzer.gcp.dns_resolver import (
+    RCODE_NXDOMAIN,
+    AsyncDNSResolver,
+    DNSQueryError,
+    backoff_delay,
+)
+
+_HEADER = struct.Struct("!HHHHHH")
+
+
+class StubNameserver(asyncio.DatagramProtocol):
+    """
+    Authoritative nameserver answering A queries from a dict.
+
+    Names missing from `records` get NXDOMAIN. Every query is recorded.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.queries = []
+        self.transport = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        query_id, flags = struct.unpack("!HH", data[:4])
+        question = data[12:]
+        name, offset = [], 0
+        while question[offset]:
+            length = question[offset]
+            name.append(question[offset + 1:offset + 1 + length].decode())
+            offset += length + 1
+        fqdn = ".".join(name).lower()
+        self.queries.append((fqdn, bool(flags & 0x0100)))
+
+        addresses = self.records.get(fqdn)
+        rcode = RCODE_NXDOMAIN if addresses is None else 0
+        answers = b"".join(
+            struct.pack("!HHHIH", 0xC00C, 1, 1, 60, 4) + socket.inet_aton(address)
+            for address in addresses or ()
+        )
+        header = _HEADER.pack(
+            query_id, 0x8000 | 0x0400 | rcode, 1, len(addresses or ()), 0, 0
+        )
+        self.transport.sendto(header + question + answers, addr)
+
+
+@pytest.fixture
+async def stub():
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        StubNameserver, local_addr=("127.0.0.1", 0)
+    )
+    protocol.address = transport.get_extra_info("sockname")
+    yield protocol
+    transport.close()
+
+
+@pytest.fixture
+def resolver(stub):
+    return AsyncDNSResolver(nameservers=[stub.address], timeout=0.5)
+
+
+async def test_resolves_a_records_without_recursion(stub, resolver):
+    stub.records["acme.nlyzer.com"] = ["34.102.136.180", "34.102.136.181"]
+
+    addresses = await resolver.resolve_a("acme.nlyzer.com")
+
+    assert addresses == ["34.102.136.180", "34.102.136.181"]
+    assert stub.queries == [("acme.nlyzer.com", False)]
+
+
+async def test_nxdomain_resolves_to_no_addresses(resolver):
+    assert await resolver.resolve_a("missing.nlyzer.com") == []
+
+
+async def test_unresponsive_nameserver_raises():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as silent:
+        silent.bind(("127.0.0.1", 0))
+        resolver = AsyncDNSResolver(
+            nameservers=[silent.getsockname()], timeout=0.1
+        )
+        with pytest.raises(DNSQueryError):
+            await resolver.resolve_a("acme.nlyzer.com")
+
+
+async def test_propagation_check_polls_until_the_record_appears(
+    stub, resolver, fake_gcp
+):
+    manager = DNSManager(client_manager=fake_gcp, resolver=resolver)
+    loop = asyncio.get_running_loop()
+    loop.call_later(
+        0.15, stub.records.__setitem__, "acme.nlyzer.com", ["34.102.136.180"]
+    )
+
+    propagated = await manager.validate_dns_propagation(
+        "acme.nlyzer.com", "34.102.136.180",
+        delay_seconds=0.05, max_delay_seconds=0.1, deadline_seconds=5
+    )
+
+    assert propagated
+    assert 2 <= len(stub.queries) < 20
+
+
+async def test_propagation_check_stops_at_its_deadline(resolver, fake_gcp):
+    manager = DNSManager(client_manager=fake_gcp, resolver=resolver)
+
+    started = time.monotonic()
+    propagated = await manager.validate_dns_propagation(
+        "acme.nlyzer.com", "34.102.136.180", max_attempts=1000,
+        delay_seconds=0.05, max_delay_seconds=0.1, deadline_seconds=0.5
+    )
+
+    assert not propagated
+    assert time.monotonic() - started < 1.0
+
+
+async def test_event_loop_keeps_ticking_during_validation(stub, resolver, fake_gcp):
+    manager = DNSManager(client_manager=fake_gcp, resolver=resolver)
+    loop = asyncio.get_running_loop()
+    loop.call_later(
+        0.3, stub.records.__setitem__, "acme.nlyzer.com", ["34.102.136.180"]
+    )
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(loop.time())
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.ensure_future(ticker())
+    try:
+        propagated = await manager.validate_dns_propagation(
+            "acme.nlyzer.com", "34.102.136.180",
+            max_attempts=1000, delay_seconds=0.02, max_delay_seconds=0.05,
+            deadline_seconds=5
+        )
+    finally:
+        ticking.cancel()
+
+    assert propagated
+    # A blocking resolver would stall the ticker for whole query timeouts
+    gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+    assert len(ticks) >= 20
+    assert max(gaps) < 0.1
+
+
+def test_backoff_is_capped_and_jittered():
+    delays = [backoff_delay(attempt, 30, 120) for attempt in range(40)]
+
+    assert all(delay <= 120 for delay in delays)
+    assert all(delay >= 60 for delay in delays[3:])
+    assert backoff_delay(0, 30, 120, jitter=False) == 30
+    assert backoff_delay(10, 30, 120, jitter=False) == 120
+
+
+class HangingResolver:
+    """Resolver answering `records` at once and hanging on any other name."""
+
+    def __init__(self, records):
+        self.records = records
+        self.pending = 0
+        self.cancelled = 0
+
+    async def resolve_a(self, fqdn):
+        if fqdn in self.records:
+            return self.records[fqdn]
+        self.pending += 1
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.pending -= 1
+
+
+async def test_validate_many_yields_records_as_they_propagate(
+    stub, resolver, fake_gcp
+):
+    manager = DNSManager(client_manager=fake_gcp, resolver=resolver)
+    loop = asyncio.get_running_loop()
+    stub.records["first.nlyzer.com"] = ["10.0.0.1"]
+    loop.call_later(0.2, stub.records.__setitem__, "second.nlyzer.com", ["10.0.0.2"])
+
+    results = [
+        result async for result in manager.validate_many(
+            {
+                "never.nlyzer.com": "10.0.0.3",
+                "second.nlyzer.com": "10.0.0.2",
+                "first.nlyzer.com": "10.0.0.1",
+            },
+            delay_seconds=0.05, max_delay_seconds=0.05, deadline_seconds=0.6
+        )
+    ]
+
+    assert [result.fqdn for result in results] == [
+        "first.nlyzer.com", "second.nlyzer.com", "never.nlyzer.com"
+    ]
+    assert [result.propagated for result in results] == [True, True, False]
+    assert results[0].attempts == 1
+    assert results[1].attempts > 1
+
+
+async def test_validate_many_stops_each_record_at_the_deadline(fake_gcp):
+    resolver = HangingResolver({"acme.nlyzer.com": ["10.0.0.1"]})
+    manager = DNSManager(client_manager=fake_gcp, resolver=resolver)
+
+    results = {
+        result.fqdn: result async for result in manager.validate_many(
+            {"acme.nlyzer.com": "10.0.0.1", "hung.nlyzer.com": "10.0.0.2"},
+            max_attempts=1000, deadline_seconds=0.3
+        )
+    }
+
+    assert results["acme.nlyzer.com"].propagated
+    hung = results["hung.nlyzer.com"]
+    assert not hung.propagated
+    assert hung.error == "deadline exceeded"
+    assert 0.3 <= hung.elapsed_seconds < 0.5
+    assert resolver.pending == 0
+
+
+async def test_closing_validate_many_early_cancels_checks_in_flight(fake_gcp):
+    resolver = HangingResolver({"acme.nlyzer.com": ["10.0.0.1"]})
+    manager = DNSManager(client_manager=fake_gcp, resolver=resolver)
+    names = {f"hung-{index}.nlyzer.com": "10.0.0.2" for index in range(5)}
+    names["acme.nlyzer.com"] = "10.0.0.1"
+
+    results = manager.validate_many(names, deadline_seconds=60)
+    first = await results.__anext__()
+    await results.aclose()
+
+    assert first.fqdn == "acme.nlyzer.com"
+    assert resolver.cancelled == 5
+    assert resolver.pending == 0
@@ -0,0 +1,137 @@
+"""Tests for zone write coalescing and zone snapshots."""
+
+import asyncio
+import types
+
+import pytest
+
+from nlyzer.gcp import dns_zone
+from nlyzer.gcp.dns_providers import DNSProviderError, NamecheapProvider
+from nlyzer.gcp.dns_zone import RecordMutation, ZoneSnapshot, ZoneWriteCoalescer
+from nlyzer.gcp.namecheap import NamecheapTransport, TokenBucket
+
+DOMAIN = "nlyzer.com"
+GET_HOSTS = "namecheap.domains.dns.getHosts"
+SET_HOSTS = "namecheap.domains.dns.setHosts"
+
+
+@pytest.fixture
+async def provider(fake_namecheap):
+    transport = NamecheapTransport(
+        "user", "key", "user", "127.0.0.1", api_url=fake_namecheap.url,
+        rate_limiter=TokenBucket(rate=1000, burst=100), max_retries=0
+    )
+    provider = NamecheapProvider(transport, DOMAIN)
+    yield provider
+    await provider.aclose()
+
+
+def _upsert(host_name: str, address: str) -> RecordMutation:
+    return RecordMutation("upsert", host_name, "A", address, 300)
+
+
+async def test_concurrent_writes_share_one_set_hosts_call(provider, fake_namecheap):
+    acme, globex = await asyncio.gather(
+        provider.apply([_upsert("acme", "10.0.0.1")]),
+        provider.apply([_upsert("globex", "10.0.0.2")])
+    )
+
+    assert acme[0].action == globex[0].action == "created"
+    assert fake_namecheap.commands[GET_HOSTS] == 1
+    assert fake_namecheap.commands[SET_HOSTS] == 1
+    hosts = {host["Name"]: host["Address"] for host in fake_namecheap.hosts}
+    assert hosts == {"www": "1.1.1.1", "acme": "10.0.0.1", "globex": "10.0.0.2"}
+
+
+async def test_writes_of_successive_flushes_are_not_lost(provider, fake_namecheap):
+    first = asyncio.ensure_future(provider.apply([_upsert("acme", "10.0.0.1")]))
+    await asyncio.sleep(0.06)
+    await asyncio.gather(first, provider.apply([_upsert("globex", "10.0.0.2")]))
+
+    assert fake_namecheap.commands[SET_HOSTS] == 2
+    hosts = {host["Name"] for host in fake_namecheap.hosts}
+    assert hosts == {"www", "acme", "globex"}
+
+
+@pytest.mark.parametrize("cancel_during", ["window", "flush"])
+async def test_cancelled_flush_cancels_every_caller(cancel_during):
+    reading = asyncio.Event()
+
+    async def read_zone():
+        reading.set()
+        await asyncio.Event().wait()
+
+    async def write_zone(records):
+        return {}
+
+    writer = ZoneWriteCoalescer(read_zone, write_zone, flush_window=0.01)
+    callers = [
+        asyncio.ensure_future(writer.upsert(host, "A", "10.0.0.1", 300))
+        for host in ("acme", "globex")
+    ]
+    await asyncio.sleep(0)
+    if cancel_during == "flush":
+        await reading.wait()
+    writer._flush_task.cancel()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*callers, return_exceptions=True), timeout=1
+    )
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert writer.get_stats()["pending"] == 0
+
+
+async def test_lookups_are_served_from_one_get_hosts_call(provider, fake_namecheap):
+    assert provider.lookup("www", "A") is None
+
+    await provider.list_records()
+    www = [provider.lookup("www", "A") for _ in range(100)]
+    missing = provider.lookup("acme", "A")
+
+    assert fake_namecheap.commands[GET_HOSTS] == 1
+    assert all(records[0]["Address"] == "1.1.1.1" for records in www)
+    assert missing == []
+    assert provider.get_stats()["snapshot"]["hits"] == 101
+
+
+async def test_successful_write_replaces_the_snapshot(provider, fake_namecheap):
+    await provider.list_records()
+
+    await provider.apply([_upsert("acme", "10.0.0.1")])
+
+    assert provider.lookup("acme", "A")[0]["Address"] == "10.0.0.1"
+    assert provider.lookup("www", "A")[0]["Address"] == "1.1.1.1"
+    # The write's own read plus the initial one
+    assert fake_namecheap.commands[GET_HOSTS] == 2
+
+
+async def test_failed_write_invalidates_the_snapshot(provider, fake_namecheap):
+    await provider.list_records()
+    get_hosts = provider.list_records
+
+    async def read_then_fail():
+        records = await get_hosts()
+        fake_namecheap.error_rate = 1.0
+        return records
+
+    provider._writer._read_zone = read_then_fail
+
+    with pytest.raises(DNSProviderError):
+        await provider.apply([_upsert("acme", "10.0.0.1")])
+
+    assert provider.lookup("www", "A") is None
+    assert provider.get_stats()["snapshot"]["invalidations"] == 1
+
+
+def test_snapshot_expires_after_max_age(monkeypatch):
+    now = [1000.0]
+    clock = types.SimpleNamespace(monotonic=lambda: now[0])
+    monkeypatch.setattr(dns_zone, "time", clock)
+    snapshot = ZoneSnapshot(max_age=300)
+    snapshot.store([{"HostName": "www", "RecordType": "A", "Address": "1.1.1.1"}])
+
+    now[0] += 299
+    assert snapshot.lookup("www", "A")[0]["Address"] == "1.1.1.1"
+    now[0] += 1
+    assert snapshot.lookup("www", "A") is None
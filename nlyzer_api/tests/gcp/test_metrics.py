@@ -0,0 +1,78 @@
+"""Tests for GCP client call metrics."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from nlyzer.gcp.clients import GCPClientManager
+from nlyzer.gcp.metrics import InstrumentedClient
+from nlyzer.gcp.registry import ClientRegistry
+
+CALL_SECONDS = 0.02
+
+
+class FakeClient:
+    def access_secret_version(self, name, fail=False):
+        if fail:
+            raise RuntimeError("denied")
+        return name
+
+    async def get_project(self, name, fail=False):
+        await asyncio.sleep(CALL_SECONDS)
+        if fail:
+            raise RuntimeError("not found")
+        return name
+
+
+def _manager(instrument_clients: bool) -> GCPClientManager:
+    auth = mock.patch(
+        "nlyzer.gcp.registry._application_default_credentials",
+        return_value=(mock.sentinel.credentials, "test-project"),
+    )
+    with auth:
+        return GCPClientManager(
+            project_id="test-project",
+            registry=ClientRegistry(),
+            instrument_clients=instrument_clients
+        )
+
+
+def test_sync_calls_record_latency_and_errors():
+    manager = _manager(instrument_clients=True)
+    client = manager._get_cached_client("secrets", FakeClient)
+
+    assert client.access_secret_version("api-key") == "api-key"
+    with pytest.raises(RuntimeError):
+        client.access_secret_version("api-key", fail=True)
+
+    call = manager.get_metrics().snapshot()["calls"]["secrets.access_secret_version"]
+    assert call["count"] == 2
+    assert call["errors"] == 1
+    assert 'method="access_secret_version"} 1' in manager.get_metrics().to_prometheus()
+
+
+async def test_async_calls_record_latency_until_awaited():
+    manager = _manager(instrument_clients=True)
+    client = manager._get_cached_client("projects", FakeClient)
+
+    assert await client.get_project("acme") == "acme"
+    with pytest.raises(RuntimeError):
+        await client.get_project("acme", fail=True)
+
+    call = manager.get_metrics().snapshot()["calls"]["projects.get_project"]
+    assert call["count"] == 2
+    assert call["errors"] == 1
+    assert call["mean_seconds"] >= CALL_SECONDS
+
+
+def test_uninstrumented_clients_are_not_wrapped():
+    manager = _manager(instrument_clients=False)
+
+    client = manager._get_cached_client("secrets", FakeClient)
+    client.access_secret_version("api-key")
+
+    assert type(client) is FakeClient
+    assert not isinstance(client, InstrumentedClient)
+    assert manager.get_metrics().snapshot()["calls"] == {}
+    assert manager.get_metrics().snapshot()["clients"]["secrets"]["cache_misses"] == 1
@@ -0,0 +1,128 @@
+"""Tests for NamecheapTransport against a local fake Namecheap XML API."""
+
+import asyncio
+
+import pytest
+from fakes import FakeNamecheap
+
+from nlyzer.gcp.dns import DNSManager
+from nlyzer.gcp.dns_providers import NamecheapProvider
+from nlyzer.gcp.namecheap import NamecheapAPIError, NamecheapTransport, TokenBucket
+
+DOMAIN = "nlyzer.com"
+
+
+def _transport(server: FakeNamecheap, **kwargs) -> NamecheapTransport:
+    kwargs.setdefault("rate_limiter", TokenBucket(rate=1000, burst=100))
+    return NamecheapTransport(
+        "user", "key", "user", "127.0.0.1", api_url=server.url,
+        retry_delay=0.05, max_retry_delay=0.2, **kwargs
+    )
+
+
+def _record(name: str, address: str = "10.0.0.1") -> dict:
+    return {"HostName": name, "RecordType": "A", "Address": address, "TTL": "300"}
+
+
+@pytest.fixture
+async def throttling_namecheap(request):
+    """Fake Namecheap admitting 5 requests per 0.2s, throttling as requested."""
+    server = FakeNamecheap(
+        rate=5, window=0.2, throttle_status=request.param, retry_after=0.1
+    ).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def test_set_hosts_then_get_hosts(fake_namecheap):
+    transport = _transport(fake_namecheap)
+
+    result = await transport.set_hosts(DOMAIN, [_record("acme"), _record("globex")])
+    hosts = await transport.get_hosts(DOMAIN)
+    await transport.aclose()
+
+    assert result["DomainDNSSetHostsResult"]["IsSuccess"] == "true"
+    assert [
+        (host["HostName"], host["Address"])
+        for host in hosts["DomainDNSGetHostsResult"]["host"]
+    ] == [("acme", "10.0.0.1"), ("globex", "10.0.0.1")]
+
+
+async def test_connections_are_reused(fake_namecheap):
+    transport = _transport(fake_namecheap, max_connections=4)
+
+    await asyncio.gather(*(transport.get_hosts(DOMAIN) for _ in range(40)))
+    await transport.aclose()
+
+    assert fake_namecheap.requests == 40
+    assert len(fake_namecheap.connections) <= 4
+
+
+@pytest.mark.parametrize("throttling_namecheap", [429, 0], indirect=True)
+async def test_throttled_calls_are_retried(throttling_namecheap):
+    transport = _transport(throttling_namecheap, max_retries=20)
+
+    await asyncio.gather(*(transport.get_hosts(DOMAIN) for _ in range(20)))
+    stats = transport.get_stats()
+    await transport.aclose()
+
+    assert throttling_namecheap.throttled > 0
+    assert stats["throttled"] == throttling_namecheap.throttled
+    assert throttling_namecheap.requests == 20 + throttling_namecheap.throttled
+
+
+async def test_rate_limiter_keeps_calls_under_the_server_limit():
+    # The bucket admits at most 2 + 8 * 0.5 = 6 requests per 0.5s window
+    server = FakeNamecheap(rate=8, window=0.5).start()
+    transport = _transport(server, rate_limiter=TokenBucket(rate=8, burst=2))
+
+    await asyncio.gather(*(transport.get_hosts(DOMAIN) for _ in range(12)))
+    await transport.aclose()
+    server.shutdown()
+    server.server_close()
+
+    assert server.throttled == 0
+    assert server.peak_in_window <= 6
+
+
+async def test_api_errors_are_not_retried():
+    server = FakeNamecheap(error_rate=1.0).start()
+    transport = _transport(server)
+
+    with pytest.raises(NamecheapAPIError) as raised:
+        await transport.get_hosts(DOMAIN)
+    await transport.aclose()
+    server.shutdown()
+    server.server_close()
+
+    assert raised.value.number == "5050900"
+    assert not raised.value.throttled
+    assert server.requests == 1
+
+
+async def test_dns_manager_configures_and_removes_records(fake_gcp, fake_namecheap):
+    provider = NamecheapProvider(_transport(fake_namecheap), DOMAIN)
+    manager = DNSManager(client_manager=fake_gcp, provider=provider)
+
+    created = await manager.configure_namecheap_dns_record("acme", "10.0.0.1")
+    updated = await manager.configure_namecheap_dns_record("acme", "10.0.0.2")
+    unchanged = await manager.configure_namecheap_dns_record("acme", "10.0.0.2")
+    hosts_after_configure = {
+        host["Name"]: host["Address"] for host in fake_namecheap.hosts
+    }
+    removed = await manager.remove_dns_record("acme")
+    missing = await manager.remove_dns_record("acme")
+    await provider.aclose()
+
+    assert created["fqdn"] == f"acme.{DOMAIN}"
+    assert [created["action"], updated["action"], unchanged["action"]] == [
+        "created", "updated", "unchanged"
+    ]
+    assert hosts_after_configure == {"www": "1.1.1.1", "acme": "10.0.0.2"}
+    assert [removed["action"], missing["action"]] == ["removed", "not_found"]
+    assert fake_namecheap.hosts == [
+        {"Name": "www", "Type": "A", "Address": "1.1.1.1", "TTL": "300"}
+    ]
+    # Re-runs are answered from the zone snapshot without another write
+    assert fake_namecheap.commands["namecheap.domains.dns.setHosts"] == 3
@@ -0,0 +1,181 @@
+"""Tests for the shared long-running operation poller."""
+
+import asyncio
+import types
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from nlyzer.gcp.operations import MAX_OPERATIONS_PER_LIST, OperationPoller
+
+POLL_DELAY = 0.01
+
+
+class FakeOperationsClient:
+    """Global Operations client reporting the operations in `status`."""
+
+    def __init__(self):
+        self.status = {}
+        self.errors = {}
+        self.calls = []
+
+    async def aggregated_list(self, request):
+        self.calls.append(request["project"])
+        operations = [
+            types.SimpleNamespace(
+                name=name,
+                status=types.SimpleNamespace(name=status),
+                error=self.errors.get(name),
+                http_error_message=None,
+                http_error_status_code=404 if name in self.errors else None
+            )
+            for name, status in self.status.items()
+            if f'"{name}"' in request["filter"]
+        ]
+        scoped_list = types.SimpleNamespace(operations=operations)
+        return types.SimpleNamespace(items={"zones/us-central1-a": scoped_list})
+
+
+class FakeAsyncOperation:
+    """AsyncOperation that finishes after `polls` checks."""
+
+    def __init__(self, name, polls=1, result=None, error=None):
+        self.operation = types.SimpleNamespace(name=name)
+        self.remaining = polls
+        self._result = result
+        self._error = error
+
+    async def done(self):
+        self.remaining -= 1
+        return self.remaining <= 0
+
+    async def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def _compute(name):
+    return types.SimpleNamespace(name=name)
+
+
+async def test_compute_waiters_share_one_list_call_per_project():
+    poller = OperationPoller()
+    client = FakeOperationsClient()
+    waiters = []
+    for project_id in ("tenant-a", "tenant-b"):
+        for index in range(MAX_OPERATIONS_PER_LIST + 10):
+            name = f"{project_id}-op-{index}"
+            client.status[name] = "DONE"
+            waiters.append(poller.wait_compute(
+                _compute(name), project_id, client,
+                timeout=1, initial_delay=POLL_DELAY
+            ))
+
+    results = await asyncio.gather(*waiters)
+
+    assert len(results) == len(waiters)
+    # One list call per project and batch of MAX_OPERATIONS_PER_LIST
+    assert sorted(client.calls) == ["tenant-a"] * 2 + ["tenant-b"] * 2
+    assert poller.get_stats()["poll_calls"] == 4
+    assert poller.get_stats()["completed"] == len(waiters)
+
+
+async def test_long_running_waiters_share_one_poll_loop():
+    poller = OperationPoller()
+    operations = [
+        FakeAsyncOperation(f"op-{index}", polls=2, result=index)
+        for index in range(20)
+    ]
+
+    waiters = [
+        asyncio.ensure_future(
+            poller.wait(operation, timeout=1, initial_delay=POLL_DELAY)
+        )
+        for operation in operations
+    ]
+    await asyncio.sleep(0)
+    task = poller._task
+    results = await asyncio.gather(*waiters)
+
+    assert results == list(range(20))
+    assert task.done() and poller._task is task
+    assert poller.get_stats()["poll_calls"] == 40
+
+
+async def test_errors_reach_the_right_waiter():
+    poller = OperationPoller()
+    client = FakeOperationsClient()
+    client.status.update({"good": "DONE", "bad": "DONE"})
+    client.errors["bad"] = types.SimpleNamespace(
+        errors=[types.SimpleNamespace(message="network not found")]
+    )
+    denied = gcp_exceptions.PermissionDenied("denied")
+
+    good, bad, created, failed = await asyncio.gather(
+        poller.wait_compute(
+            _compute("good"), "tenant-a", client,
+            timeout=1, initial_delay=POLL_DELAY
+        ),
+        poller.wait_compute(
+            _compute("bad"), "tenant-a", client,
+            timeout=1, initial_delay=POLL_DELAY
+        ),
+        poller.wait(
+            FakeAsyncOperation("created", result="project"),
+            timeout=1, initial_delay=POLL_DELAY
+        ),
+        poller.wait(
+            FakeAsyncOperation("failed", error=denied),
+            timeout=1, initial_delay=POLL_DELAY
+        ),
+        return_exceptions=True
+    )
+
+    assert good.name == "good"
+    assert isinstance(bad, gcp_exceptions.NotFound)
+    assert "network not found" in str(bad)
+    assert created == "project"
+    assert failed is denied
+    assert poller.get_stats()["failed"] == 2
+
+
+async def test_timeouts_reach_the_right_waiter():
+    poller = OperationPoller(max_interval=POLL_DELAY)
+    stuck = FakeAsyncOperation("stuck", polls=1000)
+    slow = FakeAsyncOperation("slow", polls=10, result="done")
+
+    stuck_result, slow_result = await asyncio.gather(
+        poller.wait(stuck, timeout=0.05, initial_delay=POLL_DELAY),
+        poller.wait(slow, timeout=1, initial_delay=POLL_DELAY),
+        return_exceptions=True
+    )
+
+    assert isinstance(stuck_result, TimeoutError)
+    assert "stuck" in str(stuck_result)
+    assert slow_result == "done"
+    # The timed out operation is no longer polled
+    polls = stuck.remaining
+    await asyncio.sleep(POLL_DELAY * 3)
+    assert stuck.remaining == polls
+    assert poller.get_stats()["pending"] == 0
+
+
+async def test_cancelled_waiter_does_not_fail_the_others():
+    poller = OperationPoller()
+    client = FakeOperationsClient()
+    client.status.update({"kept": "RUNNING", "dropped": "RUNNING"})
+
+    kept = asyncio.ensure_future(poller.wait_compute(
+        _compute("kept"), "tenant-a", client, timeout=1, initial_delay=POLL_DELAY
+    ))
+    dropped = asyncio.ensure_future(poller.wait_compute(
+        _compute("dropped"), "tenant-a", client, timeout=1, initial_delay=POLL_DELAY
+    ))
+    await asyncio.sleep(POLL_DELAY * 2)
+    dropped.cancel()
+    client.status["kept"] = "DONE"
+
+    assert (await asyncio.wait_for(kept, timeout=1)).name == "kept"
+    with pytest.raises(asyncio.CancelledError):
+        await dropped
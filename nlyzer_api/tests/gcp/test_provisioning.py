@@ -0,0 +1,164 @@
+"""Tests for tenant provisioning against the fake GCP."""
+
+import asyncio
+import uuid
+
+import pytest
+from fakes import FakeGCP
+from google.api_core import exceptions as gcp_exceptions
+
+from nlyzer.gcp import provisioning, resilience
+from nlyzer.gcp.checkpoints import InMemoryCheckpointStore
+from nlyzer.gcp.exceptions import ProvisioningInProgressError, TenantAlreadyExistsError
+from nlyzer.gcp.provisioning import (
+    BUCKET_NAME_INTENT,
+    PROJECT_ID_INTENT,
+    abandon_provisioning,
+    provision_new_tenant,
+)
+from nlyzer.gcp.resilience import ResilienceManager, RetryPolicy
+
+SPEEDUP = 600.0
+CONFIG = {"credentials": {"API_KEY": "secret"}}
+
+
+@pytest.fixture
+def backend(compress_time, health_url, faults, monkeypatch):
+    """Fake GCP on a compressed time scale, retrying transient errors at once."""
+    monkeypatch.setattr(
+        resilience, "_resilience_manager",
+        ResilienceManager(retry_policy=RetryPolicy(initial_delay=0.001))
+    )
+    return FakeGCP(SPEEDUP, health_url, quotas={}, faults=faults)
+
+
+async def _provision(backend, tenant_id="acme", store=None):
+    return await provision_new_tenant(
+        tenant_id, CONFIG, client_manager=backend,
+        checkpoint_store=store or InMemoryCheckpointStore()
+    )
+
+
+async def test_provisions_a_tenant(backend, compress_time):
+    compress_time(SPEEDUP)
+
+    result = await _provision(backend)
+
+    assert result["status"] == "success", result.get("error_message")
+    assert backend.projects[result["project_id"]].labels["tenant-id"] == "acme"
+    assert result["config_bucket"] in backend.buckets
+
+
+@pytest.mark.parametrize("method", ["create_project", "create_bucket"])
+async def test_create_retried_after_a_lost_response_succeeds(
+    backend, compress_time, faults, method
+):
+    compress_time(SPEEDUP)
+    # The resource is created, but the call fails as if its response was lost
+    faults.fail_next(method, gcp_exceptions.ServiceUnavailable("unavailable"))
+
+    result = await _provision(backend)
+
+    assert result["status"] == "success", result.get("error_message")
+    assert sum(faults.injected.values()) == 1
+    assert len(backend.projects) == 1
+    assert len(backend.buckets) == 1
+
+
+async def test_conflict_with_another_tenants_project_fails(
+    backend, compress_time, monkeypatch
+):
+    compress_time(SPEEDUP)
+    # Every attempt picks the same project ID
+    monkeypatch.setattr(provisioning, "uuid4", lambda: uuid.UUID(int=0))
+    first = await _provision(backend)
+    backend.projects[first["project_id"]].labels["tenant-id"] = "other"
+
+    result = await _provision(backend)
+
+    assert result["status"] == "failed"
+    assert result["failed_step"] == "create_project"
+
+
+async def test_attempt_after_a_failed_create_reuses_the_project_id(
+    backend, compress_time, faults
+):
+    compress_time(SPEEDUP)
+    store = InMemoryCheckpointStore()
+    # Not retried, so the attempt stops with the project created but not
+    # checkpointed, as if the worker had crashed
+    faults.fail_next("create_project", gcp_exceptions.PermissionDenied("denied"))
+    failed = await _provision(backend, store=store)
+    assert failed["failed_step"] == "create_project"
+    [project_id] = backend.projects
+
+    result = await _provision(backend, store=store)
+
+    assert result["status"] == "success", result.get("error_message")
+    assert result["project_id"] == project_id
+    assert list(backend.projects) == [project_id]
+    assert PROJECT_ID_INTENT not in (await store.load("acme")).outputs
+
+
+async def test_abandoning_a_failed_create_deletes_the_project(
+    backend, compress_time, faults
+):
+    compress_time(SPEEDUP)
+    store = InMemoryCheckpointStore()
+    faults.fail_next("create_project", gcp_exceptions.PermissionDenied("denied"))
+    await _provision(backend, store=store)
+
+    result = await abandon_provisioning("acme", backend, store)
+
+    assert result["status"] == "abandoned"
+    assert backend.projects == {}
+
+
+async def test_attempt_after_a_failed_bucket_create_reuses_the_bucket(
+    backend, compress_time, faults
+):
+    compress_time(SPEEDUP)
+    store = InMemoryCheckpointStore()
+    # The bucket is created, but the attempt stops before checkpointing it
+    faults.fail_next("create_bucket", gcp_exceptions.PermissionDenied("denied"))
+    failed = await _provision(backend, store=store)
+    assert failed["failed_step"] == "create_config_storage"
+    [bucket_name] = backend.buckets
+
+    result = await _provision(backend, store=store)
+
+    assert result["status"] == "success", result.get("error_message")
+    assert backend.buckets == {bucket_name}
+    outputs = (await store.load("acme")).outputs
+    assert outputs["create_config_storage"][0] == bucket_name
+    assert BUCKET_NAME_INTENT not in outputs
+
+
+async def test_abandoning_a_failed_bucket_create_deletes_the_bucket(
+    backend, compress_time, faults
+):
+    compress_time(SPEEDUP)
+    store = InMemoryCheckpointStore()
+    faults.fail_next("create_bucket", gcp_exceptions.PermissionDenied("denied"))
+    await _provision(backend, store=store)
+
+    result = await abandon_provisioning("acme", backend, store)
+
+    assert result["status"] == "abandoned"
+    assert backend.buckets == set()
+
+
+async def test_concurrent_attempts_for_a_tenant_are_rejected(backend, compress_time):
+    compress_time(SPEEDUP)
+    store = InMemoryCheckpointStore()
+
+    results = await asyncio.gather(
+        _provision(backend, store=store), _provision(backend, store=store),
+        return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [dict, ProvisioningInProgressError]
+    assert results[0]["status"] == "success", results[0].get("error_message")
+    assert len(backend.projects) == 1
+    with pytest.raises(TenantAlreadyExistsError):
+        await _provision(backend, store=store)
@@ -0,0 +1,146 @@
+"""Tests for the retry and circuit breaker layer around GCP calls."""
+
+import asyncio
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from nlyzer.gcp.exceptions import CircuitOpenError
+from nlyzer.gcp.resilience import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    ResilienceManager,
+    RetryPolicy,
+    is_transient,
+)
+from nlyzer.gcp.tracing import (
+    SPAN_KIND_CLIENT,
+    STATUS_ERROR,
+    InMemorySpanExporter,
+    get_tracer,
+)
+
+SERVICE = "compute.googleapis.com"
+
+
+@pytest.fixture
+def resilience():
+    """Manager whose breakers open after 2 failures and probe after 50ms."""
+    return ResilienceManager(
+        retry_policy=RetryPolicy(max_attempts=1),
+        failure_threshold=2,
+        reset_timeout=0.05
+    )
+
+
+async def _fail():
+    raise gcp_exceptions.ServiceUnavailable("unavailable")
+
+
+async def _succeed():
+    return "ok"
+
+
+async def _open_breaker(resilience: ResilienceManager) -> None:
+    for _ in range(2):
+        with pytest.raises(gcp_exceptions.ServiceUnavailable):
+            await resilience.call(SERVICE, "insert", None, _fail)
+    assert resilience.breaker_for(SERVICE).state == BREAKER_OPEN
+
+
+async def test_open_breaker_rejects_calls(resilience):
+    await _open_breaker(resilience)
+
+    with pytest.raises(CircuitOpenError):
+        await resilience.call(SERVICE, "insert", None, _succeed)
+
+
+async def test_successful_probe_closes_the_breaker(resilience):
+    await _open_breaker(resilience)
+    await asyncio.sleep(0.06)
+
+    assert await resilience.call(SERVICE, "insert", None, _succeed) == "ok"
+    assert resilience.breaker_for(SERVICE).state == BREAKER_CLOSED
+
+
+async def test_cancelled_probe_lets_the_next_call_probe(resilience):
+    await _open_breaker(resilience)
+    await asyncio.sleep(0.06)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    probe = asyncio.ensure_future(resilience.call(SERVICE, "insert", None, hang))
+    await started.wait()
+    with pytest.raises(CircuitOpenError):
+        await resilience.call(SERVICE, "insert", None, _succeed)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert resilience.breaker_for(SERVICE).state == BREAKER_HALF_OPEN
+    assert await resilience.call(SERVICE, "insert", None, _succeed) == "ok"
+
+
+async def test_cancelled_call_does_not_release_another_calls_probe(resilience):
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    # Admitted while the breaker is closed, still running once it half opens
+    straggler = asyncio.ensure_future(resilience.call(SERVICE, "get", None, hang))
+    await started.wait()
+    await _open_breaker(resilience)
+    await asyncio.sleep(0.06)
+    started.clear()
+    probe = asyncio.ensure_future(resilience.call(SERVICE, "insert", None, hang))
+    await started.wait()
+
+    straggler.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await straggler
+
+    with pytest.raises(CircuitOpenError):
+        await resilience.call(SERVICE, "insert", None, _succeed)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+
+async def test_every_attempt_is_traced_as_a_client_span():
+    resilience = ResilienceManager(retry_policy=RetryPolicy(initial_delay=0.001))
+    exporter = InMemorySpanExporter()
+    get_tracer().add_exporter(exporter)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise gcp_exceptions.ServiceUnavailable("unavailable")
+        return "ok"
+
+    with get_tracer().span("create_project") as step:
+        await resilience.call(SERVICE, "insert", "us-central1", flaky)
+
+    calls = [
+        span for span in exporter.get_finished_spans()
+        if span.kind == SPAN_KIND_CLIENT
+    ]
+    assert [span.name for span in calls] == [f"{SERVICE}.insert"] * 2
+    assert {span.parent_span_id for span in calls} == {step.span_id}
+    assert [span.attributes["attempt"] for span in calls] == [1, 2]
+    assert calls[0].status_code == STATUS_ERROR
+    assert calls[1].attributes["gcp_region"] == "us-central1"
+
+
+def test_retry_error_is_not_transient():
+    # Raised once google-api-core's own retries are spent; retrying it
+    # again would multiply them
+    assert not is_transient(gcp_exceptions.RetryError("deadline", None))
+    assert is_transient(gcp_exceptions.ServiceUnavailable("unavailable"))
+    assert not is_transient(gcp_exceptions.NotFound("missing"))
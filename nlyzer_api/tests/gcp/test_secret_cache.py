@@ -0,0 +1,69 @@
+"""Tests for the single-flight Secret Manager cache."""
+
+import asyncio
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from nlyzer.gcp.secrets import SecretCache
+
+READERS = 50
+
+
+@pytest.fixture
+def backend(fake_gcp_with_faults):
+    fake_gcp_with_faults.secrets["api-key"] = b"secret"
+    return fake_gcp_with_faults
+
+
+async def test_concurrent_readers_share_one_fetch(backend):
+    cache = SecretCache(backend)
+
+    values = await asyncio.gather(*(cache.get("api-key") for _ in range(READERS)))
+
+    assert values == ["secret"] * READERS
+    assert backend.quotas.calls == 1
+    assert await cache.get("api-key") == "secret"
+    assert backend.quotas.calls == 1
+
+
+async def test_cancelled_first_reader_does_not_fail_the_others(backend):
+    cache = SecretCache(backend)
+
+    first = asyncio.ensure_future(cache.get("api-key"))
+    await asyncio.sleep(0)
+    others = [asyncio.ensure_future(cache.get("api-key")) for _ in range(READERS)]
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await asyncio.gather(*others) == ["secret"] * READERS
+    assert first.cancelled()
+    assert backend.quotas.calls == 1
+
+
+async def test_failed_fetch_fails_every_reader_and_is_retried(backend, faults):
+    faults.fail_next(
+        "access_secret_version", gcp_exceptions.PermissionDenied("denied")
+    )
+    cache = SecretCache(backend)
+
+    results = await asyncio.gather(
+        *(cache.get("api-key") for _ in range(READERS)), return_exceptions=True
+    )
+
+    assert all(
+        isinstance(result, gcp_exceptions.PermissionDenied) for result in results
+    )
+    assert await cache.get("api-key") == "secret"
+    assert backend.quotas.calls == 2
+
+
+async def test_missing_secret_is_negatively_cached(backend):
+    cache = SecretCache(backend)
+
+    for _ in range(3):
+        with pytest.raises(gcp_exceptions.NotFound):
+            await cache.get("missing")
+
+    assert backend.quotas.calls == 1
+    assert cache.get_stats()["not_found"] == 1
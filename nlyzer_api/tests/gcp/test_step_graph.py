@@ -0,0 +1,56 @@
+"""Tests for the step graph executor."""
+
+import asyncio
+
+from nlyzer.gcp.step_graph import (
+    STEP_RESTORED,
+    STEP_SUCCEEDED,
+    Step,
+    StepGraph,
+    StepGraphExecutor,
+)
+
+
+class Context:
+    def __init__(self, outputs=None):
+        self.outputs = dict(outputs or {})
+        self.runs = []
+
+
+def _step(name, *requires):
+    async def run(context):
+        await asyncio.sleep(0)
+        context.runs.append(name)
+        return name
+    return Step(name, run, requires=requires)
+
+
+async def test_restored_root_waits_for_a_sibling_requirement():
+    # "both" needs the restored root and a root that still has to run;
+    # "after_root" needs only the restored root
+    graph = StepGraph([
+        _step("restored"),
+        _step("sibling"),
+        _step("both", "restored", "sibling"),
+        _step("after_root", "restored"),
+    ])
+    context = Context({"restored": "restored"})
+
+    report = await StepGraphExecutor(graph).execute(context)
+
+    assert report.succeeded
+    assert report.steps["restored"].status == STEP_RESTORED
+    assert sorted(context.runs) == ["after_root", "both", "sibling"]
+    assert context.runs.index("sibling") < context.runs.index("both")
+    assert report.steps["both"].status == STEP_SUCCEEDED
+
+
+async def test_unrestored_step_outputs_are_ignored():
+    graph = StepGraph([_step("first"), _step("second", "first")])
+    context = Context({"first.intent": "value"})
+
+    report = await StepGraphExecutor(graph).execute(context)
+
+    assert report.succeeded
+    assert context.runs == ["first", "second"]
+    assert context.outputs["first.intent"] == "value"
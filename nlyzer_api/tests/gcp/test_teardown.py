@@ -0,0 +1,136 @@
+"""Tests for dependency-ordered teardown of step graph resources."""
+
+import asyncio
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from nlyzer.gcp import teardown
+from nlyzer.gcp.step_graph import Step, StepGraph
+from nlyzer.gcp.teardown import build_teardown_graph, tear_down
+
+
+async def _noop(context):
+    return None
+
+
+def _graph() -> StepGraph:
+    """Provisioning-shaped graph; "iam" owns no resources of its own."""
+    return StepGraph([
+        Step("project", _noop),
+        Step("service_account", _noop, requires=("project",)),
+        Step("bucket", _noop, requires=("project",)),
+        Step("iam", _noop, requires=("project", "service_account")),
+        Step("run_service", _noop, requires=("iam", "bucket")),
+        Step("dns", _noop, requires=("run_service",)),
+    ])
+
+
+RESOURCE_STEPS = ("project", "service_account", "bucket", "run_service", "dns")
+
+
+class Target:
+    """Teardown context recording deletions and failing on request."""
+
+    def __init__(self):
+        self.deleted = []
+        self.attempts = {}
+        self.errors = {}
+
+    def action(self, name):
+        async def delete(target, output):
+            assert output == f"{name}-output"
+            target.attempts[name] = target.attempts.get(name, 0) + 1
+            await asyncio.sleep(0)
+            errors = target.errors.get(name)
+            if errors:
+                raise errors.pop(0)
+            target.deleted.append(name)
+        return delete
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(teardown, "TEARDOWN_RETRY_DELAY", 0.001)
+    monkeypatch.setattr(teardown, "MAX_TEARDOWN_RETRY_DELAY", 0.001)
+
+
+@pytest.fixture
+def target():
+    return Target()
+
+
+@pytest.fixture
+def actions(target):
+    return {name: target.action(name) for name in RESOURCE_STEPS}
+
+
+def _resources(*names):
+    return {name: f"{name}-output" for name in names}
+
+
+async def test_dependents_are_torn_down_before_their_dependencies(target, actions):
+    report = await tear_down(
+        _graph(), _resources(*RESOURCE_STEPS, "iam"), actions, target
+    )
+
+    assert report.succeeded
+    assert sorted(report.deleted) == sorted(RESOURCE_STEPS)
+    order = target.deleted.index
+    assert order("dns") < order("run_service")
+    # Through "iam", which has no teardown of its own
+    assert order("run_service") < order("service_account")
+    assert order("run_service") < order("bucket")
+    assert target.deleted[-1] == "project"
+
+
+async def test_not_found_counts_as_deleted(target, actions):
+    target.errors["bucket"] = [gcp_exceptions.NotFound("bucket")]
+
+    report = await tear_down(_graph(), _resources(*RESOURCE_STEPS), actions, target)
+
+    assert report.succeeded
+    assert "bucket" in report.deleted
+    assert target.attempts["bucket"] == 1
+
+
+async def test_transient_errors_are_retried(target, actions):
+    target.errors["run_service"] = [
+        gcp_exceptions.ServiceUnavailable("unavailable"),
+        gcp_exceptions.Conflict("still in use"),
+    ]
+
+    report = await tear_down(_graph(), _resources(*RESOURCE_STEPS), actions, target)
+
+    assert report.succeeded
+    assert target.attempts["run_service"] == 3
+
+
+async def test_permanent_error_does_not_block_project_deletion(target, actions):
+    target.errors["service_account"] = [gcp_exceptions.PermissionDenied("denied")]
+
+    report = await tear_down(_graph(), _resources(*RESOURCE_STEPS), actions, target)
+
+    assert not report.succeeded
+    assert report.failed == {"service_account": "denied"}
+    assert "service_account" not in report.deleted
+    assert target.attempts["service_account"] == 1
+    assert target.deleted[-1] == "project"
+
+
+async def test_only_steps_that_ran_are_torn_down(target, actions):
+    report = await tear_down(
+        _graph(), _resources("project", "service_account"), actions, target
+    )
+
+    assert report.deleted == ["service_account", "project"]
+    assert target.deleted == ["service_account", "project"]
+
+
+def test_teardown_graph_skips_steps_without_actions(actions):
+    graph = build_teardown_graph(_graph(), [*RESOURCE_STEPS, "iam"], actions)
+
+    assert set(graph.order) == set(RESOURCE_STEPS)
+    assert set(graph.descendants("run_service")) == {
+        "service_account", "bucket", "project"
+    }
@@ -0,0 +1,90 @@
+"""Tests for starting the process-wide warm pool."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from nlyzer.gcp import warm_pool
+from nlyzer.gcp.warm_pool import (
+    POOL_CLAIMED,
+    InMemoryWarmPoolStore,
+    SQLAlchemyWarmPoolStore,
+    WarmPool,
+    get_warm_pool,
+)
+
+
+@pytest.fixture(params=["memory", "sqlalchemy"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryWarmPoolStore()
+        return
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from nlyzer.db.models import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    Base.metadata.create_all(engine)
+    yield SQLAlchemyWarmPoolStore(sessionmaker(bind=engine, expire_on_commit=False))
+    engine.dispose()
+
+
+@pytest.fixture
+def refills(monkeypatch):
+    """Enable the pool and record its refill passes instead of warming."""
+    monkeypatch.setattr(warm_pool.settings, "WARM_POOL_SIZE", 2)
+    passes = []
+
+    async def refill(self):
+        passes.append(self)
+        return {"target": 2, "warmed": 0, "retired": 0}
+
+    monkeypatch.setattr(WarmPool, "refill", refill)
+    with mock.patch(
+        "nlyzer.gcp.registry._application_default_credentials",
+        return_value=(None, "nlyzer-control-plane"),
+    ):
+        yield passes
+
+
+async def test_pool_refills_once_created(refills):
+    pool = get_warm_pool()
+    await asyncio.sleep(0)
+
+    assert get_warm_pool() is pool
+    assert refills == [pool]
+    await pool.stop()
+
+
+def test_pool_created_outside_a_loop_starts_on_the_first_call_inside_one(refills):
+    pool = get_warm_pool()
+
+    async def provisioning_run():
+        assert get_warm_pool() is pool
+        await asyncio.sleep(0)
+        await pool.stop()
+
+    asyncio.run(provisioning_run())
+
+    assert refills == [pool]
+
+
+async def test_claim_removes_the_project_from_the_store(store):
+    for project_id in ("nlyzer-pool-old", "nlyzer-pool-new"):
+        await store.add(project_id)
+        await store.mark_ready(project_id)
+
+    claimed = await store.claim("acme")
+
+    assert claimed.project_id == "nlyzer-pool-old"
+    assert claimed.status == POOL_CLAIMED
+    assert claimed.claimed_by == "acme"
+    assert [project.project_id for project in await store.list()] == [
+        "nlyzer-pool-new"
+    ]
+    assert (await store.claim("globex")).project_id == "nlyzer-pool-new"
+    assert await store.claim("initech") is None
+    assert await store.list() == []
@@ -0,0 +1,173 @@
+"""
+Batch Provisioning Benchmark Against a Quota-Enforcing Fake GCP
+
+Provisions a batch of tenants against the in-process fake GCP of
+nlyzer_api/tests/fakes.py. The fake backend enforces per-API, per-method
+and per-region quotas with sliding windows and rejects calls over a quota
+with ResourceExhausted, like GCP does. Long-running operations take a
+fixed, scaled time, and the NLWeb health check is served by a local HTTP
+server.
+
+The batch is provisioned twice:
+
+- naive: provision_new_tenant for every tenant at once, without budgets
+- scheduler: provision_tenant_batch with quota budgets scaled to the fake
+
+The fake's project-creation quota is deliberately lower than the
+scheduler's default budget, so the scheduler has to adapt to throttling.
+Reports succeeded and failed tenants, throttled calls, simulated elapsed
+time and throughput for both, and exits non-zero if the scheduler left
+any tenant failed. With --trace-file, the scheduler run's traces are
+written for scripts/provisioning_trace_report.py (durations are on the
+fake's compressed time scale).
+
+Usage:
+    python scripts/benchmarks/batch_provisioning.py --tenants 100 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api" / "tests"))
+
+from fakes import FakeGCP, start_health_server  # noqa: E402
+
+from nlyzer.gcp import operations, provisioning  # noqa: E402
+from nlyzer.gcp.batch_provisioning import TenantRequest, provision_tenant_batch  # noqa: E402
+from nlyzer.gcp.checkpoints import InMemoryCheckpointStore  # noqa: E402
+from nlyzer.gcp.provisioning import provision_new_tenant  # noqa: E402
+from nlyzer.gcp.quotas import (  # noqa: E402
+    DEFAULT_API_QUOTAS,
+    DEFAULT_MAX_THROTTLE_RETRY_DELAY,
+    DEFAULT_REGIONAL_QUOTAS,
+    DEFAULT_THROTTLE_RETRY_DELAY,
+    QuotaLimit,
+    QuotaManager,
+)
+from nlyzer.gcp.tracing import OTLPJsonFileExporter, get_tracer  # noqa: E402
+
+
+def _scaled_quotas(speedup: float) -> QuotaManager:
+    """Scheduler budgets at their defaults, on the fake's time scale."""
+    def scale(quotas):
+        return {
+            key: QuotaLimit(rate=limit.rate * speedup, burst=limit.burst)
+            for key, limit in quotas.items()
+        }
+    return QuotaManager(
+        api_quotas=scale(DEFAULT_API_QUOTAS),
+        regional_quotas=scale(DEFAULT_REGIONAL_QUOTAS),
+        throttle_retry_delay=DEFAULT_THROTTLE_RETRY_DELAY / speedup,
+        max_throttle_retry_delay=DEFAULT_MAX_THROTTLE_RETRY_DELAY / speedup
+    )
+
+
+def _scale_polling(speedup: float) -> None:
+    """Put operation polling on the fake's time scale."""
+    for name in dir(provisioning):
+        if name.endswith("_POLL_DELAY"):
+            setattr(provisioning, name, getattr(provisioning, name) / speedup)
+    operations.DEFAULT_MAX_INTERVAL /= speedup
+
+
+def _requests(count: int, prefix: str):
+    return [
+        TenantRequest(f"{prefix}{index:04d}", {"credentials": {"API_KEY": "secret"}})
+        for index in range(count)
+    ]
+
+
+async def _naive(args, service_url: str) -> dict:
+    operations.get_operation_poller().max_interval = operations.DEFAULT_MAX_INTERVAL
+    backend = FakeGCP(args.speedup, service_url)
+    store = InMemoryCheckpointStore()
+    start = time.monotonic()
+    results = await asyncio.gather(*(
+        provision_new_tenant(
+            request.tenant_id, request.config,
+            client_manager=backend, checkpoint_store=store
+        )
+        for request in _requests(args.tenants, "naive")
+    ))
+    return {
+        "elapsed": time.monotonic() - start,
+        "succeeded": sum(result["status"] == "success" for result in results),
+        "failed": sum(result["status"] != "success" for result in results),
+        "throttled": dict(backend.quotas.throttled),
+    }
+
+
+async def _scheduler(args, service_url: str) -> dict:
+    operations.get_operation_poller().max_interval = operations.DEFAULT_MAX_INTERVAL
+    backend = FakeGCP(args.speedup, service_url)
+    result = await provision_tenant_batch(
+        _requests(args.tenants, "batch"),
+        client_manager=backend,
+        checkpoint_store=InMemoryCheckpointStore(),
+        quotas=_scaled_quotas(args.speedup),
+        max_concurrency=args.concurrency
+    )
+    return {
+        "elapsed": result["elapsed_seconds"],
+        "succeeded": len(result["succeeded"]),
+        "failed": len(result["failed"]),
+        "throttled": dict(backend.quotas.throttled),
+        "quota": result["quota"],
+    }
+
+
+def _print(name: str, result: dict, args) -> None:
+    simulated = result["elapsed"] * args.speedup
+    print(f"{name}:")
+    print(f"  succeeded / failed:   {result['succeeded']} / {result['failed']}")
+    throttled = result["throttled"]
+    print(f"  throttled calls:      {sum(throttled.values())} {throttled}")
+    print(f"  elapsed:              {simulated:7.1f}s (simulated)")
+    per_minute = result["succeeded"] / simulated * 60
+    print(f"  throughput:           {per_minute:7.2f} tenants/min")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--speedup", type=float, default=60.0)
+    parser.add_argument(
+        "--trace-file", help="Append traces of the scheduler run to this OTLP/JSON file"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    _scale_polling(args.speedup)
+    server, service_url = start_health_server()
+
+    try:
+        naive = asyncio.run(_naive(args, service_url))
+        if args.trace_file:
+            get_tracer().add_exporter(OTLPJsonFileExporter(args.trace_file))
+        scheduler = asyncio.run(_scheduler(args, service_url))
+    finally:
+        server.shutdown()
+
+    _print("naive (all at once)", naive, args)
+    _print(f"scheduler (concurrency {args.concurrency})", scheduler, args)
+    reduced = {
+        key: (
+            f"{stats['rate'] / args.speedup:.2f}/"
+            f"{stats['limit_rate'] / args.speedup:.2f}"
+        )
+        for key, stats in scheduler["quota"].items() if stats["throttled"]
+    }
+    print(f"adapted budgets (rate/limit per s): {reduced}")
+
+    if scheduler["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Client Cache Contention Benchmark for GCPClientManager
+
+Hammers GCPClientManager's client cache from many threads at once and
+reports:
+
+- how many times each client factory actually ran (must be exactly 1 per key)
+- cache lookups per second when all threads request the same client
+- cache lookups per second when threads request different clients
+
+Client construction is simulated with a configurable delay so that the
+check-then-create window is wide enough to expose duplicate creation.
+Exits non-zero if any client was built more than once.
+
+Usage:
+    python scripts/benchmarks/gcp_client_cache_contention.py --threads 64
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+
+from nlyzer.gcp.clients import GCPClientManager  # noqa: E402
+from nlyzer.gcp.registry import ClientRegistry  # noqa: E402
+
+
+def _build_manager() -> GCPClientManager:
+    auth = mock.patch(
+        "nlyzer.gcp.registry._application_default_credentials",
+        return_value=(None, "bench-project"),
+    )
+    with auth:
+        return GCPClientManager(project_id="bench-project", registry=ClientRegistry())
+
+
+def _run(threads: int, lookups: int, keys: int, create_delay: float) -> dict:
+    manager = _build_manager()
+    creations = Counter()
+    creations_lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def factory_for(key: str):
+        def factory():
+            with creations_lock:
+                creations[key] += 1
+            time.sleep(create_delay)
+            return object()
+        return factory
+
+    def worker(index: int) -> None:
+        key = f"client-{index % keys}"
+        factory = factory_for(key)
+        barrier.wait()
+        for _ in range(lookups):
+            manager._get_cached_client(key, factory)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "keys": keys,
+        "elapsed_s": elapsed,
+        "lookups_per_s": threads * lookups / elapsed,
+        "max_creations_per_key": max(creations.values()),
+        "total_creations": sum(creations.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--create-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    duplicates = False
+    for label, keys in (("same key", 1), ("distinct keys", args.threads)):
+        result = _run(args.threads, args.lookups, keys, args.create_delay_ms / 1000)
+        duplicates |= result["max_creations_per_key"] > 1
+        print(
+            f"{label:>13}: {result['lookups_per_s']:,.0f} lookups/s "
+            f"creations={result['total_creations']} for {result['keys']} keys "
+            f"(max per key {result['max_creations_per_key']})"
+        )
+
+    if duplicates:
+        print("FAIL: at least one client was created more than once")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Event Loop Lag Benchmark for GCP Client Access
+
+Measures how much a burst of concurrent provisioning coroutines delays the
+asyncio event loop when GCP calls are made:
+
+- blocking: the synchronous client is called directly inside the coroutine
+- async:    the same client is called through AsyncClientAdapter, the
+            compatibility mode behind GCPClientManager.get_*_async_client()
+
+A heartbeat coroutine ticks every few milliseconds and records how late each
+tick fires. With blocking calls the lag grows with the number of in-flight
+calls; with the async surface it should stay close to zero.
+
+Usage:
+    python scripts/benchmarks/gcp_event_loop_lag.py --coroutines 50 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+
+from nlyzer.gcp.clients import AsyncClientAdapter  # noqa: E402
+
+HEARTBEAT_INTERVAL = 0.005
+
+
+class SlowSecretsClient:
+    """Stand-in for a synchronous GCP client with fixed per-call latency."""
+
+    def __init__(self, latency: float):
+        self._latency = latency
+
+    def access_secret_version(self, request):
+        time.sleep(self._latency)
+        return request["name"]
+
+
+async def _heartbeat(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(mode: str, coroutines: int, latency: float) -> dict:
+    client = SlowSecretsClient(latency)
+    adapter = AsyncClientAdapter(client)
+
+    async def blocking_call(index: int):
+        return client.access_secret_version(request={"name": f"secret-{index}"})
+
+    async def async_call(index: int):
+        return await adapter.access_secret_version(request={"name": f"secret-{index}"})
+
+    call = blocking_call if mode == "blocking" else async_call
+    lags: list = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(lags, stop))
+    await asyncio.sleep(HEARTBEAT_INTERVAL * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(coroutines)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat
+
+    lags.sort()
+    p99_index = min(len(lags) - 1, int(len(lags) * 0.99))
+    return {
+        "mode": mode,
+        "wall_clock_s": elapsed,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[p99_index] * 1000 if lags else 0.0,
+        "lag_mean_ms": statistics.mean(lags) * 1000 if lags else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--coroutines", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    for mode in ("blocking", "async"):
+        result = asyncio.run(_run(mode, args.coroutines, args.latency_ms / 1000))
+        print(
+            f"{result['mode']:>8}: wall={result['wall_clock_s']:.3f}s "
+            f"lag max={result['lag_max_ms']:.1f}ms "
+            f"p99={result['lag_p99_ms']:.1f}ms "
+            f"mean={result['lag_mean_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
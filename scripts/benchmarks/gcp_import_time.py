@@ -0,0 +1,134 @@
+"""
+Import Time Benchmark for nlyzer.gcp
+
+Runs ``python -X importtime`` in a fresh interpreter for each target module
+and reports its cumulative import time along with the slowest dependencies.
+This guards cold-start time for CLI invocations and the Cloud Function
+provisioning handler, which import nlyzer.gcp but typically use only one or
+two GCP services.
+
+The check fails (exit code 1) if:
+- a target's cumulative import time exceeds its budget (median of --runs), or
+- importing a target eagerly loads any google.cloud client library, which
+  should only happen on first use of the matching get_*_client() accessor
+
+Each target is held to DEFAULT_BUDGET_MS unless TARGET_BUDGETS_MS gives it
+its own budget; --budget-ms applies one budget to every target instead.
+
+Usage:
+    python scripts/benchmarks/gcp_import_time.py
+    python scripts/benchmarks/gcp_import_time.py --budget-ms 150
+    python scripts/benchmarks/gcp_import_time.py nlyzer.gcp.dns --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[2] / "nlyzer_api"
+
+DEFAULT_TARGETS = [
+    "nlyzer.gcp", "nlyzer.gcp.clients", "nlyzer.gcp.dns", "nlyzer.gcp.provisioning",
+    "nlyzer.gcp.batch_provisioning"
+]
+
+# Cumulative import time allowed for a target, in milliseconds
+DEFAULT_BUDGET_MS = 150.0
+
+# Budgets for targets that legitimately load more than the default allows.
+# The provisioning modules also load the step graph, checkpoint store and
+# resilience layer (tracing and quota management); the warm pool and
+# teardown modules are imported on first use.
+TARGET_BUDGETS_MS = {
+    "nlyzer.gcp.provisioning": 175.0,
+    "nlyzer.gcp.batch_provisioning": 175.0,
+}
+
+# Client libraries that must not be imported as a side effect of importing
+# nlyzer.gcp; they are loaded lazily by GCPClientManager
+LAZY_LIBRARIES = (
+    "google.cloud.billing_v1",
+    "google.cloud.compute_v1",
+    "google.cloud.iam_admin_v1",
+    "google.cloud.resourcemanager_v3",
+    "google.cloud.run_v2",
+    "google.cloud.secretmanager",
+    "google.cloud.storage",
+)
+
+
+def _measure(target: str) -> dict:
+    """Import target in a fresh interpreter and parse -X importtime output."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [str(API_ROOT), os.environ.get("PYTHONPATH")])
+    ))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{completed.stderr}")
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return {
+        "cumulative_ms": modules.get(target, (0, 0))[1] / 1000,
+        "modules": modules,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for target in args.targets:
+        budget_ms = args.budget_ms
+        if budget_ms is None:
+            budget_ms = TARGET_BUDGETS_MS.get(target, DEFAULT_BUDGET_MS)
+        runs = [_measure(target) for _ in range(args.runs)]
+        median_ms = statistics.median(run["cumulative_ms"] for run in runs)
+        modules = runs[-1]["modules"]
+        eager = sorted(
+            name for name in modules
+            if any(name == lib or name.startswith(f"{lib}.") for lib in LAZY_LIBRARIES)
+        )
+
+        status = "ok"
+        if median_ms > budget_ms:
+            status = f"OVER BUDGET ({budget_ms:.0f}ms)"
+            failed = True
+        if eager:
+            status = "EAGER CLIENT LIBRARY IMPORT"
+            failed = True
+
+        print(f"{target}: {median_ms:.1f}ms median over {args.runs} runs - {status}")
+        slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_us, cumulative_us) in slowest[:args.top]:
+            print(
+                f"    {self_us / 1000:8.1f}ms self "
+                f"{cumulative_us / 1000:8.1f}ms cum  {name}"
+            )
+        for name in eager[:args.top]:
+            print(f"    eagerly imported: {name}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
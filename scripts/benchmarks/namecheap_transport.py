@@ -0,0 +1,112 @@
+"""
+Namecheap Transport Benchmark Against a Local Fake XML API
+
+Starts the fake Namecheap XML API of nlyzer_api/tests/fakes.py on
+localhost, which serves getHosts/setHosts from an in-memory zone and
+enforces its own rate limit. Requests over the limit get either HTTP 429
+or a Namecheap "too many requests" error. NamecheapTransport is then
+driven with a burst of concurrent calls, and the script reports:
+
+- calls completed, throttled responses and retries
+- the number of distinct TCP connections the server saw, which shows
+  that keep-alive pooling works
+- the peak request rate the server observed against its limit
+- mean and p95 call latency
+
+Exits non-zero if any call failed, including calls that were still throttled
+after all retries.
+
+Usage:
+    python scripts/benchmarks/namecheap_transport.py --calls 60 --rate 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api" / "tests"))
+
+from fakes import FakeNamecheap  # noqa: E402
+
+from nlyzer.gcp.namecheap import NamecheapTransport, TokenBucket  # noqa: E402
+
+
+async def _run(args: argparse.Namespace, server: FakeNamecheap) -> dict:
+    # With burst + client rate within the server's window limit the limiter,
+    # not the server, does the pacing; raise them to provoke throttling
+    limiter = TokenBucket(rate=args.client_rate / args.window, burst=args.burst)
+    transport = NamecheapTransport(
+        "user", "key", "user", "127.0.0.1",
+        rate_limiter=limiter, api_url=server.url, retry_delay=0.5, max_retry_delay=2.0,
+    )
+
+    latencies = []
+    failures = []
+
+    async def one_call(index: int) -> None:
+        started = time.perf_counter()
+        try:
+            if index % 2:
+                await transport.get_hosts("nlyzer.com")
+            else:
+                await transport.set_hosts("nlyzer.com", [{
+                    "HostName": f"t{index}", "RecordType": "A",
+                    "Address": "10.0.0.1", "TTL": "300",
+                }])
+        except Exception as error:
+            failures.append(f"call {index}: {error}")
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_call(i) for i in range(args.calls)))
+    elapsed = time.perf_counter() - started
+    await transport.aclose()
+
+    latencies.sort()
+    return {
+        "elapsed_s": elapsed,
+        "failures": failures,
+        "mean_s": statistics.mean(latencies),
+        "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "transport": transport.get_stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--rate", type=int, default=20, help="server limit per window")
+    parser.add_argument("--client-rate", type=float, default=15)
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--window", type=float, default=2.0, help="seconds")
+    parser.add_argument(
+        "--throttle-status", type=int, default=429,
+        help="HTTP status for throttled requests, or 0 for an XML API error",
+    )
+    args = parser.parse_args()
+
+    server = FakeNamecheap(args.rate, args.window, args.throttle_status).start()
+    try:
+        result = asyncio.run(_run(args, server))
+    finally:
+        server.shutdown()
+
+    stats = result["transport"]
+    print(f"calls:            {args.calls} in {result['elapsed_s']:.2f}s")
+    print(f"http requests:    {stats['requests']} ({stats['throttled']} throttled)")
+    print(f"tcp connections:  {len(server.connections)}")
+    print(f"peak per window:  {server.peak_in_window} (server limit {args.rate})")
+    print(f"latency:          mean {result['mean_s']:.2f}s, p95 {result['p95_s']:.2f}s")
+    for failure in result["failures"]:
+        print(f"FAILED {failure}")
+
+    if result["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
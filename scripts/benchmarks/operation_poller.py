@@ -0,0 +1,225 @@
+"""
+Shared Operation Poller vs Per-Operation Waiters
+
+Simulates the long-running operations of many tenants provisioned at the
+same time: for each tenant a project creation, a Weaviate instance insert,
+a firewall insert and a Cloud Run deployment, all started together.
+Operations finish after their typical duration, divided by --speedup.
+
+Two ways of waiting are compared:
+
+- per-operation: what the client libraries do on their own. Async
+  operations poll GetOperation in their own loop; Compute Engine
+  operations block a thread of the shared blocking-I/O pool
+  (BLOCKING_IO_WORKERS threads) in ExtendedOperation.result().
+  Both poll after 1s, growing 1.5x per poll up to 20s.
+- poller: nlyzer.gcp.operations.OperationPoller with the initial delays
+  used by nlyzer.gcp.provisioning; compute operations of a project share
+  one aggregatedList call.
+
+Reports status API calls, peak threads busy waiting and how long after
+its completion each operation was noticed (mean and max, simulated).
+
+Usage:
+    python scripts/benchmarks/operation_poller.py --tenants 50 --speedup 60
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+
+from nlyzer.gcp import provisioning  # noqa: E402
+from nlyzer.gcp.operations import DEFAULT_MAX_INTERVAL, OperationPoller  # noqa: E402
+from nlyzer.gcp.registry import BLOCKING_IO_WORKERS  # noqa: E402
+
+# Typical duration of each operation in seconds, whether it is a Compute
+# Engine operation, and the poller's initial delay for it
+OPERATIONS = {
+    "create_project": (45.0, False, provisioning.PROJECT_CREATION_POLL_DELAY),
+    "insert_instance": (90.0, True, provisioning.INSTANCE_CREATION_POLL_DELAY),
+    "insert_firewall": (20.0, True, provisioning.FIREWALL_CREATION_POLL_DELAY),
+    "create_service": (60.0, False, provisioning.CLOUD_RUN_DEPLOY_POLL_DELAY),
+}
+
+# Client library polling defaults
+LIBRARY_INITIAL_DELAY = 1.0
+LIBRARY_MULTIPLIER = 1.5
+LIBRARY_MAX_DELAY = 20.0
+
+
+class Backend:
+    """Operation state and call counters shared by all fakes."""
+
+    def __init__(self, speedup: float):
+        self.speedup = speedup
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.busy_threads = 0
+        self.peak_threads = 0
+        self.operations = {}
+        self.lags = []
+
+    def count_call(self) -> None:
+        with self.lock:
+            self.calls += 1
+
+    def noticed(self, operation) -> None:
+        with self.lock:
+            lag = max(0.0, time.monotonic() - operation.done_at)
+            self.lags.append(lag * self.speedup)
+
+
+class AsyncOperation:
+    def __init__(self, backend: Backend, name: str, seconds: float):
+        self.backend = backend
+        self.done_at = time.monotonic() + seconds / backend.speedup
+        self.operation = types.SimpleNamespace(name=name)
+
+    async def done(self) -> bool:
+        self.backend.count_call()
+        return time.monotonic() >= self.done_at
+
+    async def result(self, timeout=None):
+        delay = LIBRARY_INITIAL_DELAY
+        while not await self.done():
+            await asyncio.sleep(delay / self.backend.speedup)
+            delay = min(LIBRARY_MAX_DELAY, delay * LIBRARY_MULTIPLIER)
+        return None
+
+
+class ComputeOperation:
+    def __init__(self, backend: Backend, project_id: str, name: str, seconds: float):
+        self.backend = backend
+        self.name = name
+        self.done_at = time.monotonic() + seconds / backend.speedup
+        backend.operations.setdefault(project_id, {})[name] = self
+
+    def result(self, timeout=None):
+        backend = self.backend
+        with backend.lock:
+            backend.busy_threads += 1
+            backend.peak_threads = max(backend.peak_threads, backend.busy_threads)
+        try:
+            delay = LIBRARY_INITIAL_DELAY
+            while True:
+                backend.count_call()
+                if time.monotonic() >= self.done_at:
+                    return None
+                time.sleep(delay / backend.speedup)
+                delay = min(LIBRARY_MAX_DELAY, delay * LIBRARY_MULTIPLIER)
+        finally:
+            with backend.lock:
+                backend.busy_threads -= 1
+
+
+class OperationsClient:
+    """Fake async Global Operations client."""
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+
+    async def aggregated_list(self, request):
+        self.backend.count_call()
+        now = time.monotonic()
+        operations = [
+            types.SimpleNamespace(
+                name=name,
+                status=types.SimpleNamespace(
+                    name="DONE" if now >= op.done_at else "RUNNING"
+                ),
+                error=None
+            )
+            for name, op in self.backend.operations.get(request["project"], {}).items()
+            if f'"{name}"' in request["filter"]
+        ]
+        return types.SimpleNamespace(
+            items={"zones/us-central1-a": types.SimpleNamespace(operations=operations)}
+        )
+
+
+def _start(backend: Backend, tenants: int):
+    started = []
+    for tenant in range(tenants):
+        project_id = f"tenant-{tenant}"
+        for kind, (seconds, compute, _) in OPERATIONS.items():
+            name = f"{kind}-{tenant}"
+            if compute:
+                operation = ComputeOperation(backend, project_id, name, seconds)
+            else:
+                operation = AsyncOperation(backend, name, seconds)
+            started.append((kind, project_id, operation))
+    return started
+
+
+async def _per_operation(args) -> Backend:
+    backend = Backend(args.speedup)
+    executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS)
+    loop = asyncio.get_running_loop()
+
+    async def wait(kind, project_id, operation):
+        if OPERATIONS[kind][1]:
+            await loop.run_in_executor(executor, operation.result)
+        else:
+            await operation.result()
+        backend.noticed(operation)
+
+    await asyncio.gather(*(wait(*item) for item in _start(backend, args.tenants)))
+    executor.shutdown()
+    return backend
+
+
+async def _poller(args) -> Backend:
+    backend = Backend(args.speedup)
+    poller = OperationPoller(max_interval=DEFAULT_MAX_INTERVAL / args.speedup)
+    operations_client = OperationsClient(backend)
+
+    async def wait(kind, project_id, operation):
+        _, compute, initial_delay = OPERATIONS[kind]
+        initial_delay /= args.speedup
+        if compute:
+            await poller.wait_compute(
+                operation, project_id, operations_client, timeout=600,
+                initial_delay=initial_delay
+            )
+        else:
+            await poller.wait(operation, timeout=600, initial_delay=initial_delay)
+        backend.noticed(operation)
+
+    await asyncio.gather(*(wait(*item) for item in _start(backend, args.tenants)))
+    return backend
+
+
+def _print(name: str, backend: Backend, elapsed: float, args) -> None:
+    print(f"{name}:")
+    print(f"  status API calls:     {backend.calls}")
+    print(f"  peak waiting threads: {backend.peak_threads}")
+    print(
+        f"  completion noticed:   mean {statistics.mean(backend.lags):.1f}s, "
+        f"max {max(backend.lags):.1f}s after done (simulated)"
+    )
+    print(f"  elapsed:              {elapsed * args.speedup:.1f}s (simulated)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--speedup", type=float, default=60.0)
+    args = parser.parse_args()
+
+    strategies = (("per-operation waiters", _per_operation), ("shared poller", _poller))
+    for name, run in strategies:
+        start = time.monotonic()
+        backend = asyncio.run(run(args))
+        _print(name, backend, time.monotonic() - start, args)
+
+
+if __name__ == "__main__":
+    main()
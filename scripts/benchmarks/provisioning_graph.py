@@ -0,0 +1,100 @@
+"""
+Provisioning Step Graph Benchmark
+
+Runs the structure of PROVISIONING_GRAPH with simulated step durations and
+compares it against the sequential plan from GCP_PROVISIONING_ARCHITECTURE.md,
+where every step waits for the previous one. Durations are typical
+wall-clock times of the real GCP operations in seconds, multiplied by
+--scale so a run finishes quickly.
+
+Reports the elapsed time of both plans, the speedup and the critical path
+of the graph.
+
+Usage:
+    python scripts/benchmarks/provisioning_graph.py --scale 0.01 --runs 3
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+
+from nlyzer.gcp.provisioning import PROVISIONING_GRAPH  # noqa: E402
+from nlyzer.gcp.step_graph import Step, StepGraph, StepGraphExecutor  # noqa: E402
+
+# Typical duration of each step in seconds
+STEP_SECONDS = {
+    "create_project": 45.0,
+    "link_billing": 5.0,
+    "create_service_account": 12.0,
+    "store_secrets": 4.0,
+    "create_config_storage": 6.0,
+    "deploy_weaviate": 90.0,
+    "setup_networking": 20.0,
+    "deploy_nlweb": 60.0,
+    "setup_custom_domain": 3.0,
+    "validate_deployment": 15.0,
+}
+
+
+class _Context:
+    def __init__(self):
+        self.outputs = {}
+
+
+def _simulated(name: str, scale: float):
+    async def run(context):
+        await asyncio.sleep(STEP_SECONDS[name] * scale)
+    return run
+
+
+def _graphs(scale: float):
+    steps = PROVISIONING_GRAPH.steps
+    concurrent = StepGraph(
+        Step(name, _simulated(name, scale), step.requires)
+        for name, step in steps.items()
+    )
+    order = PROVISIONING_GRAPH.order
+    sequential = StepGraph(
+        Step(name, _simulated(name, scale), (order[index - 1],) if index else ())
+        for index, name in enumerate(order)
+    )
+    return concurrent, sequential
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    concurrent, sequential = _graphs(args.scale)
+    timings = {"graph": [], "sequential": []}
+    critical_path = []
+    for _ in range(args.runs):
+        report = await StepGraphExecutor(concurrent).execute(_Context())
+        timings["graph"].append(report.elapsed_seconds)
+        critical_path = report.critical_path
+        report = await StepGraphExecutor(sequential).execute(_Context())
+        timings["sequential"].append(report.elapsed_seconds)
+    return {
+        "graph": statistics.median(timings["graph"]),
+        "sequential": statistics.median(timings["sequential"]),
+        "critical_path": critical_path,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    result = asyncio.run(_run(args))
+    graph, sequential = result["graph"], result["sequential"]
+    print(f"sequential plan:  {sequential / args.scale:7.1f}s (simulated)")
+    print(f"step graph:       {graph / args.scale:7.1f}s (simulated)")
+    print(f"speedup:          {sequential / graph:.2f}x")
+    print(f"critical path:    {' -> '.join(result['critical_path'])}")
+
+
+if __name__ == "__main__":
+    main()
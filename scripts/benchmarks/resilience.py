@@ -0,0 +1,175 @@
+"""
+Retries During a Regional Outage With and Without Circuit Breakers
+
+Tenants deploy Cloud Run services across three regions through an
+in-process fake client. Partway through, one region goes down for
+--outage simulated seconds and answers every call with 503
+ServiceUnavailable, like GCP during a regional incident; the other regions
+stay healthy. Every call goes through nlyzer.gcp.resilience.ResilientClient,
+configured two ways:
+
+- retries only: the default retry policy, with unlimited retry budgets
+  and breakers that never open
+- resilience: the default retry budgets and circuit breakers
+
+Reports the calls that reached the failed region during the outage, the
+retries made, how long callers waited for a doomed call to fail, the
+calls shed by open breakers, and how soon after the region recovered
+calls to it succeeded again. Time is simulated and compressed by
+--speedup.
+
+Usage:
+    python scripts/benchmarks/resilience.py --tenants 500 --outage 300
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+
+from google.api_core import exceptions as gcp_exceptions  # noqa: E402
+
+from nlyzer.gcp import resilience  # noqa: E402
+from nlyzer.gcp.exceptions import CircuitOpenError  # noqa: E402
+from nlyzer.gcp.resilience import (  # noqa: E402
+    ResilienceManager,
+    ResilientClient,
+    RetryPolicy,
+)
+
+REGIONS = ("us-central1", "us-east1", "europe-west1")
+FAILED_REGION = "us-central1"
+
+# Simulated latency of one call in seconds
+CALL_SECONDS = 0.5
+
+# The outage starts this many simulated seconds into the run
+OUTAGE_START = 60.0
+
+
+class FakeRunClient:
+    """Cloud Run client whose calls fail in a region during its outage."""
+
+    def __init__(self, speedup: float, outage: float):
+        self.speedup = speedup
+        self.start = time.monotonic()
+        self.outage_end = OUTAGE_START + outage
+        self.calls = 0
+        self.failed_region_calls = 0
+        self.recovered_at = None
+
+    def now(self) -> float:
+        """Simulated seconds since the start of the run."""
+        return (time.monotonic() - self.start) * self.speedup
+
+    async def create_service(self, request: dict) -> str:
+        self.calls += 1
+        await asyncio.sleep(CALL_SECONDS / self.speedup)
+        now = self.now()
+        if FAILED_REGION in request["parent"]:
+            if OUTAGE_START <= now < self.outage_end:
+                self.failed_region_calls += 1
+                raise gcp_exceptions.ServiceUnavailable("Region unavailable")
+            if now >= self.outage_end and self.recovered_at is None:
+                self.recovered_at = now
+        return request["service_id"]
+
+
+async def _run(args, manager: ResilienceManager) -> dict:
+    backend = FakeRunClient(args.speedup, args.outage)
+    client = ResilientClient(backend, "run.googleapis.com", manager)
+    doomed_waits = []
+    requests = 0
+    shed = 0
+    duration = OUTAGE_START + args.outage + args.after
+
+    async def tenant(index: int) -> None:
+        nonlocal requests, shed
+        rng = random.Random(index)
+        region = REGIONS[index % len(REGIONS)]
+        while backend.now() < duration:
+            await asyncio.sleep(rng.expovariate(1 / args.interval) / args.speedup)
+            started = backend.now()
+            requests += 1
+            try:
+                await client.create_service(request={
+                    "parent": f"projects/tenant-{index}/locations/{region}",
+                    "service_id": f"nlweb-{index}",
+                })
+            except CircuitOpenError:
+                shed += 1
+                doomed_waits.append(backend.now() - started)
+            except gcp_exceptions.GoogleAPICallError:
+                doomed_waits.append(backend.now() - started)
+
+    await asyncio.gather(*(tenant(index) for index in range(args.tenants)))
+    return {
+        "failed_region_calls": backend.failed_region_calls,
+        "retries": backend.calls - (requests - shed),
+        "doomed": len(doomed_waits),
+        "doomed_wait": statistics.median(doomed_waits) if doomed_waits else 0.0,
+        "shed": shed,
+        "recovery": (
+            backend.recovered_at - backend.outage_end
+            if backend.recovered_at is not None else None
+        ),
+    }
+
+
+def _print(name: str, result: dict) -> None:
+    print(f"{name}:")
+    print(f"  calls to the failed region:  {result['failed_region_calls']}")
+    print(f"  retries:                     {result['retries']}")
+    print(
+        f"  failed calls:                {result['doomed']} "
+        f"({result['shed']} shed by open breakers)"
+    )
+    print(f"  median wait for a failure:   {result['doomed_wait']:6.1f}s (simulated)")
+    if result["recovery"] is None:
+        print("  recovery:                    no successful call after the outage")
+    else:
+        recovery = result["recovery"]
+        print(f"  recovery:                    {recovery:6.1f}s after the outage")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=30.0,
+                        help="Mean simulated seconds between calls per tenant")
+    parser.add_argument("--outage", type=float, default=300.0)
+    parser.add_argument("--after", type=float, default=120.0,
+                        help="Simulated seconds to keep running after the outage")
+    parser.add_argument("--speedup", type=float, default=60.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    policy = RetryPolicy(
+        initial_delay=resilience.DEFAULT_RETRY_DELAY / args.speedup,
+        max_delay=resilience.DEFAULT_MAX_RETRY_DELAY / args.speedup
+    )
+
+    unprotected = asyncio.run(_run(args, ResilienceManager(
+        retry_policy=policy,
+        retry_budget_ratio=float("inf"),
+        failure_threshold=sys.maxsize
+    )))
+    protected = asyncio.run(_run(args, ResilienceManager(
+        retry_policy=policy,
+        retry_budget_window=resilience.RETRY_BUDGET_WINDOW / args.speedup,
+        reset_timeout=resilience.BREAKER_RESET_TIMEOUT / args.speedup,
+        max_reset_timeout=resilience.BREAKER_MAX_RESET_TIMEOUT / args.speedup
+    )))
+
+    _print("retries only", unprotected)
+    _print("retry budgets and circuit breakers", protected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Dependency-Ordered Teardown vs Serial Sweep
+
+Offboards fully provisioned tenants against the in-process fake GCP of
+nlyzer_api/tests/fakes.py, whose deletions take their typical time
+(divided by --speedup) and are metered by the fake's quotas.
+
+Two ways of tearing down are compared:
+
+- serial: each resource of a tenant deleted one after another, in
+  reverse provisioning order, and tenants offboarded one at a time
+- graph: nlyzer.gcp.batch_provisioning.deprovision_tenant_batch, which
+  deletes independent resources of a tenant concurrently and offboards
+  many tenants at once under the quota budgets
+
+Reports the simulated time per tenant and for the whole batch, and the
+throttled calls, and exits non-zero if the graph teardown left any
+tenant with resources.
+
+Usage:
+    python scripts/benchmarks/teardown.py --tenants 50 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api" / "tests"))
+
+from batch_provisioning import _scale_polling, _scaled_quotas  # noqa: E402
+from fakes import FakeGCP  # noqa: E402
+
+from nlyzer.gcp import operations  # noqa: E402
+from nlyzer.gcp.batch_provisioning import deprovision_tenant_batch  # noqa: E402
+from nlyzer.gcp.checkpoints import RUN_SUCCEEDED, InMemoryCheckpointStore  # noqa: E402
+from nlyzer.gcp.provisioning import (  # noqa: E402
+    PROVISIONING_GRAPH,
+    TEARDOWN_ACTIONS,
+    ProvisioningContext,
+)
+
+SECRETS_PER_TENANT = 3
+
+
+def _outputs(tenant_id: str) -> dict:
+    """Checkpoints of a successfully provisioned tenant."""
+    project_id = f"nlyzer-tenant-{tenant_id}"
+    return {
+        "create_project": project_id,
+        "link_billing": None,
+        "create_service_account": (
+            f"nlweb-service-{tenant_id[:8]}@{project_id}.iam.gserviceaccount.com"
+        ),
+        "store_secrets": [
+            f"projects/{project_id}/secrets/credential-{index}/versions/1"
+            for index in range(SECRETS_PER_TENANT)
+        ],
+        "create_config_storage": [
+            f"nlyzer-config-{tenant_id}",
+            f"gs://nlyzer-config-{tenant_id}/nlweb_config.yml"
+        ],
+        "deploy_weaviate": "10.128.0.2",
+        "setup_networking": f"allow-weaviate-{tenant_id[:8]}",
+        "deploy_nlweb": "https://nlweb.a.run.app",
+        "setup_custom_domain": None,
+        "validate_deployment": None,
+    }
+
+
+async def _seed(tenant_ids) -> InMemoryCheckpointStore:
+    store = InMemoryCheckpointStore()
+    for tenant_id in tenant_ids:
+        state = await store.start_run(tenant_id)
+        for step_name, output in _outputs(tenant_id).items():
+            await store.save_checkpoint(tenant_id, step_name, output, state.attempts)
+        await store.finish_run(tenant_id, state.attempts, RUN_SUCCEEDED)
+    return store
+
+
+async def _serial(args, tenant_ids) -> dict:
+    operations.get_operation_poller().max_interval = operations.DEFAULT_MAX_INTERVAL
+    backend = FakeGCP(args.speedup, "http://unused")
+    store = await _seed(tenant_ids)
+    times = []
+    start = time.monotonic()
+    for tenant_id in tenant_ids:
+        tenant_start = time.monotonic()
+        state = await store.load(tenant_id)
+        context = ProvisioningContext(
+            tenant_id=tenant_id, config={}, client_manager=backend,
+            outputs=dict(state.outputs)
+        )
+        for name in reversed(PROVISIONING_GRAPH.order):
+            if name in TEARDOWN_ACTIONS and name in state.outputs:
+                await TEARDOWN_ACTIONS[name](context, state.outputs[name])
+        await store.delete_run(tenant_id)
+        times.append(time.monotonic() - tenant_start)
+    return {
+        "elapsed": time.monotonic() - start,
+        "times": times,
+        "failed": 0,
+        "throttled": dict(backend.quotas.throttled),
+    }
+
+
+async def _graph(args, tenant_ids) -> dict:
+    operations.get_operation_poller().max_interval = operations.DEFAULT_MAX_INTERVAL
+    backend = FakeGCP(args.speedup, "http://unused")
+    store = await _seed(tenant_ids)
+    result = await deprovision_tenant_batch(
+        tenant_ids,
+        client_manager=backend,
+        checkpoint_store=store,
+        quotas=_scaled_quotas(args.speedup),
+        max_concurrency=args.concurrency
+    )
+    return {
+        "elapsed": result["elapsed_seconds"],
+        "times": [
+            tenant["teardown"]["execution"]["elapsed_seconds"]
+            for tenant in result["results"].values() if "teardown" in tenant
+        ],
+        "failed": len(result["failed"]),
+        "throttled": dict(backend.quotas.throttled),
+    }
+
+
+def _print(name: str, result: dict, args) -> None:
+    times = [seconds * args.speedup for seconds in result["times"]]
+    print(f"{name}:")
+    print(
+        f"  per tenant:       median {statistics.median(times):6.1f}s, "
+        f"max {max(times):6.1f}s (simulated)"
+    )
+    print(f"  whole batch:      {result['elapsed'] * args.speedup:7.1f}s (simulated)")
+    print(f"  failed tenants:   {result['failed']}")
+    print(f"  throttled calls:  {sum(result['throttled'].values())}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--speedup", type=float, default=60.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    _scale_polling(args.speedup)
+    tenant_ids = [f"tenant{index:04d}" for index in range(args.tenants)]
+
+    serial = asyncio.run(_serial(args, tenant_ids))
+    graph = asyncio.run(_graph(args, tenant_ids))
+
+    _print("serial sweep", serial, args)
+    _print(f"dependency graph (concurrency {args.concurrency})", graph, args)
+    if graph["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Time-to-Ready With and Without the Warm Pool
+
+Signs up tenants one after another, --interval simulated seconds apart,
+against the in-process fake GCP of nlyzer_api/tests/fakes.py, and
+measures how long each provision_new_tenant call takes:
+
+- cold: every tenant creates and bills its own project
+- warm: a nlyzer.gcp.warm_pool.WarmPool, filled before the first signup
+  and refilled in the background, hands out pre-provisioned projects
+
+Reports median, p95 and maximum time-to-ready (simulated) for both, and
+the pool's claims, misses and warmed projects. A signup rate the refill
+cannot keep up with shows up as misses, i.e. tenants that fell back to a
+cold start.
+
+Usage:
+    python scripts/benchmarks/warm_pool.py --tenants 20 --interval 30 --pool-size 3
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api"))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nlyzer_api" / "tests"))
+
+from fakes import FakeGCP, start_health_server  # noqa: E402
+
+from nlyzer.gcp import operations, provisioning, warm_pool  # noqa: E402
+from nlyzer.gcp.checkpoints import InMemoryCheckpointStore  # noqa: E402
+from nlyzer.gcp.provisioning import provision_new_tenant  # noqa: E402
+from nlyzer.gcp.warm_pool import WarmPool, WarmPoolPolicy  # noqa: E402
+
+
+def _scale_polling(speedup: float) -> None:
+    """Put operation polling and pool timings on the fake's time scale."""
+    for module in (provisioning, warm_pool):
+        for name in dir(module):
+            if name.endswith("_POLL_DELAY"):
+                setattr(module, name, getattr(module, name) / speedup)
+    operations.DEFAULT_MAX_INTERVAL /= speedup
+
+
+async def _signups(args, service_url: str, pool_size: int) -> dict:
+    operations.get_operation_poller().max_interval = operations.DEFAULT_MAX_INTERVAL
+    backend = FakeGCP(args.speedup, service_url)
+    store = InMemoryCheckpointStore()
+    pool = None
+    if pool_size:
+        pool = WarmPool(backend, policy=WarmPoolPolicy(
+            min_size=pool_size,
+            demand_window=warm_pool.DEFAULT_DEMAND_WINDOW / args.speedup,
+            warmup_lead_time=warm_pool.DEFAULT_WARMUP_LEAD_TIME / args.speedup,
+            refill_interval=warm_pool.DEFAULT_REFILL_INTERVAL / args.speedup
+        ))
+        await pool.refill()
+        pool.start()
+
+    async def signup(index: int) -> float:
+        await asyncio.sleep(index * args.interval / args.speedup)
+        start = time.monotonic()
+        result = await provision_new_tenant(
+            f"tenant{index:04d}", {"credentials": {"API_KEY": "secret"}},
+            client_manager=backend, checkpoint_store=store, warm_pool=pool
+        )
+        if result["status"] != "success":
+            raise RuntimeError(result["error_message"])
+        return (time.monotonic() - start) * args.speedup
+
+    times = await asyncio.gather(*(signup(index) for index in range(args.tenants)))
+    if pool is not None:
+        await pool.stop()
+    return {"times": sorted(times), "pool": pool.get_stats() if pool else None}
+
+
+def _print(name: str, result: dict) -> None:
+    times = result["times"]
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"{name}:")
+    print(
+        f"  time-to-ready:  median {statistics.median(times):6.1f}s, "
+        f"p95 {p95:6.1f}s, max {times[-1]:6.1f}s (simulated)"
+    )
+    if result["pool"]:
+        stats = result["pool"]
+        print(
+            f"  pool:           {stats['claimed']} claimed, {stats['misses']} misses, "
+            f"{stats['warmed']} projects warmed"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=30.0)
+    parser.add_argument("--pool-size", type=int, default=3)
+    parser.add_argument("--speedup", type=float, default=60.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    _scale_polling(args.speedup)
+    server, service_url = start_health_server()
+
+    try:
+        cold = asyncio.run(_signups(args, service_url, 0))
+        warm = asyncio.run(_signups(args, service_url, args.pool_size))
+    finally:
+        server.shutdown()
+
+    _print("cold (no pool)", cold)
+    _print(f"warm (pool of {args.pool_size})", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Provisioning Trace Report
+
+Summarizes provisioning traces written by nlyzer.gcp.tracing (see
+settings.PROVISIONING_TRACE_FILE) across many runs:
+
+- runs: count, failures and p50/p95 of the run time
+- critical paths: the most common chains of steps that determined the run
+  time, with how often each occurred
+- steps: p50/p95 duration of each step, and how often it was on the
+  critical path
+- GCP calls: count, errors and p50/p95 latency of each API method
+
+Only traces of the selected run type are considered, by default
+provisioning runs ("provision_tenant"); use --run teardown_tenant for
+offboarding.
+
+Usage:
+    python scripts/provisioning_trace_report.py traces.jsonl
+    python scripts/provisioning_trace_report.py traces-*.jsonl --tenant t-123
+"""
+
+import argparse
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "nlyzer_api"))
+
+from nlyzer.gcp.tracing import STATUS_ERROR, read_otlp_json  # noqa: E402
+
+
+def _percentile(values: list, percentile: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _report(spans: list, args) -> None:
+    runs = [
+        span for span in spans
+        if span["name"] == args.run
+        and (args.tenant is None or span["attributes"].get("tenant_id") == args.tenant)
+    ]
+    if not runs:
+        print(f"No {args.run} runs found")
+        return
+    traces = {run["trace_id"] for run in runs}
+    run_ids = {run["span_id"] for run in runs}
+
+    durations = [run["duration_seconds"] for run in runs]
+    failed = sum(1 for run in runs if run["status_code"] == STATUS_ERROR)
+    print(f"{args.run}: {len(runs)} runs, {failed} failed")
+    print(
+        f"  run time: p50 {_percentile(durations, 50):8.1f}s, "
+        f"p95 {_percentile(durations, 95):8.1f}s, max {max(durations):8.1f}s"
+    )
+
+    paths = Counter(
+        tuple(run["attributes"].get("critical_path") or ()) for run in runs
+    )
+    on_path = Counter()
+    for path, count in paths.items():
+        for step in path:
+            on_path[step] += count
+    print()
+    print("Critical paths:")
+    for path, count in paths.most_common(args.top):
+        print(f"  {count:5d} x  {' -> '.join(path) or '(none)'}")
+
+    steps = defaultdict(list)
+    calls = defaultdict(list)
+    call_errors = Counter()
+    for span in spans:
+        if span["trace_id"] not in traces:
+            continue
+        attributes = span["attributes"]
+        if "step" in attributes and span["parent_span_id"] in run_ids:
+            steps[attributes["step"]].append(span["duration_seconds"])
+        elif "gcp_service" in attributes:
+            key = f"{attributes['gcp_service']}.{attributes['gcp_method']}"
+            calls[key].append(span["duration_seconds"])
+            if span["status_code"] == STATUS_ERROR:
+                call_errors[key] += 1
+
+    print()
+    print(f"{'Step':<28} {'runs':>6} {'p50':>9} {'p95':>9} {'critical':>9}")
+    slowest = sorted(steps.items(), key=lambda item: -_percentile(item[1], 95))
+    for name, values in slowest:
+        print(
+            f"{name:<28} {len(values):6d} {_percentile(values, 50):8.1f}s "
+            f"{_percentile(values, 95):8.1f}s {on_path[name] / len(runs):8.0%}"
+        )
+
+    if calls:
+        print()
+        print(f"{'GCP call':<56} {'calls':>6} {'errors':>6} {'p50':>9} {'p95':>9}")
+        ranked = sorted(calls.items(), key=lambda item: -sum(item[1]))
+        for name, values in ranked[:args.top]:
+            print(
+                f"{name:<56} {len(values):6d} {call_errors[name]:6d} "
+                f"{_percentile(values, 50):8.2f}s {_percentile(values, 95):8.2f}s"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="+", help="OTLP/JSON lines trace files")
+    parser.add_argument("--run", default="provision_tenant",
+                        help="Name of the root span of the runs to report on")
+    parser.add_argument("--tenant", help="Only report runs of this tenant")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Critical paths and GCP calls to list")
+    args = parser.parse_args()
+
+    spans = []
+    for path in args.files:
+        spans.extend(read_otlp_json(path))
+    _report(spans, args)
+
+
+if __name__ == "__main__":
+    main()